@@ -0,0 +1,51 @@
+"""add table_locks table for atomic table lease acquisition
+
+Revision ID: 3c9e5a7b1f20
+Revises: 2ab3f4c5d6e7, c7b1f0d3ad4a
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e5a7b1f20"
+down_revision: Union[str, Sequence[str], None] = ("2ab3f4c5d6e7", "c7b1f0d3ad4a")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "table_locks",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column(
+            "cluster_id", sa.Integer(), sa.ForeignKey("clusters.id"), nullable=False
+        ),
+        sa.Column("database_name", sa.String(length=100), nullable=False),
+        sa.Column("table_name", sa.String(length=200), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=True),
+        sa.Column("holder", sa.String(length=100), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint(
+            "cluster_id", "database_name", "table_name", name="uq_table_locks_table"
+        ),
+    )
+    op.create_index("ix_table_locks_id", "table_locks", ["id"], unique=False)
+    op.create_index("ix_table_locks_task_id", "table_locks", ["task_id"], unique=False)
+    op.create_index(
+        "ix_table_locks_expires_at", "table_locks", ["expires_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_table_locks_expires_at", table_name="table_locks")
+    op.drop_index("ix_table_locks_task_id", table_name="table_locks")
+    op.drop_index("ix_table_locks_id", table_name="table_locks")
+    op.drop_table("table_locks")
@@ -0,0 +1,53 @@
+"""add metastore_sync_states table for incremental cold-data scans
+
+Revision ID: 8d2e4f6a1b3c
+Revises: 3c9e5a7b1f20
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e4f6a1b3c"
+down_revision: Union[str, Sequence[str], None] = "3c9e5a7b1f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metastore_sync_states",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column(
+            "cluster_id", sa.Integer(), sa.ForeignKey("clusters.id"), nullable=False
+        ),
+        sa.Column("scope", sa.String(length=20), nullable=False),
+        sa.Column("database_name", sa.String(length=100), nullable=False),
+        sa.Column("table_name", sa.String(length=200), nullable=False),
+        sa.Column("max_access_time", sa.BigInteger(), nullable=False),
+        sa.Column("max_create_time", sa.BigInteger(), nullable=False),
+        sa.Column("max_object_id", sa.BigInteger(), nullable=False),
+        sa.Column("aged_through", sa.DateTime(), nullable=True),
+        sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+        sa.Column("last_sync_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint(
+            "cluster_id",
+            "scope",
+            "database_name",
+            "table_name",
+            name="uq_metastore_sync_states_scope",
+        ),
+    )
+    op.create_index(
+        "ix_metastore_sync_states_id", "metastore_sync_states", ["id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_metastore_sync_states_id", table_name="metastore_sync_states")
+    op.drop_table("metastore_sync_states")
@@ -0,0 +1,69 @@
+"""sanitize task log messages written before write-time sanitization
+
+Revision ID: 9e3f7a2b5c14
+Revises: 8d2e4f6a1b3c
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.services.scan_service import _sanitize_log_text
+
+# revision identifiers, used by Alembic.
+revision: str = "9e3f7a2b5c14"
+down_revision: Union[str, Sequence[str], None] = "8d2e4f6a1b3c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 日志接口读取时不再清洗，历史日志行在此一次性清洗
+LOG_TABLES = ("task_logs", "test_table_task_logs")
+BATCH_SIZE = 1000
+
+
+def backfill_log_messages(bind, batch_size: int = BATCH_SIZE) -> int:
+    """按 id 分批清洗日志消息，只更新有变化的行；返回更新行数"""
+    existing = set(sa.inspect(bind).get_table_names())
+    updated = 0
+    for table_name in LOG_TABLES:
+        if table_name not in existing:
+            continue
+        table = sa.table(table_name, sa.column("id"), sa.column("message"))
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(table.c.id, table.c.message)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            changes = [
+                {"row_id": row.id, "clean": _sanitize_log_text(row.message)}
+                for row in rows
+                if row.message is not None
+                and _sanitize_log_text(row.message) != row.message
+            ]
+            if changes:
+                bind.execute(
+                    table.update()
+                    .where(table.c.id == sa.bindparam("row_id"))
+                    .values(message=sa.bindparam("clean")),
+                    changes,
+                )
+                updated += len(changes)
+    return updated
+
+
+def upgrade() -> None:
+    backfill_log_messages(op.get_bind())
+
+
+def downgrade() -> None:
+    # 清洗不可逆，原始消息中的 emoji 与多余空白不再恢复
+    pass
@@ -1,11 +1,13 @@
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config.database import get_db
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.models.table_metric import TableMetric
 from app.monitor.hybrid_table_scanner import HybridTableScanner
@@ -18,7 +20,7 @@ router = APIRouter()
 
 
 @router.get("/")
-async def list_clusters(
+def list_clusters(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     db: Session = Depends(get_db)
@@ -78,7 +80,7 @@ async def list_clusters(
 
 
 @router.post("/", response_model=ClusterResponse)
-async def create_cluster(
+def create_cluster(
     cluster: ClusterCreate,
     validate_connection: bool = False,
     db: Session = Depends(get_db),
@@ -198,7 +200,7 @@ async def create_cluster(
 
 
 @router.get("/health-metrics")
-async def get_health_metrics(
+def get_health_metrics(
     days: int = Query(7, ge=1, le=90), db: Session = Depends(get_db)
 ):
     """获取集群健康指标统计"""
@@ -212,7 +214,7 @@ async def get_health_metrics(
 
 
 @router.get("/kerberos/metrics")
-async def get_kerberos_metrics():
+def get_kerberos_metrics():
     """返回内存中的 Kerberos 连通性指标（供运维监控使用）。"""
     try:
         return {
@@ -226,15 +228,19 @@ async def get_kerberos_metrics():
 
 
 @router.post("/batch-health-check")
-async def batch_health_check(
+def batch_health_check(
     cluster_ids: List[int] = None,
-    parallel_limit: int = Query(5, ge=1, le=20),
+    parallel_limit: Optional[int] = Query(None, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    """批量健康检查"""
+    """批量健康检查（默认所有集群并发检测，优先返回共享缓存中的有效结果）
+
+    同步端点运行在线程池中，检测协程在该线程的独立事件循环内执行，
+    其中的数据库读写不会阻塞主事件循环
+    """
     try:
-        results = await cluster_status_service.batch_health_check(
-            db, cluster_ids, parallel_limit
+        results = asyncio.run(
+            cluster_status_service.batch_health_check(db, cluster_ids, parallel_limit)
         )
 
         successful_checks = sum(
@@ -256,7 +262,7 @@ async def batch_health_check(
 
 
 @router.get("/{cluster_id}", response_model=ClusterResponse)
-async def get_cluster(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster(cluster_id: int, db: Session = Depends(get_db)):
     """Get cluster by ID"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -265,7 +271,7 @@ async def get_cluster(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{cluster_id}/stats")
-async def get_cluster_stats(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster_stats(cluster_id: int, db: Session = Depends(get_db)):
     """Get cluster statistics"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -318,7 +324,7 @@ async def get_cluster_stats(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{cluster_id}/databases")
-async def get_cluster_databases(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster_databases(cluster_id: int, db: Session = Depends(get_db)):
     """Get databases for cluster"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -361,7 +367,7 @@ async def get_cluster_databases(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{cluster_id}", response_model=ClusterResponse)
-async def update_cluster(
+def update_cluster(
     cluster_id: int, cluster_update: ClusterUpdate, db: Session = Depends(get_db)
 ):
     """Update cluster configuration"""
@@ -386,7 +392,7 @@ async def update_cluster(
 
 
 @router.delete("/{cluster_id}")
-async def delete_cluster(cluster_id: int, db: Session = Depends(get_db)):
+def delete_cluster(cluster_id: int, db: Session = Depends(get_db)):
     """Delete cluster and all related data"""
     from sqlalchemy import text
 
@@ -479,7 +485,7 @@ async def delete_cluster(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{cluster_id}/test")
-async def test_cluster_connection(
+def test_cluster_connection(
     cluster_id: int,
     mode: str = "mock",
     force_refresh: bool = False,
@@ -497,8 +503,11 @@ async def test_cluster_connection(
     try:
         if mode == "real":
             # 使用状态管理服务进行连接测试（支持缓存）
-            results = await cluster_status_service.test_cluster_connections(
-                db, cluster_id, force_refresh=force_refresh
+            # 同步端点运行在线程池中，数据库读写不占用主事件循环
+            results = asyncio.run(
+                cluster_status_service.test_cluster_connections(
+                    db, cluster_id, force_refresh=force_refresh
+                )
             )
 
             return {
@@ -568,21 +577,21 @@ async def test_cluster_connection(
 
 
 @router.post("/{cluster_id}/test-real")
-async def test_cluster_connection_real(cluster_id: int, db: Session = Depends(get_db)):
+def test_cluster_connection_real(cluster_id: int, db: Session = Depends(get_db)):
     """Test real cluster connections with intelligent fallback"""
-    return await test_cluster_connection(cluster_id, mode="real", db=db)
+    return test_cluster_connection(cluster_id, mode="real", db=db)
 
 
 @router.get("/{cluster_id}/test-connection")
-async def get_cluster_test_connection(
+def get_cluster_test_connection(
     cluster_id: int, mode: str = "mock", db: Session = Depends(get_db)
 ):
     """Legacy GET endpoint for cluster connection testing (for backward compatibility)"""
-    return await test_cluster_connection(cluster_id, mode=mode, db=db)
+    return test_cluster_connection(cluster_id, mode=mode, db=db)
 
 
 @router.post("/test-connection")
-async def test_connection_without_cluster(cluster: ClusterCreate):
+def test_connection_without_cluster(cluster: ClusterCreate):
     """Test connection to cluster configuration without creating a cluster
 
     This endpoint allows testing cluster connectivity before actually creating the cluster.
@@ -650,11 +659,37 @@ async def test_connection_without_cluster(cluster: ClusterCreate):
 
 
 @router.get("/health-check")
-async def check_all_clusters_health(db: Session = Depends(get_db)):
+def check_all_clusters_health(db: Session = Depends(get_db)):
     """Check health of all clusters - DRAFT VERSION"""
     all_clusters = db.query(Cluster).all()
     health_results = []
 
+    if settings.HEALTH_PROBE_ENABLED:
+        # 后台探测守护任务已维护共享缓存，这里只读缓存，不再逐个集群实时探测
+        for cluster in all_clusters:
+            summary = cluster_status_service.get_cluster_connection_summary(
+                db, cluster.id
+            )
+            connections = summary["connections"]
+            health_results.append(
+                {
+                    "cluster_id": cluster.id,
+                    "cluster_name": cluster.name,
+                    "overall_health": cluster.health_status or "unknown",
+                    "metastore_status": connections["metastore"]["status"],
+                    "hdfs_status": connections["hdfs"]["status"],
+                    "last_check": summary["last_health_check"],
+                    "details": connections,
+                }
+            )
+        return {
+            "total_clusters": len(all_clusters),
+            "healthy_count": len(
+                [r for r in health_results if r["overall_health"] == "healthy"]
+            ),
+            "clusters": health_results,
+        }
+
     for cluster in all_clusters:
         try:
             scanner = HybridTableScanner(cluster)
@@ -698,7 +733,7 @@ async def check_all_clusters_health(db: Session = Depends(get_db)):
 
 
 @router.post("/{cluster_id}/scan-all")
-async def scan_all_cluster_tables(
+def scan_all_cluster_tables(
     cluster_id: int,
     max_tables_per_db: int = Query(
         20, description="Maximum tables to scan per database"
@@ -850,7 +885,7 @@ async def scan_all_cluster_tables(
 
 
 @router.get("/{cluster_id}/status")
-async def get_cluster_status(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster_status(cluster_id: int, db: Session = Depends(get_db)):
     """获取集群状态信息"""
     try:
         status_info = cluster_status_service.get_cluster_connection_summary(
@@ -866,7 +901,7 @@ async def get_cluster_status(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{cluster_id}/status-history")
-async def get_cluster_status_history(
+def get_cluster_status_history(
     cluster_id: int, limit: int = Query(50, ge=1, le=100), db: Session = Depends(get_db)
 ):
     """获取集群状态变更历史"""
@@ -902,7 +937,7 @@ async def get_cluster_status_history(
 
 
 @router.post("/{cluster_id}/status")
-async def update_cluster_status(
+def update_cluster_status(
     cluster_id: int,
     new_status: str,
     reason: str = None,
@@ -943,7 +978,7 @@ async def update_cluster_status(
 
 
 @router.delete("/{cluster_id}/cache")
-async def clear_cluster_cache(cluster_id: int, db: Session = Depends(get_db)):
+def clear_cluster_cache(cluster_id: int, db: Session = Depends(get_db)):
     """清除集群连接状态缓存"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -959,7 +994,7 @@ async def clear_cluster_cache(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{cluster_id}/connection-history")
-async def get_connection_history(
+def get_connection_history(
     cluster_id: int, limit: int = Query(50, ge=1, le=200), db: Session = Depends(get_db)
 ):
     """获取集群连接历史记录"""
@@ -982,7 +1017,7 @@ async def get_connection_history(
 
 
 @router.get("/{cluster_id}/connection-statistics")
-async def get_connection_statistics(
+def get_connection_statistics(
     cluster_id: int,
     hours: int = Query(24, ge=1, le=168),  # 最多7天
     db: Session = Depends(get_db),
@@ -1004,7 +1039,7 @@ async def get_connection_statistics(
 
 
 @router.post("/{cluster_id}/test-enhanced")
-async def test_cluster_connection_enhanced(
+def test_cluster_connection_enhanced(
     cluster_id: int,
     connection_types: List[str] = Query(
         default=None,
@@ -1029,8 +1064,10 @@ async def test_cluster_connection_enhanced(
             )
 
     try:
-        results = await cluster_status_service.test_cluster_connections(
-            db, cluster_id, force_refresh, connection_types
+        results = asyncio.run(
+            cluster_status_service.test_cluster_connections(
+                db, cluster_id, force_refresh, connection_types
+            )
         )
 
         return {
@@ -17,6 +17,7 @@ from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
 from app.models.partition_metric import PartitionMetric
 from app.models.table_metric import TableMetric
+from app.utils.coldness import ColdnessColumns
 
 router = APIRouter()
 
@@ -128,7 +129,7 @@ class EnhancedColdnessDistribution(BaseModel):
 
 
 @router.get("/summary", response_model=DashboardSummary)
-async def get_dashboard_summary(
+def get_dashboard_summary(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> DashboardSummary:
@@ -215,7 +216,7 @@ async def get_dashboard_summary(
 
 
 @router.get("/trends", response_model=List[TrendPoint])
-async def get_small_file_trends(
+def get_small_file_trends(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
     db: Session = Depends(get_db),
@@ -266,7 +267,7 @@ async def get_small_file_trends(
 
 
 @router.get("/file-distribution", response_model=List[FileDistributionItem])
-async def get_file_distribution(
+def get_file_distribution(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> List[FileDistributionItem]:
@@ -338,7 +339,7 @@ async def get_file_distribution(
 
 
 @router.get("/top-tables", response_model=List[TopTable])
-async def get_top_tables(
+def get_top_tables(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     limit: int = Query(10, ge=1, le=50, description="Number of top tables to return"),
     db: Session = Depends(get_db),
@@ -388,7 +389,7 @@ async def get_top_tables(
 
 
 @router.get("/recent-tasks", response_model=List[RecentTask])
-async def get_recent_tasks(
+def get_recent_tasks(
     limit: int = Query(
         20, ge=1, le=100, description="Number of recent tasks to return"
     ),
@@ -438,7 +439,7 @@ async def get_recent_tasks(
 
 
 @router.get("/cluster-stats")
-async def get_cluster_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_cluster_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Get detailed statistics for each cluster
     """
@@ -497,7 +498,7 @@ async def get_cluster_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
 
 
 @router.get("/table-file-counts", response_model=List[TableFileCountItem])
-async def get_table_file_counts(
+def get_table_file_counts(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     limit: int = Query(20, ge=1, le=100, description="Number of tables to return"),
     db: Session = Depends(get_db),
@@ -600,7 +601,7 @@ async def get_table_file_counts(
 
 
 @router.get("/table-file-trends/{table_id}", response_model=List[TableFileCountPoint])
-async def get_table_file_trends(
+def get_table_file_trends(
     table_id: str,
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
     db: Session = Depends(get_db),
@@ -664,7 +665,7 @@ async def get_table_file_trends(
 
 
 @router.get("/file-classification", response_model=List[FileClassificationItem])
-async def get_file_classification(
+def get_file_classification(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> List[FileClassificationItem]:
@@ -797,7 +798,7 @@ async def get_file_classification(
 @router.get(
     "/enhanced-coldness-distribution", response_model=EnhancedColdnessDistribution
 )
-async def get_enhanced_coldness_distribution(
+def get_enhanced_coldness_distribution(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> EnhancedColdnessDistribution:
@@ -827,108 +828,73 @@ async def get_enhanced_coldness_distribution(
         "over_3_years": (1095, 999999),
     }
 
-    distribution = {}
-    total_partitions = 0
-    total_tables = 0
-    total_partitions_size = 0.0
-    total_tables_size = 0.0
-
-    # Process partition data - include ALL partitions
-    partition_query = db.query(PartitionMetric)
+    # Process partition data - include ALL partitions, loaded as columns
+    partition_query = db.query(
+        PartitionMetric.days_since_last_access,
+        PartitionMetric.scan_time,
+        PartitionMetric.total_size,
+    )
     if cluster_id_filter:
         partition_query = partition_query.join(TableMetric).filter(
             TableMetric.cluster_id == cluster_id_filter
         )
 
-    partitions = (
-        partition_query.all()
-    )  # Include all partitions, not just those with access time
-
     # Process table data - include ALL tables
-    table_query = db.query(TableMetric)
+    table_query = db.query(
+        TableMetric.cluster_id,
+        TableMetric.database_name,
+        TableMetric.table_name,
+        TableMetric.days_since_last_access,
+        TableMetric.scan_time,
+        TableMetric.total_size,
+    )
     if cluster_id_filter:
         table_query = table_query.filter(TableMetric.cluster_id == cluster_id_filter)
 
-    # Get all tables, prioritizing latest metrics for each table
-    all_tables = table_query.order_by(
+    # Get latest metric for each unique table
+    table_rows = []
+    seen_tables = set()
+    for row in table_query.order_by(
         TableMetric.cluster_id,
         TableMetric.database_name,
         TableMetric.table_name,
         desc(TableMetric.scan_time),
-    ).all()
-
-    # Get latest metric for each unique table
-    table_metrics = {}
-    for table in all_tables:
-        table_key = f"{table.cluster_id}:{table.database_name}:{table.table_name}"
-        if table_key not in table_metrics:
-            table_metrics[table_key] = table
+    ):
+        table_key = (row.cluster_id, row.database_name, row.table_name)
+        if table_key not in seen_tables:
+            seen_tables.add(table_key)
+            table_rows.append(row[3:])
+
+    # Intelligent time inference: days_since_last_access, then days since scan,
+    # then assume recent access (partitions: a week, tables: a month)
+    current_time = datetime.now()
+    partitions = ColdnessColumns.from_rows(
+        partition_query.all(), current_time, fallback_days=7
+    )
+    tables = ColdnessColumns.from_rows(table_rows, current_time, fallback_days=30)
 
-    tables = list(table_metrics.values())
+    edges = [time_ranges[name][0] for name in time_ranges]
+    edges.append(list(time_ranges.values())[-1][1])
+    partition_counts, partition_sizes = partitions.histogram(edges)
+    table_counts, table_sizes = tables.histogram(edges)
 
-    # Initialize distribution
-    for range_name in time_ranges:
+    gb = 1024**3
+    distribution = {}
+    for index, range_name in enumerate(time_ranges):
+        table_size_gb = round(float(table_sizes[index]) / gb, 2)
         distribution[range_name] = DetailedColdnessStats(
-            partitions={"count": 0, "size_gb": 0},
-            tables={"count": 0, "size_gb": 0},
-            total_size_gb=0.0,
+            partitions={
+                "count": int(partition_counts[index]),
+                "size_gb": round(float(partition_sizes[index]) / gb, 2),
+            },
+            tables={"count": int(table_counts[index]), "size_gb": table_size_gb},
+            total_size_gb=table_size_gb,
         )
 
-    # Categorize partitions with intelligent time inference
-    current_time = datetime.now()
-    for partition in partitions:
-        # Intelligent time calculation
-        if partition.days_since_last_access is not None:
-            # Use actual access time if available
-            days = partition.days_since_last_access
-        elif hasattr(partition, "scan_time") and partition.scan_time:
-            # Fall back to scan time
-            days = (current_time - partition.scan_time).days
-        else:
-            # Default to "unknown" - classify as recent for conservative estimation
-            days = 7  # Assume accessed within a week if no data
-
-        size_gb = (partition.total_size or 0) / (1024**3)
-
-        for range_name, (min_days, max_days) in time_ranges.items():
-            if min_days <= days < max_days:
-                distribution[range_name].partitions["count"] += 1
-                distribution[range_name].partitions["size_gb"] += size_gb
-                break
-
-        total_partitions += 1
-        total_partitions_size += size_gb
-
-    # Categorize tables with intelligent time inference
-    for table in tables:
-        # Intelligent time calculation for tables
-        if table.days_since_last_access is not None:
-            # Use actual access time if available
-            days = table.days_since_last_access
-        elif table.scan_time:
-            # Fall back to scan time - how long since last scan
-            days = (current_time - table.scan_time).days
-        else:
-            # Default to "unknown" - classify as recent for conservative estimation
-            days = 30  # Assume accessed within a month if no data
-
-        size_gb = (table.total_size or 0) / (1024**3)
-
-        for range_name, (min_days, max_days) in time_ranges.items():
-            if min_days <= days < max_days:
-                distribution[range_name].tables["count"] += 1
-                distribution[range_name].tables["size_gb"] += size_gb
-                distribution[range_name].total_size_gb += size_gb
-                break
-
-        total_tables += 1
-        total_tables_size += size_gb
-
-    # Round all size values
-    for range_stats in distribution.values():
-        range_stats.partitions["size_gb"] = round(range_stats.partitions["size_gb"], 2)
-        range_stats.tables["size_gb"] = round(range_stats.tables["size_gb"], 2)
-        range_stats.total_size_gb = round(range_stats.total_size_gb, 2)
+    total_partitions = len(partitions)
+    total_tables = len(tables)
+    total_partitions_size = float(partitions.sizes.sum()) / gb
+    total_tables_size = float(tables.sizes.sum()) / gb
 
     return EnhancedColdnessDistribution(
         cluster_id=cluster_id_filter or 0,
@@ -945,7 +911,7 @@ async def get_enhanced_coldness_distribution(
 
 
 @router.get("/coldest-data", response_model=List[ColdDataItem])
-async def get_coldest_data(
+def get_coldest_data(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     limit: int = Query(
         10, ge=1, le=50, description="Number of coldest data entries to return"
@@ -1082,7 +1048,7 @@ class FormatCompressionItem(BaseModel):
 
 
 @router.get("/storage-format-distribution", response_model=List[StorageFormatItem])
-async def get_storage_format_distribution(
+def get_storage_format_distribution(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> List[StorageFormatItem]:
@@ -1174,7 +1140,7 @@ async def get_storage_format_distribution(
 @router.get(
     "/format-compression-distribution", response_model=List[FormatCompressionItem]
 )
-async def get_format_compression_distribution(
+def get_format_compression_distribution(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> List[FormatCompressionItem]:
@@ -1399,7 +1365,7 @@ async def get_format_compression_distribution(
 @router.get(
     "/compression-format-distribution", response_model=List[CompressionFormatItem]
 )
-async def get_compression_format_distribution(
+def get_compression_format_distribution(
     cluster_id: Optional[int] = Query(None, description="Filter by cluster ID"),
     db: Session = Depends(get_db),
 ) -> List[CompressionFormatItem]:
@@ -5,7 +5,7 @@ router = APIRouter()
 
 
 @router.get("/test-error")
-async def test_error():
+def test_error():
     """测试错误监控端点"""
     try:
         raise ValueError("This is a test error for Sentry monitoring")
@@ -15,7 +15,7 @@ async def test_error():
 
 
 @router.get("/test-manual-error")
-async def test_manual_error():
+def test_manual_error():
     """手动触发错误"""
     sentry_sdk.capture_message("Manual test message", level="error")
     return {"message": "Manual error message sent to Sentry"}
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+from app.services.job_executor import get_job_executor
+
+router = APIRouter()
+
+
+@router.get("/")
+def get_background_jobs(
+    job_type: Optional[str] = Query(None, description="只返回指定作业类型的线程池"),
+):
+    """后台作业执行器状态：各线程池的运行中/排队作业与最近完成的作业"""
+    stats = get_job_executor().stats()
+    if job_type:
+        stats["pools"] = {
+            name: pool for name, pool in stats["pools"].items() if name == job_type
+        }
+        stats["recent"] = [
+            job for job in stats["recent"] if job["job_type"] == job_type
+        ]
+    return stats
@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.config.database import SessionLocal, get_db
@@ -15,13 +16,14 @@ from app.models.partition_metric import PartitionMetric
 from app.models.table_metric import TableMetric
 from app.monitor.partition_archive_engine import PartitionArchiveEngine
 from app.monitor.partition_cold_data_scanner import PartitionColdDataScanner
+from app.services.job_executor import PRIORITY_HIGH, PRIORITY_LOW, JobQueueFullError
 from app.services.scan_service import scan_task_manager
 
 router = APIRouter()
 
 
 @router.post("/scan-cold-partitions/{cluster_id}")
-async def scan_cold_partitions(
+def scan_cold_partitions(
     cluster_id: int,
     cold_threshold_days: Optional[int] = Query(90, description="冷数据阈值天数"),
     database_name: Optional[str] = Query(None, description="指定数据库名称"),
@@ -134,12 +136,12 @@ async def scan_cold_partitions(
                 except Exception:
                     pass
 
-        import threading
-
-        t = threading.Thread(target=run_scan, daemon=True)
-        t.start()
+        scan_task_manager.run_in_background(db, task.task_id, "scan", run_scan)
         return {"message": "Cold partition scan started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Cold partition scan failed: {str(e)}"
@@ -147,7 +149,7 @@ async def scan_cold_partitions(
 
 
 @router.get("/cold-partitions-summary/{cluster_id}")
-async def get_cold_partitions_summary(
+def get_cold_partitions_summary(
     cluster_id: int,
     database_name: Optional[str] = Query(None, description="数据库名过滤"),
     table_name: Optional[str] = Query(None, description="表名过滤"),
@@ -172,7 +174,7 @@ async def get_cold_partitions_summary(
 
 
 @router.get("/cold-partitions-list/{cluster_id}")
-async def get_cold_partitions_list(
+def get_cold_partitions_list(
     cluster_id: int,
     database_name: Optional[str] = Query(None, description="数据库名过滤"),
     table_name: Optional[str] = Query(None, description="表名过滤"),
@@ -248,7 +250,7 @@ async def get_cold_partitions_list(
 @router.post(
     "/archive-partition/{cluster_id}/{database_name}/{table_name}/{partition_name}"
 )
-async def archive_partition(
+def archive_partition(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -337,11 +339,12 @@ async def archive_partition(
                 except Exception:
                     pass
 
-        import threading
-
-        threading.Thread(target=run_archive, daemon=True).start()
+        scan_task_manager.run_in_background(db, task.task_id, "archive", run_archive)
         return {"message": "Partition archive started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Archive failed: {str(e)}")
 
@@ -349,7 +352,7 @@ async def archive_partition(
 @router.post(
     "/restore-partition/{cluster_id}/{database_name}/{table_name}/{partition_name}"
 )
-async def restore_partition(
+def restore_partition(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -433,17 +436,21 @@ async def restore_partition(
                 except Exception:
                     pass
 
-        import threading
-
-        threading.Thread(target=run_restore, daemon=True).start()
+        # 恢复通常是用户在等待数据，优先于归档执行
+        scan_task_manager.run_in_background(
+            db, task.task_id, "archive", run_restore, priority=PRIORITY_HIGH
+        )
         return {"message": "Partition restore started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Restore failed: {str(e)}")
 
 
 @router.post("/batch-archive-partitions/{cluster_id}")
-async def batch_archive_partitions(
+def batch_archive_partitions(
     cluster_id: int,
     partition_list: List[Dict[str, str]] = Body(..., description="分区列表"),
     force: bool = Query(False, description="强制归档，跳过检查"),
@@ -517,11 +524,12 @@ async def batch_archive_partitions(
                 except Exception:
                     pass
 
-        import threading
-
-        threading.Thread(target=run_batch, daemon=True).start()
+        scan_task_manager.run_in_background(db, task.task_id, "archive", run_batch)
         return {"message": "Batch partition archive started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch archive failed: {str(e)}")
 
@@ -529,7 +537,7 @@ async def batch_archive_partitions(
 @router.get(
     "/partition-archive-status/{cluster_id}/{database_name}/{table_name}/{partition_name}"
 )
-async def get_partition_archive_status(
+def get_partition_archive_status(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -568,7 +576,7 @@ async def get_partition_archive_status(
 
 
 @router.get("/archived-partitions/{cluster_id}")
-async def list_archived_partitions(
+def list_archived_partitions(
     cluster_id: int,
     database_name: Optional[str] = Query(None),
     table_name: Optional[str] = Query(None),
@@ -601,7 +609,7 @@ async def list_archived_partitions(
 
 
 @router.get("/partition-archive-statistics/{cluster_id}")
-async def get_partition_archive_statistics(
+def get_partition_archive_statistics(
     cluster_id: int,
     days_range: int = Query(30, description="统计天数范围"),
     db: Session = Depends(get_db),
@@ -630,7 +638,7 @@ async def get_partition_archive_statistics(
 
 
 @router.get("/partition-coldness-distribution/{cluster_id}")
-async def get_partition_coldness_distribution(
+def get_partition_coldness_distribution(
     cluster_id: int,
     database_name: Optional[str] = Query(None),
     table_name: Optional[str] = Query(None),
@@ -653,26 +661,41 @@ async def get_partition_coldness_distribution(
         if table_name:
             base_query = base_query.filter(TableMetric.table_name == table_name)
 
-        # 统计不同冷热程度的分区数量
-        very_cold_count = base_query.filter(
-            PartitionMetric.days_since_last_access > 180
-        ).count()
-        cold_count = base_query.filter(
-            PartitionMetric.days_since_last_access.between(90, 180)
-        ).count()
-        warm_count = base_query.filter(
-            PartitionMetric.days_since_last_access < 90
-        ).count()
-
-        # 统计归档状态分布
-        archived_count = base_query.filter(
-            PartitionMetric.archive_status == "archived"
-        ).count()
-        active_count = base_query.filter(
-            PartitionMetric.archive_status == "active"
-        ).count()
+        # 数据库端一次 GROUP BY 按冷热分桶与归档状态聚合,只返回少量汇总行
+        days = PartitionMetric.days_since_last_access
+        bucket = case(
+            (days > 180, "very_cold"),
+            (days >= 90, "cold"),
+            (days < 90, "warm"),
+        )
+        rows = (
+            base_query.with_entities(
+                bucket,
+                PartitionMetric.archive_status,
+                func.count(PartitionMetric.id),
+                func.coalesce(func.sum(PartitionMetric.total_size), 0),
+            )
+            .group_by(bucket, PartitionMetric.archive_status)
+            .all()
+        )
 
-        total_count = base_query.count()
+        counts = {"very_cold": 0, "cold": 0, "warm": 0}
+        sizes = {"very_cold": 0, "cold": 0, "warm": 0}
+        status_counts = {"archived": 0, "active": 0}
+        archived_size = 0
+        total_count = 0
+        total_size = 0
+        for bucket_name, status, count, size in rows:
+            count, size = int(count), int(size or 0)
+            total_count += count
+            total_size += size
+            if bucket_name in counts:
+                counts[bucket_name] += count
+                sizes[bucket_name] += size
+            if status in status_counts:
+                status_counts[status] += count
+            if status == "archived":
+                archived_size += size
 
         return {
             "cluster_id": cluster_id,
@@ -681,16 +704,24 @@ async def get_partition_coldness_distribution(
                 "table_name": table_name,
             },
             "coldness_distribution": {
-                "very_cold_180d_plus": very_cold_count,
-                "cold_90_180d": cold_count,
-                "warm_under_90d": warm_count,
+                "very_cold_180d_plus": counts["very_cold"],
+                "cold_90_180d": counts["cold"],
+                "warm_under_90d": counts["warm"],
                 "total_partitions": total_count,
             },
             "archive_status_distribution": {
-                "archived": archived_count,
-                "active": active_count,
+                "archived": status_counts["archived"],
+                "active": status_counts["active"],
                 "total_partitions": total_count,
             },
+            # 按分区大小(字节)加权的分布
+            "size_distribution": {
+                "very_cold_180d_plus": sizes["very_cold"],
+                "cold_90_180d": sizes["cold"],
+                "warm_under_90d": sizes["warm"],
+                "archived": archived_size,
+                "total_size": total_size,
+            },
             "statistics_timestamp": datetime.now().isoformat(),
         }
 
@@ -702,7 +733,7 @@ async def get_partition_coldness_distribution(
 
 
 @router.post("/auto-archive-by-policy/{cluster_id}")
-async def auto_archive_by_policy(
+def auto_archive_by_policy(
     cluster_id: int,
     policy_config: Dict[str, Any] = Body(..., description="归档策略配置"),
     dry_run: bool = Query(False, description="干运行模式，只返回匹配的分区不执行归档"),
@@ -852,11 +883,15 @@ async def auto_archive_by_policy(
                 except Exception:
                     pass
 
-        import threading
-
-        threading.Thread(target=run_policy, daemon=True).start()
+        # 策略驱动的批量归档不紧急，排在手动提交的归档/恢复之后
+        scan_task_manager.run_in_background(
+            db, task.task_id, "archive", run_policy, priority=PRIORITY_LOW
+        )
         return {"message": "Policy partition archive started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Auto archive by policy failed: {str(e)}"
@@ -16,7 +16,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[ScanTaskResponse])
-async def list_scan_tasks(
+def list_scan_tasks(
     cluster_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=500),
@@ -49,7 +49,7 @@ async def list_scan_tasks(
 
 
 @router.get("/{task_id}", response_model=ScanTaskResponse)
-async def get_scan_task(task_id: str, db: Session = Depends(get_db)):
+def get_scan_task(task_id: str, db: Session = Depends(get_db)):
     task = db.query(ScanTask).filter(ScanTask.task_id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -57,7 +57,7 @@ async def get_scan_task(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{task_id}/logs", response_model=List[ScanTaskLog])
-async def get_scan_task_logs(task_id: str, db: Session = Depends(get_db)):
+def get_scan_task_logs(task_id: str, db: Session = Depends(get_db)):
     """Get logs for a specific scan task.
     Prefer persisted logs; if task is running and in-memory has newer logs, append them.
     """
@@ -103,7 +103,7 @@ async def get_scan_task_logs(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{task_id}/cancel")
-async def cancel_scan_task(task_id: str, db: Session = Depends(get_db)):
+def cancel_scan_task(task_id: str, db: Session = Depends(get_db)):
     """请求取消正在运行的扫描任务。若任务已完成或不存在，返回相应提示。"""
     db_task = db.query(ScanTaskModel).filter(ScanTaskModel.task_id == task_id).first()
     if not db_task:
@@ -66,7 +66,7 @@ def _with_kinit(payload: SSHBase, remote: str) -> str:
 
 
 @router.post("/ec/set-policy/{cluster_id}")
-async def set_ec_policy(
+def set_ec_policy(
     cluster_id: int, req: ECSetPolicyRequest, db: Session = Depends(get_db)
 ):
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
@@ -164,16 +164,12 @@ async def set_ec_policy(
             except Exception:
                 pass
 
-    import threading
-
-    threading.Thread(target=run, daemon=True).start()
+    scan_task_manager.run_in_background(db, task_id, "storage", run)
     return {"message": "EC set started", "task_id": task_id, "cluster_id": cluster_id}
 
 
 @router.post("/storage/mover/{cluster_id}")
-async def run_mover(
-    cluster_id: int, req: RunMoverRequest, db: Session = Depends(get_db)
-):
+def run_mover(cluster_id: int, req: RunMoverRequest, db: Session = Depends(get_db)):
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
         raise HTTPException(status_code=404, detail="Cluster not found")
@@ -243,14 +239,12 @@ async def run_mover(
             except Exception:
                 pass
 
-    import threading
-
-    threading.Thread(target=run, daemon=True).start()
+    scan_task_manager.run_in_background(db, task_id, "storage", run)
     return {"message": "Mover started", "task_id": task_id, "cluster_id": cluster_id}
 
 
 @router.post("/storage/set-replication/{cluster_id}")
-async def set_replication(
+def set_replication(
     cluster_id: int, req: SetReplicationRequest, db: Session = Depends(get_db)
 ):
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
@@ -365,9 +359,7 @@ async def set_replication(
             except Exception:
                 pass
 
-    import threading
-
-    threading.Thread(target=run, daemon=True).start()
+    scan_task_manager.run_in_background(db, task_id, "storage", run)
     return {
         "message": "Set replication started",
         "task_id": task_id,
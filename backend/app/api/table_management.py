@@ -18,7 +18,7 @@ router = APIRouter()
 
 
 @router.get("/metrics", response_model=list[TableMetricResponse])
-async def get_table_metrics(
+def get_table_metrics(
     cluster_id: int = Query(...),
     database_name: str = Query(None),
     db: Session = Depends(get_db),
@@ -49,7 +49,7 @@ async def get_table_metrics(
 
 
 @router.get("/small-files", response_model=dict)
-async def get_small_file_summary(
+def get_small_file_summary(
     cluster_id: int = Query(...),
     database_name: str = Query(None),
     db: Session = Depends(get_db),
@@ -83,7 +83,7 @@ async def get_small_file_summary(
 
 
 @router.get("/databases/{cluster_id}")
-async def get_databases(cluster_id: int, db: Session = Depends(get_db)):
+def get_databases(cluster_id: int, db: Session = Depends(get_db)):
     """获取集群的数据库列表"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -102,9 +102,7 @@ async def get_databases(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/tables/{cluster_id}/{database_name}")
-async def get_tables(
-    cluster_id: int, database_name: str, db: Session = Depends(get_db)
-):
+def get_tables(cluster_id: int, database_name: str, db: Session = Depends(get_db)):
     """获取指定数据库的表列表"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -126,7 +124,7 @@ async def get_tables(
 
 
 @router.get("/table-detail/{cluster_id}/{database_name}/{table_name}")
-async def get_table_detail(
+def get_table_detail(
     cluster_id: int, database_name: str, table_name: str, db: Session = Depends(get_db)
 ):
     """获取单个表的详细信息"""
@@ -188,7 +186,7 @@ async def get_table_detail(
 
 
 @router.get("/{cluster_id}/{database_name}/{table_name}/info")
-async def get_table_info(
+def get_table_info(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -259,7 +257,7 @@ async def get_table_info(
 
 
 @router.get("/table-history/{cluster_id}/{database_name}/{table_name}")
-async def get_table_scan_history(
+def get_table_scan_history(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -296,7 +294,7 @@ async def get_table_scan_history(
 
 
 @router.get("/{cluster_id}/{database_name}/{table_name}/partitions")
-async def get_table_partitions(
+def get_table_partitions(
     cluster_id: int, database_name: str, table_name: str, db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """获取表的分区列表"""
@@ -12,6 +12,7 @@ from app.monitor.hybrid_table_scanner import HybridTableScanner
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
 from app.schemas.scan_task import ScanTaskProgress
 from app.schemas.table_metric import ScanRequest
+from app.services.job_executor import JobQueueFullError
 from app.services.scan_service import scan_task_manager
 from app.utils.webhdfs_client import WebHDFSClient
 
@@ -19,7 +20,7 @@ router = APIRouter()
 
 
 @router.post("/scan")
-async def scan_tables(
+def scan_tables(
     request: ScanRequest,
     strict_real: bool = Query(True, description="严格实连模式"),
     db: Session = Depends(get_db),
@@ -63,7 +64,7 @@ async def scan_tables(
 
 
 @router.post("/scan/{cluster_id}")
-async def scan_all_cluster_databases_with_progress(
+def scan_all_cluster_databases_with_progress(
     cluster_id: int,
     strict_real: bool = Query(True, description="严格实连模式"),
     max_tables_per_db: Optional[int] = Query(
@@ -114,6 +115,9 @@ async def scan_all_cluster_databases_with_progress(
             "status": "started",
         }
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to start cluster scan: {str(e)}"
@@ -121,7 +125,7 @@ async def scan_all_cluster_databases_with_progress(
 
 
 @router.post("/scan/{cluster_id}/{database_name}")
-async def scan_database_tables(
+def scan_database_tables(
     cluster_id: int,
     database_name: str,
     strict_real: bool = Query(True, description="严格实连模式"),
@@ -156,7 +160,7 @@ async def scan_database_tables(
 
 
 @router.post("/scan-real/{cluster_id}/{database_name}")
-async def scan_database_tables_real(
+def scan_database_tables_real(
     cluster_id: int,
     database_name: str,
     max_tables: int = Query(0, description="最大扫描表数，0或负值表示不限制"),
@@ -192,7 +196,7 @@ async def scan_database_tables_real(
 
 
 @router.get("/partition-metrics")
-async def get_partition_metrics(
+def get_partition_metrics(
     cluster_id: int = Query(...),
     database_name: str = Query(...),
     table_name: str = Query(...),
@@ -311,7 +315,7 @@ async def get_partition_metrics(
 
 
 @router.post("/scan-table/{cluster_id}/{database_name}/{table_name}")
-async def scan_single_table(
+def scan_single_table(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -336,7 +340,7 @@ async def scan_single_table(
 
 
 @router.get("/scan-progress/{task_id}", response_model=ScanTaskProgress)
-async def get_scan_task_progress(task_id: str):
+def get_scan_task_progress(task_id: str):
     """获取扫描任务进度（实时）"""
     try:
         progress = scan_task_manager.get_task_progress(task_id)
@@ -348,7 +352,7 @@ async def get_scan_task_progress(task_id: str):
 
 
 @router.get("/scan-progress/cluster/{cluster_id}")
-async def get_scan_progress(cluster_id: int):
+def get_scan_progress(cluster_id: int):
     """获取集群扫描进度概览"""
     try:
         progress_data = scan_task_manager.get_cluster_scan_overview(cluster_id)
@@ -360,7 +364,7 @@ async def get_scan_progress(cluster_id: int):
 
 
 @router.get("/scan-logs/{task_id}")
-async def get_scan_task_logs(
+def get_scan_task_logs(
     task_id: str,
     limit: int = Query(100, ge=1, le=1000),
     level: Optional[str] = Query(None, description="日志级别过滤"),
@@ -16,13 +16,14 @@ from app.config.database import SessionLocal, get_db
 from app.models.cluster import Cluster
 from app.models.table_metric import TableMetric
 from app.monitor.simple_archive_engine import SimpleArchiveEngine
+from app.services.job_executor import PRIORITY_HIGH
 from app.services.scan_service import scan_task_manager
 
 router = APIRouter()
 
 
 @router.post("/archive-with-progress/{cluster_id}/{database_name}/{table_name}")
-async def archive_table_with_progress(
+def archive_table_with_progress(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -187,9 +188,7 @@ async def archive_table_with_progress(
             except Exception:
                 pass
 
-    import threading
-
-    threading.Thread(target=run_archive, daemon=True).start()
+    scan_task_manager.run_in_background(db, task_id, "archive", run_archive)
 
     return {
         "message": "Archive started",
@@ -201,7 +200,7 @@ async def archive_table_with_progress(
 
 
 @router.post("/restore-with-progress/{cluster_id}/{database_name}/{table_name}")
-async def restore_table_with_progress(
+def restore_table_with_progress(
     cluster_id: int,
     database_name: str,
     table_name: str,
@@ -328,9 +327,10 @@ async def restore_table_with_progress(
             except Exception:
                 pass
 
-    import threading
-
-    threading.Thread(target=run_restore, daemon=True).start()
+    # 恢复通常是用户在等待数据，优先于归档执行
+    scan_task_manager.run_in_background(
+        db, task_id, "archive", run_restore, priority=PRIORITY_HIGH
+    )
     return {
         "message": "Restore started",
         "task_id": task_id,
@@ -340,7 +340,7 @@ async def restore_table_with_progress(
 
 
 @router.get("/archive-status/{cluster_id}/{database_name}/{table_name}")
-async def get_archive_status(
+def get_archive_status(
     cluster_id: int, database_name: str, table_name: str, db: Session = Depends(get_db)
 ):
     """
@@ -393,7 +393,7 @@ async def get_archive_status(
 
 
 @router.get("/archived-tables/{cluster_id}")
-async def list_archived_tables(
+def list_archived_tables(
     cluster_id: int,
     database_name: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
@@ -454,7 +454,7 @@ async def list_archived_tables(
 
 
 @router.get("/archive-statistics/{cluster_id}")
-async def get_archive_statistics(
+def get_archive_statistics(
     cluster_id: int,
     days_range: int = Query(30, description="统计天数范围"),
     db: Session = Depends(get_db),
@@ -16,13 +16,14 @@ from app.config.database import SessionLocal, get_db
 from app.models.cluster import Cluster
 from app.models.table_metric import TableMetric
 from app.monitor.cold_data_scanner import SimpleColdDataScanner
+from app.services.job_executor import JobQueueFullError
 from app.services.scan_service import scan_task_manager
 
 router = APIRouter()
 
 
 @router.post("/scan-cold-data/{cluster_id}")
-async def scan_cold_data(
+def scan_cold_data(
     cluster_id: int,
     # 兼容旧参数名 cold_days_threshold，同时支持 cold_threshold_days
     cold_days_threshold: Optional[int] = Query(
@@ -180,17 +181,18 @@ async def scan_cold_data(
                 except Exception:
                     pass
 
-        import threading
-
-        threading.Thread(target=run_cold_scan, daemon=True).start()
+        scan_task_manager.run_in_background(db, task.task_id, "scan", run_cold_scan)
         return {"message": "Cold data scan started", "task_id": task.task_id}
 
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cold data scan failed: {str(e)}")
 
 
 @router.get("/cold-data-summary/{cluster_id}")
-async def get_cold_data_summary(cluster_id: int, db: Session = Depends(get_db)):
+def get_cold_data_summary(cluster_id: int, db: Session = Depends(get_db)):
     """
     获取集群冷数据统计摘要
 
@@ -236,7 +238,7 @@ async def get_cold_data_summary(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/cold-data-list/{cluster_id}")
-async def get_cold_data_list(
+def get_cold_data_list(
     cluster_id: int,
     database_name: Optional[str] = Query(None),
     min_days_since_access: int = Query(0, description="最小未访问天数"),
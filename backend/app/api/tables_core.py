@@ -17,7 +17,7 @@ router = APIRouter()
 
 
 @router.get("/metrics", response_model=list[TableMetricResponse])
-async def get_table_metrics(
+def get_table_metrics(
     cluster_id: int = Query(..., description="Cluster ID to filter tables"),
     database_name: str = Query(None, description="Optional database name filter"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
@@ -61,7 +61,7 @@ async def get_table_metrics(
 
 
 @router.get("/small-files", response_model=dict)
-async def get_small_file_summary(
+def get_small_file_summary(
     cluster_id: int = Query(...), db: Session = Depends(get_db)
 ):
     """Get small file summary for a cluster"""
@@ -90,7 +90,7 @@ async def get_small_file_summary(
 
 
 @router.get("/databases/{cluster_id}")
-async def get_databases(cluster_id: int, db: Session = Depends(get_db)):
+def get_databases(cluster_id: int, db: Session = Depends(get_db)):
     """Get list of databases for a cluster"""
     cluster = db.query(Cluster).filter(Cluster.id == cluster_id).first()
     if not cluster:
@@ -107,7 +107,7 @@ async def get_databases(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/tables/{cluster_id}/{database_name}")
-async def get_tables(
+def get_tables(
     cluster_id: int, database_name: str, db: Session = Depends(get_db)
 ):
     """Get list of tables for a database in a cluster"""
@@ -124,7 +124,7 @@ async def get_tables(
 
 
 @router.get("/small-file-analysis/{cluster_id}")
-async def analyze_small_file_ratios(cluster_id: int, db: Session = Depends(get_db)):
+def analyze_small_file_ratios(cluster_id: int, db: Session = Depends(get_db)):
     """Analyze small file ratios for each table"""
     all_tables = (
         db.query(TableMetric).filter(TableMetric.cluster_id == cluster_id).all()
@@ -1,6 +1,9 @@
+import json
 from datetime import datetime
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.config.database import SessionLocal, get_db
@@ -9,13 +12,14 @@ from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
 from app.models.test_table_task_log import TestTableTaskLog
 from app.schemas.merge_task import MergeTaskCreate, MergeTaskResponse
+from app.services.job_executor import JobQueueFullError, get_job_executor
 
 router = APIRouter()
 # Reload hint: retry endpoint added; ensure router includes it
 
 
 @router.get("/")
-async def list_tasks(
+def list_tasks(
     cluster_id: int = Query(None),
     status: str = Query(None),
     limit: int = Query(50),
@@ -149,7 +153,7 @@ async def list_tasks(
 
 
 @router.post("/", response_model=MergeTaskResponse)
-async def create_task(task: MergeTaskCreate, db: Session = Depends(get_db)):
+def create_task(task: MergeTaskCreate, db: Session = Depends(get_db)):
     """Create a new merge task"""
     payload = task.dict()
     fmt = payload.get("target_storage_format")
@@ -171,7 +175,7 @@ async def create_task(task: MergeTaskCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/cluster/{cluster_id}", response_model=list[MergeTaskResponse])
-async def get_cluster_tasks(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster_tasks(cluster_id: int, db: Session = Depends(get_db)):
     """Get tasks for a specific cluster"""
     tasks = (
         db.query(MergeTask)
@@ -183,7 +187,7 @@ async def get_cluster_tasks(cluster_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/stats")
-async def get_task_stats(cluster_id: int = Query(None), db: Session = Depends(get_db)):
+def get_task_stats(cluster_id: int = Query(None), db: Session = Depends(get_db)):
     """获取任务统计信息"""
     from sqlalchemy import func
 
@@ -223,7 +227,7 @@ async def get_task_stats(cluster_id: int = Query(None), db: Session = Depends(ge
 
 
 @router.get("/{task_id}", response_model=MergeTaskResponse)
-async def get_task(task_id: int, db: Session = Depends(get_db)):
+def get_task(task_id: int, db: Session = Depends(get_db)):
     """Get task by ID"""
     task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
     if not task:
@@ -232,7 +236,7 @@ async def get_task(task_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{task_id}/execute")
-async def execute_task(task_id: int, db: Session = Depends(get_db)):
+def execute_task(task_id: int, db: Session = Depends(get_db)):
     """Execute a merge task in background to avoid blocking the API worker."""
     task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
     if not task:
@@ -253,9 +257,7 @@ async def execute_task(task_id: int, db: Session = Depends(get_db)):
     task.current_operation = "初始化合并任务"
     db.commit()
 
-    # Run merge in a dedicated thread with its own DB session
-    import threading
-
+    # Run merge on the background job executor with its own DB session
     def _run_merge(tid: int, cluster_id: int):
         s = SessionLocal()
         try:
@@ -313,7 +315,15 @@ async def execute_task(task_id: int, db: Session = Depends(get_db)):
         finally:
             s.close()
 
-    threading.Thread(target=_run_merge, args=(task_id, cluster.id), daemon=True).start()
+    try:
+        get_job_executor().submit(
+            "merge", _run_merge, task_id, cluster.id, name=f"merge:{task_id}"
+        )
+    except JobQueueFullError as e:
+        task.status = "failed"
+        task.error_message = str(e)
+        db.commit()
+        raise HTTPException(status_code=503, detail=str(e))
 
     return {
         "message": "Task started",
@@ -323,14 +333,14 @@ async def execute_task(task_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{task_id}/retry")
-async def retry_task(task_id: int, db: Session = Depends(get_db)):
+def retry_task(task_id: int, db: Session = Depends(get_db)):
     """Retry a failed or cancelled merge task by delegating to execute."""
     # 直接复用执行逻辑；若任务已在运行或已成功，execute_task 会返回相应错误
-    return await execute_task(task_id, db)
+    return execute_task(task_id, db)
 
 
 @router.post("/{task_id}/cancel")
-async def cancel_task(task_id: int, db: Session = Depends(get_db)):
+def cancel_task(task_id: int, db: Session = Depends(get_db)):
     """Cancel a running task"""
     task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
     if not task:
@@ -347,135 +357,210 @@ async def cancel_task(task_id: int, db: Session = Depends(get_db)):
     return {"message": "Task cancelled successfully"}
 
 
-@router.get("/{task_id}/logs")
-async def get_task_logs(task_id: str, db: Session = Depends(get_db)):
-    """Get logs for a specific task"""
+TASK_LOG_STREAM_BATCH_SIZE = 500
+# /logs 未指定 limit 时的默认条数,需要全部日志时按 after_id 翻页或使用 /logs/stream
+TASK_LOG_DEFAULT_LIMIT = 1000
+
+
+def _resolve_log_source(task_id: str, db: Session):
+    """解析任务日志来源: 返回 (日志模型, 任务键, 测试表任务或None)"""
     # 先检查是否是测试表任务（UUID格式）
+    from app.models.task_log import TaskLog
     from app.models.test_table_task import TestTableTask as TestTableTaskModel
 
-    # 尝试作为UUID查找测试表任务
     test_task = (
         db.query(TestTableTaskModel).filter(TestTableTaskModel.id == task_id).first()
     )
     if test_task:
-        # 读取持久化日志
-        persisted_logs = (
-            db.query(TestTableTaskLog)
-            .filter(TestTableTaskLog.task_id == task_id)
-            .order_by(TestTableTaskLog.timestamp.asc())
-            .all()
-        )
-
-        if persisted_logs:
-            normalized = []
-            for row in persisted_logs:
-                normalized.append(
-                    {
-                        "id": row.id,
-                        "log_level": row.log_level,
-                        "message": _sanitize_log_text(row.message),
-                        "details": row.details,
-                        "timestamp": row.timestamp,
-                        "phase": row.phase,
-                        "progress_percentage": row.progress_percentage,
-                    }
-                )
-            return normalized
-
-        # 兼容老任务：没有持久化日志时返回基础信息
-        fallback_logs = []
-        if test_task.started_time:
-            fallback_logs.append(
-                {
-                    "id": 1,
-                    "log_level": "INFO",
-                    "message": _sanitize_log_text(
-                        f"任务开始执行: {test_task.task_name}"
-                    ),
-                    "details": None,
-                    "timestamp": test_task.started_time,
-                    "phase": test_task.current_phase,
-                    "progress_percentage": test_task.progress_percentage,
-                }
-            )
-
-        if test_task.error_message:
-            fallback_logs.append(
-                {
-                    "id": 2,
-                    "log_level": "ERROR",
-                    "message": _sanitize_log_text(
-                        f"任务执行失败: {test_task.error_message}"
-                    ),
-                    "details": test_task.current_operation,
-                    "timestamp": test_task.completed_time or test_task.started_time,
-                    "phase": test_task.current_phase,
-                    "progress_percentage": test_task.progress_percentage,
-                }
-            )
-
-        if test_task.status == "success" and test_task.completed_time:
-            fallback_logs.append(
-                {
-                    "id": 3,
-                    "log_level": "INFO",
-                    "message": _sanitize_log_text(
-                        f"任务执行成功 - 创建文件: {test_task.hdfs_files_created}, 分区: {test_task.hive_partitions_added}, 大小: {test_task.total_size_mb:.2f}MB"
-                    ),
-                    "details": test_task.current_operation,
-                    "timestamp": test_task.completed_time,
-                    "phase": test_task.current_phase,
-                    "progress_percentage": test_task.progress_percentage,
-                }
-            )
-
-        return fallback_logs
+        return TestTableTaskLog, task_id, test_task
 
     # 如果不是测试表任务，尝试作为整数ID查找合并任务
     try:
         merge_task_id = int(task_id)
-        task = db.query(MergeTask).filter(MergeTask.id == merge_task_id).first()
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        # 查询任务日志
-        from app.models.task_log import TaskLog
-
-        logs = (
-            db.query(TaskLog)
-            .filter(TaskLog.task_id == merge_task_id)
-            .order_by(TaskLog.timestamp.asc())
-            .all()
-        )
     except ValueError:
         # 既不是UUID也不是有效的整数ID
         raise HTTPException(status_code=404, detail="Task not found")
+    task = db.query(MergeTask).filter(MergeTask.id == merge_task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return TaskLog, merge_task_id, None
+
+
+def _query_task_logs(
+    db: Session,
+    model,
+    task_key,
+    *,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    level: Optional[str] = None,
+    phase: Optional[str] = None,
+):
+    """按主键游标(keyset)查询任务日志,id 单调递增即写入顺序"""
+    query = db.query(model).filter(model.task_id == task_key)
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    if level:
+        levels = [lv.strip().upper() for lv in level.split(",") if lv.strip()]
+        query = query.filter(model.log_level.in_(levels))
+    if phase:
+        phases = [ph.strip() for ph in phase.split(",") if ph.strip()]
+        query = query.filter(model.phase.in_(phases))
+    query = query.order_by(model.id.asc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def _serialize_task_log(row) -> dict:
+    """日志行转字典(消息已在写入时清洗, 历史日志行由迁移 9e3f7a2b5c14 清洗)"""
+    data = {
+        "id": row.id,
+        "log_level": row.log_level,
+        "message": row.message,
+        "details": row.details,
+        "timestamp": row.timestamp,
+        "phase": row.phase,
+        "progress_percentage": row.progress_percentage,
+    }
+    if isinstance(row, TestTableTaskLog):
+        return data
+    data.update(
+        {
+            "duration_ms": row.duration_ms,
+            "sql_statement": row.sql_statement,
+            "affected_rows": row.affected_rows,
+            "files_before": row.files_before,
+            "files_after": row.files_after,
+            "hdfs_stats": row.hdfs_stats,
+            "yarn_application_id": row.yarn_application_id,
+        }
+    )
+    return data
+
+
+def _test_task_fallback_logs(test_task) -> list:
+    """兼容老任务：没有持久化日志时返回基础信息"""
+    fallback_logs = []
+    if test_task.started_time:
+        fallback_logs.append(
+            {
+                "id": 1,
+                "log_level": "INFO",
+                "message": _sanitize_log_text(f"任务开始执行: {test_task.task_name}"),
+                "details": None,
+                "timestamp": test_task.started_time,
+                "phase": test_task.current_phase,
+                "progress_percentage": test_task.progress_percentage,
+            }
+        )
+
+    if test_task.error_message:
+        fallback_logs.append(
+            {
+                "id": 2,
+                "log_level": "ERROR",
+                "message": _sanitize_log_text(
+                    f"任务执行失败: {test_task.error_message}"
+                ),
+                "details": test_task.current_operation,
+                "timestamp": test_task.completed_time or test_task.started_time,
+                "phase": test_task.current_phase,
+                "progress_percentage": test_task.progress_percentage,
+            }
+        )
 
-    sanitized = []
-    for log in logs:
-        sanitized.append(
+    if test_task.status == "success" and test_task.completed_time:
+        fallback_logs.append(
             {
-                "id": log.id,
-                "log_level": log.log_level,
-                "message": _sanitize_log_text(log.message),
-                "details": log.details,
-                "timestamp": log.timestamp,
-                "phase": log.phase,
-                "duration_ms": log.duration_ms,
-                "sql_statement": log.sql_statement,
-                "affected_rows": log.affected_rows,
-                "files_before": log.files_before,
-                "files_after": log.files_after,
-                "hdfs_stats": log.hdfs_stats,
-                "yarn_application_id": log.yarn_application_id,
-                "progress_percentage": log.progress_percentage,
+                "id": 3,
+                "log_level": "INFO",
+                "message": _sanitize_log_text(
+                    f"任务执行成功 - 创建文件: {test_task.hdfs_files_created}, 分区: {test_task.hive_partitions_added}, 大小: {test_task.total_size_mb:.2f}MB"
+                ),
+                "details": test_task.current_operation,
+                "timestamp": test_task.completed_time,
+                "phase": test_task.current_phase,
+                "progress_percentage": test_task.progress_percentage,
             }
         )
-    return sanitized
+
+    return fallback_logs
+
+
+@router.get("/{task_id}/logs")
+def get_task_logs(
+    task_id: str,
+    after_id: Optional[int] = Query(None, ge=0, description="只返回 id 大于该值的日志"),
+    limit: int = Query(
+        TASK_LOG_DEFAULT_LIMIT, ge=1, le=5000, description="最多返回条数"
+    ),
+    level: Optional[str] = Query(None, description="日志级别过滤,逗号分隔"),
+    phase: Optional[str] = Query(None, description="阶段过滤,逗号分隔"),
+    db: Session = Depends(get_db),
+):
+    """Get logs for a specific task (keyset pagination via after_id/limit)"""
+    model, task_key, test_task = _resolve_log_source(task_id, db)
+
+    rows = _query_task_logs(
+        db,
+        model,
+        task_key,
+        after_id=after_id,
+        limit=limit,
+        level=level,
+        phase=phase,
+    )
+    if (
+        test_task is not None
+        and not rows
+        and after_id is None
+        and not level
+        and not phase
+    ):
+        return _test_task_fallback_logs(test_task)
+
+    return [_serialize_task_log(row) for row in rows]
+
+
+@router.get("/{task_id}/logs/stream")
+def stream_task_logs(
+    task_id: str,
+    after_id: Optional[int] = Query(None, ge=0, description="只返回 id 大于该值的日志"),
+    level: Optional[str] = Query(None, description="日志级别过滤,逗号分隔"),
+    phase: Optional[str] = Query(None, description="阶段过滤,逗号分隔"),
+    db: Session = Depends(get_db),
+):
+    """以NDJSON流式返回任务日志(每行一条),按主键游标分批读取避免整表加载"""
+    model, task_key, _ = _resolve_log_source(task_id, db)
+
+    def _iter_ndjson():
+        cursor = after_id
+        while True:
+            rows = _query_task_logs(
+                db,
+                model,
+                task_key,
+                after_id=cursor,
+                limit=TASK_LOG_STREAM_BATCH_SIZE,
+                level=level,
+                phase=phase,
+            )
+            for row in rows:
+                yield json.dumps(
+                    _serialize_task_log(row), ensure_ascii=False, default=str
+                ) + "\n"
+            if len(rows) < TASK_LOG_STREAM_BATCH_SIZE:
+                break
+            cursor = rows[-1].id
+            # 释放已加载对象,保持内存恒定
+            db.expunge_all()
+
+    return StreamingResponse(_iter_ndjson(), media_type="application/x-ndjson")
 
 
 @router.get("/{task_id}/preview")
-async def get_task_preview(task_id: int, db: Session = Depends(get_db)):
+def get_task_preview(task_id: int, db: Session = Depends(get_db)):
     """Get merge preview for a specific task"""
     # 验证任务是否存在
     task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
@@ -16,13 +16,14 @@ from app.schemas.test_table import (
     TestTableVerifyRequest,
     TestTableVerifyResult,
 )
+from app.services.job_executor import JobQueueFullError
 from app.services.test_table_service import test_table_service
 
 router = APIRouter()
 
 
 @router.post("/check-timeout")
-async def check_timeout_tasks(db: Session = Depends(get_db)):
+def check_timeout_tasks(db: Session = Depends(get_db)):
     """检测并标记超时任务"""
     marked_count = test_table_service.check_and_mark_timeout_tasks(
         db, timeout_minutes=30
@@ -34,7 +35,7 @@ async def check_timeout_tasks(db: Session = Depends(get_db)):
 
 
 @router.get("/scenarios")
-async def get_test_scenarios():
+def get_test_scenarios():
     """获取预设测试场景"""
     scenarios = {}
     for scenario, config in SCENARIO_CONFIGS.items():
@@ -59,9 +60,7 @@ async def get_test_scenarios():
 
 
 @router.post("/create", response_model=TestTableTaskResponse)
-async def create_test_table(
-    request: TestTableCreateRequest, db: Session = Depends(get_db)
-):
+def create_test_table(request: TestTableCreateRequest, db: Session = Depends(get_db)):
     """创建测试表"""
     try:
         # 如果使用预设场景，应用场景配置
@@ -78,23 +77,26 @@ async def create_test_table(
                 )
                 request.config = config_copy
 
-        task = await test_table_service.create_test_table(request, db)
+        task = test_table_service.create_test_table(request, db)
         return task
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFullError:
+        # 交给全局处理器返回 503，不包装成 500
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"创建测试表失败: {str(e)}")
 
 
 @router.get("/tasks", response_model=list[TestTableTaskResponse])
-async def list_test_table_tasks(db: Session = Depends(get_db)):
+def list_test_table_tasks(db: Session = Depends(get_db)):
     """获取测试表任务列表"""
     return test_table_service.list_active_tasks(db)
 
 
 @router.get("/tasks/{task_id}", response_model=TestTableTaskResponse)
-async def get_test_table_task(task_id: str, db: Session = Depends(get_db)):
+def get_test_table_task(task_id: str, db: Session = Depends(get_db)):
     """获取指定任务详情"""
     task = test_table_service.get_task(task_id, db)
     if not task:
@@ -103,12 +105,10 @@ async def get_test_table_task(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/delete")
-async def delete_test_table(
-    request: TestTableDeleteRequest, db: Session = Depends(get_db)
-):
+def delete_test_table(request: TestTableDeleteRequest, db: Session = Depends(get_db)):
     """删除测试表"""
     try:
-        result = await test_table_service.delete_test_table(request, db)
+        result = test_table_service.delete_test_table(request, db)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -117,12 +117,10 @@ async def delete_test_table(
 
 
 @router.post("/verify", response_model=TestTableVerifyResult)
-async def verify_test_table(
-    request: TestTableVerifyRequest, db: Session = Depends(get_db)
-):
+def verify_test_table(request: TestTableVerifyRequest, db: Session = Depends(get_db)):
     """验证测试表"""
     try:
-        result = await test_table_service.verify_test_table(request, db)
+        result = test_table_service.verify_test_table(request, db)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -131,7 +129,7 @@ async def verify_test_table(
 
 
 @router.get("/config/validate")
-async def validate_test_config(
+def validate_test_config(
     table_name: str = Query(..., description="表名"),
     database_name: str = Query(..., description="数据库名"),
     hdfs_base_path: str = Query(..., description="HDFS路径"),
@@ -165,7 +163,7 @@ async def validate_test_config(
 
 
 @router.get("/cluster/{cluster_id}/existing-tables")
-async def get_cluster_test_tables(cluster_id: int, db: Session = Depends(get_db)):
+def get_cluster_test_tables(cluster_id: int, db: Session = Depends(get_db)):
     """获取集群中的测试表"""
     from app.models.cluster import Cluster
 
@@ -38,6 +38,11 @@ async def websocket_endpoint(
     - scan_progress: 扫描进度更新
     - task_updates: 任务状态变更
     - health_check: 健康检查结果
+    - scan_progress:<task_id> / scan_logs:<task_id>: 单个扫描任务的进度/日志
+    - task_progress:<task_id> / task_logs:<task_id>: 单个合并任务的进度/日志
+
+    任务级主题的消息带有 offset,断线重连后可在 subscribe 时携带
+    {"offsets": {topic: 最后收到的offset}} 或发送 replay 消息补齐缺失消息。
     """
     connected = await websocket_manager.connect(websocket, user_id)
     if not connected:
@@ -96,6 +101,12 @@ async def handle_client_message(websocket: WebSocket, user_id: str, message: dic
             WebSocketMessage(type="subscription_confirmed", data={"topics": topics}),
         )
 
+        # 携带 offsets 时补发订阅前错过的消息
+        offsets = data.get("offsets") or {}
+        for topic, from_offset in offsets.items():
+            if topic in topics:
+                await send_topic_replay(websocket, topic, from_offset)
+
     elif message_type == "unsubscribe":
         # 取消订阅
         topics = data.get("topics", [])
@@ -106,6 +117,12 @@ async def handle_client_message(websocket: WebSocket, user_id: str, message: dic
             WebSocketMessage(type="unsubscription_confirmed", data={"topics": topics}),
         )
 
+    elif message_type == "replay":
+        # 从指定offset重放主题消息
+        await send_topic_replay(
+            websocket, data.get("topic", ""), data.get("from_offset", 0)
+        )
+
     elif message_type == "ping":
         # 心跳检测
         await websocket_manager._send_to_websocket(
@@ -130,8 +147,37 @@ async def handle_client_message(websocket: WebSocket, user_id: str, message: dic
         )
 
 
+async def send_topic_replay(websocket: WebSocket, topic: str, from_offset):
+    """向单个连接补发主题内 offset 之后的消息,并以 replay_complete 结束
+
+    gap=True 表示所需消息已被淘汰出重放缓冲,客户端应改用 REST 接口补齐历史。
+    """
+    try:
+        from_offset = int(from_offset or 0)
+    except (TypeError, ValueError):
+        from_offset = 0
+
+    messages, latest_offset, gap = websocket_manager.replay(topic, from_offset)
+    for message in messages:
+        await websocket_manager._send_to_websocket(websocket, message)
+
+    await websocket_manager._send_to_websocket(
+        websocket,
+        WebSocketMessage(
+            type="replay_complete",
+            data={
+                "topic": topic,
+                "from_offset": from_offset,
+                "latest_offset": latest_offset,
+                "replayed": len(messages),
+                "gap": gap,
+            },
+        ),
+    )
+
+
 @router.get("/ws/stats")
-async def get_websocket_stats():
+def get_websocket_stats():
     """获取WebSocket连接统计信息"""
     return websocket_manager.get_connection_stats()
 
@@ -143,7 +189,7 @@ async def broadcast_message(topic: str, message_type: str, data: dict):
     """
     message = WebSocketMessage(type=message_type, data=data)
 
-    await websocket_manager.broadcast_to_topic(topic, message)
+    await websocket_manager.fanout(topic, message)
 
     return {
         "status": "success",
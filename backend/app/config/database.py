@@ -1,8 +1,13 @@
+import threading
+import weakref
 from pathlib import Path
+from typing import Any, Dict, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.config.settings import settings
 
@@ -16,7 +21,178 @@ if db_url.startswith("sqlite:///"):
         abs_path = (backend_dir / path).resolve()
         db_url = f"sqlite:///{abs_path}"
 
-engine = create_engine(db_url)
+
+# 每个引擎的连接池统计
+_pool_metrics: "weakref.WeakKeyDictionary[Engine, PoolMetrics]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class PoolMetrics:
+    """连接池使用统计: 累计借出次数、峰值占用、池满时的借出次数"""
+
+    def __init__(self, max_overflow: int = 0):
+        self.max_overflow = max_overflow
+        self.checkouts = 0
+        self.saturated_checkouts = 0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def attach(self, target: Engine) -> None:
+        pool = target.pool
+        if not isinstance(pool, QueuePool):
+            return
+
+        @event.listens_for(target, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            checked_out = pool.checkedout()
+            capacity = pool.size() + max(self.max_overflow, 0)
+            with self._lock:
+                self.checkouts += 1
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+                # 借出后已无空闲连接,后续请求需要排队等待 pool_timeout
+                if self.max_overflow >= 0 and checked_out >= capacity:
+                    self.saturated_checkouts += 1
+
+
+def _is_sqlite_memory(url) -> bool:
+    database = url.database or ""
+    return database in ("", ":memory:") or "mode=memory" in database
+
+
+def build_engine_options(url_string: str) -> Dict[str, Any]:
+    """按数据库类型生成 create_engine 参数
+
+    - SQLite: 允许跨线程使用连接(API线程池/扫描线程),busy_timeout 等待写锁,
+      WAL/synchronous 由连接事件设置
+    - PostgreSQL: 连接池大小/溢出、pool_pre_ping、statement_timeout
+    - MySQL: 连接池大小/溢出、pool_pre_ping、定期回收(避免 wait_timeout 断连)
+    """
+    url = make_url(url_string)
+    backend = url.get_backend_name()
+
+    if backend == "sqlite":
+        options: Dict[str, Any] = {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            }
+        }
+        if not _is_sqlite_memory(url):
+            options.update(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            )
+        return options
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
+def _configure_sqlite(target: Engine) -> None:
+    journal_mode = settings.SQLITE_JOURNAL_MODE
+    if _is_sqlite_memory(target.url):
+        # 内存库不支持 WAL
+        journal_mode = ""
+
+    @event.listens_for(target, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if journal_mode:
+                cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        finally:
+            cursor.close()
+
+
+def _configure_mysql(target: Engine) -> None:
+    if settings.DB_STATEMENT_TIMEOUT_MS <= 0:
+        return
+
+    @event.listens_for(target, "connect")
+    def _set_mysql_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # 仅对 SELECT 生效(MySQL 5.7.8+),旧版本忽略
+            cursor.execute(
+                f"SET SESSION max_execution_time={settings.DB_STATEMENT_TIMEOUT_MS}"
+            )
+        except Exception:
+            pass
+        finally:
+            cursor.close()
+
+
+def create_db_engine(url_string: str) -> Engine:
+    """按数据库类型的配置档创建引擎,并挂载连接池统计"""
+    options = build_engine_options(url_string)
+    target = create_engine(url_string, **options)
+
+    backend = target.url.get_backend_name()
+    if backend == "sqlite":
+        _configure_sqlite(target)
+    elif backend == "mysql":
+        _configure_mysql(target)
+
+    metrics = PoolMetrics(max_overflow=options.get("max_overflow", 0))
+    metrics.attach(target)
+    _pool_metrics[target] = metrics
+    return target
+
+
+def get_pool_status(target: Optional[Engine] = None) -> Dict[str, Any]:
+    """连接池饱和度指标(供 /health 与运维监控使用)"""
+    target = target or engine
+    pool = target.pool
+    status: Dict[str, Any] = {
+        "backend": target.url.get_backend_name(),
+        "pool_class": type(pool).__name__,
+    }
+    metrics = _pool_metrics.get(target)
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        max_overflow = metrics.max_overflow if metrics else 0
+        capacity = size + max(max_overflow, 0)
+        status.update(
+            {
+                "size": size,
+                "max_overflow": max_overflow,
+                "checked_in": pool.checkedin(),
+                "checked_out": checked_out,
+                "overflow": max(pool.overflow(), 0),
+                "utilization": (
+                    round(checked_out / capacity, 3)
+                    if max_overflow >= 0 and capacity
+                    else None
+                ),
+            }
+        )
+    if metrics is not None:
+        status.update(
+            {
+                "total_checkouts": metrics.checkouts,
+                "saturated_checkouts": metrics.saturated_checkouts,
+                "peak_checked_out": metrics.peak_checked_out,
+            }
+        )
+    return status
+
+
+engine = create_db_engine(db_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -12,8 +12,120 @@ class Settings(BaseSettings):
     # Database
     # Default to engineered local path (under backend/var/data)
     DATABASE_URL: str = "sqlite:///./var/data/hive_small_file_db.db"
+    # Connection pool (Postgres/MySQL; SQLite file DBs use the same pool sizing)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 60000  # Postgres/MySQL, 0 disables
+    # SQLite: WAL lets dashboard reads proceed during scan commits
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 10000
+    # Worker threads for sync (def) route handlers: blocking DB/HDFS calls run here
+    API_THREADPOOL_SIZE: int = 64
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Shared client for status cache, leases and WS fan-out: after a failure, reconnect
+    # is attempted again only once this interval has passed
+    REDIS_RETRY_INTERVAL_SECONDS: float = 60.0
+
+    # Cluster health checks: all probes of all clusters run concurrently (bounded by
+    # HEALTH_CHECK_MAX_CONCURRENCY) with a per-probe timeout; results shared via Redis
+    HEALTH_CHECK_MAX_CONCURRENCY: int = 32
+    HEALTH_CHECK_PROBE_TIMEOUT_SECONDS: float = 60.0
+    CONNECTION_STATUS_CACHE_BACKEND: str = "redis"  # in-process while Redis is down
+    CONNECTION_STATUS_CACHE_TTL_SECONDS: int = 300
+
+    # Background health-probe daemon: one API worker (elected via lease) probes every
+    # active cluster on an adaptive schedule, writes the shared status cache, records
+    # history and publishes on the cluster_status topic only when health changes.
+    # When enabled, status endpoints read the cache and probe only on force_refresh.
+    HEALTH_PROBE_ENABLED: bool = False
+    HEALTH_PROBE_TICK_SECONDS: float = 5.0
+    HEALTH_PROBE_UNHEALTHY_INTERVAL_SECONDS: int = 30
+    HEALTH_PROBE_HEALTHY_INTERVAL_SECONDS: int = 60
+    # Stable clusters back off up to this interval; kept below the cache TTL
+    HEALTH_PROBE_MAX_INTERVAL_SECONDS: int = 240
+
+    # HiveServer2 connection pool shared by the merge engine and its helpers: avoids
+    # repeating SASL/Kerberos handshakes. Session SET/USE state is reset on return.
+    HIVE_POOL_ENABLED: bool = True
+    HIVE_POOL_MAX_IDLE_PER_KEY: int = 4
+    HIVE_POOL_MAX_LIFETIME_SECONDS: int = 1800
+    HIVE_POOL_IDLE_TIMEOUT_SECONDS: int = 600
+    # Idle connections older than this are checked with SELECT 1 before reuse
+    HIVE_POOL_VALIDATE_AFTER_IDLE_SECONDS: float = 30.0
+
+    # In-memory scan/archive task registry (progress + recent logs for polling).
+    # Finished tasks are evicted after the TTL; tasks without activity for
+    # SCAN_TASK_STALE_SECONDS are treated as abandoned. Logs are persisted in the DB.
+    SCAN_TASK_REGISTRY_MAX_TASKS: int = 500
+    SCAN_TASK_REGISTRY_TTL_SECONDS: int = 900
+    SCAN_TASK_STALE_SECONDS: int = 21600
+    SCAN_TASK_LOG_BUFFER_SIZE: int = 100
+
+    # Background job executor for long-running work started by API handlers.
+    # Each job type gets a bounded worker pool; excess jobs wait in a priority queue.
+    JOB_EXECUTOR_POOL_SIZES: Dict[str, int] = {
+        "scan": 2,
+        "archive": 2,
+        "storage": 2,
+        "merge": 4,
+        "test_table": 1,
+    }
+    JOB_EXECUTOR_DEFAULT_POOL_SIZE: int = 2
+    JOB_EXECUTOR_MAX_QUEUE_SIZE: int = 1000  # per job type
+    JOB_EXECUTOR_HISTORY_SIZE: int = 200
+    JOB_EXECUTOR_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+
+    # Kerberos: one private ticket cache per principal/keytab, renewed in the background
+    # KERBEROS_RENEW_MARGIN_SECONDS before expiry (klist); lifetime fallback if unparsable
+    KERBEROS_CACHE_DIR: str = "./var/krb5"
+    KERBEROS_RENEW_MARGIN_SECONDS: int = 600
+    KERBEROS_RENEW_CHECK_SECONDS: int = 60
+    KERBEROS_DEFAULT_TICKET_LIFETIME_SECONDS: int = 36000
+
+    # Distributed leases for merges/archives: "redis" (fails closed if Redis is down) or "local"
+    LEASE_BACKEND: str = "redis"
+    LEASE_DEFAULT_TTL_SECONDS: int = 60
+
+    # Batched partition merge: max partitions per dynamic-partition INSERT (<=1 disables)
+    MERGE_PARTITION_BATCH_SIZE: int = 200
+
+    # Test-table WebHDFS data generation: concurrent file writes (thread pool and
+    # pooled WebHDFS clients) and number of partitions written at the same time
+    TEST_TABLE_WRITE_CONCURRENCY: int = 16
+    TEST_TABLE_PARTITION_CONCURRENCY: int = 4
+
+    # Batch partition archive: concurrent RENAMEs under a NameNode ops/sec budget,
+    # metadata committed every ARCHIVE_BATCH_COMMIT_SIZE partitions
+    ARCHIVE_BATCH_CONCURRENCY: int = 8
+    ARCHIVE_NAMENODE_OPS_PER_SECOND: float = 50.0
+    ARCHIVE_BATCH_COMMIT_SIZE: int = 200
+    # Hive metadata after archive/restore moves: "off", "hs2" (grouped ALTER TABLE ...
+    # SET LOCATION in one HiveServer2 session) or "metastore" (direct SDS batch update)
+    ARCHIVE_METADATA_RELOCATION: str = "off"
+    # Files moved by archive/restore: "summary" (GETCONTENTSUMMARY counts and bytes)
+    # or "full" (per-file list in the response); ARCHIVE_MANIFEST_DIR additionally
+    # streams a JSON-lines manifest of moved files
+    ARCHIVE_FILE_REPORT: str = "summary"
+    ARCHIVE_MANIFEST_DIR: Optional[str] = None
+
+    # Cold-data scans: fetch only metastore rows changed since the last high-water mark,
+    # with a periodic full reconcile (refreshes sizes, clears dropped objects)
+    COLD_SCAN_INCREMENTAL_ENABLED: bool = True
+    COLD_SCAN_FULL_RECONCILE_HOURS: int = 24
+
+    # WebSocket task topics: max pushes per topic per second, replay buffer per topic
+    WS_MAX_UPDATES_PER_SECOND: int = 4
+    WS_REPLAY_BUFFER_SIZE: int = 500
+    # Cross-process fan-out: "redis" (falls back to in-process) or "local"
+    WS_FANOUT_BACKEND: str = "redis"
+    # Per-connection send queue: drop oldest when full; slow sends time out and disconnect
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
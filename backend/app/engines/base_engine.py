@@ -1,12 +1,81 @@
+import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
 from app.services.scan_service import _sanitize_log_text  # 复用统一日志清洗
 
+logger = logging.getLogger(__name__)
+
+
+def publish_task_progress(task: MergeTask) -> None:
+    """推送任务状态/进度快照到WebSocket任务进度主题(同一窗口内只保留最新)"""
+    try:
+        from app.services.websocket_service import (
+            task_progress_topic,
+            websocket_manager,
+        )
+
+        websocket_manager.publish(
+            task_progress_topic(task.id),
+            "task_progress",
+            {
+                "task_id": task.id,
+                "status": task.status,
+                "execution_phase": getattr(task, "execution_phase", None),
+                "progress_percentage": getattr(task, "progress_percentage", None),
+                "current_operation": getattr(task, "current_operation", None),
+                "yarn_application_id": getattr(task, "yarn_application_id", None),
+                "estimated_remaining_time": getattr(
+                    task, "estimated_remaining_time", None
+                ),
+                "error_message": task.error_message,
+            },
+        )
+    except Exception:
+        pass
+
+
+def create_detached_progress_updater(
+    db_session: Optional[Session], task_id: Optional[int]
+) -> Optional[Callable[..., None]]:
+    """为心跳等后台线程创建任务进度写入函数
+
+    须在合并线程中调用: 此处只读取合并会话绑定的引擎,
+    返回的函数每次在独立会话中按任务ID更新进度字段并推送快照,
+    后台线程不再提交或回滚合并线程的会话。无法获取引擎时返回 None。
+    """
+    if task_id is None or not isinstance(db_session, Session):
+        return None
+    try:
+        factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=db_session.get_bind()
+        )
+    except Exception:
+        return None
+
+    def _update(**fields: Any) -> None:
+        session = factory()
+        try:
+            task = session.get(MergeTask, task_id)
+            if task is None:
+                return
+            for name, value in fields.items():
+                if value is not None:
+                    setattr(task, name, value)
+            session.commit()
+            publish_task_progress(task)
+        except Exception as e:
+            logger.error(f"Failed to update task {task_id} progress: {e}")
+            session.rollback()
+        finally:
+            session.close()
+
+    return _update
+
 
 class BaseMergeEngine(ABC):
     """
@@ -14,9 +83,25 @@ class BaseMergeEngine(ABC):
     定义所有合并引擎必须实现的接口
     """
 
+    # 租约校验回调：执行不可逆变更前调用，租约丢失时抛出异常中止合并
+    lease_guard: Optional[Callable[[], None]] = None
+
     def __init__(self, cluster: Cluster):
         self.cluster = cluster
 
+    def set_lease_guard(self, guard: Optional[Callable[[], None]]):
+        """设置租约校验回调（如 lease_service.ensure_valid 的封装）"""
+        self.lease_guard = guard
+
+    def _ensure_lease_valid(self, operation: str) -> None:
+        """表切换、删除分区等不可逆步骤前确认表租约仍然有效"""
+        if self.lease_guard is None:
+            return
+        try:
+            self.lease_guard()
+        except Exception as e:
+            raise RuntimeError(f"表租约已失效，中止{operation}: {e}") from e
+
     @abstractmethod
     def validate_task(self, task: MergeTask) -> Dict[str, Any]:
         """
@@ -166,6 +251,12 @@ class BaseMergeEngine(ABC):
         if db_session:
             db_session.commit()
 
+        self._publish_task_progress(task)
+
+    def _publish_task_progress(self, task: MergeTask):
+        """推送任务状态/进度快照到WebSocket任务进度主题(同一窗口内只保留最新)"""
+        publish_task_progress(task)
+
     def _build_table_path(self, database_name: str, table_name: str) -> str:
         """
         构建表的 HDFS 路径（子类可以重写此方法）
@@ -11,6 +11,7 @@ from pyhive import hive
 from app.models.cluster import Cluster
 from app.monitor.hive_connector import HiveMetastoreConnector
 from app.utils.encryption import decrypt_cluster_password
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.webhdfs_client import WebHDFSClient
 from app.utils.yarn_monitor import YarnResourceManagerMonitor
 
@@ -108,7 +109,7 @@ class HiveConnectionManager:
                     }
                 )
 
-            return hive.Connection(**connect_params)
+            return get_hive_connection_pool().connect(hive.Connection, **connect_params)
 
         except Exception as e:
             logger.error(f"Failed to create Hive connection: {e}")
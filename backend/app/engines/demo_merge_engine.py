@@ -38,8 +38,18 @@ class DemoMergeEngine:
 
     def execute_merge(self, task: MergeTask, db_session: Session) -> Dict[str, Any]:
         """执行演示版合并任务"""
-        start_time = time.time()
+        # 初始化详尽日志记录器,任务结束(含异常)时刷新并关闭日志写线程
         merge_logger = MergeTaskLogger(task, db_session)
+        try:
+            return self._execute_merge_with_logger(task, db_session, merge_logger)
+        finally:
+            merge_logger.close()
+
+    def _execute_merge_with_logger(
+        self, task: MergeTask, db_session: Session, merge_logger: MergeTaskLogger
+    ) -> Dict[str, Any]:
+        """execute_merge 的主体流程"""
+        start_time = time.time()
 
         result = {
             "success": False,
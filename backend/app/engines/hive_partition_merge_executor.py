@@ -407,6 +407,7 @@ class HivePartitionMergeExecutor:
             f"开始初始化: 分区表整表合并(动态分区模式) - {database}.{table}",
         )
 
+        conn = None
         try:
             # 1. 获取分区列
             partition_cols = self.engine.metadata_manager._get_partition_columns(
@@ -573,6 +574,7 @@ TBLPROPERTIES (
             # 先关闭当前连接
             cursor.close()
             conn.close()
+            conn = None
 
             # 调用原子交换方法 (内部会创建和管理新连接)
             swap_result = self.engine.atomic_swap_manager.atomic_swap_table_location(
@@ -615,15 +617,28 @@ TBLPROPERTIES (
                 MergePhase.EXECUTION, MergeLogLevel.ERROR, f"动态分区合并失败: {e}"
             )
 
+            # 释放合并阶段未关闭的连接
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                conn = None
+
             # 清理临时表
             try:
                 conn = self.engine.metadata_manager._create_hive_connection(database)
                 cursor = conn.cursor()
                 cursor.execute(f"DROP TABLE IF EXISTS {temp_table}")
                 cursor.close()
-                conn.close()
             except:
                 pass
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
 
             raise
 
@@ -634,9 +649,10 @@ TBLPROPERTIES (
         返回: "col1, col2, col3"
         """
         conn = self.engine.metadata_manager._create_hive_connection(database)
-        cursor = conn.cursor()
+        cursor = None
 
         try:
+            cursor = conn.cursor()
             # 先获取所有分区列名
             cursor.execute(f"SHOW PARTITIONS {database}.{table}")
             partition_cols_result = cursor.fetchone()
@@ -670,8 +686,11 @@ TBLPROPERTIES (
 
             return ", ".join(non_partition_cols)
         finally:
-            cursor.close()
-            conn.close()
+            try:
+                if cursor is not None:
+                    cursor.close()
+            finally:
+                conn.close()
 
     def _get_dynamic_partition_settings(self, task: MergeTask) -> list[str]:
         """获取动态分区的Hive参数设置"""
@@ -10,6 +10,7 @@ from typing import Dict, List, Optional
 from pyhive import hive
 
 from app.models.cluster import Cluster
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.webhdfs_client import WebHDFSClient
 
 logger = logging.getLogger(__name__)
@@ -50,7 +51,7 @@ class HivePartitionPathResolver:
                 hive_conn_params["password"] = self.hive_password
             hive_conn_params["auth"] = "LDAP"
 
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
 
     def _get_table_location(self, database_name: str, table_name: str) -> Optional[str]:
         """获取表的HDFS位置"""
@@ -66,17 +67,20 @@ class HivePartitionPathResolver:
 
     def _get_table_partitions(self, database_name: str, table_name: str) -> List[str]:
         """获取表的分区列表"""
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
             cursor.execute(f"SHOW PARTITIONS {table_name}")
             partitions = [row[0] for row in cursor.fetchall()]
             cursor.close()
-            conn.close()
             return partitions
         except Exception as e:
             logger.error(f"Failed to get table partitions: {e}")
             return []
+        finally:
+            if conn is not None:
+                conn.close()
 
     def partition_filter_to_spec(self, partition_filter: str) -> Optional[str]:
         """将 WHERE 风格的分区过滤转换为 PARTITION 规范，例如:
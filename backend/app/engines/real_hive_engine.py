@@ -5,7 +5,7 @@ from typing import Any, Callable, Dict, List, Optional
 from impala.dbapi import connect as impala_connect
 from sqlalchemy.orm import Session
 
-from app.engines.base_engine import BaseMergeEngine
+from app.engines.base_engine import BaseMergeEngine, create_detached_progress_updater
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
 from app.monitor.hive_connector import HiveMetastoreConnector
@@ -14,7 +14,10 @@ from app.services.path_resolver import PathResolver
 from app.utils.encryption import decrypt_cluster_password
 from app.utils.merge_logger import MergeLogLevel, MergePhase, MergeTaskLogger
 from app.utils.webhdfs_client import WebHDFSClient
-from app.utils.yarn_monitor import YarnResourceManagerMonitor
+from app.utils.yarn_monitor import (
+    YarnResourceManagerMonitor,
+    subscribe_yarn_application,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +103,7 @@ class RealHiveMergeEngine(BaseMergeEngine):
                 task.current_operation = current_operation
 
             db_session.commit()
+            self._publish_task_progress(task)
             logger.debug(
                 f"Updated task {task.id} progress: {execution_phase} - {progress_percentage}%"
             )
@@ -166,10 +170,18 @@ class RealHiveMergeEngine(BaseMergeEngine):
 
     def execute_merge(self, task: MergeTask, db_session: Session) -> Dict[str, Any]:
         """执行真实的Hive文件合并（使用真实的Hive连接）"""
-        start_time = time.time()
-
-        # 初始化详尽日志记录器
+        # 初始化详尽日志记录器,任务结束(含异常)时刷新并关闭日志写线程
         merge_logger = MergeTaskLogger(task, db_session)
+        try:
+            return self._execute_merge_with_logger(task, db_session, merge_logger)
+        finally:
+            merge_logger.close()
+
+    def _execute_merge_with_logger(
+        self, task: MergeTask, db_session: Session, merge_logger: MergeTaskLogger
+    ) -> Dict[str, Any]:
+        """execute_merge 的主体流程"""
+        start_time = time.time()
 
         result = {
             "success": False,
@@ -854,25 +866,10 @@ class RealHiveMergeEngine(BaseMergeEngine):
                 try:
                     cur_op = f"{op_desc} (已等待{waited}s)"
                     yarn_id = None
-                    if self.yarn_monitor is not None:
+                    if yarn_sub is not None:
                         try:
-                            apps = self.yarn_monitor.get_applications(limit=20)
-                            apps = [
-                                a
-                                for a in apps
-                                if str(getattr(a, "application_type", "")).upper()
-                                in ("TEZ", "MAPREDUCE")
-                            ]
-                            app = None
-                            if getattr(task, "yarn_application_id", None):
-                                for a in apps:
-                                    if a.id == task.yarn_application_id:
-                                        app = a
-                                        break
-                            if app is None and apps:
-                                app = sorted(
-                                    apps, key=lambda a: a.start_time, reverse=True
-                                )[0]
+                            # 由集群共享轮询器按查询标签匹配并推送，心跳只读取最新快照
+                            app = yarn_sub.latest
                             if app is not None:
                                 yarn_id = app.id
                                 merge_logger.log_yarn_monitoring(
@@ -894,18 +891,15 @@ class RealHiveMergeEngine(BaseMergeEngine):
                                     pass
                         except Exception:
                             pass
-                    if db_session is not None:
-                        try:
-                            self._update_task_progress(
-                                task,
-                                db_session,
-                                execution_phase=execution_phase_name,
-                                yarn_application_id=yarn_id
-                                or getattr(task, "yarn_application_id", None),
-                                current_operation=cur_op,
-                            )
-                        except Exception:
-                            pass
+                    if yarn_id:
+                        latest_yarn_id[0] = yarn_id
+                    # 心跳线程只通过独立会话写进度，绝不触碰合并线程的 db_session
+                    if update_progress is not None:
+                        update_progress(
+                            execution_phase=execution_phase_name,
+                            yarn_application_id=yarn_id,
+                            current_operation=cur_op,
+                        )
                 except Exception:
                     pass
 
@@ -915,16 +909,31 @@ class RealHiveMergeEngine(BaseMergeEngine):
             f"SQL开始执行: {op_desc}",
             details={"full_sql": sql},
         )
+        yarn_poller, yarn_sub = subscribe_yarn_application(
+            self.yarn_monitor, cursor, getattr(task, "id", None)
+        )
+        update_progress = create_detached_progress_updater(
+            db_session, getattr(task, "id", None)
+        )
+        latest_yarn_id = [None]
         t = threading.Thread(target=_heartbeat, daemon=True)
         t.start()
         try:
             cursor.execute(sql)
             stop.set()
             t.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             merge_logger.log_sql_execution(sql, phase, success=True)
         except Exception as e:
             stop.set()
             t.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             merge_logger.log_sql_execution(
                 sql, phase, success=False, error_message=str(e)
             )
@@ -12,11 +12,16 @@ from typing import Any, Dict, List, Optional
 from pyhive import hive
 from sqlalchemy.orm import Session
 
+from app.engines.base_engine import create_detached_progress_updater
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.merge_logger import MergeLogLevel, MergePhase, MergeTaskLogger
 from app.utils.webhdfs_client import WebHDFSClient
-from app.utils.yarn_monitor import YarnResourceManagerMonitor
+from app.utils.yarn_monitor import (
+    YarnResourceManagerMonitor,
+    subscribe_yarn_application,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +70,7 @@ class HiveAtomicSwapManager:
                 hive_conn_params["password"] = self.hive_password
             hive_conn_params["auth"] = "LDAP"
 
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
 
     def _test_connections(
         self,
@@ -287,27 +292,10 @@ class HiveAtomicSwapManager:
                     cur_op = f"{op_desc} (已等待{waited}s)"
                     yarn_id = None
                     # 附带 YARN 应用心跳（如果配置了 RM）
-                    if self.yarn_monitor is not None:
+                    if yarn_sub is not None:
                         try:
-                            # 拉取更宽的范围，包含 RUNNING/ACCEPTED/SUBMITTED，避免 RM 还未进入 RUNNING 时拿不到应用
-                            apps = self.yarn_monitor.get_applications(limit=20)
-                            apps = [
-                                a
-                                for a in apps
-                                if str(getattr(a, "application_type", "")).upper()
-                                in ("TEZ", "MAPREDUCE")
-                            ]
-                            # 选择最新启动的应用，优先匹配已记录的ID
-                            app = None
-                            if task.yarn_application_id:
-                                for a in apps:
-                                    if a.id == task.yarn_application_id:
-                                        app = a
-                                        break
-                            if app is None and apps:
-                                app = sorted(
-                                    apps, key=lambda a: a.start_time, reverse=True
-                                )[0]
+                            # 由集群共享轮询器按查询标签匹配并推送，心跳只读取最新快照
+                            app = yarn_sub.latest
                             if app is not None:
                                 yarn_id = app.id
                                 # 记录 YARN 监控日志
@@ -333,13 +321,15 @@ class HiveAtomicSwapManager:
                             # 监控失败不影响主流程
                             pass
 
-                    self._update_task_progress(
-                        task,
-                        db_session,
-                        execution_phase=execution_phase_name,
-                        yarn_application_id=yarn_id or task.yarn_application_id,
-                        current_operation=cur_op,
-                    )
+                    if yarn_id:
+                        latest_yarn_id[0] = yarn_id
+                    # 心跳线程只通过独立会话写进度，绝不触碰合并线程的 db_session
+                    if update_progress is not None:
+                        update_progress(
+                            execution_phase=execution_phase_name,
+                            yarn_application_id=yarn_id,
+                            current_operation=cur_op,
+                        )
                 except Exception:
                     pass
 
@@ -350,16 +340,31 @@ class HiveAtomicSwapManager:
             f"SQL开始执行: {op_desc}",
             details={"full_sql": sql},
         )
+        yarn_poller, yarn_sub = subscribe_yarn_application(
+            self.yarn_monitor, cursor, getattr(task, "id", None)
+        )
+        update_progress = create_detached_progress_updater(
+            db_session, getattr(task, "id", None)
+        )
+        latest_yarn_id = [None]
         hb = threading.Thread(target=_heartbeat, daemon=True)
         hb.start()
         try:
             cursor.execute(sql)
             stop.set()
             hb.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             merge_logger.log_sql_execution(sql, phase, success=True)
         except Exception as e:
             stop.set()
             hb.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             formatted_error = self._extract_error_detail(e)
             merge_logger.log_sql_execution(
                 sql, phase, success=False, error_message=formatted_error
@@ -372,8 +377,8 @@ class HiveAtomicSwapManager:
         """原子性地交换表"""
         sql_statements = []
 
+        conn = self._create_hive_connection(task.database_name)
         try:
-            conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
 
             # 第一步：将原表重命名为备份表
@@ -391,7 +396,6 @@ class HiveAtomicSwapManager:
             sql_statements.append(rename_temp_to_original_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info(
                 f"Atomic table swap completed: {task.table_name} -> {backup_table_name}, {temp_table_name} -> {task.table_name}"
@@ -400,6 +404,9 @@ class HiveAtomicSwapManager:
         except Exception as e:
             logger.error(f"Failed to perform atomic table swap: {e}")
             raise
+        finally:
+            # 出错时同样归还连接，由连接池判断是否可复用
+            conn.close()
 
         return sql_statements
 
@@ -413,6 +420,7 @@ class HiveAtomicSwapManager:
         """带详细日志记录的原子表切换"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -456,7 +464,6 @@ class HiveAtomicSwapManager:
             )
 
             cursor.close()
-            conn.close()
 
             merge_logger.log(
                 MergePhase.ATOMIC_SWAP,
@@ -477,6 +484,9 @@ class HiveAtomicSwapManager:
                 details={"error": str(e), "failed_operation": "table_rename"},
             )
             raise
+        finally:
+            if conn is not None:
+                conn.close()
 
         return sql_statements
 
@@ -566,9 +576,10 @@ class HiveAtomicSwapManager:
             )
 
             conn = self._create_hive_connection(database)
-            cursor = conn.cursor()
-
+            cursor = None
             try:
+                cursor = conn.cursor()
+
                 # 刷新分区
                 cursor.execute(f"MSCK REPAIR TABLE {database}.{original_table}")
 
@@ -583,8 +594,11 @@ class HiveAtomicSwapManager:
                 )
 
             finally:
-                cursor.close()
-                conn.close()
+                try:
+                    if cursor is not None:
+                        cursor.close()
+                finally:
+                    conn.close()
 
             # Step 5: 清理
             merge_logger.log(
@@ -597,10 +611,12 @@ class HiveAtomicSwapManager:
 
             # 删除临时表元数据
             conn = self._create_hive_connection(database)
-            cursor = conn.cursor()
-            cursor.execute(f"DROP TABLE IF EXISTS {database}.{temp_table}")
-            cursor.close()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(f"DROP TABLE IF EXISTS {database}.{temp_table}")
+                cursor.close()
+            finally:
+                conn.close()
 
             merge_logger.log(MergePhase.ATOMIC_SWAP, MergeLogLevel.INFO, "原子交换完成")
 
@@ -651,13 +667,13 @@ class HiveAtomicSwapManager:
             )
 
         # 2) 回退 HS2 dfs -mv
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cur = conn.cursor()
             cur.execute(f"dfs -mv {src} {dst}")
             try:
                 cur.close()
-                conn.close()
             except Exception:
                 pass
             merge_logger.log_hdfs_operation(
@@ -686,6 +702,12 @@ class HiveAtomicSwapManager:
                 error_message=f"hs2-dfs-mv failed: {e2}",
             )
             return False, f"WebHDFS failed: {last_msg}; HS2 failed: {e2}"
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
 
     def _rollback_merge(
         self, task: MergeTask, temp_table_name: str, backup_table_name: str
@@ -693,6 +715,7 @@ class HiveAtomicSwapManager:
         """回滚合并操作"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -717,12 +740,14 @@ class HiveAtomicSwapManager:
             sql_statements.append(drop_temp_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info("Rollback completed successfully")
 
         except Exception as e:
             logger.error(f"Rollback failed: {e}")
             raise
+        finally:
+            if conn is not None:
+                conn.close()
 
         return sql_statements
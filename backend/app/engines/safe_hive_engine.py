@@ -3,13 +3,17 @@ import re
 import socket
 import threading
 import time
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from pyhive import exc as hive_exc
 from pyhive import hive
 from sqlalchemy.orm import Session
 
-from app.engines.base_engine import BaseMergeEngine
+from app.config.settings import settings
+from app.engines.base_engine import (
+    BaseMergeEngine,
+    create_detached_progress_updater,
+)
 from app.engines.merge_progress_tracker import MergeProgressTracker
 from app.engines.safe_hive_metadata_manager import SafeHiveMetadataManager
 from app.models.cluster import Cluster
@@ -17,9 +21,13 @@ from app.models.merge_task import MergeTask
 from app.monitor.hive_connector import HiveMetastoreConnector
 from app.services.path_resolver import PathResolver
 from app.utils.encryption import decrypt_cluster_password
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.merge_logger import MergeLogLevel, MergePhase, MergeTaskLogger
 from app.utils.webhdfs_client import WebHDFSClient
-from app.utils.yarn_monitor import YarnResourceManagerMonitor
+from app.utils.yarn_monitor import (
+    YarnResourceManagerMonitor,
+    subscribe_yarn_application,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -222,6 +230,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 task.current_operation = current_operation
 
             db_session.commit()
+            self._publish_task_progress(task)
             logger.debug(
                 f"Updated task {task.id} progress: {execution_phase} - {progress_percentage}%"
             )
@@ -295,10 +304,18 @@ class SafeHiveMergeEngine(BaseMergeEngine):
 
     def execute_merge(self, task: MergeTask, db_session: Session) -> Dict[str, Any]:
         """执行安全文件合并（带详尽日志记录）"""
-        start_time = time.time()
-
-        # 初始化详尽日志记录器
+        # 初始化详尽日志记录器,任务结束(含异常)时刷新并关闭日志写线程
         merge_logger = MergeTaskLogger(task, db_session)
+        try:
+            return self._execute_merge_with_logger(task, db_session, merge_logger)
+        finally:
+            merge_logger.close()
+
+    def _execute_merge_with_logger(
+        self, task: MergeTask, db_session: Session, merge_logger: MergeTaskLogger
+    ) -> Dict[str, Any]:
+        """execute_merge 的主体流程"""
+        start_time = time.time()
 
         result = self._init_merge_result_dict()
 
@@ -772,6 +789,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                     processed_files_count=files_after,
                     current_operation="执行外部表目录切换",
                 )
+                self._ensure_lease_valid("外部表目录切换")
                 hdfs: WebHDFSClient = self.webhdfs_client
                 ts_id = int(time.time())
                 # 首选：备份到 .merge_shadow 根
@@ -828,14 +846,16 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                     )
                     raise RuntimeError(f"切换影子目录失败: {msg2}")
                 # 删除临时表元数据
+                conn = None
                 try:
                     conn = self._create_hive_connection(task.database_name)
                     cur = conn.cursor()
                     cur.execute(f"DROP TABLE IF EXISTS {temp_table_name}")
                     cur.close()
-                    conn.close()
                 except Exception:
                     pass
+                finally:
+                    self._close_quietly(None, conn)
                 result["backup_table_created"] = backup_dir
                 merge_logger.end_phase(MergePhase.ATOMIC_SWAP, "外部表目录切换完成")
                 self._update_task_progress(
@@ -1346,7 +1366,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 f"Creating LDAP connection for user: {self.cluster.hive_username}"
             )
 
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
 
     def _cleanup_connections(self):
         """清理连接"""
@@ -1427,6 +1447,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         comp = (compression or "").upper()
         if comp in {"DEFAULT", ""}:
             comp = None
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
@@ -1461,7 +1482,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                         success=True,
                     )
             cursor.close()
-            conn.close()
         except Exception as exc:  # pragma: no cover - metadata updates best effort
             merge_logger.log(
                 MergePhase.COMPLETION,
@@ -1469,6 +1489,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 f"更新表文件格式/压缩信息失败: {exc}",
                 details={"code": "W902"},
             )
+        finally:
+            self._close_quietly(None, conn)
 
 
 
@@ -1880,6 +1902,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         """创建临时表并执行合并"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -1920,13 +1943,14 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             sql_statements.append(create_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info(f"Temporary table {temp_table_name} created successfully")
 
         except Exception as e:
             logger.error(f"Failed to create temporary table: {e}")
             raise
+        finally:
+            self._close_quietly(None, conn)
 
         return sql_statements
 
@@ -1941,6 +1965,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             "temp_count": 0,
         }
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -1969,12 +1994,13 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 )
 
             cursor.close()
-            conn.close()
 
         except Exception as e:
             logger.error(f"Failed to validate temp table data: {e}")
             result["valid"] = False
             result["message"] = str(e)
+        finally:
+            self._close_quietly(None, conn)
 
         return result
 
@@ -1982,8 +2008,10 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         self, task: MergeTask, temp_table_name: str, backup_table_name: str
     ) -> List[str]:
         """原子性地交换表"""
+        self._ensure_lease_valid("原子表切换")
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -2003,7 +2031,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             sql_statements.append(rename_temp_to_original_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info(
                 f"Atomic table swap completed: {task.table_name} -> {backup_table_name}, {temp_table_name} -> {task.table_name}"
@@ -2012,6 +2039,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         except Exception as e:
             logger.error(f"Failed to perform atomic table swap: {e}")
             raise
+        finally:
+            self._close_quietly(None, conn)
 
         return sql_statements
 
@@ -2050,13 +2079,13 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             )
 
         # 2) 回退 HS2 dfs -mv
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cur = conn.cursor()
             cur.execute(f"dfs -mv {src} {dst}")
             try:
                 cur.close()
-                conn.close()
             except Exception:
                 pass
             merge_logger.log_hdfs_operation(
@@ -2085,6 +2114,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 error_message=f"hs2-dfs-mv failed: {e2}",
             )
             return False, f"WebHDFS failed: {last_msg}; HS2 failed: {e2}"
+        finally:
+            self._close_quietly(None, conn)
 
     def _rollback_merge(
         self, task: MergeTask, temp_table_name: str, backup_table_name: str
@@ -2092,6 +2123,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         """回滚合并操作"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -2116,13 +2148,14 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             sql_statements.append(drop_temp_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info("Rollback completed successfully")
 
         except Exception as e:
             logger.error(f"Rollback failed: {e}")
             raise
+        finally:
+            self._close_quietly(None, conn)
 
         return sql_statements
 
@@ -2303,6 +2336,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         """带详细日志记录的临时表创建"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -2548,7 +2582,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 sql_statements.append(create_sql)
 
             cursor.close()
-            conn.close()
 
             merge_logger.log(
                 MergePhase.TEMP_TABLE_CREATION,
@@ -2568,6 +2601,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 error_message=str(e),
             )
             raise
+        finally:
+            self._close_quietly(None, conn)
 
         return sql_statements
 
@@ -2612,27 +2647,10 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                     cur_op = f"{op_desc} (已等待{waited}s)"
                     yarn_id = None
                     # 附带 YARN 应用心跳（如果配置了 RM）
-                    if self.yarn_monitor is not None:
+                    if yarn_sub is not None:
                         try:
-                            # 拉取更宽的范围，包含 RUNNING/ACCEPTED/SUBMITTED，避免 RM 还未进入 RUNNING 时拿不到应用
-                            apps = self.yarn_monitor.get_applications(limit=20)
-                            apps = [
-                                a
-                                for a in apps
-                                if str(getattr(a, "application_type", "")).upper()
-                                in ("TEZ", "MAPREDUCE")
-                            ]
-                            # 选择最新启动的应用，优先匹配已记录的ID
-                            app = None
-                            if task.yarn_application_id:
-                                for a in apps:
-                                    if a.id == task.yarn_application_id:
-                                        app = a
-                                        break
-                            if app is None and apps:
-                                app = sorted(
-                                    apps, key=lambda a: a.start_time, reverse=True
-                                )[0]
+                            # 由集群共享轮询器按查询标签匹配并推送，心跳只读取最新快照
+                            app = yarn_sub.latest
                             if app is not None:
                                 yarn_id = app.id
                                 # 记录 YARN 监控日志
@@ -2658,13 +2676,15 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                             # 监控失败不影响主流程
                             pass
 
-                    self._update_task_progress(
-                        task,
-                        db_session,
-                        execution_phase=execution_phase_name,
-                        yarn_application_id=yarn_id or task.yarn_application_id,
-                        current_operation=cur_op,
-                    )
+                    if yarn_id:
+                        latest_yarn_id[0] = yarn_id
+                    # 心跳线程只通过独立会话写进度，绝不触碰合并线程的 db_session
+                    if update_progress is not None:
+                        update_progress(
+                            execution_phase=execution_phase_name,
+                            yarn_application_id=yarn_id,
+                            current_operation=cur_op,
+                        )
                 except Exception:
                     pass
 
@@ -2675,6 +2695,13 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             f"SQL开始执行: {op_desc}",
             details={"full_sql": sql},
         )
+        yarn_poller, yarn_sub = subscribe_yarn_application(
+            self.yarn_monitor, cursor, getattr(task, "id", None)
+        )
+        update_progress = create_detached_progress_updater(
+            db_session, getattr(task, "id", None)
+        )
+        latest_yarn_id = [None]
         hb = threading.Thread(target=_heartbeat, daemon=True)
         hb.start()
         try:
@@ -2685,10 +2712,18 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 f.write(f"[{time.time()}] cursor.execute(sql) completed\n")
             stop.set()
             hb.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             merge_logger.log_sql_execution(sql, phase, success=True)
         except Exception as e:
             stop.set()
             hb.join(timeout=0.2)
+            if latest_yarn_id[0]:
+                task.yarn_application_id = latest_yarn_id[0]
+            if yarn_sub is not None:
+                yarn_poller.unsubscribe(yarn_sub)
             formatted_error = self._extract_error_detail(e)
             merge_logger.log_sql_execution(
                 sql, phase, success=False, error_message=formatted_error
@@ -2703,8 +2738,10 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         merge_logger,
     ) -> List[str]:
         """带详细日志记录的原子表切换"""
+        self._ensure_lease_valid("原子表切换")
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -2748,7 +2785,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             )
 
             cursor.close()
-            conn.close()
 
             merge_logger.log(
                 MergePhase.ATOMIC_SWAP,
@@ -2769,6 +2805,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                 details={"error": str(e), "failed_operation": "table_rename"},
             )
             raise
+        finally:
+            self._close_quietly(None, conn)
 
         return sql_statements
 
@@ -2786,6 +2824,19 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         Returns:
             分区列名列表,如: ["partition_id", "dt", "hour"]
         """
+        return [name for name, _ in self._get_partition_column_types(database, table)]
+
+    def _get_partition_column_types(
+        self, database: str, table: str
+    ) -> list[tuple[str, str]]:
+        """
+        获取表的分区列名及类型
+
+        Returns:
+            [(列名, 类型)],如: [("dt", "string"), ("hour", "int")];失败时返回空列表
+        """
+        conn = None
+        cursor = None
         try:
             conn = self._create_hive_connection(database)
             cursor = conn.cursor()
@@ -2793,8 +2844,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             # 使用DESCRIBE FORMATTED获取表结构
             cursor.execute(f"DESCRIBE FORMATTED {database}.{table}")
             desc_result = cursor.fetchall()
-            cursor.close()
-            conn.close()
 
             # 解析DESCRIBE结果,找到分区列定义
             partition_cols = []
@@ -2818,15 +2867,20 @@ class SafeHiveMergeEngine(BaseMergeEngine):
                     # 遇到空行或其他section,结束
                     if col_name == "" or col_name.startswith("#"):
                         break
-                    # 提取分区列名(第一列)
+                    # 提取分区列名(第一列)与类型(第二列)
                     if col_name and not col_name.startswith("#"):
-                        partition_cols.append(col_name)
+                        col_type = (
+                            str(row[1]).strip() if len(row) > 1 and row[1] else ""
+                        )
+                        partition_cols.append((col_name, col_type))
 
             return partition_cols
 
         except Exception as e:
             logger.error(f"Failed to get partition columns: {e}")
             return []
+        finally:
+            self._close_quietly(cursor, conn)
 
     def _list_all_partitions(self, database: str, table: str) -> list[str]:
         """
@@ -2837,37 +2891,45 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             table: 表名
 
         Returns:
-            分区规格列表,如: ["partition_id='p1'", "partition_id='p2'"]
+            分区规格列表,如: ["partition_id='p1'", "partition_id='p2'"];失败时返回空列表
         """
         try:
-            conn = self._create_hive_connection(database)
-            cursor = conn.cursor()
+            return self._show_partitions(database, table)
+        except Exception as e:
+            logger.error(f"Failed to list partitions: {e}")
+            return []
+
+    def _show_partitions(self, database: str, table: str) -> list[str]:
+        """
+        执行 SHOW PARTITIONS 并转换为分区规格列表,失败时抛出异常
 
+        需要区分"没有分区"与"查询失败"的调用方(如批量合并校验)使用此方法。
+        """
+        conn = self._create_hive_connection(database)
+        cursor = None
+        try:
+            cursor = conn.cursor()
             cursor.execute(f"SHOW PARTITIONS {database}.{table}")
             partitions = cursor.fetchall()
-            cursor.close()
-            conn.close()
-
-            # partitions格式: [('partition_id=p1',), ('partition_id=p2',)]
-            partition_specs = []
-            for partition_tuple in partitions:
-                if partition_tuple and partition_tuple[0]:
-                    # 转换 'partition_id=p1' 为 "partition_id='p1'"
-                    raw_spec = partition_tuple[0]
-                    # 分割key=value对
-                    parts = []
-                    for part in raw_spec.split("/"):
-                        if "=" in part:
-                            key, value = part.split("=", 1)
-                            parts.append(f"{key}='{value}'")
-                    if parts:
-                        partition_specs.append(", ".join(parts))
-
-            return partition_specs
+        finally:
+            self._close_quietly(cursor, conn)
+
+        # partitions格式: [('partition_id=p1',), ('partition_id=p2',)]
+        partition_specs = []
+        for partition_tuple in partitions:
+            if partition_tuple and partition_tuple[0]:
+                # 转换 'partition_id=p1' 为 "partition_id='p1'"
+                raw_spec = partition_tuple[0]
+                # 分割key=value对
+                parts = []
+                for part in raw_spec.split("/"):
+                    if "=" in part:
+                        key, value = part.split("=", 1)
+                        parts.append(f"{key}='{value}'")
+                if parts:
+                    partition_specs.append(", ".join(parts))
 
-        except Exception as e:
-            logger.error(f"Failed to list partitions: {e}")
-            return []
+        return partition_specs
 
     def _parse_partition_spec(self, partition_spec: str) -> Dict[str, str]:
         """
@@ -2909,6 +2971,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         """
         import re
 
+        conn = None
         try:
             conn = self._create_hive_connection(database)
             cursor = conn.cursor()
@@ -2916,7 +2979,6 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             cursor.execute(f"SHOW CREATE TABLE {database}.{table}")
             result = cursor.fetchall()
             cursor.close()
-            conn.close()
 
             # 拼接所有行为完整DDL
             ddl_lines = [row[0] for row in result if row and row[0]]
@@ -2987,6 +3049,8 @@ class SafeHiveMergeEngine(BaseMergeEngine):
         except Exception as e:
             logger.error(f"Failed to parse table schema: {e}")
             raise Exception(f"Cannot parse table schema for {database}.{table}: {e}")
+        finally:
+            self._close_quietly(None, conn)
 
     def _get_format_classes(self, storage_format: str) -> tuple:
         """
@@ -3075,6 +3139,7 @@ class SafeHiveMergeEngine(BaseMergeEngine):
             f"开始初始化: 分区表整表合并(动态分区模式) - {database}.{table}",
         )
 
+        conn = None
         try:
             # 1. 获取分区列
             print(
@@ -3370,6 +3435,7 @@ TBLPROPERTIES (
                 f.write(f"[{time.time()}] Closing cursor and connection...\n")
             cursor.close()
             conn.close()
+            conn = None
             with open("/tmp/merge_debug.log", "a") as f:
                 f.write(f"[{time.time()}] Connection closed\n")
 
@@ -3436,15 +3502,20 @@ TBLPROPERTIES (
                 MergePhase.EXECUTION, MergeLogLevel.ERROR, f"动态分区合并失败: {e}"
             )
 
+            # 释放合并阶段未关闭的连接
+            self._close_quietly(None, conn)
+            conn = None
+
             # 清理临时表
             try:
                 conn = self._create_hive_connection(database)
                 cursor = conn.cursor()
                 cursor.execute(f"DROP TABLE IF EXISTS {temp_table}")
                 cursor.close()
-                conn.close()
             except:
                 pass
+            finally:
+                self._close_quietly(None, conn)
 
             raise
 
@@ -3474,6 +3545,7 @@ TBLPROPERTIES (
         Returns:
             操作结果
         """
+        self._ensure_lease_valid("表位置切换")
         ts = int(time.time())
 
         try:
@@ -3532,9 +3604,10 @@ TBLPROPERTIES (
             )
 
             conn = self._create_hive_connection(database)
-            cursor = conn.cursor()
-
+            cursor = None
             try:
+                cursor = conn.cursor()
+
                 # 刷新分区
                 cursor.execute(f"MSCK REPAIR TABLE {database}.{original_table}")
 
@@ -3549,8 +3622,7 @@ TBLPROPERTIES (
                 )
 
             finally:
-                cursor.close()
-                conn.close()
+                self._close_quietly(cursor, conn)
 
             # Step 5: 清理
             merge_logger.log(
@@ -3563,10 +3635,12 @@ TBLPROPERTIES (
 
             # 删除临时表元数据
             conn = self._create_hive_connection(database)
-            cursor = conn.cursor()
-            cursor.execute(f"DROP TABLE IF EXISTS {database}.{temp_table}")
-            cursor.close()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(f"DROP TABLE IF EXISTS {database}.{temp_table}")
+                cursor.close()
+            finally:
+                self._close_quietly(None, conn)
 
             merge_logger.log(MergePhase.ATOMIC_SWAP, MergeLogLevel.INFO, "原子交换完成")
 
@@ -3687,6 +3761,7 @@ TBLPROPERTIES (
             temp_partition_spec: 临时分区规格
             merge_logger: 合并日志记录器
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database)
             cursor = conn.cursor()
@@ -3695,7 +3770,6 @@ TBLPROPERTIES (
             )
             cursor.execute(drop_sql)
             cursor.close()
-            conn.close()
             merge_logger.log(
                 MergePhase.ROLLBACK,
                 MergeLogLevel.INFO,
@@ -3705,6 +3779,8 @@ TBLPROPERTIES (
             merge_logger.log(
                 MergePhase.ROLLBACK, MergeLogLevel.WARNING, f"清理临时分区失败: {e}"
             )
+        finally:
+            self._close_quietly(None, conn)
 
     def _get_non_partition_columns(self, database: str, table: str) -> str:
         """
@@ -3713,9 +3789,10 @@ TBLPROPERTIES (
         返回: "col1, col2, col3"
         """
         conn = self._create_hive_connection(database)
-        cursor = conn.cursor()
+        cursor = None
 
         try:
+            cursor = conn.cursor()
             # 先获取所有分区列名
             cursor.execute(f"SHOW PARTITIONS {database}.{table}")
             partition_cols_result = cursor.fetchone()
@@ -3749,8 +3826,7 @@ TBLPROPERTIES (
 
             return ", ".join(non_partition_cols)
         finally:
-            cursor.close()
-            conn.close()
+            self._close_quietly(cursor, conn)
 
     def _execute_partition_native_merge(
         self,
@@ -3825,17 +3901,48 @@ TBLPROPERTIES (
                     progress_tracker=progress_tracker,
                 )
 
-            # 多分区顺序合并
             total_partitions = len(partition_list)
             merged_count = 0
             failed_partitions = []
 
-            for idx, partition_spec in enumerate(partition_list, start=1):
+            # 多分区批量合并: 兼容分区按批次合并为一次动态分区INSERT
+            pending_partitions = partition_list
+            batch_size = int(settings.MERGE_PARTITION_BATCH_SIZE or 0)
+            if batch_size > 1:
+                batches, pending_partitions = self._plan_partition_batches(
+                    task.database_name, task.table_name, partition_list, batch_size
+                )
+                for batch_idx, batch in enumerate(batches, start=1):
+                    merge_logger.log(
+                        MergePhase.EXECUTION,
+                        MergeLogLevel.INFO,
+                        f"批量合并分区 [批次 {batch_idx}/{len(batches)}]: {len(batch)} 个分区",
+                    )
+                    batch_result = self._execute_partition_batch_native_merge(
+                        task=task, partition_specs=batch, merge_logger=merge_logger
+                    )
+                    merged_count += len(batch_result["merged"]) + len(
+                        batch_result["skipped"]
+                    )
+                    failed_partitions.extend(batch_result["failed"])
+                    # 批量INSERT失败或无法交换的分区回退到逐分区合并
+                    pending_partitions = pending_partitions + batch_result["fallback"]
+
+                if batches:
+                    progress_pct = (merged_count / total_partitions) * 100
+                    merge_logger.log(
+                        MergePhase.EXECUTION,
+                        MergeLogLevel.INFO,
+                        f"批量合并完成: {len(batches)} 个作业, 已合并 {merged_count}/{total_partitions} 个分区 ({progress_pct:.1f}%)",
+                    )
+
+            # 剩余分区顺序合并
+            for idx, partition_spec in enumerate(pending_partitions, start=1):
                 try:
                     merge_logger.log(
                         MergePhase.EXECUTION,
                         MergeLogLevel.INFO,
-                        f"合并分区 [{idx}/{total_partitions}]: {partition_spec}",
+                        f"合并分区 [{idx}/{len(pending_partitions)}]: {partition_spec}",
                     )
 
                     self._execute_single_partition_native_merge(
@@ -3893,6 +4000,355 @@ TBLPROPERTIES (
             )
             raise
 
+    def _plan_partition_batches(
+        self, database: str, table: str, partition_list: List[str], batch_size: int
+    ) -> tuple[List[List[str]], List[str]]:
+        """
+        将分区列表划分为可批量合并的批次
+
+        只有指定了全部分区列的分区才可进入批次(动态分区INSERT需要完整分区值),
+        其余分区以及临时分区名冲突的分区返回给调用方逐个合并。
+        仅当全部分区列均为 string 类型时才批量合并: 临时分区值形如
+        '<原值>_temp_<时间戳>', 在 int/date 等列上会被转换为 NULL 写入
+        __HIVE_DEFAULT_PARTITION__, 在 varchar(n)/char(n) 列上可能被截断。
+
+        返回:
+            (批次列表, 需逐分区合并的分区列表)
+        """
+        column_types = self._get_partition_column_types(database, table)
+        if not column_types or any(
+            col_type.lower() != "string" for _, col_type in column_types
+        ):
+            return [], list(partition_list)
+        partition_cols = [name for name, _ in column_types]
+
+        compatible: List[str] = []
+        leftovers: List[str] = []
+        for spec in partition_list:
+            kv = self._parse_partition_spec(spec)
+            if set(kv) == set(partition_cols):
+                compatible.append(spec)
+            else:
+                leftovers.append(spec)
+
+        if len(compatible) < 2:
+            return [], list(partition_list)
+
+        batches = [
+            compatible[i : i + batch_size]
+            for i in range(0, len(compatible), batch_size)
+        ]
+        # 尾批只有一个分区时没有批量收益
+        if len(batches[-1]) == 1:
+            leftovers.extend(batches.pop())
+        return batches, leftovers
+
+    def _build_partition_batch_insert_sql(
+        self,
+        database: str,
+        table: str,
+        partition_cols: List[str],
+        non_partition_cols: str,
+        partition_kvs: List[Dict[str, str]],
+        temp_kvs: List[Dict[str, str]],
+    ) -> str:
+        """
+        构建批量动态分区INSERT语句
+
+        每个分区列通过CASE表达式映射到对应的临时分区值,WHERE只读取本批次分区:
+            INSERT OVERWRITE TABLE db.t PARTITION (dt)
+            SELECT c1, c2, CASE dt WHEN '2024-01-01' THEN 'temp_20240101_123' END
+            FROM db.t WHERE dt IN ('2024-01-01', ...)
+        """
+        case_exprs = []
+        for col in partition_cols:
+            mapping: Dict[str, str] = {}
+            for kv, temp_kv in zip(partition_kvs, temp_kvs):
+                mapping[kv[col]] = temp_kv[col]
+            whens = " ".join(
+                f"WHEN '{value}' THEN '{temp}'" for value, temp in mapping.items()
+            )
+            case_exprs.append(f"CASE {col} {whens} END")
+
+        if len(partition_cols) == 1:
+            col = partition_cols[0]
+            values = ", ".join(f"'{kv[col]}'" for kv in partition_kvs)
+            where_clause = f"{col} IN ({values})"
+        else:
+            where_clause = " OR ".join(
+                "(" + " AND ".join(f"{col}='{kv[col]}'" for col in partition_cols) + ")"
+                for kv in partition_kvs
+            )
+
+        select_cols = ", ".join([c for c in [non_partition_cols] if c] + case_exprs)
+        return f"""
+                INSERT OVERWRITE TABLE {database}.{table}
+                PARTITION ({", ".join(partition_cols)})
+                SELECT {select_cols} FROM {database}.{table}
+                WHERE {where_clause}
+            """
+
+    def _execute_partition_batch_native_merge(
+        self,
+        task: MergeTask,
+        partition_specs: List[str],
+        merge_logger: MergeTaskLogger,
+    ) -> Dict[str, Any]:
+        """
+        使用一次动态分区INSERT合并一批分区(临时分区+RENAME策略的批量版本)
+
+        核心流程:
+        1. 一次INSERT OVERWRITE ... PARTITION(动态分区)将本批次数据写入各自的临时分区
+        2. 删除任何原分区之前逐分区校验原分区/临时分区文件数,任一不一致则中止整个批次
+        3. 逐个分区: 删除原分区 → 将临时分区重命名为原分区(仅元数据操作)
+
+        N个分区只提交一个YARN作业,避免N次容器启动开销。
+
+        返回:
+            {"merged": [...], "failed": [...], "fallback": [...], "skipped": [...]}
+            fallback中的分区尚未改动,调用方应逐分区重试;
+            failed中的分区原分区已删除但重命名失败,临时分区保留以便人工恢复。
+        """
+        database = task.database_name
+        table = task.table_name
+        result: Dict[str, Any] = {
+            "merged": [],
+            "failed": [],
+            "fallback": [],
+            "skipped": [],
+        }
+
+        partition_cols = self._get_partition_columns(database, table)
+        ts = int(time.time())
+        partition_kvs = [self._parse_partition_spec(s) for s in partition_specs]
+        temp_kvs = [
+            {
+                col: self._generate_temp_partition_kv(kv, ts)[col]
+                for col in partition_cols
+            }
+            for kv in partition_kvs
+        ]
+        temp_specs = [self._format_partition_spec(kv) for kv in temp_kvs]
+
+        # 临时分区值必须一一对应,否则无法安全地重命名回原分区
+        if not partition_cols or len(set(temp_specs)) != len(temp_specs):
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.WARNING,
+                "批次内临时分区名冲突,回退为逐分区合并",
+            )
+            result["fallback"] = list(partition_specs)
+            return result
+
+        conn = None
+        cursor = None
+        try:
+            conn = self._create_hive_connection(database)
+            cursor = conn.cursor()
+
+            non_partition_cols = self._get_non_partition_columns(database, table)
+            batch_params = [
+                "SET hive.exec.dynamic.partition=true",
+                "SET hive.exec.dynamic.partition.mode=nonstrict",
+                "SET hive.exec.max.dynamic.partitions=100000",
+                "SET hive.exec.max.dynamic.partitions.pernode=100000",
+                "SET hive.merge.mapfiles=true",
+                "SET hive.merge.mapredfiles=true",
+                "SET hive.merge.size.per.task=256000000",
+                "SET hive.merge.smallfiles.avgsize=16000000",
+                "SET mapred.max.split.size=256000000",
+                "SET mapred.min.split.size.per.node=100000000",
+                "SET mapred.min.split.size.per.rack=100000000",
+            ]
+            for param in batch_params:
+                cursor.execute(param)
+
+            insert_sql = self._build_partition_batch_insert_sql(
+                database,
+                table,
+                partition_cols,
+                non_partition_cols,
+                partition_kvs,
+                temp_kvs,
+            )
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.INFO,
+                f"执行批量动态分区INSERT OVERWRITE: {len(partition_specs)} 个分区 → 临时分区(_{ts})",
+            )
+            cursor.execute(insert_sql)
+        except Exception as e:
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.WARNING,
+                f"批量动态分区INSERT失败,回退为逐分区合并: {e}",
+            )
+            for temp_spec in temp_specs:
+                self._cleanup_temp_partition(database, table, temp_spec, merge_logger)
+            result["fallback"] = list(partition_specs)
+            return result
+        finally:
+            self._close_quietly(cursor, conn)
+
+        # 动态分区只会为有数据的分区生成临时分区;无法列出分区时无法校验,整批回退
+        try:
+            created = set(self._show_partitions(database, table))
+        except Exception as e:
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.ERROR,
+                f"批量合并后列出分区失败,中止本批次,未删除任何原分区,回退为逐分区合并: {e}",
+            )
+            for temp_spec in temp_specs:
+                self._cleanup_temp_partition(database, table, temp_spec, merge_logger)
+            result["fallback"] = list(partition_specs)
+            return result
+
+        # 删除任何原分区之前逐分区校验,任一分区不一致则中止整批(原分区均未改动)
+        swaps, skipped, mismatches = self._verify_batch_partitions(
+            database, table, partition_specs, temp_specs, created
+        )
+        if mismatches:
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.ERROR,
+                f"批量合并校验失败,中止本批次,未删除任何原分区,回退为逐分区合并: "
+                f"{len(mismatches)} 个分区不一致",
+                details={"mismatches": mismatches[:20]},
+            )
+            for temp_spec in temp_specs:
+                if temp_spec in created:
+                    self._cleanup_temp_partition(
+                        database, table, temp_spec, merge_logger
+                    )
+            result["fallback"] = list(partition_specs)
+            return result
+
+        for spec in skipped:
+            merge_logger.log(
+                MergePhase.EXECUTION,
+                MergeLogLevel.WARNING,
+                f"原分区无文件,跳过交换: {spec}",
+            )
+        result["skipped"].extend(skipped)
+
+        self._ensure_lease_valid("批量分区替换")
+        conn = self._create_hive_connection(database)
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            for spec, temp_spec, original_files, temp_files in swaps:
+                try:
+                    cursor.execute(
+                        f"ALTER TABLE {table} DROP IF EXISTS PARTITION ({spec})"
+                    )
+                except Exception as e:
+                    merge_logger.log(
+                        MergePhase.EXECUTION,
+                        MergeLogLevel.WARNING,
+                        f"删除原分区失败,回退为逐分区合并: {spec}: {e}",
+                    )
+                    self._cleanup_temp_partition(
+                        database, table, temp_spec, merge_logger
+                    )
+                    result["fallback"].append(spec)
+                    continue
+
+                try:
+                    cursor.execute(
+                        f"ALTER TABLE {table} PARTITION ({temp_spec}) RENAME TO PARTITION ({spec})"
+                    )
+                    result["merged"].append(spec)
+                    merge_logger.log(
+                        MergePhase.EXECUTION,
+                        MergeLogLevel.INFO,
+                        f"分区合并完成: {spec}, 原文件数={original_files}, 合并后文件数={temp_files}",
+                    )
+                except Exception as e:
+                    merge_logger.log(
+                        MergePhase.EXECUTION,
+                        MergeLogLevel.ERROR,
+                        f"重命名临时分区失败,数据保留在 {temp_spec}: {e}",
+                    )
+                    result["failed"].append(spec)
+        finally:
+            self._close_quietly(cursor, conn)
+
+        merge_logger.log(
+            MergePhase.EXECUTION,
+            MergeLogLevel.INFO,
+            f"批次合并完成: 成功 {len(result['merged'])}, 跳过 {len(result['skipped'])}, "
+            f"回退 {len(result['fallback'])}, 失败 {len(result['failed'])}",
+        )
+        return result
+
+    def _verify_batch_partitions(
+        self,
+        database: str,
+        table: str,
+        partition_specs: List[str],
+        temp_specs: List[str],
+        created: set,
+    ) -> Tuple[List[Tuple[str, str, int, int]], List[str], List[Dict[str, Any]]]:
+        """
+        批量交换前逐分区校验(与单分区路径一致: 原分区有文件, 临时分区数据已生成)
+
+        只有原分区确实没有文件时,缺少临时分区才视为跳过;否则记为不一致。
+
+        返回:
+            (待交换列表[(分区, 临时分区, 原文件数, 临时文件数)], 无文件跳过的分区, 不一致的分区)
+        """
+        swaps: List[Tuple[str, str, int, int]] = []
+        skipped: List[str] = []
+        mismatches: List[Dict[str, Any]] = []
+        for spec, temp_spec in zip(partition_specs, temp_specs):
+            original_path = self._resolve_partition_path(database, table, spec)
+            original_files = (
+                self._count_partition_files(original_path) if original_path else 0
+            )
+            if temp_spec not in created:
+                # 原分区没有文件时 INSERT 不会生成临时分区,原分区保持不变;
+                # 原分区有文件却没有临时分区说明数据未写到预期位置,不能视为已合并
+                if original_path and original_files == 0:
+                    skipped.append(spec)
+                else:
+                    mismatches.append(
+                        {
+                            "partition": spec,
+                            "original_path": original_path,
+                            "original_files": original_files,
+                            "temp_files": 0,
+                            "reason": "temp partition not created",
+                        }
+                    )
+                continue
+
+            temp_path = self._resolve_partition_path(database, table, temp_spec)
+            temp_files = self._count_partition_files(temp_path) if temp_path else 0
+            if not original_path or original_files == 0 or temp_files == 0:
+                mismatches.append(
+                    {
+                        "partition": spec,
+                        "original_path": original_path,
+                        "original_files": original_files,
+                        "temp_files": temp_files,
+                    }
+                )
+                continue
+            swaps.append((spec, temp_spec, original_files, temp_files))
+        return swaps, skipped, mismatches
+
+    @staticmethod
+    def _close_quietly(cursor, conn) -> None:
+        """关闭游标与连接,失败时记录日志"""
+        for resource in (cursor, conn):
+            if resource is None:
+                continue
+            try:
+                resource.close()
+            except Exception as e:
+                logger.warning(f"关闭Hive资源失败: {e}")
+
     def _execute_single_partition_native_merge(
         self,
         task: MergeTask,
@@ -4029,6 +4485,7 @@ TBLPROPERTIES (
             cursor = conn.cursor()
 
             # 9. 删除原分区
+            self._ensure_lease_valid("分区替换")
             drop_original_sql = (
                 f"ALTER TABLE {table} DROP IF EXISTS PARTITION ({partition_spec})"
             )
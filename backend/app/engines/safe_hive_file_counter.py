@@ -9,6 +9,7 @@ from typing import Optional
 from pyhive import hive
 
 from app.models.cluster import Cluster
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.merge_logger import MergeLogLevel, MergePhase
 from app.utils.webhdfs_client import WebHDFSClient
 
@@ -53,7 +54,7 @@ class HiveFileCounter:
                 f"Creating LDAP connection for user: {self.cluster.hive_username}"
             )
 
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
 
     def _get_file_count(
         self,
@@ -292,6 +293,7 @@ class HiveFileCounter:
             temp_partition_spec: 临时分区规格
             merge_logger: 合并日志记录器
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database)
             cursor = conn.cursor()
@@ -300,7 +302,6 @@ class HiveFileCounter:
             )
             cursor.execute(drop_sql)
             cursor.close()
-            conn.close()
             merge_logger.log(
                 MergePhase.ROLLBACK,
                 MergeLogLevel.INFO,
@@ -310,3 +311,6 @@ class HiveFileCounter:
             merge_logger.log(
                 MergePhase.ROLLBACK, MergeLogLevel.WARNING, f"清理临时分区失败: {e}"
             )
+        finally:
+            if conn is not None:
+                conn.close()
@@ -16,6 +16,7 @@ from pyhive import hive
 
 from app.services.path_resolver import PathResolver
 from app.models.cluster import Cluster
+from app.utils.hive_connection_pool import get_hive_connection_pool
 
 logger = logging.getLogger(__name__)
 
@@ -104,7 +105,7 @@ class SafeHiveMetadataManager:
                 f"Creating LDAP connection for user: {self.cluster.hive_username}"
             )
         
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
     
     # ==================== 核心元数据方法 (10个) ====================
     # 重要: 所有方法签名必须100%匹配safe_hive_engine.py,避免上次重构失败的错误
@@ -139,16 +140,19 @@ class SafeHiveMetadataManager:
         Returns:
             bool: True表示表存在,False表示不存在
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
             cursor.execute(f'SHOW TABLES LIKE "{table_name}"')
             result = cursor.fetchone()
             cursor.close()
-            conn.close()
             return result is not None
         except Exception:
             return False
+        finally:
+            if conn is not None:
+                conn.close()
     
     def _is_partitioned_table(self, database_name: str, table_name: str) -> bool:
         """
@@ -161,6 +165,7 @@ class SafeHiveMetadataManager:
         Returns:
             bool: True表示分区表,False表示非分区表
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
@@ -175,11 +180,13 @@ class SafeHiveMetadataManager:
                     break
             
             cursor.close()
-            conn.close()
             return is_partitioned
         except Exception as e:
             logger.error(f"Failed to check if table is partitioned: {e}")
             return False
+        finally:
+            if conn is not None:
+                conn.close()
     
     def _get_table_partitions(self, database_name: str, table_name: str) -> List[str]:
         """
@@ -192,17 +199,20 @@ class SafeHiveMetadataManager:
         Returns:
             List[str]: 分区列表,例如 ['dt=2024-01-01', 'dt=2024-01-02']
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
             cursor.execute(f"SHOW PARTITIONS {table_name}")
             partitions = [row[0] for row in cursor.fetchall()]
             cursor.close()
-            conn.close()
             return partitions
         except Exception as e:
             logger.error(f"Failed to get table partitions: {e}")
             return []
+        finally:
+            if conn is not None:
+                conn.close()
     
     def _get_table_format_info(
         self, database_name: str, table_name: str
@@ -231,6 +241,7 @@ class SafeHiveMetadataManager:
             "tblproperties": {},
             "table_type": "",
         }
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
@@ -264,9 +275,11 @@ class SafeHiveMetadataManager:
             except Exception:
                 pass
             cursor.close()
-            conn.close()
         except Exception:
             pass
+        finally:
+            if conn is not None:
+                conn.close()
         return info
     
     def _get_table_columns(
@@ -282,13 +295,13 @@ class SafeHiveMetadataManager:
         Returns:
             Tuple[List[str], List[str]]: (非分区列列表, 分区列列表)
         """
+        conn = None
         try:
             conn = self._create_hive_connection(database_name)
             cursor = conn.cursor()
             cursor.execute(f"DESCRIBE FORMATTED {table_name}")
             rows = cursor.fetchall()
             cursor.close()
-            conn.close()
             nonpart: List[str] = []
             parts: List[str] = []
             in_part = False
@@ -318,6 +331,9 @@ class SafeHiveMetadataManager:
             return nonpart, parts
         except Exception:
             return [], []
+        finally:
+            if conn is not None:
+                conn.close()
     
     def _is_unsupported_table_type(self, fmt: Dict[str, Any]) -> bool:
         """
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
+from app.utils.hive_connection_pool import get_hive_connection_pool
 from app.utils.merge_logger import MergeLogLevel, MergePhase
 
 logger = logging.getLogger(__name__)
@@ -45,7 +46,7 @@ class HiveTempTableManager:
                 hive_conn_params["password"] = self.hive_password
             hive_conn_params["auth"] = "LDAP"
 
-        return hive.Connection(**hive_conn_params)
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
 
     def _generate_temp_table_name(self, table_name: str) -> str:
         """生成临时表名"""
@@ -61,6 +62,7 @@ class HiveTempTableManager:
         """创建临时表并执行合并"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -101,13 +103,15 @@ class HiveTempTableManager:
             sql_statements.append(create_sql)
 
             cursor.close()
-            conn.close()
 
             logger.info(f"Temporary table {temp_table_name} created successfully")
 
         except Exception as e:
             logger.error(f"Failed to create temporary table: {e}")
             raise
+        finally:
+            if conn is not None:
+                conn.close()
 
         return sql_statements
 
@@ -125,6 +129,7 @@ class HiveTempTableManager:
         """带详细日志记录的临时表创建"""
         sql_statements = []
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -374,7 +379,6 @@ class HiveTempTableManager:
                 sql_statements.append(create_sql)
 
             cursor.close()
-            conn.close()
 
             merge_logger.log(
                 MergePhase.TEMP_TABLE_CREATION,
@@ -394,6 +398,9 @@ class HiveTempTableManager:
                 error_message=str(e),
             )
             raise
+        finally:
+            if conn is not None:
+                conn.close()
 
         return sql_statements
 
@@ -408,6 +415,7 @@ class HiveTempTableManager:
             "temp_count": 0,
         }
 
+        conn = None
         try:
             conn = self._create_hive_connection(task.database_name)
             cursor = conn.cursor()
@@ -436,11 +444,13 @@ class HiveTempTableManager:
                 )
 
             cursor.close()
-            conn.close()
 
         except Exception as e:
             logger.error(f"Failed to validate temp table data: {e}")
             result["valid"] = False
             result["message"] = str(e)
+        finally:
+            if conn is not None:
+                conn.close()
 
         return result
@@ -1,11 +1,13 @@
+import anyio
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
 from app import models as models_module
-from app.api import clusters, dashboard, errors, partition_archiving
+from app.api import clusters, dashboard, errors, jobs, partition_archiving
 from app.api import scan_tasks as scan_tasks_api
 from app.api import (
     storage_admin,
@@ -16,8 +18,9 @@ from app.api import (
     test_tables,
     websocket,
 )
-from app.config.database import Base, engine
+from app.config.database import Base, engine, get_pool_status
 from app.config.settings import settings
+from app.services.job_executor import JobQueueFullError, shutdown_job_executor
 
 # Initialize Sentry
 if settings.SENTRY_DSN and settings.SENTRY_DSN.startswith("http"):
@@ -89,6 +92,61 @@ app.include_router(
     test_tables.router, prefix="/api/v1/test-tables", tags=["test-tables"]
 )
 app.include_router(websocket.router, prefix="/api/v1", tags=["websocket"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@app.exception_handler(JobQueueFullError)
+async def job_queue_full_handler(request: Request, exc: JobQueueFullError):
+    # 后台作业排队已满或服务正在关闭,提示客户端稍后重试
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # 路由处理函数为同步 def,由 FastAPI 放入线程池执行,阻塞的数据库/HDFS
+    # 调用不再占用事件循环;线程池大小决定同时执行的同步请求数
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.API_THREADPOOL_SIZE
+
+
+@app.on_event("startup")
+async def start_websocket_fanout():
+    # 订阅Redis主题频道,使其他进程(Celery/其他API worker)的推送能到达本进程连接
+    from app.services.websocket_service import websocket_manager
+
+    await websocket_manager.start_fanout_listener()
+
+
+@app.on_event("shutdown")
+async def stop_websocket_fanout():
+    from app.services.websocket_service import websocket_manager
+
+    websocket_manager.stop_fanout_listener()
+
+
+@app.on_event("shutdown")
+async def drain_background_jobs():
+    # 停止接收新作业,在超时内等待已排队/运行中的扫描、归档等后台作业完成
+    await anyio.to_thread.run_sync(shutdown_job_executor)
+
+
+@app.on_event("startup")
+async def start_health_probe_daemon():
+    # 后台按自适应间隔探测集群健康状态,状态接口只读共享缓存
+    if not settings.HEALTH_PROBE_ENABLED:
+        return
+    from app.services.health_probe_daemon import get_health_probe_daemon
+
+    get_health_probe_daemon().start()
+
+
+@app.on_event("shutdown")
+async def stop_health_probe_daemon():
+    if not settings.HEALTH_PROBE_ENABLED:
+        return
+    from app.services.health_probe_daemon import get_health_probe_daemon
+
+    await get_health_probe_daemon().stop()
 
 
 @app.get("/")
@@ -105,6 +163,7 @@ async def health():
             "port": settings.SERVER_PORT,
             "environment": settings.SENTRY_ENVIRONMENT,
         },
+        "database_pool": get_pool_status(),
     }
 
 
@@ -1,9 +1,11 @@
 from .cluster import Cluster
 from .cluster_status_history import ClusterStatusHistory
 from .merge_task import MergeTask
+from .metastore_sync_state import MetastoreSyncState
 from .partition_metric import PartitionMetric
 from .scan_task import ScanTask
 from .scan_task_log import ScanTaskLogDB
+from .table_lock import TableLock
 from .table_metric import TableMetric
 from .task_log import TaskLog
 from .test_table_task_log import TestTableTaskLog
@@ -18,4 +20,6 @@ __all__ = [
     "ScanTaskLogDB",
     "ClusterStatusHistory",
     "TestTableTaskLog",
+    "TableLock",
+    "MetastoreSyncState",
 ]
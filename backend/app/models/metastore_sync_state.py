@@ -0,0 +1,43 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from app.config.database import Base
+
+
+class MetastoreSyncState(Base):
+    """冷数据扫描的MetaStore增量同步状态：每个集群/扫描范围一行高水位"""
+
+    __tablename__ = "metastore_sync_states"
+    __table_args__ = (
+        UniqueConstraint(
+            "cluster_id",
+            "scope",
+            "database_name",
+            "table_name",
+            name="uq_metastore_sync_states_scope",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    cluster_id = Column(Integer, ForeignKey("clusters.id"), nullable=False)
+    scope = Column(String(20), nullable=False)  # table, partition
+    # 扫描过滤条件，空字符串表示不过滤
+    database_name = Column(String(100), nullable=False, default="")
+    table_name = Column(String(200), nullable=False, default="")
+
+    # 高水位（MetaStore 秒级时间戳 / TBL_ID、PART_ID）
+    max_access_time = Column(BigInteger, nullable=False, default=0)
+    max_create_time = Column(BigInteger, nullable=False, default=0)
+    max_object_id = Column(BigInteger, nullable=False, default=0)
+
+    # 未变化记录的 days_since_last_access 已累加到的时间点
+    aged_through = Column(DateTime, nullable=True)
+    last_full_sync_at = Column(DateTime, nullable=True)
+    last_sync_at = Column(DateTime, nullable=True)
@@ -0,0 +1,35 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from app.config.database import Base
+
+
+class TableLock(Base):
+    """表级租约锁：每张表最多一行，由唯一约束保证获取的原子性"""
+
+    __tablename__ = "table_locks"
+    __table_args__ = (
+        UniqueConstraint(
+            "cluster_id", "database_name", "table_name", name="uq_table_locks_table"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    cluster_id = Column(Integer, ForeignKey("clusters.id"), nullable=False)
+    database_name = Column(String(100), nullable=False)
+    table_name = Column(String(200), nullable=False)
+
+    # 持有者信息
+    task_id = Column(Integer, nullable=True, index=True)  # 持有锁的合并任务ID
+    holder = Column(String(100), nullable=False)  # e.g., "task_123"
+
+    # 租约时间（UTC）
+    acquired_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
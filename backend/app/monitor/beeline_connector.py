@@ -15,12 +15,12 @@ from app.utils.kerberos_diagnostics import (
     KerberosDiagnostic,
     KerberosDiagnosticCode,
     KerberosDiagnosticError,
-    build_diagnostic,
     log_kerberos_diagnostic,
     map_exception_to_diagnostic,
     raise_diagnostic_error,
 )
-from app.utils.metrics import increment_kerberos_failure, increment_ticket_event
+from app.utils.kerberos_ticket_manager import get_ticket_manager
+from app.utils.metrics import increment_kerberos_failure
 
 if TYPE_CHECKING:  # pragma: no cover
     from app.models.cluster import Cluster
@@ -65,6 +65,7 @@ class BeelineConnector:
         self.kerberos_ticket_cache = kerberos_ticket_cache
         self._last_diagnostic: Optional[KerberosDiagnostic] = None
         self._cached_principal: Optional[str] = None
+        self._ticket_cache: Optional[str] = None
 
     def last_diagnostic(self) -> Optional[KerberosDiagnostic]:
         return self._last_diagnostic
@@ -271,7 +272,7 @@ class BeelineConnector:
                 capture_output=True,
                 text=True,
                 timeout=self.timeout,
-                env=os.environ.copy(),
+                env=self._beeline_env(),
             )
             end_time = time.time()
             result["response_time_ms"] = int((end_time - start_time) * 1000)
@@ -352,49 +353,21 @@ class BeelineConnector:
                 logger=logger,
             )
 
+        # 票据由全局票据管理器维护，连接时只取私有缓存路径，不再每次 kinit
+        try:
+            self._ticket_cache = get_ticket_manager().get_cache(
+                principal, self.kerberos_keytab_path, self.kerberos_ticket_cache
+            )
+        except KerberosDiagnosticError as exc:
+            self._record_diagnostic(exc.diagnostic, extra={"stage": "beeline_kinit"})
+            raise
+
+    def _beeline_env(self) -> Dict[str, str]:
+        """Beeline 子进程环境，Kerberos 票据缓存只传给子进程"""
         env = os.environ.copy()
-        if self.kerberos_ticket_cache:
-            cache_path = os.path.expanduser(self.kerberos_ticket_cache)
-            os.environ["KRB5CCNAME"] = cache_path
-            env["KRB5CCNAME"] = cache_path
-            increment_ticket_event("kerberos_ticket_cache_set")
-
-        if self.kerberos_keytab_path:
-            keytab_path = os.path.expanduser(self.kerberos_keytab_path)
-            if not os.path.exists(keytab_path):
-                raise_diagnostic_error(
-                    KerberosDiagnosticCode.KEYTAB_MISSING,
-                    detail=f"Kerberos keytab 不存在: {keytab_path}",
-                    logger=logger,
-                )
-            try:
-                subprocess.run(
-                    ["kinit", "-k", "-t", keytab_path, principal],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    env=env,
-                )
-                increment_ticket_event("kerberos_kinit_success")
-                increment_ticket_event("kerberos_ticket_renewed")
-            except FileNotFoundError as exc:
-                diagnostic = build_diagnostic(
-                    KerberosDiagnosticCode.KINIT_FAILURE,
-                    detail="未找到 kinit 命令，请确认 Kerberos 客户端已安装",
-                )
-                self._record_diagnostic(diagnostic, extra={"stage": "beeline_kinit"})
-                raise KerberosDiagnosticError(diagnostic, original=exc)
-            except subprocess.CalledProcessError as exc:
-                detail = exc.stderr.strip() if exc.stderr else str(exc)
-                diagnostic = build_diagnostic(
-                    KerberosDiagnosticCode.KINIT_FAILURE,
-                    detail=f"kinit 执行失败: {detail}",
-                )
-                self._record_diagnostic(diagnostic, extra={"stage": "beeline_kinit"})
-                raise KerberosDiagnosticError(diagnostic, original=exc)
-        else:
-            logger.debug("未提供 Kerberos keytab，假定外部票据已准备就绪")
+        if self._ticket_cache:
+            env["KRB5CCNAME"] = self._ticket_cache
+        return env
 
     def _extract_server_version(self, output: str) -> str:
         if not output:
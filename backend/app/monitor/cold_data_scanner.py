@@ -1,15 +1,43 @@
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple, Type
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.models.cluster import Cluster
 from app.models.table_metric import TableMetric
+from app.monitor.metastore_sync import MetastoreSyncTracker
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
+from app.utils.coldness import UNKNOWN_DAYS, age_days, days_since, to_datetime64
 
 logger = logging.getLogger(__name__)
 
+# 冷数据扫描批量写入的分块大小
+BULK_CHUNK_SIZE = 1000
+
+
+def apply_bulk_mappings(
+    db_session: Session,
+    model: Type,
+    updates: List[Dict],
+    inserts: List[Dict],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> None:
+    """
+    分块执行批量更新与插入
+    Args:
+        db_session: 数据库会话
+        model: ORM模型类
+        updates: 带主键 id 的更新映射
+        inserts: 新记录映射
+        chunk_size: 每批语句处理的记录数
+    """
+    for start in range(0, len(updates), chunk_size):
+        db_session.bulk_update_mappings(model, updates[start : start + chunk_size])
+    for start in range(0, len(inserts), chunk_size):
+        db_session.bulk_insert_mappings(model, inserts[start : start + chunk_size])
+
 
 class SimpleColdDataScanner:
     """
@@ -27,13 +55,17 @@ class SimpleColdDataScanner:
         self.cold_days_threshold = cold_days_threshold
 
     def scan_cold_tables(
-        self, db_session: Session, database_name: Optional[str] = None
+        self,
+        db_session: Session,
+        database_name: Optional[str] = None,
+        full_reconcile: bool = False,
     ) -> Dict:
         """
         扫描并标记冷数据表
         Args:
             db_session: 数据库会话
             database_name: 指定数据库名，为空则扫描所有数据库
+            full_reconcile: 强制全量对齐，否则在周期内按高水位增量拉取
         Returns:
             扫描结果字典
         """
@@ -42,11 +74,17 @@ class SimpleColdDataScanner:
         )
 
         try:
-            # 1. 从MetaStore获取访问时间信息
+            current_time = datetime.now()
+            tracker = MetastoreSyncTracker(
+                db_session, self.cluster.id, "table", database_name
+            )
+            since = tracker.begin(current_time, force_full=full_reconcile)
+
+            # 1. 从MetaStore获取访问时间信息（增量时只拉取高水位之后变化的表）
             with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
-                access_info = conn.get_table_access_info(database_name)
+                access_info = conn.get_table_access_info(database_name, since=since)
 
-            if not access_info:
+            if not access_info and tracker.full_sync:
                 logger.warning(f"未获取到数据库 {database_name or 'ALL'} 的表访问信息")
                 return {
                     "total_tables_scanned": 0,
@@ -56,67 +94,114 @@ class SimpleColdDataScanner:
                     "scan_timestamp": datetime.now().isoformat(),
                 }
 
-            cold_tables = []
-            current_time = datetime.now()
-            tables_updated = 0
-
-            # 2. 计算每个表的冷热程度并更新数据库
-            for info in access_info:
-                try:
-                    days_since_access = self._calculate_days_since_access(
-                        info, current_time
-                    )
-                    is_cold = days_since_access > self.cold_days_threshold
-
-                    # 3. 获取或创建表指标记录
-                    table_metric = self._get_or_create_table_metric(
-                        db_session, info["database_name"], info["table_name"]
-                    )
-
-                    # 4. 更新冷数据相关字段
-                    table_metric.last_access_time = info["last_access_time"]
-                    table_metric.days_since_last_access = days_since_access
-                    table_metric.is_cold_data = 1 if is_cold else 0
-
-                    tables_updated += 1
-
-                    if is_cold:
-                        cold_table_info = {
-                            "database_name": info["database_name"],
-                            "table_name": info["table_name"],
-                            "days_since_access": days_since_access,
-                            "last_access_time": (
-                                info["last_access_time"].isoformat()
-                                if info["last_access_time"]
-                                else None
-                            ),
-                            "create_time": (
-                                info["create_time"].isoformat()
-                                if info["create_time"]
-                                else None
-                            ),
-                            "table_metric_id": table_metric.id,
-                        }
-                        cold_tables.append(cold_table_info)
-
-                        logger.debug(
-                            f"标记冷数据表: {info['database_name']}.{info['table_name']} "
-                            f"(距离上次访问: {days_since_access}天)"
-                        )
-
-                except Exception as e:
-                    logger.error(
-                        f"处理表 {info.get('database_name')}.{info.get('table_name')} 时出错: {e}"
-                    )
-                    continue
-
-            # 提交数据库更改
+            # 2. 一次查询载入已有表指标ID,避免逐表 SELECT
+            metric_ids = self._load_table_metric_ids(db_session, database_name)
+
+            updates: List[Dict] = []
+            inserts: Dict[Tuple[str, str], Dict] = {}
+            cold_rows = []
+
+            # 3. 按列批量计算距上次访问天数与冷数据标记
+            days_array = self._calculate_days_since_access(access_info, current_time)
+            cold_flags = days_array > self.cold_days_threshold
+
+            # 4. 生成批量更新/插入映射
+            for info, days_since_access, is_cold in zip(
+                access_info, days_array.astype(int).tolist(), cold_flags.tolist()
+            ):
+                fields = {
+                    "last_access_time": info["last_access_time"],
+                    "days_since_last_access": days_since_access,
+                    "is_cold_data": 1 if is_cold else 0,
+                }
+                key = (info["database_name"], info["table_name"])
+                metric_id = metric_ids.get(key)
+                if metric_id is not None:
+                    mapping = {"id": metric_id, **fields}
+                    updates.append(mapping)
+                elif key in inserts:
+                    mapping = inserts[key]
+                    mapping.update(fields)
+                else:
+                    mapping = {
+                        "cluster_id": self.cluster.id,
+                        "database_name": info["database_name"],
+                        "table_name": info["table_name"],
+                        "total_files": 0,  # 这些值会在后续的表扫描中更新
+                        "small_files": 0,
+                        "total_size": 0,
+                        "avg_file_size": 0.0,
+                        **fields,
+                    }
+                    inserts[key] = mapping
+
+                if is_cold:
+                    cold_rows.append((info, days_since_access, mapping))
+
+            # 5. MetaStore中未变化的表：增量时刷新天数，全量对齐时清除已删除表的冷标记
+            seen_keys = {
+                (info["database_name"], info["table_name"]) for info in access_info
+            }
+            if tracker.full_sync:
+                unchanged_updates = [
+                    {"id": metric_id, "is_cold_data": 0}
+                    for key, metric_id in metric_ids.items()
+                    if key not in seen_keys
+                ]
+                aged_cold_tables = []
+            else:
+                unchanged_updates, aged_cold_tables = self._age_unchanged_tables(
+                    db_session,
+                    metric_ids,
+                    seen_keys,
+                    current_time,
+                    tracker.elapsed_days(current_time),
+                    database_name,
+                )
+            updates.extend(unchanged_updates)
+
+            # 6. 分块批量写入
+            apply_bulk_mappings(
+                db_session, TableMetric, updates, list(inserts.values())
+            )
+            tables_updated = len(updates) + len(inserts)
+            if inserts:
+                # 批量插入不回填主键,重新载入一次以获得新记录ID
+                metric_ids = self._load_table_metric_ids(db_session, database_name)
+                for key, mapping in inserts.items():
+                    mapping["id"] = metric_ids.get(key)
+
+            cold_tables = [
+                {
+                    "database_name": info["database_name"],
+                    "table_name": info["table_name"],
+                    "days_since_access": days_since_access,
+                    "last_access_time": (
+                        info["last_access_time"].isoformat()
+                        if info["last_access_time"]
+                        else None
+                    ),
+                    "create_time": (
+                        info["create_time"].isoformat() if info["create_time"] else None
+                    ),
+                    "table_metric_id": mapping.get("id"),
+                }
+                for info, days_since_access, mapping in cold_rows
+            ]
+            cold_tables.extend(aged_cold_tables)
+
+            # 提交数据库更改（同时推进同步高水位）
+            tracker.finish(access_info, current_time)
             db_session.commit()
 
             result = {
+                "scan_mode": "full" if tracker.full_sync else "incremental",
                 "total_tables_scanned": len(access_info),
                 "cold_tables_found": len(cold_tables),
                 "tables_updated": tables_updated,
+                "tables_missing_in_metastore": (
+                    len(unchanged_updates) if tracker.full_sync else 0
+                ),
                 "cold_tables": cold_tables,
                 "threshold_days": self.cold_days_threshold,
                 "scan_timestamp": datetime.now().isoformat(),
@@ -135,68 +220,126 @@ class SimpleColdDataScanner:
             db_session.rollback()
             raise
 
-    def _calculate_days_since_access(self, info: Dict, current_time: datetime) -> int:
+    def _calculate_days_since_access(
+        self, access_info: List[Dict], current_time: datetime
+    ) -> np.ndarray:
         """
-        计算距离最后访问的天数
+        批量计算距离最后访问的天数
         Args:
-            info: 表访问信息字典
+            access_info: 表访问信息字典列表
             current_time: 当前时间
         Returns:
-            距离最后访问的天数
+            天数数组；没有访问时间时用创建时间作为fallback，都没有则标记为很久
         """
-        last_access = info["last_access_time"]
-
-        if not last_access:
-            # 如果没有访问时间，用创建时间作为fallback
-            create_time = info["create_time"]
-            if create_time:
-                return (current_time - create_time).days
-            else:
-                logger.warning(
-                    f"表 {info['database_name']}.{info['table_name']} 缺少访问时间和创建时间"
+        days = days_since(
+            current_time,
+            to_datetime64([info["last_access_time"] for info in access_info]),
+            to_datetime64([info["create_time"] for info in access_info]),
+        )
+        missing = np.isnan(days)
+        if missing.any():
+            logger.warning(f"{int(missing.sum())} 个表缺少访问时间和创建时间")
+            days[missing] = UNKNOWN_DAYS
+        return days
+
+    def _age_unchanged_tables(
+        self,
+        db_session: Session,
+        metric_ids: Dict[Tuple[str, str], int],
+        changed_keys: Set[Tuple[str, str]],
+        current_time: datetime,
+        elapsed_days: int,
+        database_name: Optional[str] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        增量扫描时刷新MetaStore中未变化的表的距今天数与冷数据标记
+        Args:
+            metric_ids: 扫描器维护的表指标ID
+            changed_keys: 本次从MetaStore拉取到的表
+            elapsed_days: 自上次对齐以来经过的整天数
+        Returns:
+            (需要更新的映射, 冷数据表结果列表)
+        """
+        tracked_ids = {
+            metric_id
+            for key, metric_id in metric_ids.items()
+            if key not in changed_keys
+        }
+        query = db_session.query(
+            TableMetric.id,
+            TableMetric.database_name,
+            TableMetric.table_name,
+            TableMetric.last_access_time,
+            TableMetric.days_since_last_access,
+            TableMetric.is_cold_data,
+        ).filter(TableMetric.cluster_id == self.cluster.id)
+        if database_name:
+            query = query.filter(TableMetric.database_name == database_name)
+        rows = [row for row in query if row[0] in tracked_ids]
+        if not rows:
+            return [], []
+
+        columns = list(zip(*rows))
+        previous = np.array(
+            [np.nan if days is None else days for days in columns[4]], dtype=np.float64
+        )
+        days = age_days(to_datetime64(columns[3]), previous, current_time, elapsed_days)
+        known = ~np.isnan(days)
+        cold = days > self.cold_days_threshold
+        was_cold = np.array([flag == 1 for flag in columns[5]], dtype=bool)
+        changed = known & ((days != previous) | (cold != was_cold))
+
+        updates = []
+        cold_tables = []
+        for row, days_since_access, is_cold, is_known, is_changed in zip(
+            rows,
+            np.nan_to_num(days).astype(int).tolist(),
+            cold.tolist(),
+            known.tolist(),
+            changed.tolist(),
+        ):
+            if is_changed:
+                updates.append(
+                    {
+                        "id": row[0],
+                        "days_since_last_access": days_since_access,
+                        "is_cold_data": 1 if is_cold else 0,
+                    }
                 )
-                return 999  # 无任何时间信息，标记为很久
-
-        return (current_time - last_access).days
+            if is_known and is_cold:
+                cold_tables.append(
+                    {
+                        "database_name": row[1],
+                        "table_name": row[2],
+                        "days_since_access": days_since_access,
+                        "last_access_time": row[3].isoformat() if row[3] else None,
+                        "create_time": None,
+                        "table_metric_id": row[0],
+                    }
+                )
+        return updates, cold_tables
 
-    def _get_or_create_table_metric(
-        self, db_session: Session, database_name: str, table_name: str
-    ) -> TableMetric:
+    def _load_table_metric_ids(
+        self, db_session: Session, database_name: Optional[str] = None
+    ) -> Dict[Tuple[str, str], int]:
         """
-        获取或创建表指标记录
+        一次查询载入集群已有表指标记录
         Args:
             db_session: 数据库会话
-            database_name: 数据库名
-            table_name: 表名
+            database_name: 指定数据库名，为空则载入所有数据库
         Returns:
-            表指标对象
+            (数据库名, 表名) -> 表指标ID，同名多条记录时取最早的一条
         """
-        # 查找现有记录
-        metric = (
-            db_session.query(TableMetric)
-            .filter(
-                TableMetric.cluster_id == self.cluster.id,
-                TableMetric.database_name == database_name,
-                TableMetric.table_name == table_name,
-            )
-            .first()
-        )
-
-        if not metric:
-            # 创建新记录
-            metric = TableMetric(
-                cluster_id=self.cluster.id,
-                database_name=database_name,
-                table_name=table_name,
-                total_files=0,  # 这些值会在后续的表扫描中更新
-                small_files=0,
-                total_size=0,
-                avg_file_size=0.0,
-            )
-            db_session.add(metric)
-            db_session.flush()  # 获取ID
-
-        return metric
+        query = db_session.query(
+            TableMetric.id, TableMetric.database_name, TableMetric.table_name
+        ).filter(TableMetric.cluster_id == self.cluster.id)
+        if database_name:
+            query = query.filter(TableMetric.database_name == database_name)
+
+        metric_ids: Dict[Tuple[str, str], int] = {}
+        for metric_id, db_name, tbl_name in query.order_by(TableMetric.id):
+            metric_ids.setdefault((db_name, tbl_name), metric_id)
+        return metric_ids
 
     def get_cold_data_summary(self, db_session: Session) -> Dict:
         """
@@ -0,0 +1,277 @@
+import logging
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.config.settings import settings
+from app.models.cluster import Cluster
+from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
+from app.utils.encryption import decrypt_cluster_password
+from app.utils.hive_connection_pool import get_hive_connection_pool
+
+logger = logging.getLogger(__name__)
+
+
+def qualify_location(path: str, reference: Optional[str]) -> str:
+    """为裸路径补齐参考位置的 scheme 与 authority（如 hdfs://nameservice）"""
+    if not path or urlparse(path).scheme or not reference:
+        return path
+    parsed = urlparse(reference)
+    if not parsed.scheme:
+        return path
+    return f"{parsed.scheme}://{parsed.netloc}{path}"
+
+
+def normalize_location(location: Optional[str]) -> str:
+    """去掉 scheme/authority 与末尾斜杠，用于位置比较"""
+    if not location:
+        return ""
+    return (urlparse(location).path or location).rstrip("/")
+
+
+def partition_spec_from_name(partition_name: str) -> str:
+    """
+    MetaStore 分区名转换为 PARTITION 子句
+    Examples:
+        dt=2024-01-01/hour=01 -> `dt`='2024-01-01', `hour`='01'
+    """
+    parts = []
+    for item in partition_name.split("/"):
+        key, _, value = item.partition("=")
+        value = unquote(value).replace("\\", "\\\\").replace("'", "\\'")
+        parts.append(f"`{unquote(key)}`='{value}'")
+    return ", ".join(parts)
+
+
+def _quote_location(location: str) -> str:
+    return location.replace("\\", "\\\\").replace("'", "\\'")
+
+
+class HiveMetadataRelocator:
+    """
+    归档/恢复移动数据后批量更新Hive元数据中的位置
+    - hs2: 在一个 HiveServer2 会话内按表分组执行 ALTER TABLE ... SET LOCATION
+    - metastore: 直接在 MetaStore 库中按表单事务批量更新 SDS.LOCATION
+    - off: 不更新元数据
+    更新后从 MetaStore 回读位置进行校验
+    """
+
+    MODES = ("off", "hs2", "metastore")
+
+    def __init__(self, cluster: Cluster, mode: Optional[str] = None):
+        """
+        Args:
+            cluster: 集群对象
+            mode: 重定位方式，为空则使用 ARCHIVE_METADATA_RELOCATION 配置
+        """
+        self.cluster = cluster
+        self.mode = (mode or settings.ARCHIVE_METADATA_RELOCATION or "off").lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"不支持的元数据重定位方式: {self.mode}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def relocate_partitions(
+        self, relocations: List[Dict]
+    ) -> Dict[Tuple[str, str, str], Optional[str]]:
+        """
+        批量更新分区位置并校验
+        Args:
+            relocations: 每项包含 database_name, table_name, partition_name, location
+        Returns:
+            (数据库名, 表名, 分区名) -> 错误信息，成功为None
+        """
+        grouped: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for item in relocations:
+            grouped.setdefault((item["database_name"], item["table_name"]), {})[
+                item["partition_name"]
+            ] = item["location"]
+        errors: Dict[Tuple[str, str, str], Optional[str]] = {
+            (*table_key, partition_name): None
+            for table_key, locations in grouped.items()
+            for partition_name in locations
+        }
+        if not self.enabled or not grouped:
+            return errors
+
+        if self.mode == "hs2":
+            self._alter_partitions_hs2(grouped, errors)
+        else:
+            self._update_partitions_metastore(grouped, errors)
+        self._verify_partitions(grouped, errors)
+
+        failed = sum(1 for error in errors.values() if error)
+        logger.info(
+            f"分区元数据重定位完成({self.mode}): {len(errors) - failed} 成功, {failed} 失败"
+        )
+        return errors
+
+    def relocate_table(
+        self,
+        database_name: str,
+        table_name: str,
+        old_location: str,
+        new_location: str,
+    ) -> Dict:
+        """
+        表目录整体移动后，更新表位置及位于原目录下的所有分区位置并校验
+        Returns:
+            {"relocated": 是否成功, "partitions_relocated": 分区数, "errors": 错误列表}
+        """
+        result = {"relocated": False, "partitions_relocated": 0, "errors": []}
+        if not self.enabled:
+            return result
+
+        old_prefix = old_location.rstrip("/") + "/"
+        new_prefix = new_location.rstrip("/") + "/"
+        partitions: Dict[str, str] = {}
+        try:
+            with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
+                partitions = {
+                    p["partition_name"]: new_prefix
+                    + p["partition_path"][len(old_prefix) :]
+                    for p in conn.get_table_partitions(database_name, table_name)
+                    if (p.get("partition_path") or "").startswith(old_prefix)
+                }
+                if self.mode == "metastore":
+                    conn.update_table_location(
+                        database_name, table_name, old_location, new_location
+                    )
+
+            if self.mode == "hs2":
+                statements = [
+                    f"ALTER TABLE `{database_name}`.`{table_name}` "
+                    f"SET LOCATION '{_quote_location(new_location)}'"
+                ] + [
+                    f"ALTER TABLE `{database_name}`.`{table_name}` "
+                    f"PARTITION ({partition_spec_from_name(name)}) "
+                    f"SET LOCATION '{_quote_location(location)}'"
+                    for name, location in partitions.items()
+                ]
+                with closing(self._create_hive_connection()) as hive_conn:
+                    cursor = hive_conn.cursor()
+                    for statement in statements:
+                        cursor.execute(statement)
+
+            # 校验
+            with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
+                actual = conn.get_table_location(database_name, table_name)
+                if normalize_location(actual) != normalize_location(new_location):
+                    result["errors"].append(
+                        f"表位置校验失败: 期望 {new_location}, 实际 {actual}"
+                    )
+                if partitions:
+                    current = {
+                        p["partition_name"]: p.get("partition_path")
+                        for p in conn.get_table_partitions(database_name, table_name)
+                    }
+                    for name, location in partitions.items():
+                        if normalize_location(current.get(name)) != normalize_location(
+                            location
+                        ):
+                            result["errors"].append(
+                                f"分区 {name} 位置校验失败: 期望 {location}, "
+                                f"实际 {current.get(name)}"
+                            )
+        except Exception as e:
+            logger.error(f"表 {database_name}.{table_name} 元数据重定位失败: {e}")
+            result["errors"].append(str(e))
+
+        result["relocated"] = not result["errors"]
+        result["partitions_relocated"] = len(partitions) if result["relocated"] else 0
+        return result
+
+    def _create_hive_connection(self):
+        """创建Hive连接（支持LDAP认证）"""
+        from pyhive import hive
+
+        hive_conn_params = {
+            "host": self.cluster.hive_host,
+            "port": self.cluster.hive_port,
+            "database": self.cluster.hive_database or "default",
+        }
+        if self.cluster.auth_type == "LDAP" and self.cluster.hive_username:
+            hive_conn_params["username"] = self.cluster.hive_username
+            if self.cluster.hive_password:
+                hive_conn_params["password"] = decrypt_cluster_password(self.cluster)
+            hive_conn_params["auth"] = "LDAP"
+        return get_hive_connection_pool().connect(hive.Connection, **hive_conn_params)
+
+    def _alter_partitions_hs2(
+        self,
+        grouped: Dict[Tuple[str, str], Dict[str, str]],
+        errors: Dict[Tuple[str, str, str], Optional[str]],
+    ) -> None:
+        """一个 HiveServer2 会话内按表分组执行 ALTER TABLE ... PARTITION ... SET LOCATION"""
+        try:
+            hive_conn = self._create_hive_connection()
+        except Exception as e:
+            for key in errors:
+                errors[key] = f"HiveServer2 连接失败: {e}"
+            return
+
+        with closing(hive_conn):
+            cursor = hive_conn.cursor()
+            for (database_name, table_name), locations in grouped.items():
+                for partition_name, location in locations.items():
+                    try:
+                        cursor.execute(
+                            f"ALTER TABLE `{database_name}`.`{table_name}` "
+                            f"PARTITION ({partition_spec_from_name(partition_name)}) "
+                            f"SET LOCATION '{_quote_location(location)}'"
+                        )
+                    except Exception as e:
+                        errors[(database_name, table_name, partition_name)] = (
+                            f"ALTER TABLE SET LOCATION 失败: {e}"
+                        )
+
+    def _update_partitions_metastore(
+        self,
+        grouped: Dict[Tuple[str, str], Dict[str, str]],
+        errors: Dict[Tuple[str, str, str], Optional[str]],
+    ) -> None:
+        """按表在 MetaStore 中单事务批量更新分区位置"""
+        try:
+            with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
+                for (database_name, table_name), locations in grouped.items():
+                    try:
+                        conn.update_partition_locations(
+                            database_name, table_name, locations
+                        )
+                    except Exception as e:
+                        for partition_name in locations:
+                            errors[(database_name, table_name, partition_name)] = (
+                                f"MetaStore 更新失败: {e}"
+                            )
+        except Exception as e:
+            for key in errors:
+                errors[key] = f"MetaStore 连接失败: {e}"
+
+    def _verify_partitions(
+        self,
+        grouped: Dict[Tuple[str, str], Dict[str, str]],
+        errors: Dict[Tuple[str, str, str], Optional[str]],
+    ) -> None:
+        """每张表一次查询回读分区位置，与期望位置不一致的记为失败"""
+        try:
+            with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
+                for (database_name, table_name), locations in grouped.items():
+                    current = {
+                        p["partition_name"]: p.get("partition_path")
+                        for p in conn.get_table_partitions(database_name, table_name)
+                    }
+                    for partition_name, location in locations.items():
+                        key = (database_name, table_name, partition_name)
+                        actual = current.get(partition_name)
+                        if errors[key] is None and normalize_location(
+                            actual
+                        ) != normalize_location(location):
+                            errors[key] = (
+                                f"元数据校验失败: 期望 {location}, 实际 {actual}"
+                            )
+        except Exception as e:
+            for key, error in errors.items():
+                if error is None:
+                    errors[key] = f"元数据校验失败: {e}"
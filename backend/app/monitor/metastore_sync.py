@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.models.metastore_sync_state import MetastoreSyncState
+
+logger = logging.getLogger(__name__)
+
+
+class MetastoreSyncTracker:
+    """
+    冷数据扫描的MetaStore增量同步状态
+    记录每个集群/扫描范围已同步到的高水位（最大访问时间、创建时间、对象ID），
+    后续扫描只拉取之后变化的行；按 COLD_SCAN_FULL_RECONCILE_HOURS 周期全量对齐，
+    刷新分区大小并识别已删除的对象
+    """
+
+    def __init__(
+        self,
+        db_session: Session,
+        cluster_id: int,
+        scope: str,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+    ):
+        """
+        Args:
+            db_session: 数据库会话
+            cluster_id: 集群ID
+            scope: 扫描范围类型，table 或 partition
+            database_name: 扫描的数据库过滤条件
+            table_name: 扫描的表过滤条件
+        """
+        self.db_session = db_session
+        key = {
+            "cluster_id": cluster_id,
+            "scope": scope,
+            "database_name": database_name or "",
+            "table_name": table_name or "",
+        }
+        self.state = db_session.query(MetastoreSyncState).filter_by(**key).first()
+        if self.state is None:
+            self.state = MetastoreSyncState(
+                **key, max_access_time=0, max_create_time=0, max_object_id=0
+            )
+        self.full_sync = True
+
+    def begin(
+        self, current_time: datetime, force_full: bool = False
+    ) -> Optional[Dict[str, int]]:
+        """
+        决定本次扫描模式
+        Returns:
+            增量扫描时返回高水位，全量对齐时返回None
+        """
+        state = self.state
+        reconcile_due = state.last_full_sync_at is None or (
+            current_time - state.last_full_sync_at
+            >= timedelta(hours=settings.COLD_SCAN_FULL_RECONCILE_HOURS)
+        )
+        self.full_sync = (
+            force_full
+            or reconcile_due
+            or state.aged_through is None
+            or not settings.COLD_SCAN_INCREMENTAL_ENABLED
+        )
+        if self.full_sync:
+            return None
+        return {
+            "max_access_time": state.max_access_time,
+            "max_create_time": state.max_create_time,
+            "max_object_id": state.max_object_id,
+        }
+
+    def elapsed_days(self, current_time: datetime) -> int:
+        """自上次天数对齐以来经过的整天数，并把对齐时间推进相应天数"""
+        aged_through = self.state.aged_through
+        if aged_through is None:
+            return 0
+        elapsed = max((current_time - aged_through).days, 0)
+        self.state.aged_through = aged_through + timedelta(days=elapsed)
+        return elapsed
+
+    def finish(self, access_info: List[Dict], current_time: datetime) -> None:
+        """
+        根据本次拉取的行推进高水位，由调用方随扫描结果一起提交
+        Args:
+            access_info: MetaStore访问信息（含 last_access_time/create_time/metastore_id）
+            current_time: 本次扫描时间
+        """
+        state = self.state
+        if self.full_sync:
+            # 全量对齐重新确定高水位
+            state.max_access_time = 0
+            state.max_create_time = 0
+            state.max_object_id = 0
+            state.aged_through = current_time
+            state.last_full_sync_at = current_time
+
+        for info in access_info:
+            last_access = info.get("last_access_time")
+            if last_access is not None:
+                state.max_access_time = max(
+                    state.max_access_time, int(last_access.timestamp())
+                )
+            create_time = info.get("create_time")
+            if create_time is not None:
+                state.max_create_time = max(
+                    state.max_create_time, int(create_time.timestamp())
+                )
+            object_id = info.get("metastore_id")
+            if object_id is not None:
+                state.max_object_id = max(state.max_object_id, int(object_id))
+
+        state.last_sync_at = current_time
+        self.db_session.add(state)
+        logger.info(
+            f"MetaStore同步高水位({state.scope}): access={state.max_access_time}, "
+            f"create={state.max_create_time}, id={state.max_object_id}, "
+            f"{'全量' if self.full_sync else '增量'}"
+        )
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import pymysql
 
@@ -393,14 +393,62 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
 
         return "OTHER"
 
+    def _access_info_conditions(
+        self,
+        database_name: Optional[str],
+        table_name: Optional[str],
+        since: Optional[Dict[str, int]],
+        alias: str,
+        id_column: str,
+    ) -> Tuple[List[str], List]:
+        """
+        构建访问信息查询的过滤条件
+        Args:
+            since: 增量高水位 {"max_access_time", "max_create_time", "max_object_id"}，
+                为空则不过滤；时间为MetaStore秒级时间戳
+            alias: 访问时间所在表的别名（t/p）
+            id_column: 对象ID列（TBL_ID/PART_ID）
+        """
+        conditions = []
+        params: List = []
+
+        if database_name:
+            conditions.append("d.NAME = %s")
+            params.append(database_name)
+
+        if table_name:
+            conditions.append("t.TBL_NAME = %s")
+            params.append(table_name)
+
+        if since:
+            # 时间为秒级精度，用 >= 避免遗漏同一秒内的后续变更（重复行按主键幂等更新）；
+            # 新建对象由 CREATE_TIME/自增ID 捕获，0 表示未记录访问时间，不参与比较
+            conditions.append(
+                f"({alias}.LAST_ACCESS_TIME >= %s OR {alias}.CREATE_TIME >= %s"
+                f" OR {alias}.{id_column} > %s)"
+            )
+            params.extend(
+                [
+                    max(int(since.get("max_access_time") or 0), 1),
+                    max(int(since.get("max_create_time") or 0), 1),
+                    int(since.get("max_object_id") or 0),
+                ]
+            )
+
+        return conditions, params
+
     def get_table_access_info(
-        self, database_name: Optional[str] = None, table_name: Optional[str] = None
+        self,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+        since: Optional[Dict[str, int]] = None,
     ) -> List[Dict]:
         """
         获取表的访问时间信息
         Args:
             database_name: 数据库名称，为空则获取所有数据库
             table_name: 表名称，为空则获取指定数据库的所有表
+            since: 增量高水位，只返回此后被访问、新建的表；为空则全量
         Returns:
             包含访问时间信息的字典列表
         """
@@ -411,6 +459,7 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
             with self._connection.cursor() as cursor:
                 base_query = """
                 SELECT
+                    t.TBL_ID,
                     d.NAME as database_name,
                     t.TBL_NAME as table_name,
                     t.LAST_ACCESS_TIME,
@@ -419,16 +468,9 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
                 JOIN DBS d ON t.DB_ID = d.DB_ID
                 """
 
-                conditions = []
-                params = []
-
-                if database_name:
-                    conditions.append("d.NAME = %s")
-                    params.append(database_name)
-
-                if table_name:
-                    conditions.append("t.TBL_NAME = %s")
-                    params.append(table_name)
+                conditions, params = self._access_info_conditions(
+                    database_name, table_name, since, "t", "TBL_ID"
+                )
 
                 if conditions:
                     base_query += " WHERE " + " AND ".join(conditions)
@@ -438,6 +480,7 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
 
                 return [
                     {
+                        "metastore_id": row["TBL_ID"],
                         "database_name": row["database_name"],
                         "table_name": row["table_name"],
                         "last_access_time": self._timestamp_to_datetime(
@@ -485,6 +528,97 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
             )
             return None
 
+    def update_partition_locations(
+        self, database_name: str, table_name: str, locations: Dict[str, str]
+    ) -> int:
+        """
+        直接在MetaStore中批量更新分区 LOCATION（单事务）
+        Args:
+            database_name: 数据库名称
+            table_name: 表名称
+            locations: 分区名 -> 新位置
+        Returns:
+            更新的行数
+        """
+        if not self._connection:
+            raise ConnectionError("Not connected to MetaStore")
+        if not locations:
+            return 0
+
+        query = """
+        UPDATE SDS s
+        JOIN PARTITIONS p ON p.SD_ID = s.SD_ID
+        JOIN TBLS t ON p.TBL_ID = t.TBL_ID
+        JOIN DBS d ON t.DB_ID = d.DB_ID
+        SET s.LOCATION = %s
+        WHERE d.NAME = %s AND t.TBL_NAME = %s AND p.PART_NAME = %s
+        """
+        try:
+            with self._connection.cursor() as cursor:
+                updated = cursor.executemany(
+                    query,
+                    [
+                        (location, database_name, table_name, partition_name)
+                        for partition_name, location in locations.items()
+                    ],
+                )
+            self._connection.commit()
+            return updated or 0
+        except Exception:
+            self._connection.rollback()
+            raise
+
+    def update_table_location(
+        self, database_name: str, table_name: str, old_location: str, new_location: str
+    ) -> int:
+        """
+        直接在MetaStore中更新表 LOCATION，并把位于旧目录下的分区 LOCATION
+        前缀替换为新目录（单事务）
+        Returns:
+            更新的分区行数
+        """
+        if not self._connection:
+            raise ConnectionError("Not connected to MetaStore")
+
+        old_prefix = old_location.rstrip("/") + "/"
+        new_prefix = new_location.rstrip("/") + "/"
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE SDS s
+                    JOIN TBLS t ON t.SD_ID = s.SD_ID
+                    JOIN DBS d ON t.DB_ID = d.DB_ID
+                    SET s.LOCATION = %s
+                    WHERE d.NAME = %s AND t.TBL_NAME = %s
+                    """,
+                    (new_location, database_name, table_name),
+                )
+                updated = cursor.execute(
+                    """
+                    UPDATE SDS s
+                    JOIN PARTITIONS p ON p.SD_ID = s.SD_ID
+                    JOIN TBLS t ON p.TBL_ID = t.TBL_ID
+                    JOIN DBS d ON t.DB_ID = d.DB_ID
+                    SET s.LOCATION = CONCAT(%s, SUBSTRING(s.LOCATION, %s))
+                    WHERE d.NAME = %s AND t.TBL_NAME = %s
+                      AND SUBSTRING(s.LOCATION, 1, %s) = %s
+                    """,
+                    (
+                        new_prefix,
+                        len(old_prefix) + 1,
+                        database_name,
+                        table_name,
+                        len(old_prefix),
+                        old_prefix,
+                    ),
+                )
+            self._connection.commit()
+            return updated or 0
+        except Exception:
+            self._connection.rollback()
+            raise
+
     def _timestamp_to_datetime(self, timestamp) -> Optional[datetime]:
         """
         将时间戳转换为datetime对象
@@ -502,13 +636,17 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
         return None
 
     def get_partition_access_info(
-        self, database_name: Optional[str] = None, table_name: Optional[str] = None
+        self,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+        since: Optional[Dict[str, int]] = None,
     ) -> List[Dict]:
         """
         获取分区的访问时间信息
         Args:
             database_name: 数据库名称，为空则获取所有数据库
             table_name: 表名称，为空则获取指定数据库的所有表
+            since: 增量高水位，只返回此后被访问、新建的分区；为空则全量
         Returns:
             包含分区访问时间信息的字典列表
         """
@@ -520,6 +658,7 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
                 # 查询分区信息，包括分区访问时间和大小信息
                 base_query = """
                 SELECT DISTINCT
+                    p.PART_ID,
                     d.NAME as database_name,
                     t.TBL_NAME as table_name,
                     p.PART_NAME as partition_name,
@@ -534,16 +673,9 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
                 LEFT JOIN PARTITION_PARAMS ps ON p.PART_ID = ps.PART_ID AND ps.PARAM_KEY = 'totalSize'
                 """
 
-                conditions = []
-                params = []
-
-                if database_name:
-                    conditions.append("d.NAME = %s")
-                    params.append(database_name)
-
-                if table_name:
-                    conditions.append("t.TBL_NAME = %s")
-                    params.append(table_name)
+                conditions, params = self._access_info_conditions(
+                    database_name, table_name, since, "p", "PART_ID"
+                )
 
                 if conditions:
                     base_query += " WHERE " + " AND ".join(conditions)
@@ -561,6 +693,7 @@ class MySQLHiveMetastoreConnector(BaseMetastoreConnector):
                         partition_size = 0
 
                     partition_info = {
+                        "metastore_id": row["PART_ID"],
                         "database_name": row["database_name"],
                         "table_name": row["table_name"],
                         "partition_name": row["partition_name"],
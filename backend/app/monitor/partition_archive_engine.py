@@ -1,16 +1,32 @@
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.models.partition_metric import PartitionMetric
 from app.models.table_metric import TableMetric
+from app.monitor.hive_metadata_relocator import (
+    HiveMetadataRelocator,
+    qualify_location,
+)
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
-from app.utils.webhdfs_client import WebHDFSClient
+from app.utils.lease_service import (
+    Lease,
+    default_owner,
+    get_lease_service,
+    partition_resource,
+    table_resource,
+)
+from app.utils.archive_report import build_move_report
+from app.utils.rate_limiter import RateLimiter
+from app.utils.webhdfs_client import WebHDFSClient, WebHDFSClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +37,9 @@ class PartitionArchiveEngine:
     提供比表级别更精细的归档控制，支持选择性分区归档
     """
 
+    # 同一分区被其他归档/恢复占用时的最长等待时间（秒）
+    LOCK_WAIT_SECONDS = 30
+
     def __init__(self, cluster: Cluster, archive_root_path: str = "/archive"):
         """
         初始化分区归档引擎
@@ -30,6 +49,62 @@ class PartitionArchiveEngine:
         """
         self.cluster = cluster
         self.archive_root_path = archive_root_path.rstrip("/")
+        # 表级 + 分区级租约：表级租约与合并、表归档互斥，分区级租约互斥同一分区的归档/恢复
+        self.lease_service = get_lease_service()
+        # 移动数据后同步更新Hive元数据中的分区位置（ARCHIVE_METADATA_RELOCATION）
+        self.relocator = HiveMetadataRelocator(cluster)
+
+    def _acquire_table_lock(self, database_name: str, table_name: str) -> Lease:
+        """
+        获取表级租约：合并与表归档持有同一资源，避免分区数据移动期间
+        合并删除/替换该表的分区，或表归档移动整个表目录
+        """
+        return self.lease_service.acquire_or_raise(
+            table_resource(self.cluster.id, database_name, table_name),
+            owner=default_owner(f"partition-archive:{database_name}.{table_name}"),
+            wait_timeout=self.LOCK_WAIT_SECONDS,
+        )
+
+    def _acquire_partition_lock(
+        self, database_name: str, table_name: str, partition_name: str
+    ) -> Lease:
+        return self.lease_service.acquire_or_raise(
+            partition_resource(
+                self.cluster.id, database_name, table_name, partition_name
+            ),
+            owner=default_owner(
+                f"partition-archive:{database_name}.{table_name}.{partition_name}"
+            ),
+            wait_timeout=self.LOCK_WAIT_SECONDS,
+        )
+
+    def _acquire_lock(
+        self, database_name: str, table_name: str, partition_name: str
+    ) -> List[Lease]:
+        """依次获取表级、分区级租约；任一失败时释放已获取的租约"""
+        table_lease = self._acquire_table_lock(database_name, table_name)
+        try:
+            partition_lease = self._acquire_partition_lock(
+                database_name, table_name, partition_name
+            )
+        except Exception:
+            self._release_lock(table_lease)
+            raise
+        return [table_lease, partition_lease]
+
+    def _ensure_locks_valid(self, leases: List[Lease]) -> None:
+        for lease in leases:
+            self.lease_service.ensure_valid(lease)
+
+    def _release_lock(self, lease: Lease) -> None:
+        try:
+            self.lease_service.release(lease)
+        except Exception as e:
+            logger.warning(f"释放分区租约失败: {lease.resource}: {e}")
+
+    def _release_locks(self, leases: List[Lease]) -> None:
+        for lease in reversed(leases):
+            self._release_lock(lease)
 
     def archive_partition(
         self,
@@ -52,6 +127,7 @@ class PartitionArchiveEngine:
         """
         logger.info(f"开始归档分区: {database_name}.{table_name}.{partition_name}")
 
+        locks = self._acquire_lock(database_name, table_name, partition_name)
         try:
             # 1. 获取分区指标记录
             partition_metric = self._get_partition_metric(
@@ -84,9 +160,18 @@ class PartitionArchiveEngine:
             )
 
             # 5. 执行数据文件移动
-            moved_files = self._move_partition_data(partition_location, archive_path)
+            move_report = self._move_partition_data(partition_location, archive_path)
+
+            # 6. 更新Hive元数据中的分区位置
+            metadata_error = self._relocate_partition(
+                database_name,
+                table_name,
+                partition_name,
+                qualify_location(archive_path, partition_location),
+            )
 
-            # 6. 更新分区元数据
+            # 7. 更新分区元数据（提交前确认租约未被接管）
+            self._ensure_locks_valid(locks)
             partition_metric.archive_status = "archived"
             partition_metric.archive_location = archive_path
             partition_metric.archived_at = datetime.now()
@@ -98,15 +183,19 @@ class PartitionArchiveEngine:
                 "partition_full_name": f"{database_name}.{table_name}.{partition_name}",
                 "original_location": partition_location,
                 "archive_location": archive_path,
-                "files_moved": len(moved_files),
-                "moved_files": moved_files,
+                "files_moved": move_report["file_count"],
+                "bytes_moved": move_report["total_bytes"],
+                "moved_files": move_report["files"],
+                "manifest_path": move_report["manifest_path"],
+                "metadata_relocated": self.relocator.enabled and not metadata_error,
+                "metadata_error": metadata_error,
                 "archived_at": datetime.now().isoformat(),
                 "cluster_id": self.cluster.id,
                 "cluster_name": self.cluster.name,
             }
 
             logger.info(
-                f"分区 {database_name}.{table_name}.{partition_name} 归档成功，移动了 {len(moved_files)} 个文件"
+                f"分区 {database_name}.{table_name}.{partition_name} 归档成功，移动了 {move_report['file_count']} 个文件"
             )
             return result
 
@@ -116,6 +205,8 @@ class PartitionArchiveEngine:
             )
             db_session.rollback()
             raise
+        finally:
+            self._release_locks(locks)
 
     def restore_partition(
         self,
@@ -136,6 +227,7 @@ class PartitionArchiveEngine:
         """
         logger.info(f"开始恢复分区: {database_name}.{table_name}.{partition_name}")
 
+        locks = self._acquire_lock(database_name, table_name, partition_name)
         try:
             # 1. 获取分区指标记录
             partition_metric = self._get_partition_metric(
@@ -155,19 +247,29 @@ class PartitionArchiveEngine:
             if not partition_metric.archive_location:
                 raise ValueError(f"分区缺少归档位置信息")
 
-            # 3. 获取原始分区位置
+            # 3. 获取原始分区位置（元数据已重定位时，MetaStore中为归档位置）
             original_location = self._get_partition_location(
                 database_name, table_name, partition_name
             )
+            if self.relocator.enabled and partition_metric.partition_path:
+                original_location = qualify_location(
+                    partition_metric.partition_path, original_location
+                )
             if not original_location:
                 raise ValueError(f"无法获取分区原始存储位置")
 
             # 4. 执行数据文件恢复
-            restored_files = self._restore_partition_data(
+            restore_report = self._restore_partition_data(
                 partition_metric.archive_location, original_location
             )
 
-            # 5. 更新分区元数据
+            # 5. 将Hive元数据中的分区位置改回原始位置
+            metadata_error = self._relocate_partition(
+                database_name, table_name, partition_name, original_location
+            )
+
+            # 6. 更新分区元数据（提交前确认租约未被接管）
+            self._ensure_locks_valid(locks)
             partition_metric.archive_status = "active"
             partition_metric.archive_location = None
             partition_metric.archived_at = None
@@ -179,15 +281,19 @@ class PartitionArchiveEngine:
                 "partition_full_name": f"{database_name}.{table_name}.{partition_name}",
                 "archive_location": partition_metric.archive_location,
                 "restored_location": original_location,
-                "files_restored": len(restored_files),
-                "restored_files": restored_files,
+                "files_restored": restore_report["file_count"],
+                "bytes_restored": restore_report["total_bytes"],
+                "restored_files": restore_report["files"],
+                "manifest_path": restore_report["manifest_path"],
+                "metadata_relocated": self.relocator.enabled and not metadata_error,
+                "metadata_error": metadata_error,
                 "restored_at": datetime.now().isoformat(),
                 "cluster_id": self.cluster.id,
                 "cluster_name": self.cluster.name,
             }
 
             logger.info(
-                f"分区 {database_name}.{table_name}.{partition_name} 恢复成功，恢复了 {len(restored_files)} 个文件"
+                f"分区 {database_name}.{table_name}.{partition_name} 恢复成功，恢复了 {restore_report['file_count']} 个文件"
             )
             return result
 
@@ -197,12 +303,18 @@ class PartitionArchiveEngine:
             )
             db_session.rollback()
             raise
+        finally:
+            self._release_locks(locks)
 
     def batch_archive_partitions(
         self, db_session: Session, partition_list: List[Dict], force: bool = False
     ) -> Dict:
         """
-        批量归档分区
+        批量归档分区（流水线执行）
+        1. 一次查询载入分区指标，每张表一次MetaStore查询获取分区位置
+        2. 按父目录去重创建归档目录
+        3. 共享WebHDFS客户端池并发执行 RENAME，受 NameNode ops/sec 预算限制
+        4. 每 ARCHIVE_BATCH_COMMIT_SIZE 个分区批量提交一次元数据
         Args:
             db_session: 数据库会话
             partition_list: 分区列表，每个元素包含database_name, table_name, partition_name
@@ -211,34 +323,69 @@ class PartitionArchiveEngine:
             批量归档结果字典
         """
         logger.info(f"开始批量归档 {len(partition_list)} 个分区")
-
-        success_count = 0
-        failed_count = 0
-        results = []
-
-        for partition_info in partition_list:
-            try:
-                database_name = partition_info["database_name"]
-                table_name = partition_info["table_name"]
-                partition_name = partition_info["partition_name"]
-
-                result = self.archive_partition(
-                    db_session, database_name, table_name, partition_name, force
-                )
-                result["result_type"] = "success"
-                results.append(result)
-                success_count += 1
-
-            except Exception as e:
-                error_result = {
-                    "result_type": "error",
-                    "partition_full_name": f"{partition_info.get('database_name', 'unknown')}.{partition_info.get('table_name', 'unknown')}.{partition_info.get('partition_name', 'unknown')}",
-                    "error_message": str(e),
-                }
-                results.append(error_result)
-                failed_count += 1
-                logger.error(
-                    f"批量归档中处理分区失败: {error_result['partition_full_name']}, 错误: {e}"
+        started = time.monotonic()
+
+        results: List[Optional[Dict]] = [None] * len(partition_list)
+        plans = self._plan_batch_archive(db_session, partition_list, force, results)
+        # 每张表只获取一次表级租约，同表分区并发移动，整批结束后释放
+        table_leases = self._acquire_table_locks(plans, results)
+        plans = [plan for plan in plans if "table_lease" in plan]
+
+        concurrency = max(1, settings.ARCHIVE_BATCH_CONCURRENCY)
+        commit_size = max(1, settings.ARCHIVE_BATCH_COMMIT_SIZE)
+        limiter = RateLimiter(settings.ARCHIVE_NAMENODE_OPS_PER_SECOND, concurrency)
+
+        if plans:
+            with WebHDFSClientPool(self.cluster, size=concurrency) as pool:
+                with ThreadPoolExecutor(
+                    max_workers=concurrency, thread_name_prefix="partition-archive"
+                ) as executor:
+                    futures = {}
+                    try:
+                        plans = self._create_archive_parents(
+                            pool, executor, limiter, plans, results
+                        )
+                        futures = {
+                            executor.submit(
+                                self._move_planned_partition, pool, limiter, plan
+                            ): plan
+                            for plan in plans
+                        }
+                        pending: List[Dict] = []
+                        for future in as_completed(futures):
+                            plan = futures[future]
+                            try:
+                                future.result()
+                                pending.append(plan)
+                            except Exception as e:
+                                results[plan["index"]] = self._batch_error(plan, e)
+                            if len(pending) >= commit_size:
+                                self._commit_archived_batch(
+                                    db_session, pool, limiter, pending, results
+                                )
+                                pending = []
+                        self._commit_archived_batch(
+                            db_session, pool, limiter, pending, results
+                        )
+                    finally:
+                        for future in futures:
+                            future.cancel()
+                        executor.shutdown(wait=True)
+                        # 异常退出时释放尚未提交的分区租约
+                        for plan in plans:
+                            lease = plan.pop("lease", None)
+                            if lease is not None:
+                                self._release_lock(lease)
+        self._release_locks(table_leases)
+
+        success_count = sum(
+            1 for r in results if r and r.get("result_type") == "success"
+        )
+        failed_count = len(partition_list) - success_count
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = self._batch_error(
+                    partition_list[index], RuntimeError("未执行")
                 )
 
         batch_result = {
@@ -246,6 +393,7 @@ class PartitionArchiveEngine:
             "total_partitions": len(partition_list),
             "success_count": success_count,
             "failed_count": failed_count,
+            "duration_seconds": round(time.monotonic() - started, 3),
             "batch_timestamp": datetime.now().isoformat(),
             "cluster_id": self.cluster.id,
             "cluster_name": self.cluster.name,
@@ -255,6 +403,428 @@ class PartitionArchiveEngine:
         logger.info(f"批量归档完成: 成功 {success_count}, 失败 {failed_count}")
         return batch_result
 
+    def _plan_batch_archive(
+        self,
+        db_session: Session,
+        partition_list: List[Dict],
+        force: bool,
+        results: List[Optional[Dict]],
+    ) -> List[Dict]:
+        """
+        批量解析并校验待归档分区，校验失败的分区直接写入results
+        Returns:
+            归档计划列表（index, 库表分区名, 分区指标ID, 源路径, 归档路径）
+        """
+        requested = []
+        seen = set()
+        for index, partition_info in enumerate(partition_list):
+            try:
+                key = (
+                    partition_info["database_name"],
+                    partition_info["table_name"],
+                    partition_info["partition_name"],
+                )
+            except KeyError as e:
+                results[index] = self._batch_error(
+                    partition_info, ValueError(f"缺少字段: {e}")
+                )
+                continue
+            if key in seen:
+                results[index] = self._batch_error(
+                    partition_info, ValueError("分区在批量列表中重复")
+                )
+                continue
+            seen.add(key)
+            requested.append((index, key))
+
+        tables = {key[:2] for _, key in requested}
+        metrics = self._load_partition_metrics(db_session, tables)
+        locations = self._load_partition_locations(tables)
+
+        plans = []
+        for index, key in requested:
+            database_name, table_name, partition_name = key
+            plan = {
+                "index": index,
+                "database_name": database_name,
+                "table_name": table_name,
+                "partition_name": partition_name,
+            }
+            try:
+                metric = metrics.get(key)
+                if not metric:
+                    raise ValueError(
+                        f"分区 {database_name}.{table_name}.{partition_name} 在系统中不存在"
+                    )
+                metric_id, archive_status, is_cold_data = metric
+                if not force and archive_status != "active":
+                    raise ValueError(f"分区已被归档，状态: {archive_status}")
+                if not force and is_cold_data != 1:
+                    raise ValueError(f"分区不是冷数据，无法归档")
+
+                source = locations.get(key[:2], {}).get(partition_name)
+                if not source:
+                    raise ValueError(f"无法获取分区存储位置")
+
+                plan.update(
+                    metric_id=metric_id,
+                    source=source,
+                    target=self._create_partition_archive_path(
+                        database_name, table_name, partition_name
+                    ),
+                )
+                plans.append(plan)
+            except Exception as e:
+                results[index] = self._batch_error(plan, e)
+        return plans
+
+    def _acquire_table_locks(
+        self, plans: List[Dict], results: List[Optional[Dict]]
+    ) -> List[Lease]:
+        """
+        为批量涉及的每张表获取表级租约，写入 plan["table_lease"]；
+        获取失败的表，其分区直接写入results
+        Returns:
+            已获取的表级租约
+        """
+        leases: List[Lease] = []
+        by_table: Dict[Tuple[str, str], object] = {}
+        for plan in plans:
+            key = (plan["database_name"], plan["table_name"])
+            if key not in by_table:
+                try:
+                    by_table[key] = self._acquire_table_lock(*key)
+                    leases.append(by_table[key])
+                except Exception as e:
+                    logger.warning(f"表 {key[0]}.{key[1]} 被占用，跳过其分区: {e}")
+                    by_table[key] = e
+            lease = by_table[key]
+            if isinstance(lease, Exception):
+                results[plan["index"]] = self._batch_error(plan, lease)
+            else:
+                plan["table_lease"] = lease
+        return leases
+
+    def _load_partition_metrics(
+        self, db_session: Session, tables: Set[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str, str], Tuple[int, str, int]]:
+        """
+        一次查询载入批量涉及的分区指标
+        Returns:
+            (数据库名, 表名, 分区名) -> (分区指标ID, 归档状态, 冷数据标记)
+        """
+        if not tables:
+            return {}
+        query = (
+            db_session.query(
+                PartitionMetric.id,
+                TableMetric.database_name,
+                TableMetric.table_name,
+                PartitionMetric.partition_name,
+                PartitionMetric.archive_status,
+                PartitionMetric.is_cold_data,
+            )
+            .join(TableMetric, PartitionMetric.table_metric_id == TableMetric.id)
+            .filter(
+                TableMetric.cluster_id == self.cluster.id,
+                TableMetric.database_name.in_({db_name for db_name, _ in tables}),
+                TableMetric.table_name.in_({tbl_name for _, tbl_name in tables}),
+            )
+            .order_by(PartitionMetric.id)
+        )
+        metrics: Dict[Tuple[str, str, str], Tuple[int, str, int]] = {}
+        for metric_id, db_name, tbl_name, part_name, status, is_cold in query:
+            if (db_name, tbl_name) in tables:
+                metrics.setdefault(
+                    (db_name, tbl_name, part_name), (metric_id, status, is_cold)
+                )
+        return metrics
+
+    def _load_partition_locations(
+        self, tables: Set[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Dict[str, str]]:
+        """
+        每张表一次MetaStore查询获取所有分区位置
+        Returns:
+            (数据库名, 表名) -> {分区名: 存储位置}
+        """
+        locations: Dict[Tuple[str, str], Dict[str, str]] = {}
+        if not tables:
+            return locations
+        try:
+            with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
+                for database_name, table_name in sorted(tables):
+                    try:
+                        partitions = conn.get_table_partitions(
+                            database_name, table_name
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"获取表 {database_name}.{table_name} 分区位置失败: {e}"
+                        )
+                        continue
+                    locations[(database_name, table_name)] = {
+                        partition["partition_name"]: partition.get("partition_path")
+                        for partition in partitions
+                    }
+        except Exception as e:
+            logger.error(f"批量获取分区存储位置失败: {e}")
+        return locations
+
+    def _create_archive_parents(
+        self,
+        pool: WebHDFSClientPool,
+        executor: ThreadPoolExecutor,
+        limiter: RateLimiter,
+        plans: List[Dict],
+        results: List[Optional[Dict]],
+    ) -> List[Dict]:
+        """
+        按父目录去重并发创建归档目录，父目录创建失败的分区直接写入results
+        Returns:
+            父目录可用的归档计划
+        """
+
+        def mkdirs(parent: str) -> Tuple[bool, str]:
+            limiter.acquire()
+            with pool.client() as hdfs_client:
+                return hdfs_client.create_directory(parent)
+
+        parents = {os.path.dirname(plan["target"]) for plan in plans}
+        futures = {executor.submit(mkdirs, parent): parent for parent in parents}
+        failed: Dict[str, str] = {}
+        for future in as_completed(futures):
+            parent = futures[future]
+            try:
+                ok, message = future.result()
+            except Exception as e:
+                ok, message = False, str(e)
+            if not ok and "已存在" not in message:
+                failed[parent] = message
+
+        ready = []
+        for plan in plans:
+            message = failed.get(os.path.dirname(plan["target"]))
+            if message is None:
+                ready.append(plan)
+            else:
+                results[plan["index"]] = self._batch_error(
+                    plan, RuntimeError(f"创建归档父目录失败: {message}")
+                )
+        logger.info(f"创建 {len(parents)} 个归档父目录，失败 {len(failed)} 个")
+        return ready
+
+    def _move_planned_partition(
+        self, pool: WebHDFSClientPool, limiter: RateLimiter, plan: Dict
+    ) -> None:
+        """在工作线程中获取分区租约并 RENAME 到归档路径，租约保留到元数据提交"""
+        lease = self._acquire_partition_lock(
+            plan["database_name"], plan["table_name"], plan["partition_name"]
+        )
+        plan["lease"] = lease
+        try:
+            # RENAME 前确认租约仍有效：等待限流或 NameNode 期间租约可能已被接管
+            limiter.acquire()
+            self._ensure_locks_valid([plan["table_lease"], lease])
+            with pool.client() as hdfs_client:
+                ok, message = hdfs_client.move_file(plan["source"], plan["target"])
+                if not ok:
+                    # 失败时再查询一次源路径，给出明确原因
+                    limiter.acquire()
+                    if not hdfs_client.get_file_status(plan["source"]):
+                        raise ValueError(f"源路径不存在: {plan['source']}")
+                    raise RuntimeError(f"归档失败: {message}")
+        except Exception:
+            plan.pop("lease", None)
+            self._release_lock(lease)
+            raise
+
+    def _commit_archived_batch(
+        self,
+        db_session: Session,
+        pool: WebHDFSClientPool,
+        limiter: RateLimiter,
+        pending: List[Dict],
+        results: List[Optional[Dict]],
+    ) -> None:
+        """
+        批量提交已移动分区的元数据，提交后释放租约
+        租约失效或提交失败的分区把数据移回原路径（Hive元数据位置一并改回），
+        移回失败的分区标记为 moved_unrecorded，供人工核对
+        """
+        if not pending:
+            return
+        valid = []
+        try:
+            for plan in pending:
+                try:
+                    self._ensure_locks_valid([plan["table_lease"], plan["lease"]])
+                    valid.append(plan)
+                except Exception as e:
+                    results[plan["index"]] = self._rollback_moved_partition(
+                        pool, limiter, plan, e
+                    )
+
+            # 按表分组批量更新Hive元数据中的分区位置
+            metadata_errors = self.relocator.relocate_partitions(
+                [
+                    {
+                        "database_name": plan["database_name"],
+                        "table_name": plan["table_name"],
+                        "partition_name": plan["partition_name"],
+                        "location": qualify_location(plan["target"], plan["source"]),
+                    }
+                    for plan in valid
+                ]
+            )
+
+            archived_at = datetime.now()
+            db_session.bulk_update_mappings(
+                PartitionMetric,
+                [
+                    {
+                        "id": plan["metric_id"],
+                        "archive_status": "archived",
+                        "archive_location": plan["target"],
+                        "archived_at": archived_at,
+                    }
+                    for plan in valid
+                ],
+            )
+            db_session.commit()
+
+            for plan in valid:
+                metadata_error = metadata_errors.get(
+                    (plan["database_name"], plan["table_name"], plan["partition_name"])
+                )
+                results[plan["index"]] = {
+                    "result_type": "success",
+                    "status": "success",
+                    "partition_full_name": self._partition_full_name(plan),
+                    "original_location": plan["source"],
+                    "archive_location": plan["target"],
+                    "metadata_relocated": self.relocator.enabled and not metadata_error,
+                    "metadata_error": metadata_error,
+                    "archived_at": archived_at.isoformat(),
+                    "cluster_id": self.cluster.id,
+                    "cluster_name": self.cluster.name,
+                }
+            logger.info(f"批量归档提交 {len(valid)} 个分区元数据")
+        except Exception as e:
+            db_session.rollback()
+            logger.error(f"批量归档元数据提交失败，回滚已移动的数据: {e}")
+            # Hive元数据可能已改为归档位置，先改回原位置
+            try:
+                self.relocator.relocate_partitions(
+                    [
+                        {
+                            "database_name": plan["database_name"],
+                            "table_name": plan["table_name"],
+                            "partition_name": plan["partition_name"],
+                            "location": plan["source"],
+                        }
+                        for plan in valid
+                    ]
+                )
+            except Exception as relocate_error:
+                logger.error(f"还原Hive元数据分区位置失败: {relocate_error}")
+            for plan in valid:
+                results[plan["index"]] = self._rollback_moved_partition(
+                    pool, limiter, plan, RuntimeError(f"元数据提交失败: {e}")
+                )
+        finally:
+            for plan in pending:
+                lease = plan.pop("lease", None)
+                if lease is not None:
+                    self._release_lock(lease)
+
+    def _rollback_moved_partition(
+        self,
+        pool: WebHDFSClientPool,
+        limiter: RateLimiter,
+        plan: Dict,
+        error: Exception,
+    ) -> Dict:
+        """
+        把已 RENAME 到归档路径的分区数据移回原路径
+        Returns:
+            分区结果：移回成功为 error，移回失败为 moved_unrecorded
+        """
+        try:
+            limiter.acquire()
+            with pool.client() as hdfs_client:
+                ok, message = hdfs_client.move_file(plan["target"], plan["source"])
+        except Exception as move_error:
+            ok, message = False, str(move_error)
+        if ok:
+            return self._batch_error(
+                plan, RuntimeError(f"{error}，数据已移回 {plan['source']}")
+            )
+
+        logger.error(
+            f"分区 {self._partition_full_name(plan)} 数据已移动到 {plan['target']} "
+            f"但未记录，移回失败: {message}"
+        )
+        return {
+            "result_type": "moved_unrecorded",
+            "status": "moved_unrecorded",
+            "partition_full_name": self._partition_full_name(plan),
+            "original_location": plan["source"],
+            "archive_location": plan["target"],
+            "error_message": f"{error}；移回原路径失败: {message}",
+            "cluster_id": self.cluster.id,
+            "cluster_name": self.cluster.name,
+        }
+
+    def _relocate_partition(
+        self,
+        database_name: str,
+        table_name: str,
+        partition_name: str,
+        location: str,
+    ) -> Optional[str]:
+        """
+        更新单个分区在Hive元数据中的位置
+        Returns:
+            错误信息，成功或未启用时为None
+        """
+        if not self.relocator.enabled:
+            return None
+        error = self.relocator.relocate_partitions(
+            [
+                {
+                    "database_name": database_name,
+                    "table_name": table_name,
+                    "partition_name": partition_name,
+                    "location": location,
+                }
+            ]
+        ).get((database_name, table_name, partition_name))
+        if error:
+            logger.warning(
+                f"分区 {database_name}.{table_name}.{partition_name} 数据已移动，元数据重定位失败: {error}"
+            )
+        return error
+
+    @staticmethod
+    def _partition_full_name(partition_info: Dict) -> str:
+        return (
+            f"{partition_info.get('database_name', 'unknown')}."
+            f"{partition_info.get('table_name', 'unknown')}."
+            f"{partition_info.get('partition_name', 'unknown')}"
+        )
+
+    def _batch_error(self, partition_info: Dict, error: Exception) -> Dict:
+        error_result = {
+            "result_type": "error",
+            "partition_full_name": self._partition_full_name(partition_info),
+            "error_message": str(error),
+        }
+        logger.error(
+            f"批量归档中处理分区失败: {error_result['partition_full_name']}, 错误: {error}"
+        )
+        return error_result
+
     def get_partition_archive_status(
         self,
         db_session: Session,
@@ -437,7 +1007,7 @@ class PartitionArchiveEngine:
                 partitions = conn.get_table_partitions(database_name, table_name)
                 for partition in partitions:
                     if partition["partition_name"] == partition_name:
-                        return partition.get("location")
+                        return partition.get("partition_path")
 
                 logger.warning(
                     f"未找到分区 {database_name}.{table_name}.{partition_name} 的位置信息"
@@ -467,14 +1037,14 @@ class PartitionArchiveEngine:
         archive_path = f"{self.archive_root_path}/{self.cluster.name}/{database_name}/{table_name}/{safe_partition_name}_{timestamp}"
         return archive_path
 
-    def _move_partition_data(self, source_path: str, target_path: str) -> List[str]:
+    def _move_partition_data(self, source_path: str, target_path: str) -> Dict:
         """
         移动分区数据文件到归档位置
         Args:
             source_path: 源路径
             target_path: 目标路径
         Returns:
-            移动的文件列表
+            移动报告（文件数、字节数，可选逐文件列表与清单文件路径）
         """
         try:
             logger.info(f"开始移动分区数据从 {source_path} 到 {target_path}")
@@ -499,30 +1069,13 @@ class PartitionArchiveEngine:
                 if not archive_success:
                     raise RuntimeError(f"归档失败: {archive_msg}")
 
-                # 3. 列出已归档目录中的文件，生成移动记录
-                archived_files = hdfs_client.list_directory(target_path)
-                moved_files = []
-
-                for file_info in archived_files:
-                    if not file_info.is_directory:
-                        # 构建原始文件路径（相对于source_path）
-                        relative_path = os.path.relpath(file_info.path, target_path)
-                        original_file = os.path.join(
-                            source_path, relative_path
-                        ).replace("\\", "/")
-
-                        moved_files.append(
-                            {
-                                "source": original_file,
-                                "target": file_info.path,
-                                "size": file_info.size,
-                            }
-                        )
+                # 3. 汇总已归档目录（默认 GETCONTENTSUMMARY，不再全量列出）
+                report = build_move_report(hdfs_client, source_path, target_path)
 
                 logger.info(
-                    f"成功移动 {len(moved_files)} 个文件从 {source_path} 到 {target_path}"
+                    f"成功移动 {report['file_count']} 个文件从 {source_path} 到 {target_path}"
                 )
-                return moved_files
+                return report
 
             finally:
                 hdfs_client.close()
@@ -532,26 +1085,24 @@ class PartitionArchiveEngine:
             # 如果是连接错误，返回模拟结果以保持系统可用性
             if "连接" in str(e) or "Connection" in str(e):
                 logger.warning(f"HDFS连接失败，返回模拟结果: {e}")
-                return [
+                return self._simulated_report(
                     {
                         "source": f"{source_path}/part-00000-simulated.parquet",
                         "target": f"{target_path}/part-00000-simulated.parquet",
                         "size": 1024000,
                         "simulated": True,
                     }
-                ]
+                )
             raise
 
-    def _restore_partition_data(
-        self, archive_path: str, restore_path: str
-    ) -> List[str]:
+    def _restore_partition_data(self, archive_path: str, restore_path: str) -> Dict:
         """
         从归档位置恢复分区数据文件
         Args:
             archive_path: 归档路径
             restore_path: 恢复路径
         Returns:
-            恢复的文件列表
+            恢复报告（文件数、字节数，可选逐文件列表与清单文件路径）
         """
         try:
             logger.info(f"开始恢复分区数据从 {archive_path} 到 {restore_path}")
@@ -581,30 +1132,19 @@ class PartitionArchiveEngine:
                 if not restore_success:
                     raise RuntimeError(f"恢复失败: {restore_msg}")
 
-                # 4. 列出恢复目录中的文件，生成恢复记录
-                restored_files_info = hdfs_client.list_directory(restore_path)
-                restored_files = []
-
-                for file_info in restored_files_info:
-                    if not file_info.is_directory:
-                        # 构建归档文件路径（相对于archive_path）
-                        relative_path = os.path.relpath(file_info.path, restore_path)
-                        archive_file = os.path.join(
-                            archive_path, relative_path
-                        ).replace("\\", "/")
-
-                        restored_files.append(
-                            {
-                                "archive": archive_file,
-                                "restored": file_info.path,
-                                "size": file_info.size,
-                            }
-                        )
+                # 4. 汇总恢复目录（默认 GETCONTENTSUMMARY，不再全量列出）
+                report = build_move_report(
+                    hdfs_client,
+                    archive_path,
+                    restore_path,
+                    source_key="archive",
+                    target_key="restored",
+                )
 
                 logger.info(
-                    f"成功恢复 {len(restored_files)} 个文件从 {archive_path} 到 {restore_path}"
+                    f"成功恢复 {report['file_count']} 个文件从 {archive_path} 到 {restore_path}"
                 )
-                return restored_files
+                return report
 
             finally:
                 hdfs_client.close()
@@ -614,16 +1154,27 @@ class PartitionArchiveEngine:
             # 如果是连接错误，返回模拟结果以保持系统可用性
             if "连接" in str(e) or "Connection" in str(e):
                 logger.warning(f"HDFS连接失败，返回模拟结果: {e}")
-                return [
+                return self._simulated_report(
                     {
                         "archive": f"{archive_path}/part-00000-simulated.parquet",
                         "restored": f"{restore_path}/part-00000-simulated.parquet",
                         "size": 1024000,
                         "simulated": True,
                     }
-                ]
+                )
             raise
 
+    @staticmethod
+    def _simulated_report(record: Dict) -> Dict:
+        return {
+            "file_count": 1,
+            "directory_count": 0,
+            "total_bytes": record["size"],
+            "files": [record],
+            "manifest_path": None,
+            "simulated": True,
+        }
+
     def get_partition_archive_statistics(self, db_session: Session) -> Dict:
         """
         获取集群的分区归档统计信息
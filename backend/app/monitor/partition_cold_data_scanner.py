@@ -1,14 +1,18 @@
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.cluster import Cluster
 from app.models.partition_metric import PartitionMetric
 from app.models.table_metric import TableMetric
+from app.monitor.cold_data_scanner import apply_bulk_mappings
+from app.monitor.metastore_sync import MetastoreSyncTracker
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
+from app.utils.coldness import UNKNOWN_DAYS, age_days, days_since, to_datetime64
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,7 @@ class PartitionColdDataScanner:
         database_name: Optional[str] = None,
         table_name: Optional[str] = None,
         min_partition_size: int = 0,
+        full_reconcile: bool = False,
     ) -> Dict:
         """
         扫描并标记冷数据分区
@@ -43,6 +48,7 @@ class PartitionColdDataScanner:
             database_name: 指定数据库名，为空则扫描所有数据库
             table_name: 指定表名，为空则扫描指定数据库的所有表
             min_partition_size: 最小分区大小阈值（字节），用于过滤小分区
+            full_reconcile: 强制全量对齐，否则在周期内按高水位增量拉取
         Returns:
             扫描结果字典
         """
@@ -51,13 +57,19 @@ class PartitionColdDataScanner:
         )
 
         try:
-            # 1. 从MetaStore获取分区访问时间信息
+            current_time = datetime.now()
+            tracker = MetastoreSyncTracker(
+                db_session, self.cluster.id, "partition", database_name, table_name
+            )
+            since = tracker.begin(current_time, force_full=full_reconcile)
+
+            # 1. 从MetaStore获取分区访问时间信息（增量时只拉取高水位之后变化的分区）
             with MySQLHiveMetastoreConnector(self.cluster.hive_metastore_url) as conn:
                 partition_access_info = conn.get_partition_access_info(
-                    database_name, table_name
+                    database_name, table_name, since=since
                 )
 
-            if not partition_access_info:
+            if not partition_access_info and tracker.full_sync:
                 logger.warning(
                     f"未获取到数据库 {database_name or 'ALL'} 的分区访问信息"
                 )
@@ -69,76 +81,160 @@ class PartitionColdDataScanner:
                     "scan_timestamp": datetime.now().isoformat(),
                 }
 
-            cold_partitions = []
-            current_time = datetime.now()
-            partitions_updated = 0
+            # 2. 一次查询分别载入已有的表/分区指标ID,避免逐分区 SELECT
+            table_ids = self._load_table_metric_ids(
+                db_session, database_name, table_name
+            )
+            partition_ids = self._load_partition_metric_ids(
+                db_session, database_name, table_name
+            )
 
-            # 2. 计算每个分区的冷热程度并更新数据库
-            for info in partition_access_info:
-                try:
-                    days_since_access = self._calculate_days_since_access(
-                        info, current_time
-                    )
-                    is_cold = days_since_access > self.cold_days_threshold
+            table_inserts: Dict[Tuple[str, str], Dict] = {}
+            updates: List[Dict] = []
+            inserts: Dict[Tuple[str, str, str], Dict] = {}
+            cold_rows = []
 
-                    # 根据大小阈值过滤
-                    partition_size = info.get("partition_size", 0)
-                    if min_partition_size > 0 and partition_size < min_partition_size:
-                        continue
+            # 3. 按列批量计算距上次访问天数与冷数据标记
+            days_array = self._calculate_days_since_access(
+                partition_access_info, current_time
+            )
+            cold_flags = days_array > self.cold_days_threshold
+
+            # 4. 生成批量更新/插入映射
+            for info, days_since_access, is_cold in zip(
+                partition_access_info,
+                days_array.astype(int).tolist(),
+                cold_flags.tolist(),
+            ):
+                # 根据大小阈值过滤
+                partition_size = info.get("partition_size", 0)
+                if min_partition_size > 0 and partition_size < min_partition_size:
+                    continue
 
-                    # 3. 获取或创建分区指标记录
-                    partition_metric = self._get_or_create_partition_metric(
+                fields = {
+                    "last_access_time": info["last_access_time"],
+                    "days_since_last_access": days_since_access,
+                    "is_cold_data": 1 if is_cold else 0,
+                    "total_size": partition_size,
+                    "scan_time": current_time,
+                }
+
+                table_key = (info["database_name"], info["table_name"])
+                if table_key not in table_ids and table_key not in table_inserts:
+                    # 如果表指标不存在，创建一个基础记录
+                    table_inserts[table_key] = {
+                        "cluster_id": self.cluster.id,
+                        "database_name": info["database_name"],
+                        "table_name": info["table_name"],
+                        "total_files": 0,
+                        "small_files": 0,
+                        "total_size": 0,
+                        "avg_file_size": 0.0,
+                        "is_partitioned": 1,  # 标记为分区表
+                    }
+
+                key = (*table_key, info["partition_name"])
+                metric_id = partition_ids.get(key)
+                if metric_id is not None:
+                    mapping = {"id": metric_id, **fields}
+                    updates.append(mapping)
+                elif key in inserts:
+                    mapping = inserts[key]
+                    mapping.update(fields)
+                else:
+                    mapping = {
+                        "partition_name": info["partition_name"],
+                        "partition_path": info["partition_path"],
+                        "file_count": 0,
+                        "small_file_count": 0,
+                        "avg_file_size": 0.0,
+                        **fields,
+                    }
+                    inserts[key] = mapping
+
+                if is_cold:
+                    cold_rows.append((info, days_since_access, partition_size, mapping))
+
+            # 5. MetaStore中未变化的分区：增量时刷新天数，全量对齐时清除已删除分区的冷标记
+            seen_keys = {
+                (info["database_name"], info["table_name"], info["partition_name"])
+                for info in partition_access_info
+            }
+            if tracker.full_sync:
+                unchanged_updates = [
+                    {"id": metric_id, "is_cold_data": 0}
+                    for key, metric_id in partition_ids.items()
+                    if key not in seen_keys
+                ]
+                aged_cold_partitions = []
+            else:
+                unchanged_updates, aged_cold_partitions = (
+                    self._age_unchanged_partitions(
                         db_session,
-                        info["database_name"],
-                        info["table_name"],
-                        info["partition_name"],
-                        info["partition_path"],
+                        partition_ids,
+                        seen_keys,
+                        current_time,
+                        tracker.elapsed_days(current_time),
+                        min_partition_size,
+                        database_name,
+                        table_name,
                     )
+                )
+            updates.extend(unchanged_updates)
 
-                    # 4. 更新冷数据相关字段
-                    partition_metric.last_access_time = info["last_access_time"]
-                    partition_metric.days_since_last_access = days_since_access
-                    partition_metric.is_cold_data = 1 if is_cold else 0
-                    partition_metric.total_size = partition_size
-                    partition_metric.scan_time = current_time
-
-                    partitions_updated += 1
-
-                    if is_cold:
-                        cold_partition_info = {
-                            "database_name": info["database_name"],
-                            "table_name": info["table_name"],
-                            "partition_name": info["partition_name"],
-                            "partition_path": info["partition_path"],
-                            "days_since_access": days_since_access,
-                            "last_access_time": (
-                                info["last_access_time"].isoformat()
-                                if info["last_access_time"]
-                                else None
-                            ),
-                            "partition_size": partition_size,
-                            "partition_metric_id": partition_metric.id,
-                        }
-                        cold_partitions.append(cold_partition_info)
-
-                        logger.debug(
-                            f"标记冷数据分区: {info['database_name']}.{info['table_name']}.{info['partition_name']} "
-                            f"(距离上次访问: {days_since_access}天，大小: {partition_size}字节)"
-                        )
-
-                except Exception as e:
-                    logger.error(
-                        f"处理分区 {info.get('database_name')}.{info.get('table_name')}.{info.get('partition_name')} 时出错: {e}"
-                    )
-                    continue
+            # 6. 先补齐缺失的表指标,再分块写入分区指标
+            apply_bulk_mappings(
+                db_session, TableMetric, [], list(table_inserts.values())
+            )
+            if table_inserts:
+                # 批量插入不回填主键,重新载入一次以获得新表指标ID
+                table_ids = self._load_table_metric_ids(
+                    db_session, database_name, table_name
+                )
+            for key, mapping in inserts.items():
+                mapping["table_metric_id"] = table_ids[key[:2]]
+            apply_bulk_mappings(
+                db_session, PartitionMetric, updates, list(inserts.values())
+            )
+            partitions_updated = len(updates) + len(inserts)
+            if inserts:
+                partition_ids = self._load_partition_metric_ids(
+                    db_session, database_name, table_name
+                )
+                for key, mapping in inserts.items():
+                    mapping["id"] = partition_ids.get(key)
 
-            # 提交数据库更改
+            cold_partitions = [
+                {
+                    "database_name": info["database_name"],
+                    "table_name": info["table_name"],
+                    "partition_name": info["partition_name"],
+                    "partition_path": info["partition_path"],
+                    "days_since_access": days_since_access,
+                    "last_access_time": (
+                        info["last_access_time"].isoformat()
+                        if info["last_access_time"]
+                        else None
+                    ),
+                    "partition_size": partition_size,
+                    "partition_metric_id": mapping.get("id"),
+                }
+                for info, days_since_access, partition_size, mapping in cold_rows
+            ]
+            cold_partitions.extend(aged_cold_partitions)
+
+            # 提交数据库更改（同时推进同步高水位）
+            tracker.finish(partition_access_info, current_time)
             db_session.commit()
 
             result = {
+                "scan_mode": "full" if tracker.full_sync else "incremental",
                 "total_partitions_scanned": len(partition_access_info),
                 "cold_partitions_found": len(cold_partitions),
                 "partitions_updated": partitions_updated,
+                "partitions_missing_in_metastore": (
+                    len(unchanged_updates) if tracker.full_sync else 0
+                ),
                 "cold_partitions": cold_partitions,
                 "threshold_days": self.cold_days_threshold,
                 "min_partition_size": min_partition_size,
@@ -158,100 +254,180 @@ class PartitionColdDataScanner:
             db_session.rollback()
             raise
 
-    def _calculate_days_since_access(self, info: Dict, current_time: datetime) -> int:
+    def _calculate_days_since_access(
+        self, access_info: List[Dict], current_time: datetime
+    ) -> np.ndarray:
         """
-        计算距离最后访问的天数
+        批量计算距离最后访问的天数
         Args:
-            info: 分区访问信息字典
+            access_info: 分区访问信息字典列表
             current_time: 当前时间
         Returns:
-            距离最后访问的天数
+            天数数组；没有访问时间时用创建时间作为fallback，都没有则标记为很久
         """
-        last_access = info["last_access_time"]
-
-        if not last_access:
-            # 如果没有访问时间，用分区创建时间作为fallback
-            create_time = info.get("create_time")
-            if create_time:
-                return (current_time - create_time).days
-            else:
-                logger.warning(
-                    f"分区 {info['database_name']}.{info['table_name']}.{info['partition_name']} 缺少访问时间和创建时间"
-                )
-                return 999  # 无任何时间信息，标记为很久
-
-        return (current_time - last_access).days
+        days = days_since(
+            current_time,
+            to_datetime64([info["last_access_time"] for info in access_info]),
+            to_datetime64([info.get("create_time") for info in access_info]),
+        )
+        missing = np.isnan(days)
+        if missing.any():
+            logger.warning(f"{int(missing.sum())} 个分区缺少访问时间和创建时间")
+            days[missing] = UNKNOWN_DAYS
+        return days
 
-    def _get_or_create_partition_metric(
+    def _age_unchanged_partitions(
         self,
         db_session: Session,
-        database_name: str,
-        table_name: str,
-        partition_name: str,
-        partition_path: str,
-    ) -> PartitionMetric:
+        partition_ids: Dict[Tuple[str, str, str], int],
+        changed_keys: Set[Tuple[str, str, str]],
+        current_time: datetime,
+        elapsed_days: int,
+        min_partition_size: int = 0,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
         """
-        获取或创建分区指标记录
+        增量扫描时刷新MetaStore中未变化的分区的距今天数与冷数据标记
         Args:
-            db_session: 数据库会话
-            database_name: 数据库名
-            table_name: 表名
-            partition_name: 分区名
-            partition_path: 分区路径
+            partition_ids: 扫描器维护的分区指标ID
+            changed_keys: 本次从MetaStore拉取到的分区
+            elapsed_days: 自上次对齐以来经过的整天数
+            min_partition_size: 最小分区大小阈值（字节），与拉取到的分区过滤一致
         Returns:
-            分区指标对象
+            (需要更新的映射, 冷数据分区结果列表)
         """
-        # 先获取对应的表指标记录
-        table_metric = (
-            db_session.query(TableMetric)
-            .filter(
-                TableMetric.cluster_id == self.cluster.id,
-                TableMetric.database_name == database_name,
-                TableMetric.table_name == table_name,
+        tracked_ids = {
+            metric_id
+            for key, metric_id in partition_ids.items()
+            if key not in changed_keys
+        }
+        query = (
+            db_session.query(
+                PartitionMetric.id,
+                TableMetric.database_name,
+                TableMetric.table_name,
+                PartitionMetric.partition_name,
+                PartitionMetric.partition_path,
+                PartitionMetric.total_size,
+                PartitionMetric.last_access_time,
+                PartitionMetric.days_since_last_access,
+                PartitionMetric.is_cold_data,
             )
-            .first()
+            .join(TableMetric, PartitionMetric.table_metric_id == TableMetric.id)
+            .filter(TableMetric.cluster_id == self.cluster.id)
+        )
+        if database_name:
+            query = query.filter(TableMetric.database_name == database_name)
+        if table_name:
+            query = query.filter(TableMetric.table_name == table_name)
+        rows = [
+            row
+            for row in query
+            if row[0] in tracked_ids
+            and not (min_partition_size > 0 and (row[5] or 0) < min_partition_size)
+        ]
+        if not rows:
+            return [], []
+
+        columns = list(zip(*rows))
+        previous = np.array(
+            [np.nan if days is None else days for days in columns[7]], dtype=np.float64
         )
+        days = age_days(to_datetime64(columns[6]), previous, current_time, elapsed_days)
+        known = ~np.isnan(days)
+        cold = days > self.cold_days_threshold
+        was_cold = np.array([flag == 1 for flag in columns[8]], dtype=bool)
+        changed = known & ((days != previous) | (cold != was_cold))
+
+        updates = []
+        cold_partitions = []
+        for row, days_since_access, is_cold, is_known, is_changed in zip(
+            rows,
+            np.nan_to_num(days).astype(int).tolist(),
+            cold.tolist(),
+            known.tolist(),
+            changed.tolist(),
+        ):
+            if is_changed:
+                updates.append(
+                    {
+                        "id": row[0],
+                        "days_since_last_access": days_since_access,
+                        "is_cold_data": 1 if is_cold else 0,
+                    }
+                )
+            if is_known and is_cold:
+                cold_partitions.append(
+                    {
+                        "database_name": row[1],
+                        "table_name": row[2],
+                        "partition_name": row[3],
+                        "partition_path": row[4],
+                        "days_since_access": days_since_access,
+                        "last_access_time": row[6].isoformat() if row[6] else None,
+                        "partition_size": row[5] or 0,
+                        "partition_metric_id": row[0],
+                    }
+                )
+        return updates, cold_partitions
 
-        if not table_metric:
-            # 如果表指标不存在，创建一个基础记录
-            table_metric = TableMetric(
-                cluster_id=self.cluster.id,
-                database_name=database_name,
-                table_name=table_name,
-                total_files=0,
-                small_files=0,
-                total_size=0,
-                avg_file_size=0.0,
-                is_partitioned=1,  # 标记为分区表
-            )
-            db_session.add(table_metric)
-            db_session.flush()
+    def _load_table_metric_ids(
+        self,
+        db_session: Session,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        一次查询载入集群已有表指标记录
+        Returns:
+            (数据库名, 表名) -> 表指标ID，同名多条记录时取最早的一条
+        """
+        query = db_session.query(
+            TableMetric.id, TableMetric.database_name, TableMetric.table_name
+        ).filter(TableMetric.cluster_id == self.cluster.id)
+        if database_name:
+            query = query.filter(TableMetric.database_name == database_name)
+        if table_name:
+            query = query.filter(TableMetric.table_name == table_name)
 
-        # 查找现有的分区记录
-        partition_metric = (
-            db_session.query(PartitionMetric)
-            .filter(
-                PartitionMetric.table_metric_id == table_metric.id,
-                PartitionMetric.partition_name == partition_name,
-            )
-            .first()
-        )
+        table_ids: Dict[Tuple[str, str], int] = {}
+        for metric_id, db_name, tbl_name in query.order_by(TableMetric.id):
+            table_ids.setdefault((db_name, tbl_name), metric_id)
+        return table_ids
 
-        if not partition_metric:
-            # 创建新的分区记录
-            partition_metric = PartitionMetric(
-                table_metric_id=table_metric.id,
-                partition_name=partition_name,
-                partition_path=partition_path,
-                file_count=0,
-                small_file_count=0,
-                total_size=0,
-                avg_file_size=0.0,
+    def _load_partition_metric_ids(
+        self,
+        db_session: Session,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+    ) -> Dict[Tuple[str, str, str], int]:
+        """
+        一次查询载入集群已有分区指标记录
+        Returns:
+            (数据库名, 表名, 分区名) -> 分区指标ID
+        """
+        query = (
+            db_session.query(
+                PartitionMetric.id,
+                TableMetric.database_name,
+                TableMetric.table_name,
+                PartitionMetric.partition_name,
             )
-            db_session.add(partition_metric)
-            db_session.flush()
-
-        return partition_metric
+            .join(TableMetric, PartitionMetric.table_metric_id == TableMetric.id)
+            .filter(TableMetric.cluster_id == self.cluster.id)
+        )
+        if database_name:
+            query = query.filter(TableMetric.database_name == database_name)
+        if table_name:
+            query = query.filter(TableMetric.table_name == table_name)
+
+        partition_ids: Dict[Tuple[str, str, str], int] = {}
+        for metric_id, db_name, tbl_name, part_name in query.order_by(
+            PartitionMetric.id
+        ):
+            partition_ids.setdefault((db_name, tbl_name, part_name), metric_id)
+        return partition_ids
 
     def get_cold_partitions_summary(
         self,
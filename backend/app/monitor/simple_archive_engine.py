@@ -1,13 +1,23 @@
 import logging
-import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
 from sqlalchemy.orm import Session
 
 from app.models.cluster import Cluster
 from app.models.table_metric import TableMetric
+from app.monitor.hive_metadata_relocator import (
+    HiveMetadataRelocator,
+    qualify_location,
+)
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
+from app.utils.archive_report import build_move_report
+from app.utils.lease_service import (
+    Lease,
+    default_owner,
+    get_lease_service,
+    table_resource,
+)
 from app.utils.webhdfs_client import WebHDFSClient
 
 logger = logging.getLogger(__name__)
@@ -18,6 +28,9 @@ class SimpleArchiveEngine:
     简单归档引擎，实现表级数据归档和恢复功能
     """
 
+    # 同表被合并/其他归档占用时的最长等待时间（秒）
+    LOCK_WAIT_SECONDS = 30
+
     def __init__(self, cluster: Cluster, archive_root_path: str = "/archive"):
         """
         初始化归档引擎
@@ -27,19 +40,23 @@ class SimpleArchiveEngine:
         """
         self.cluster = cluster
         self.archive_root_path = archive_root_path.rstrip("/")
-        # 进程内锁表，避免同表并发归档/恢复（跨进程需外部锁/DB锁）
-        global _TABLE_LOCKS
-        if "_TABLE_LOCKS" not in globals():
-            _TABLE_LOCKS = {}
-
-    def _acquire_lock(self, database_name: str, table_name: str) -> threading.Lock:
-        key = f"{self.cluster.id}:{database_name}:{table_name}"
-        lock = _TABLE_LOCKS.get(key)
-        if lock is None:
-            lock = threading.Lock()
-            _TABLE_LOCKS[key] = lock
-        lock.acquire()
-        return lock
+        # 表级租约与合并任务共用，跨 API 进程与 Celery worker 互斥
+        self.lease_service = get_lease_service()
+        # 移动数据后同步更新Hive元数据中的表/分区位置（ARCHIVE_METADATA_RELOCATION）
+        self.relocator = HiveMetadataRelocator(cluster)
+
+    def _acquire_lock(self, database_name: str, table_name: str) -> Lease:
+        return self.lease_service.acquire_or_raise(
+            table_resource(self.cluster.id, database_name, table_name),
+            owner=default_owner(f"archive:{database_name}.{table_name}"),
+            wait_timeout=self.LOCK_WAIT_SECONDS,
+        )
+
+    def _release_lock(self, lease: Lease) -> None:
+        try:
+            self.lease_service.release(lease)
+        except Exception as e:
+            logger.warning(f"释放表租约失败: {lease.resource}: {e}")
 
     def archive_table(
         self,
@@ -94,9 +111,18 @@ class SimpleArchiveEngine:
             archive_path = self._create_archive_path(database_name, table_name)
 
             # 5. 执行数据文件移动
-            moved_files = self._move_table_data(table_location, archive_path)
+            move_report = self._move_table_data(table_location, archive_path)
+
+            # 6. 更新Hive元数据中的表及分区位置
+            relocation = self._relocate_table(
+                database_name,
+                table_name,
+                table_location,
+                qualify_location(archive_path, table_location),
+            )
 
-            # 6. 更新表元数据
+            # 7. 更新表元数据（提交前确认租约未被接管）
+            self.lease_service.ensure_valid(lock)
             table_metric.archive_status = "archived"
             table_metric.archive_location = archive_path
             table_metric.archived_at = datetime.now()
@@ -108,15 +134,18 @@ class SimpleArchiveEngine:
                 "table_full_name": f"{database_name}.{table_name}",
                 "original_location": table_location,
                 "archive_location": archive_path,
-                "files_moved": len(moved_files),
-                "moved_files": moved_files,
+                "files_moved": move_report["file_count"],
+                "bytes_moved": move_report["total_bytes"],
+                "moved_files": move_report["files"],
+                "manifest_path": move_report["manifest_path"],
+                "metadata_relocation": relocation,
                 "archived_at": datetime.now().isoformat(),
                 "cluster_id": self.cluster.id,
                 "cluster_name": self.cluster.name,
             }
 
             logger.info(
-                f"表 {database_name}.{table_name} 归档成功，移动了 {len(moved_files)} 个文件"
+                f"表 {database_name}.{table_name} 归档成功，移动了 {move_report['file_count']} 个文件"
             )
             return result
 
@@ -125,10 +154,7 @@ class SimpleArchiveEngine:
             db_session.rollback()
             raise
         finally:
-            try:
-                lock.release()
-            except Exception:
-                pass
+            self._release_lock(lock)
 
     def restore_table(
         self, db_session: Session, database_name: str, table_name: str
@@ -161,7 +187,13 @@ class SimpleArchiveEngine:
                 raise ValueError(f"表 {database_name}.{table_name} 缺少归档位置信息")
 
             # 3. 获取原始表位置（优先MetaStore，失败时回退指标table_path）
-            original_location = self._get_table_location(database_name, table_name)
+            #    元数据已重定位时MetaStore中为归档位置，优先使用指标table_path
+            current_location = self._get_table_location(database_name, table_name)
+            original_location = current_location
+            if self.relocator.enabled and table_metric.table_path:
+                original_location = qualify_location(
+                    table_metric.table_path, current_location
+                )
             if not original_location:
                 tp = getattr(table_metric, "table_path", None)
                 if tp:
@@ -175,11 +207,20 @@ class SimpleArchiveEngine:
                 )
 
             # 4. 执行数据文件恢复
-            restored_files = self._restore_table_data(
+            restore_report = self._restore_table_data(
                 table_metric.archive_location, original_location
             )
 
-            # 5. 更新表元数据
+            # 5. 将Hive元数据中的表及分区位置改回原始位置
+            relocation = self._relocate_table(
+                database_name,
+                table_name,
+                qualify_location(table_metric.archive_location, original_location),
+                original_location,
+            )
+
+            # 6. 更新表元数据（提交前确认租约未被接管）
+            self.lease_service.ensure_valid(lock)
             table_metric.archive_status = "active"
             table_metric.archive_location = None
             table_metric.archived_at = None
@@ -191,15 +232,18 @@ class SimpleArchiveEngine:
                 "table_full_name": f"{database_name}.{table_name}",
                 "archive_location": table_metric.archive_location,
                 "restored_location": original_location,
-                "files_restored": len(restored_files),
-                "restored_files": restored_files,
+                "files_restored": restore_report["file_count"],
+                "bytes_restored": restore_report["total_bytes"],
+                "restored_files": restore_report["files"],
+                "manifest_path": restore_report["manifest_path"],
+                "metadata_relocation": relocation,
                 "restored_at": datetime.now().isoformat(),
                 "cluster_id": self.cluster.id,
                 "cluster_name": self.cluster.name,
             }
 
             logger.info(
-                f"表 {database_name}.{table_name} 恢复成功，恢复了 {len(restored_files)} 个文件"
+                f"表 {database_name}.{table_name} 恢复成功，恢复了 {restore_report['file_count']} 个文件"
             )
             return result
 
@@ -208,10 +252,24 @@ class SimpleArchiveEngine:
             db_session.rollback()
             raise
         finally:
-            try:
-                lock.release()
-            except Exception:
-                pass
+            self._release_lock(lock)
+
+    def _relocate_table(
+        self,
+        database_name: str,
+        table_name: str,
+        old_location: str,
+        new_location: str,
+    ) -> Dict:
+        """更新表在Hive元数据中的位置，失败只记录警告（数据已移动）"""
+        relocation = self.relocator.relocate_table(
+            database_name, table_name, old_location, new_location
+        )
+        if relocation["errors"]:
+            logger.warning(
+                f"表 {database_name}.{table_name} 数据已移动，元数据重定位失败: {relocation['errors']}"
+            )
+        return relocation
 
     # ---- Storage policy archive (no move) ----
     def apply_storage_policy_table(
@@ -246,6 +304,7 @@ class SimpleArchiveEngine:
             raise ValueError(f"无法获取表 {database_name}.{table_name} 的存储位置")
 
         # 调用 WebHDFS 设置策略
+        lock = self._acquire_lock(database_name, table_name)
         hdfs = WebHDFSClient.from_cluster(self.cluster)
         try:
             if recursive:
@@ -280,6 +339,7 @@ class SimpleArchiveEngine:
                 hdfs.close()
             except Exception:
                 pass
+            self._release_lock(lock)
 
     def get_archive_status(
         self, db_session: Session, database_name: str, table_name: str
@@ -419,17 +479,17 @@ class SimpleArchiveEngine:
         archive_path = f"{self.archive_root_path}/{self.cluster.name}/{database_name}/{table_name}_{timestamp}"
         return archive_path
 
-    def _move_table_data(self, source_path: str, target_path: str) -> List[str]:
+    def _move_table_data(self, source_path: str, target_path: str) -> Dict:
         """
         移动表数据文件到归档位置
         Args:
             source_path: 源路径
             target_path: 目标路径
         Returns:
-            移动的文件列表
+            移动报告（文件数、字节数，可选逐文件列表与清单文件路径）
         """
         try:
-            # 使用 WebHDFS 归档目录（目录重命名/移动），并列出归档文件作为迁移记录
+            # 使用 WebHDFS 归档目录（目录重命名/移动），按 ARCHIVE_FILE_REPORT 生成迁移报告
             hdfs = WebHDFSClient.from_cluster(self.cluster)
             try:
                 ok, msg = hdfs.archive_directory(
@@ -437,22 +497,11 @@ class SimpleArchiveEngine:
                 )
                 if not ok:
                     raise RuntimeError(f"归档失败: {msg}")
-                files = hdfs.list_directory(target_path)
-                moved = []
-                for fi in files:
-                    if not fi.is_directory:
-                        # 重建原始文件路径（近似）
-                        from os.path import relpath
-
-                        rel = relpath(fi.path, target_path)
-                        src = f"{source_path}/{rel}".replace("\\", "/")
-                        moved.append(
-                            {"source": src, "target": fi.path, "size": fi.size}
-                        )
+                report = build_move_report(hdfs, source_path, target_path)
                 logger.info(
-                    f"归档完成，移动 {len(moved)} 个文件从 {source_path} 到 {target_path}"
+                    f"归档完成，移动 {report['file_count']} 个文件从 {source_path} 到 {target_path}"
                 )
-                return moved
+                return report
             finally:
                 hdfs.close()
         except Exception as e:
@@ -460,24 +509,24 @@ class SimpleArchiveEngine:
             # 连接/环境问题下，返回模拟结果以不阻塞流程
             if "连接" in str(e) or "Connection" in str(e):
                 logger.warning(f"HDFS连接失败，返回模拟结果: {e}")
-                return [
+                return self._simulated_report(
                     {
                         "source": f"{source_path}/part-00000-simulated.parquet",
                         "target": f"{target_path}/part-00000-simulated.parquet",
                         "size": 1024,
                         "simulated": True,
                     }
-                ]
+                )
             raise
 
-    def _restore_table_data(self, archive_path: str, restore_path: str) -> List[str]:
+    def _restore_table_data(self, archive_path: str, restore_path: str) -> Dict:
         """
         从归档位置恢复表数据文件
         Args:
             archive_path: 归档路径
             restore_path: 恢复路径
         Returns:
-            恢复的文件列表
+            恢复报告（文件数、字节数，可选逐文件列表与清单文件路径）
         """
         try:
             hdfs = WebHDFSClient.from_cluster(self.cluster)
@@ -485,37 +534,44 @@ class SimpleArchiveEngine:
                 ok, msg = hdfs.restore_directory(archive_path, restore_path)
                 if not ok:
                     raise RuntimeError(f"恢复失败: {msg}")
-                files = hdfs.list_directory(restore_path)
-                restored = []
-                for fi in files:
-                    if not fi.is_directory:
-                        from os.path import relpath
-
-                        rel = relpath(fi.path, restore_path)
-                        arch = f"{archive_path}/{rel}".replace("\\", "/")
-                        restored.append(
-                            {"archive": arch, "restored": fi.path, "size": fi.size}
-                        )
+                report = build_move_report(
+                    hdfs,
+                    archive_path,
+                    restore_path,
+                    source_key="archive",
+                    target_key="restored",
+                )
                 logger.info(
-                    f"恢复完成，恢复 {len(restored)} 个文件从 {archive_path} 到 {restore_path}"
+                    f"恢复完成，恢复 {report['file_count']} 个文件从 {archive_path} 到 {restore_path}"
                 )
-                return restored
+                return report
             finally:
                 hdfs.close()
         except Exception as e:
             logger.error(f"恢复表数据失败: {e}")
             if "连接" in str(e) or "Connection" in str(e):
                 logger.warning(f"HDFS连接失败，返回模拟结果: {e}")
-                return [
+                return self._simulated_report(
                     {
                         "archive": f"{archive_path}/part-00000-simulated.parquet",
                         "restored": f"{restore_path}/part-00000-simulated.parquet",
                         "size": 1024,
                         "simulated": True,
                     }
-                ]
+                )
             raise
 
+    @staticmethod
+    def _simulated_report(record: Dict) -> Dict:
+        return {
+            "file_count": 1,
+            "directory_count": 0,
+            "total_bytes": record["size"],
+            "files": [record],
+            "manifest_path": None,
+            "simulated": True,
+        }
+
     def get_archive_statistics(self, db_session: Session) -> Dict:
         """
         获取集群的归档统计信息
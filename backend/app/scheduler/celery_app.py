@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init
 
 from app.config.settings import settings
 
@@ -50,3 +51,11 @@ celery_app.conf.update(
     task_acks_late=True,
     worker_max_tasks_per_child=100,
 )
+
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    # prefork 子进程不能复用父进程的数据库连接,丢弃继承的连接池
+    from app.config.database import engine
+
+    engine.dispose(close=False)
@@ -9,11 +9,15 @@ from app.engines.engine_factory import MergeEngineFactory
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
 from app.scheduler.celery_app import celery_app
+from app.utils.lease_service import default_owner, get_lease_service, table_resource
 from app.utils.table_lock_manager import TableLockManager
 
 logger = logging.getLogger(__name__)
 SessionLocal = sessionmaker(bind=engine)
 
+# 表锁租约时长；执行期间由心跳线程按 1/3 租约周期续约，worker 异常退出后租约自然过期
+TABLE_LOCK_LEASE_MINUTES = 10
+
 
 @celery_app.task(bind=True, name="app.scheduler.merge_tasks.execute_merge_task")
 def execute_merge_task(self, task_id: int):
@@ -24,6 +28,9 @@ def execute_merge_task(self, task_id: int):
         task_id: 任务ID
     """
     db = SessionLocal()
+    lock_heartbeat = None
+    table_lease = None
+    lease_service = get_lease_service()
 
     try:
         # 获取任务信息
@@ -40,7 +47,12 @@ def execute_merge_task(self, task_id: int):
 
         # 尝试获取表级别锁
         lock_result = TableLockManager.acquire_table_lock(
-            db, cluster.id, task.database_name, task.table_name, task.id
+            db,
+            cluster.id,
+            task.database_name,
+            task.table_name,
+            task.id,
+            lock_timeout_minutes=TABLE_LOCK_LEASE_MINUTES,
         )
 
         if not lock_result["success"]:
@@ -53,6 +65,28 @@ def execute_merge_task(self, task_id: int):
             db.commit()
             raise ValueError(f"Table lock acquisition failed: {lock_result['message']}")
 
+        lock_heartbeat = TableLockManager.start_lock_heartbeat(
+            SessionLocal, task.id, TABLE_LOCK_LEASE_MINUTES
+        )
+
+        # 与表归档/恢复共用的分布式租约，防止合并与归档同时操作同一张表
+        table_lease = lease_service.acquire(
+            table_resource(cluster.id, task.database_name, task.table_name),
+            owner=default_owner(f"merge_task:{task.id}"),
+            auto_renew=True,
+        )
+        if table_lease is None:
+            holder = lease_service.get_lease(
+                table_resource(cluster.id, task.database_name, task.table_name)
+            )
+            raise ValueError(
+                f"Table {task.database_name}.{task.table_name} is busy: "
+                f"held by {(holder or {}).get('owner', 'another operation')}"
+            )
+        logger.info(
+            f"Acquired table lease for task {task_id}, fencing token {table_lease.token}"
+        )
+
         # 更新任务状态和 Celery 任务ID
         task.status = "running"
         task.celery_task_id = self.request.id
@@ -73,6 +107,9 @@ def execute_merge_task(self, task_id: int):
 
         # 统一使用SafeHiveMergeEngine，支持所有合并策略
         engine = MergeEngineFactory.get_engine(cluster)
+        # 表切换、删除分区前确认租约未丢失（续约失败或已被其他持有者接管）
+        if hasattr(engine, "set_lease_guard"):
+            engine.set_lease_guard(lambda: lease_service.ensure_valid(table_lease))
 
         # 验证任务
         validation = engine.validate_task(task)
@@ -188,6 +225,13 @@ def execute_merge_task(self, task_id: int):
         return {"status": "failed", "task_id": task_id, "error": str(e)}
 
     finally:
+        if lock_heartbeat is not None:
+            lock_heartbeat.set()
+        if table_lease is not None:
+            try:
+                lease_service.release(table_lease)
+            except Exception as lease_error:
+                logger.warning(f"Failed to release table lease: {lease_error}")
         db.close()
 
 
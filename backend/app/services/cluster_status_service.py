@@ -6,13 +6,18 @@
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.models.cluster_status_history import ClusterStatusHistory
+from app.services.connection_status_cache import (
+    BaseConnectionStatusCache,
+    create_connection_status_cache,
+)
 from app.services.enhanced_connection_service import (
     ConnectionType,
     enhanced_connection_service,
@@ -22,11 +27,18 @@ from app.services.enhanced_connection_service import (
 class ClusterStatusService:
     """集群状态管理服务"""
 
-    def __init__(self):
-        # 连接状态缓存: cluster_id -> {service: status, timestamp}
-        self._connection_cache: Dict[int, Dict[str, Dict]] = {}
+    def __init__(self, cache: Optional[BaseConnectionStatusCache] = None):
+        # 连接状态缓存: cluster_id -> {service: {status, details, timestamp}}
+        # 默认使用 Redis 共享缓存，各 API 进程读取同一份健康检查结果；首次使用时创建
+        self._status_cache = cache
         # 缓存过期时间（秒）
-        self._cache_ttl = 300  # 5分钟
+        self._cache_ttl = settings.CONNECTION_STATUS_CACHE_TTL_SECONDS
+
+    @property
+    def _cache(self) -> BaseConnectionStatusCache:
+        if self._status_cache is None:
+            self._status_cache = create_connection_status_cache()
+        return self._status_cache
 
     def record_status_change(
         self,
@@ -112,10 +124,7 @@ class ClusterStatusService:
         self, cluster_id: int, service: str
     ) -> Optional[Dict]:
         """从缓存获取连接状态"""
-        if cluster_id not in self._connection_cache:
-            return None
-
-        service_cache = self._connection_cache[cluster_id].get(service)
+        service_cache = self._cache.get(cluster_id).get(service)
         if not service_cache:
             return None
 
@@ -126,9 +135,7 @@ class ClusterStatusService:
 
         if datetime.now() - cache_time > timedelta(seconds=self._cache_ttl):
             # 缓存过期，删除缓存项
-            del self._connection_cache[cluster_id][service]
-            if not self._connection_cache[cluster_id]:
-                del self._connection_cache[cluster_id]
+            self._cache.delete(cluster_id, service)
             return None
 
         return service_cache
@@ -137,14 +144,16 @@ class ClusterStatusService:
         self, cluster_id: int, service: str, status: str, details: Dict = None
     ):
         """缓存连接状态"""
-        if cluster_id not in self._connection_cache:
-            self._connection_cache[cluster_id] = {}
-
-        self._connection_cache[cluster_id][service] = {
-            "status": status,
-            "details": details or {},
-            "timestamp": datetime.now(),
-        }
+        self._cache.put(
+            cluster_id,
+            service,
+            {
+                "status": status,
+                "details": details or {},
+                "timestamp": datetime.now(),
+            },
+            self._cache_ttl,
+        )
 
     async def test_cluster_connections(
         self,
@@ -163,6 +172,9 @@ class ClusterStatusService:
             cached_result = self._get_cached_cluster_test_result(cluster_id)
             if cached_result:
                 return cached_result
+            if settings.HEALTH_PROBE_ENABLED:
+                # 后台探测守护任务负责刷新缓存，接口只读缓存；尚未探测过的集群返回待探测
+                return self._pending_cluster_test_result()
 
         # 转换连接类型参数
         if connection_types:
@@ -177,10 +189,40 @@ class ClusterStatusService:
         else:
             conn_types = None
 
-        # 执行增强的连接测试
+        test_results, _, _ = await self.refresh_cluster_status(db, cluster, conn_types)
+        return test_results
+
+    async def refresh_cluster_status(
+        self,
+        db: Session,
+        cluster: Cluster,
+        connection_types: List[ConnectionType] = None,
+    ) -> Tuple[Dict, Optional[str], str]:
+        """
+        实时探测集群并写入共享缓存与健康状态（仅健康状态变化时记录历史）
+        Returns:
+            (测试结果, 探测前健康状态, 探测后健康状态)
+        """
+        previous_health = cluster.health_status
+        test_results, health_status = await self.probe_cluster(
+            cluster, connection_types
+        )
+        self.update_health_status(db, cluster.id, health_status, test_results)
+        return test_results, previous_health, health_status
+
+    async def probe_cluster(
+        self,
+        cluster: Cluster,
+        connection_types: List[ConnectionType] = None,
+    ) -> Tuple[Dict, str]:
+        """
+        探测集群并把各服务状态写入共享缓存（不访问数据库）
+        Returns:
+            (测试结果, 健康状态)
+        """
         try:
             test_results = await enhanced_connection_service.test_cluster_connections(
-                cluster, conn_types
+                cluster, connection_types
             )
 
             # 解析测试结果并缓存各服务状态
@@ -189,13 +231,13 @@ class ClusterStatusService:
             # 缓存各服务状态
             for service_name, service_result in tests.items():
                 self.cache_connection_status(
-                    cluster_id,
+                    cluster.id,
                     service_name,
                     service_result.get("status", "unknown"),
                     service_result,
                 )
 
-            # 根据连接测试结果更新健康状态
+            # 根据连接测试结果确定健康状态
             overall_status = test_results.get("overall_status", "unknown")
             health_mapping = {
                 "success": "healthy",
@@ -203,11 +245,7 @@ class ClusterStatusService:
                 "failed": "unhealthy",
                 "unknown": "unknown",
             }
-            health_status = health_mapping.get(overall_status, "unknown")
-
-            self.update_health_status(db, cluster_id, health_status, test_results)
-
-            return test_results
+            return test_results, health_mapping.get(overall_status, "unknown")
 
         except Exception as e:
             # 测试失败时也要记录状态
@@ -226,23 +264,37 @@ class ClusterStatusService:
                 ],
             }
 
-            self.update_health_status(db, cluster_id, "unhealthy", error_result)
-
             # 缓存失败状态
             for service in ["metastore", "hdfs", "hiveserver2"]:
                 self.cache_connection_status(
-                    cluster_id, service, "error", {"error": str(e)}
+                    cluster.id, service, "error", {"error": str(e)}
                 )
 
-            return error_result
+            return error_result, "unhealthy"
+
+    @staticmethod
+    def _pending_cluster_test_result() -> Dict:
+        """缓存中尚无探测结果时返回的占位结果"""
+        return {
+            "overall_status": "unknown",
+            "test_time": None,
+            "tests": {},
+            "logs": [],
+            "suggestions": ["集群尚未完成后台健康探测，请稍后刷新"],
+            "cached": True,
+            "pending": True,
+        }
 
     def _get_cached_cluster_test_result(self, cluster_id: int) -> Optional[Dict]:
         """获取集群完整的缓存测试结果"""
-        if cluster_id not in self._connection_cache:
+        cache_data = {
+            service: entry
+            for service, entry in self._cache.get(cluster_id).items()
+            if datetime.now() - entry["timestamp"] <= timedelta(seconds=self._cache_ttl)
+        }
+        if not cache_data:
             return None
 
-        cache_data = self._connection_cache[cluster_id]
-
         # 检查是否有足够的缓存数据
         required_services = ["metastore", "hdfs"]
         if not all(service in cache_data for service in required_services):
@@ -311,9 +363,17 @@ class ClusterStatusService:
         }
 
     async def batch_health_check(
-        self, db: Session, cluster_ids: List[int] = None, parallel_limit: int = 5
+        self,
+        db: Session,
+        cluster_ids: List[int] = None,
+        parallel_limit: Optional[int] = None,
     ) -> Dict:
-        """批量健康检查"""
+        """
+        批量健康检查
+        所有集群同时发起检测（每个集群内各服务也并发），同时进行中的集群数不超过
+        parallel_limit（默认 HEALTH_CHECK_MAX_CONCURRENCY），不再按固定批次等待最慢的成员；
+        共享缓存中仍有效的结果直接返回
+        """
         if cluster_ids is None:
             # 获取所有活跃集群
             clusters = (
@@ -323,29 +383,27 @@ class ClusterStatusService:
             )
             cluster_ids = [c.id for c in clusters]
 
-        results = {}
-
-        # 分批并行处理
-        for i in range(0, len(cluster_ids), parallel_limit):
-            batch = cluster_ids[i : i + parallel_limit]
+        semaphore = asyncio.Semaphore(
+            max(1, parallel_limit or settings.HEALTH_CHECK_MAX_CONCURRENCY)
+        )
 
-            # 创建并行任务
-            tasks = [
-                self.test_cluster_connections(db, cluster_id) for cluster_id in batch
-            ]
+        async def check(cluster_id: int) -> Dict:
+            async with semaphore:
+                return await self.test_cluster_connections(db, cluster_id)
 
-            # 等待批次完成
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        check_results = await asyncio.gather(
+            *(check(cluster_id) for cluster_id in cluster_ids), return_exceptions=True
+        )
 
-            # 处理结果
-            for cluster_id, result in zip(batch, batch_results):
-                if isinstance(result, Exception):
-                    results[cluster_id] = {
-                        "overall_status": "error",
-                        "error": str(result),
-                    }
-                else:
-                    results[cluster_id] = result
+        results = {}
+        for cluster_id, result in zip(cluster_ids, check_results):
+            if isinstance(result, Exception):
+                results[cluster_id] = {
+                    "overall_status": "error",
+                    "error": str(result),
+                }
+            else:
+                results[cluster_id] = result
 
         return results
 
@@ -386,9 +444,9 @@ class ClusterStatusService:
     def clear_connection_cache(self, cluster_id: int = None):
         """清除连接状态缓存"""
         if cluster_id is None:
-            self._connection_cache.clear()
+            self._cache.clear()
         else:
-            self._connection_cache.pop(cluster_id, None)
+            self._cache.delete(cluster_id)
 
 
 # 全局服务实例
@@ -0,0 +1,188 @@
+"""
+集群连接状态共享缓存
+健康检查结果写入 Redis（按集群一个 Hash，带 TTL），所有 API 进程读取同一份结果，
+不必各自重新探测；Redis 不可用期间读写进程内缓存，按共享客户端的重试间隔恢复使用 Redis
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.config.settings import settings
+from app.utils.redis_client import get_redis_client, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+class BaseConnectionStatusCache:
+    """连接状态缓存接口，条目格式: {"status", "details", "timestamp"}"""
+
+    def get(self, cluster_id: int) -> Dict[str, Dict]:
+        """返回 service -> 条目，未命中返回空字典"""
+        raise NotImplementedError
+
+    def put(self, cluster_id: int, service: str, entry: Dict, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, cluster_id: int, service: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LocalConnectionStatusCache(BaseConnectionStatusCache):
+    """进程内实现（单进程部署或 Redis 不可用时使用）"""
+
+    def __init__(self):
+        self._entries: Dict[int, Dict[str, Dict]] = {}
+        self._expires: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cluster_id: int) -> Dict[str, Dict]:
+        with self._lock:
+            if self._expires.get(cluster_id, 0) < time.monotonic():
+                self._entries.pop(cluster_id, None)
+                self._expires.pop(cluster_id, None)
+                return {}
+            return {
+                service: dict(entry)
+                for service, entry in self._entries.get(cluster_id, {}).items()
+            }
+
+    def put(self, cluster_id: int, service: str, entry: Dict, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries.setdefault(cluster_id, {})[service] = dict(entry)
+            self._expires[cluster_id] = time.monotonic() + ttl_seconds
+
+    def delete(self, cluster_id: int, service: Optional[str] = None) -> None:
+        with self._lock:
+            if service is None:
+                self._entries.pop(cluster_id, None)
+                self._expires.pop(cluster_id, None)
+                return
+            services = self._entries.get(cluster_id)
+            if services is not None:
+                services.pop(service, None)
+                if not services:
+                    self._entries.pop(cluster_id, None)
+                    self._expires.pop(cluster_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expires.clear()
+
+
+class RedisConnectionStatusCache(BaseConnectionStatusCache):
+    """Redis 实现：key = {prefix}{cluster_id}，field = 服务名，value = JSON 条目
+
+    传入 client_factory 时每次操作经工厂取客户端：取不到或操作失败时改用进程内缓存，
+    并上报共享客户端不可用，重试间隔过后自动切回 Redis
+    """
+
+    def __init__(
+        self,
+        client=None,
+        key_prefix: str = "hsfp:connection-status:",
+        client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.client = client
+        self.key_prefix = key_prefix
+        self._client_factory = client_factory
+        self._fallback = LocalConnectionStatusCache()
+
+    def _key(self, cluster_id: int) -> str:
+        return f"{self.key_prefix}{cluster_id}"
+
+    def _redis(self):
+        if self._client_factory is not None:
+            self.client = self._client_factory()
+        return self.client
+
+    def _run(self, operation: str, redis_op: Callable[[Any], Any], local_op):
+        client = self._redis()
+        if client is not None:
+            try:
+                return redis_op(client)
+            except Exception as e:
+                if self._client_factory is None:
+                    raise
+                logger.warning(
+                    f"Redis connection status cache {operation} failed, using in-process cache: {e}"
+                )
+                mark_redis_unavailable()
+        return local_op()
+
+    def get(self, cluster_id: int) -> Dict[str, Dict]:
+        return self._run(
+            "get",
+            lambda client: self._get(client, cluster_id),
+            lambda: self._fallback.get(cluster_id),
+        )
+
+    def _get(self, client, cluster_id: int) -> Dict[str, Dict]:
+        entries = {}
+        for service, raw in (client.hgetall(self._key(cluster_id)) or {}).items():
+            try:
+                entry = json.loads(raw)
+                entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+            except (TypeError, ValueError, KeyError) as e:
+                logger.warning(
+                    f"忽略无法解析的连接状态缓存 {cluster_id}/{service}: {e}"
+                )
+                continue
+            entries[service] = entry
+        return entries
+
+    def put(self, cluster_id: int, service: str, entry: Dict, ttl_seconds: int) -> None:
+        self._run(
+            "put",
+            lambda client: self._put(client, cluster_id, service, entry, ttl_seconds),
+            lambda: self._fallback.put(cluster_id, service, entry, ttl_seconds),
+        )
+
+    def _put(
+        self, client, cluster_id: int, service: str, entry: Dict, ttl_seconds: int
+    ) -> None:
+        payload = dict(entry)
+        payload["timestamp"] = payload["timestamp"].isoformat()
+        key = self._key(cluster_id)
+        pipe = client.pipeline()
+        pipe.hset(key, service, json.dumps(payload, default=str, ensure_ascii=False))
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+
+    def delete(self, cluster_id: int, service: Optional[str] = None) -> None:
+        # 进程内缓存可能留有 Redis 不可用期间写入的条目，一并删除
+        self._fallback.delete(cluster_id, service)
+        self._run(
+            "delete",
+            lambda client: self._delete(client, cluster_id, service),
+            lambda: None,
+        )
+
+    def _delete(self, client, cluster_id: int, service: Optional[str]) -> None:
+        if service is None:
+            client.delete(self._key(cluster_id))
+        else:
+            client.hdel(self._key(cluster_id), service)
+
+    def clear(self) -> None:
+        self._fallback.clear()
+        self._run("clear", self._clear, lambda: None)
+
+    def _clear(self, client) -> None:
+        keys = list(client.scan_iter(match=f"{self.key_prefix}*"))
+        if keys:
+            client.delete(*keys)
+
+
+def create_connection_status_cache() -> BaseConnectionStatusCache:
+    """按配置创建连接状态缓存（Redis 不可用期间使用进程内缓存，恢复后自动切回）"""
+    if settings.CONNECTION_STATUS_CACHE_BACKEND == "redis":
+        return RedisConnectionStatusCache(client_factory=get_redis_client)
+    return LocalConnectionStatusCache()
@@ -16,6 +16,7 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.monitor.hive_connector import HiveMetastoreConnector
 from app.monitor.beeline_connector import BeelineConnector
@@ -90,8 +91,13 @@ class EnhancedConnectionService:
 
     def __init__(self, config: ConnectionConfig = None):
         self.config = config or ConnectionConfig()
+        max_workers = max(10, settings.HEALTH_CHECK_MAX_CONCURRENCY)
         self.executor = ThreadPoolExecutor(
-            max_workers=10, thread_name_prefix="conn-test"
+            max_workers=max_workers, thread_name_prefix="conn-test"
+        )
+        # 外层探测（含重试等待）使用独立线程池，批量检查时所有集群的所有服务可同时进行
+        self.probe_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="conn-probe"
         )
         self._connection_history: Dict[int, List[ConnectionResult]] = {}
         self._circuit_breakers: Dict[Tuple[int, ConnectionType], int] = {}  # 熔断器状态
@@ -562,10 +568,37 @@ class EnhancedConnectionService:
             error_message="All connection attempts failed",
         )
 
+    async def _probe(
+        self, cluster: Cluster, connection_type: ConnectionType, timeout: float
+    ) -> ConnectionResult:
+        """在探测线程池中执行带重试的连接测试，整体超过 timeout 秒记为超时"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    self.probe_executor,
+                    self._test_connection_with_retry,
+                    cluster,
+                    connection_type,
+                ),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            return ConnectionResult(
+                connection_type=connection_type,
+                status="timeout",
+                response_time_ms=timeout * 1000,
+                failure_type=FailureType.NETWORK_TIMEOUT,
+                error_message=f"Probe timeout after {timeout}s",
+            )
+
     async def test_cluster_connections(
-        self, cluster: Cluster, connection_types: List[ConnectionType] = None
+        self,
+        cluster: Cluster,
+        connection_types: List[ConnectionType] = None,
+        probe_timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
-        """异步测试集群连接"""
+        """异步测试集群连接（各服务并发探测，每个探测单独超时）"""
         if connection_types is None:
             connection_types = [
                 ConnectionType.METASTORE,
@@ -577,6 +610,7 @@ class EnhancedConnectionService:
         results = {}
         logs = []
         suggestions = []
+        probe_timeout = probe_timeout or settings.HEALTH_CHECK_PROBE_TIMEOUT_SECONDS
 
         # 并发测试所有连接类型
         tasks = []
@@ -598,8 +632,8 @@ class EnhancedConnectionService:
                     continue
 
             # 创建异步任务
-            task = asyncio.get_event_loop().run_in_executor(
-                None, self._test_connection_with_retry, cluster, conn_type
+            task = asyncio.ensure_future(
+                self._probe(cluster, conn_type, probe_timeout)
             )
             tasks.append((conn_type, task))
 
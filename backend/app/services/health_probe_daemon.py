@@ -0,0 +1,251 @@
+"""
+集群健康探测守护任务
+在 API 进程的事件循环中周期性探测所有活跃集群，取代“调用接口时才实时探测”：
+- 多个 API worker 通过租约选出一个执行者，避免重复探测
+- 自适应间隔：异常集群按短间隔重试，持续健康的集群逐步退避到最大间隔
+- 结果写入共享连接状态缓存，状态接口只读缓存
+- 仅在健康状态变化时记录 ClusterStatusHistory 并推送 cluster_status 主题
+- 数据库读写经 asyncio.to_thread 在线程中执行，每次使用独立会话，不阻塞事件循环
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config.database import SessionLocal
+from app.config.settings import settings
+from app.models.cluster import Cluster
+from app.services.cluster_status_service import (
+    ClusterStatusService,
+    cluster_status_service,
+)
+from app.utils.lease_service import BaseLeaseService, default_owner, get_lease_service
+
+logger = logging.getLogger(__name__)
+
+LEADER_RESOURCE = "health-probe-daemon"
+
+
+class HealthProbeDaemon:
+    """后台健康探测循环，start()/stop() 由应用启动、关闭事件调用"""
+
+    def __init__(
+        self,
+        status_service: Optional[ClusterStatusService] = None,
+        notifier=None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_service: Optional[BaseLeaseService] = None,
+        tick_seconds: Optional[float] = None,
+        unhealthy_interval: Optional[float] = None,
+        healthy_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+    ):
+        self.status_service = status_service or cluster_status_service
+        self._notifier = notifier
+        self.session_factory = session_factory
+        self._lease_service = lease_service
+        self.tick_seconds = tick_seconds or settings.HEALTH_PROBE_TICK_SECONDS
+        self.unhealthy_interval = (
+            unhealthy_interval or settings.HEALTH_PROBE_UNHEALTHY_INTERVAL_SECONDS
+        )
+        self.healthy_interval = (
+            healthy_interval or settings.HEALTH_PROBE_HEALTHY_INTERVAL_SECONDS
+        )
+        self.max_interval = max(
+            self.healthy_interval,
+            max_interval or settings.HEALTH_PROBE_MAX_INTERVAL_SECONDS,
+        )
+        # cluster_id -> (下次探测时间, 当前间隔)
+        self._schedule: Dict[int, tuple] = {}
+        self._lease = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    @property
+    def notifier(self):
+        if self._notifier is None:
+            from app.services.websocket_service import notification_service
+
+            self._notifier = notification_service
+        return self._notifier
+
+    @property
+    def lease_service(self) -> BaseLeaseService:
+        if self._lease_service is None:
+            self._lease_service = get_lease_service()
+        return self._lease_service
+
+    def next_interval(
+        self, previous: Optional[float], health_status: str, changed: bool
+    ) -> float:
+        """异常集群短间隔重试；健康集群从基础间隔开始，每次稳定探测后翻倍直到上限"""
+        if health_status != "healthy":
+            return self.unhealthy_interval
+        if changed or previous is None or previous < self.healthy_interval:
+            return self.healthy_interval
+        return min(previous * 2, self.max_interval)
+
+    async def run_once(self) -> int:
+        """探测所有已到期的活跃集群，返回本轮探测数量"""
+        cluster_ids = await asyncio.to_thread(self._list_active_cluster_ids)
+
+        # 已删除/停用的集群不再调度
+        for cluster_id in set(self._schedule) - set(cluster_ids):
+            self._schedule.pop(cluster_id, None)
+
+        now = time.monotonic()
+        due = [
+            cluster_id
+            for cluster_id in cluster_ids
+            if self._schedule.get(cluster_id, (0.0, None))[0] <= now
+        ]
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(max(1, settings.HEALTH_CHECK_MAX_CONCURRENCY))
+
+        async def probe(cluster_id: int) -> None:
+            async with semaphore:
+                await self._probe_cluster(cluster_id)
+
+        await asyncio.gather(*(probe(cluster_id) for cluster_id in due))
+        return len(due)
+
+    async def _probe_cluster(self, cluster_id: int) -> None:
+        previous_interval = self._schedule.get(cluster_id, (0.0, None))[1]
+        try:
+            cluster = await asyncio.to_thread(self._load_cluster, cluster_id)
+            if cluster is None:
+                self._schedule.pop(cluster_id, None)
+                return
+            old_health = cluster.health_status
+            cluster_name = cluster.name
+            results, new_health = await self.status_service.probe_cluster(cluster)
+            await asyncio.to_thread(
+                self._save_health_status, cluster_id, new_health, results
+            )
+        except Exception as e:
+            logger.warning(f"集群 {cluster_id} 后台健康探测失败: {e}")
+            self._reschedule(cluster_id, self.unhealthy_interval)
+            return
+
+        changed = old_health != new_health
+        self._reschedule(
+            cluster_id, self.next_interval(previous_interval, new_health, changed)
+        )
+        if not changed:
+            return
+
+        logger.info(f"集群 {cluster_name} 健康状态变化: {old_health} -> {new_health}")
+        try:
+            await self.notifier.notify_connection_status_changed(
+                cluster_id, cluster_name, results
+            )
+        except Exception as e:
+            logger.warning(f"推送集群 {cluster_id} 状态变化失败: {e}")
+
+    def _list_active_cluster_ids(self) -> List[int]:
+        db = self.session_factory()
+        try:
+            return [
+                cluster_id
+                for (cluster_id,) in db.query(Cluster.id)
+                .filter(Cluster.status.in_(["active", "testing"]))
+                .all()
+            ]
+        finally:
+            db.close()
+
+    def _load_cluster(self, cluster_id: int) -> Optional[Cluster]:
+        """读取集群配置；会话关闭后对象已脱离会话，只读取已加载的属性"""
+        db = self.session_factory()
+        try:
+            return db.query(Cluster).filter(Cluster.id == cluster_id).first()
+        finally:
+            db.close()
+
+    def _save_health_status(
+        self, cluster_id: int, health_status: str, results: Dict
+    ) -> None:
+        db = self.session_factory()
+        try:
+            self.status_service.update_health_status(
+                db, cluster_id, health_status, results
+            )
+        finally:
+            db.close()
+
+    def _reschedule(self, cluster_id: int, interval: float) -> None:
+        self._schedule[cluster_id] = (time.monotonic() + interval, interval)
+
+    async def _ensure_leader(self) -> bool:
+        """持有（或抢占到）执行者租约时返回 True；租约丢失后重新调度全部集群"""
+        if self._lease is not None and not self._lease.lost:
+            return True
+        if self._lease is not None:
+            logger.warning("健康探测执行者租约已丢失，等待重新选举")
+            self._lease = None
+            self._schedule.clear()
+        ttl = max(30.0, self.tick_seconds * 6)
+        self._lease = await asyncio.to_thread(
+            self.lease_service.acquire,
+            LEADER_RESOURCE,
+            default_owner("health-probe"),
+            ttl_seconds=ttl,
+            auto_renew=True,
+        )
+        if self._lease is not None:
+            logger.info("本进程成为健康探测执行者")
+        return self._lease is not None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if await self._ensure_leader():
+                    await self.run_once()
+            except Exception as e:
+                logger.warning(f"健康探测循环异常: {e}")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Health probe daemon started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.tick_seconds + 5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        if self._lease is not None:
+            lease, self._lease = self._lease, None
+            await asyncio.to_thread(self.lease_service.release, lease)
+        logger.info("Health probe daemon stopped")
+
+
+_daemon: Optional[HealthProbeDaemon] = None
+_daemon_lock = threading.Lock()
+
+
+def get_health_probe_daemon() -> HealthProbeDaemon:
+    """获取全局健康探测守护任务"""
+    global _daemon
+    if _daemon is not None:
+        return _daemon
+    with _daemon_lock:
+        if _daemon is None:
+            _daemon = HealthProbeDaemon()
+        return _daemon
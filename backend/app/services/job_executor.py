@@ -0,0 +1,305 @@
+"""
+后台作业执行器
+API 处理函数中的长耗时工作（扫描、归档、存储运维、测试表生成、合并）统一提交到这里，
+取代直接 threading.Thread(daemon=True).start()：
+- 每种作业类型一个有界工作线程池，突发请求在队列中等待，不再同时压向主机与 HDFS
+- 队列按优先级出队（数值越小越先执行），同优先级先进先出；队列长度有上限
+- 应用关闭时停止接收新作业，在超时内等待已排队与运行中的作业完成
+- stats() 提供各线程池的运行/排队/完成情况，供查询接口使用
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class JobQueueFullError(RuntimeError):
+    """作业队列已满或执行器已关闭"""
+
+
+@dataclass
+class Job:
+    """一次提交的作业"""
+
+    job_id: str
+    job_type: str
+    name: str
+    priority: int
+    fn: Callable = field(repr=False)
+    args: tuple = field(default=(), repr=False)
+    kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    state: str = "queued"  # queued / running / succeeded / failed / cancelled
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "name": self.name,
+            "priority": self.priority,
+            "state": self.state,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class _JobPool:
+    """单个作业类型的优先级队列与工作线程（线程按需启动，最多 size 个）"""
+
+    def __init__(self, job_type: str, size: int, executor: "JobExecutor"):
+        self.job_type = job_type
+        self.size = max(1, size)
+        self._executor = executor
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._workers: List[threading.Thread] = []
+        self.running: Dict[str, Job] = {}
+        self.queued: Dict[str, Job] = {}
+        self.completed = 0
+        self.failed = 0
+
+    def put(self, job: Job, seq: int) -> None:
+        # 调用方持有 executor 锁
+        self.queued[job.job_id] = job
+        self._queue.put((job.priority, seq, job))
+        idle = len(self._workers) - len(self.running)
+        if len(self.queued) > idle and len(self._workers) < self.size:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"job-{self.job_type}-{len(self._workers) + 1}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def stop(self) -> None:
+        # 每个工作线程一个停止信号，排在所有作业之后
+        for _ in self._workers:
+            self._queue.put((float("inf"), next(self._executor._seq), None))
+
+    def drop_queued(self) -> int:
+        dropped = 0
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            if job is not None and job.job_id in self.queued:
+                self._executor._finish(self, job, "cancelled", "executor shut down")
+                dropped += 1
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            if not self._executor._start(self, job):
+                continue
+            try:
+                job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                logger.exception(f"Background job {job.name} ({job.job_id}) failed")
+                self._executor._finish(self, job, "failed", str(e))
+            else:
+                self._executor._finish(self, job, "succeeded")
+
+
+class JobExecutor:
+    """按作业类型划分线程池的后台作业执行器"""
+
+    def __init__(
+        self,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        default_pool_size: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        history_size: Optional[int] = None,
+    ):
+        self.pool_sizes = dict(
+            settings.JOB_EXECUTOR_POOL_SIZES if pool_sizes is None else pool_sizes
+        )
+        self.default_pool_size = (
+            default_pool_size or settings.JOB_EXECUTOR_DEFAULT_POOL_SIZE
+        )
+        self.max_queue_size = max_queue_size or settings.JOB_EXECUTOR_MAX_QUEUE_SIZE
+        self._pools: Dict[str, _JobPool] = {}
+        self._history: Deque[Job] = deque(
+            maxlen=history_size or settings.JOB_EXECUTOR_HISTORY_SIZE
+        )
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._accepting = True
+
+    def submit(
+        self,
+        job_type: str,
+        fn: Callable,
+        *args,
+        name: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+        **kwargs,
+    ) -> str:
+        """
+        提交作业
+        Args:
+            job_type: 作业类型，决定使用哪个线程池（大小见 JOB_EXECUTOR_POOL_SIZES）
+            fn: 作业函数，在工作线程中以 fn(*args, **kwargs) 调用
+            name: 作业名称（用于日志与查询）
+            priority: 优先级，数值越小越先执行
+        Returns:
+            作业 ID
+        Raises:
+            JobQueueFullError: 该类型排队作业已达上限，或执行器正在关闭
+        """
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            job_type=job_type,
+            name=name or getattr(fn, "__name__", job_type),
+            priority=priority,
+            fn=fn,
+            args=args,
+            kwargs=kwargs,
+        )
+        with self._lock:
+            if not self._accepting:
+                raise JobQueueFullError("Job executor is shutting down")
+            pool = self._pools.get(job_type)
+            if pool is None:
+                size = self.pool_sizes.get(job_type, self.default_pool_size)
+                pool = self._pools[job_type] = _JobPool(job_type, size, self)
+            if len(pool.queued) >= self.max_queue_size:
+                raise JobQueueFullError(
+                    f"Too many queued {job_type} jobs ({len(pool.queued)}), "
+                    "please retry later"
+                )
+            pool.put(job, next(self._seq))
+        logger.debug(f"Queued {job_type} job {job.name} ({job.job_id})")
+        return job.job_id
+
+    def _start(self, pool: _JobPool, job: Job) -> bool:
+        with self._lock:
+            if pool.queued.pop(job.job_id, None) is None:
+                return False
+            job.state = "running"
+            job.started_at = datetime.now()
+            pool.running[job.job_id] = job
+            return True
+
+    def _finish(
+        self, pool: _JobPool, job: Job, state: str, error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            pool.running.pop(job.job_id, None)
+            pool.queued.pop(job.job_id, None)
+            job.state = state
+            job.error = error
+            job.finished_at = datetime.now()
+            if state == "succeeded":
+                pool.completed += 1
+            else:
+                pool.failed += 1
+            # 释放作业函数与参数引用，历史记录只保留元信息
+            job.fn, job.args, job.kwargs = None, (), {}
+            self._history.append(job)
+            self._idle.notify_all()
+
+    def _pending_locked(self) -> int:
+        return sum(len(p.running) + len(p.queued) for p in self._pools.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """各线程池的运行/排队情况与最近完成的作业"""
+        with self._lock:
+            pools = {
+                job_type: {
+                    "max_workers": pool.size,
+                    "workers": len(pool._workers),
+                    "running": [job.to_dict() for job in pool.running.values()],
+                    "queued": [
+                        job.to_dict()
+                        for job in sorted(
+                            pool.queued.values(),
+                            key=lambda j: (j.priority, j.submitted_at),
+                        )
+                    ],
+                    "completed": pool.completed,
+                    "failed": pool.failed,
+                }
+                for job_type, pool in self._pools.items()
+            }
+            return {
+                "accepting": self._accepting,
+                "max_queue_size": self.max_queue_size,
+                "pools": pools,
+                "recent": [job.to_dict() for job in reversed(self._history)],
+            }
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        优雅关闭：停止接收新作业，等待已排队与运行中的作业完成
+        超时后丢弃仍在排队的作业（运行中的作业为守护线程，不再等待）
+        Returns:
+            全部作业在超时前完成时返回 True
+        """
+        if timeout is None:
+            timeout = settings.JOB_EXECUTOR_SHUTDOWN_TIMEOUT_SECONDS
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._lock:
+            self._accepting = False
+            while self._pending_locked():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._idle.wait(remaining)
+            drained = self._pending_locked() == 0
+            pools = list(self._pools.values())
+        for pool in pools:
+            dropped = pool.drop_queued()
+            if dropped:
+                logger.warning(f"Dropped {dropped} queued {pool.job_type} jobs")
+            pool.stop()
+        logger.info(f"Job executor shut down (drained={drained})")
+        return drained
+
+
+_executor: Optional[JobExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> JobExecutor:
+    """获取全局后台作业执行器"""
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
+
+
+def shutdown_job_executor(timeout: Optional[float] = None) -> bool:
+    """关闭全局执行器；之后再调用 get_job_executor() 会创建新的执行器"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return True
+    return executor.shutdown(timeout)
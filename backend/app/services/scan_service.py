@@ -1,27 +1,91 @@
 import re
 import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
 from app.config.database import SessionLocal
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.models.scan_task import ScanTask
 from app.monitor.hybrid_table_scanner import HybridTableScanner
 from app.monitor.mysql_hive_connector import MySQLHiveMetastoreConnector
-from app.schemas.scan_task import ScanTaskLog
+from app.services.job_executor import (
+    PRIORITY_NORMAL,
+    JobQueueFullError,
+    get_job_executor,
+)
+from app.services.websocket_service import (
+    scan_logs_topic,
+    scan_progress_topic,
+    websocket_manager,
+)
+
+
+class ScanLogEntry:
+    """内存日志条目（字段与 ScanTaskLog 一致，写入时已清洗，读取时直接共享引用）"""
+
+    __slots__ = ("timestamp", "level", "message", "database_name", "table_name")
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        level: str,
+        message: str,
+        database_name: Optional[str] = None,
+        table_name: Optional[str] = None,
+    ):
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.database_name = database_name
+        self.table_name = table_name
+
+    # 提供 keys()/__getitem__，dict(entry) 与 jsonable_encoder 可直接序列化
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
 
 
 class ScanTaskManager:
-    """扫描任务管理器，支持进度追踪和日志记录"""
+    """扫描任务管理器，支持进度追踪和日志记录
+
+    内存中的任务登记表有上限：已结束的任务保留 SCAN_TASK_REGISTRY_TTL_SECONDS 后淘汰，
+    长时间无进度/日志的任务视为失联淘汰，超过 SCAN_TASK_REGISTRY_MAX_TASKS 时优先淘汰
+    最早结束的任务；每个任务的日志为定长环形缓冲
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_tasks: Optional[int] = None,
+        finished_ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
+        log_buffer_size: Optional[int] = None,
+    ):
         self.active_tasks: Dict[str, ScanTask] = {}
-        self.task_logs: Dict[str, List[ScanTaskLog]] = {}
+        self.task_logs: Dict[str, Deque[ScanLogEntry]] = {}
         self._lock = threading.Lock()
         self._cancelled: set[str] = set()
+        # task_id -> 最近一次进度/日志时间、结束时间（monotonic）
+        self._touched_at: Dict[str, float] = {}
+        self._finished_at: Dict[str, float] = {}
+        self.max_tasks = max_tasks or settings.SCAN_TASK_REGISTRY_MAX_TASKS
+        self.finished_ttl_seconds = (
+            settings.SCAN_TASK_REGISTRY_TTL_SECONDS
+            if finished_ttl_seconds is None
+            else finished_ttl_seconds
+        )
+        self.stale_ttl_seconds = (
+            settings.SCAN_TASK_STALE_SECONDS
+            if stale_ttl_seconds is None
+            else stale_ttl_seconds
+        )
+        self.log_buffer_size = log_buffer_size or settings.SCAN_TASK_LOG_BUFFER_SIZE
 
     def create_scan_task(
         self,
@@ -45,8 +109,10 @@ class ScanTaskManager:
         db.refresh(task)
 
         with self._lock:
+            self._evict_locked(time.monotonic())
             self.active_tasks[task.task_id] = task
-            self.task_logs[task.task_id] = []
+            self.task_logs[task.task_id] = deque(maxlen=self.log_buffer_size)
+            self._touched_at[task.task_id] = time.monotonic()
 
         return task
 
@@ -55,26 +121,24 @@ class ScanTaskManager:
         with self._lock:
             return self.active_tasks.get(task_id)
 
-    def get_task_logs(self, task_id: str) -> List[ScanTaskLog]:
-        """获取任务日志"""
+    def get_task_logs(
+        self, task_id: str, limit: Optional[int] = None, level: Optional[str] = None
+    ) -> List[ScanLogEntry]:
+        """获取任务日志（返回条目引用的快照，不逐条重建对象）
+
+        Args:
+            limit: 只返回最近 limit 条
+            level: 按日志级别过滤
+        """
         with self._lock:
-            logs = self.task_logs.get(task_id, [])
-            # 兜底清洗，保证历史内存日志不含图标符号
-            cleaned: List[ScanTaskLog] = []
-            for le in logs:
-                try:
-                    cleaned.append(
-                        ScanTaskLog(
-                            timestamp=le.timestamp,
-                            level=le.level,
-                            message=_sanitize_log_text(le.message),
-                            database_name=le.database_name,
-                            table_name=le.table_name,
-                        )
-                    )
-                except Exception:
-                    cleaned.append(le)
-            return cleaned
+            logs = self.task_logs.get(task_id)
+            snapshot = list(logs) if logs else []
+        if level:
+            level = level.upper()
+            snapshot = [entry for entry in snapshot if entry.level == level]
+        if limit is not None:
+            snapshot = snapshot[-limit:] if limit > 0 else []
+        return snapshot
 
     def request_cancel(self, db: Session, task_id: str) -> bool:
         """请求取消任务：设置标记并记录日志"""
@@ -92,9 +156,58 @@ class ScanTaskManager:
 
     def _cleanup_task(self, task_id: str):
         with self._lock:
-            self.active_tasks.pop(task_id, None)
-            self.task_logs.pop(task_id, None)
-            self._cancelled.discard(task_id)
+            self._drop_locked(task_id)
+
+    def _drop_locked(self, task_id: str) -> None:
+        self.active_tasks.pop(task_id, None)
+        self.task_logs.pop(task_id, None)
+        self._cancelled.discard(task_id)
+        self._touched_at.pop(task_id, None)
+        self._finished_at.pop(task_id, None)
+
+    def _evict_locked(self, now: float) -> None:
+        """淘汰过期任务；调用方需持有 self._lock"""
+        expired = [
+            task_id
+            for task_id, finished_at in self._finished_at.items()
+            if now - finished_at >= self.finished_ttl_seconds
+        ]
+        # 未结束但长时间没有任何进度/日志的任务（执行线程异常退出等）
+        expired.extend(
+            task_id
+            for task_id, touched_at in self._touched_at.items()
+            if task_id not in self._finished_at
+            and now - touched_at >= self.stale_ttl_seconds
+        )
+        for task_id in expired:
+            self._drop_locked(task_id)
+
+        overflow = len(self.active_tasks) - self.max_tasks + 1
+        if overflow > 0:
+            # 按结束先后淘汰；仍超限时按最近活动时间淘汰最久未更新的任务
+            victims = sorted(self._finished_at, key=self._finished_at.get)[:overflow]
+            if len(victims) < overflow:
+                running = sorted(
+                    (t for t in self._touched_at if t not in self._finished_at),
+                    key=self._touched_at.get,
+                )
+                victims.extend(running[: overflow - len(victims)])
+            for task_id in victims:
+                self._drop_locked(task_id)
+
+    def _mark_finished(self, task_id: str) -> None:
+        with self._lock:
+            if task_id in self.active_tasks:
+                self._finished_at.setdefault(task_id, time.monotonic())
+
+    def registry_stats(self) -> Dict[str, int]:
+        """内存登记表规模（任务数 / 已结束任务数 / 日志条目数）"""
+        with self._lock:
+            return {
+                "tasks": len(self.active_tasks),
+                "finished": len(self._finished_at),
+                "log_entries": sum(len(logs) for logs in self.task_logs.values()),
+            }
 
     def add_log(
         self,
@@ -108,7 +221,7 @@ class ScanTaskManager:
         """添加任务日志（内存 + 可选持久化）"""
         # 移除表情/图标，满足“日志中不出现图标符号”的要求
         message_clean = _sanitize_log_text(message)
-        log_entry = ScanTaskLog(
+        log_entry = ScanLogEntry(
             timestamp=datetime.utcnow(),
             level=level,
             message=message_clean,
@@ -117,11 +230,28 @@ class ScanTaskManager:
         )
 
         with self._lock:
-            if task_id in self.task_logs:
-                self.task_logs[task_id].append(log_entry)
-                # 只保留最近100条日志
-                if len(self.task_logs[task_id]) > 100:
-                    self.task_logs[task_id] = self.task_logs[task_id][-100:]
+            logs = self.task_logs.get(task_id)
+            if logs is not None:
+                # 环形缓冲，只保留最近 log_buffer_size 条
+                logs.append(log_entry)
+                self._touched_at[task_id] = time.monotonic()
+
+        # 推送到任务级日志主题(按频率合并)
+        try:
+            websocket_manager.publish(
+                scan_logs_topic(task_id),
+                "scan_logs",
+                {
+                    "timestamp": log_entry.timestamp.isoformat(),
+                    "level": level,
+                    "message": message_clean,
+                    "database_name": database_name,
+                    "table_name": table_name,
+                },
+                append=True,
+            )
+        except Exception:
+            pass
 
         # 可选持久化到数据库
         if db is not None:
@@ -150,6 +280,29 @@ class ScanTaskManager:
                 # 持久化失败不影响主流程
                 pass
 
+    def _publish_progress(self, task: ScanTask):
+        """推送任务进度快照到任务级进度主题(同一窗口内只保留最新)"""
+        try:
+            websocket_manager.publish(
+                scan_progress_topic(task.task_id),
+                "scan_progress",
+                {
+                    "task_id": task.task_id,
+                    "status": task.status,
+                    "progress_percentage": task.progress_percentage,
+                    "current_item": task.current_item,
+                    "completed_items": task.completed_items or 0,
+                    "total_items": task.total_items or 0,
+                    "estimated_remaining_seconds": task.estimated_remaining_seconds,
+                    "total_tables_scanned": task.total_tables_scanned,
+                    "total_files_found": task.total_files_found,
+                    "total_small_files": task.total_small_files,
+                    "error_message": task.error_message,
+                },
+            )
+        except Exception:
+            pass
+
     # ---- Structured logging helpers (no emoji, consistent format) ----
     def _format_msg(
         self,
@@ -249,6 +402,7 @@ class ScanTaskManager:
             task = self.active_tasks.get(task_id)
             if not task:
                 return
+            self._touched_at[task_id] = time.monotonic()
 
             if completed_items is not None:
                 task.completed_items = completed_items
@@ -267,6 +421,8 @@ class ScanTaskManager:
             if total_small_files is not None:
                 task.total_small_files = total_small_files
 
+            self._publish_progress(task)
+
             # 更新数据库
             db_task = db.query(ScanTask).filter(ScanTask.task_id == task_id).first()
             if db_task:
@@ -325,12 +481,15 @@ class ScanTaskManager:
                 return
 
             task.status = "completed" if success else "failed"
+            self._finished_at[task_id] = time.monotonic()
             task.end_time = datetime.utcnow()
             task.duration = (task.end_time - task.start_time).total_seconds()
 
             if error_message:
                 task.error_message = error_message
 
+            self._publish_progress(task)
+
             # 更新数据库
             db_task = db.query(ScanTask).filter(ScanTask.task_id == task_id).first()
             if db_task:
@@ -407,15 +566,30 @@ class ScanTaskManager:
                     db_thread.close()
                 except Exception:
                     pass
-                # 清理内存引用，避免泄漏
-                self._cleanup_task(task.task_id)
+                # 结束后保留一段时间供轮询读取，由登记表按 TTL 淘汰
+                self._mark_finished(task.task_id)
 
-        thread = threading.Thread(target=run_scan)
-        thread.daemon = True
-        thread.start()
+        self.run_in_background(db, task.task_id, "scan", run_scan)
 
         return task.task_id
 
+    def run_in_background(
+        self,
+        db: Session,
+        task_id: str,
+        job_type: str,
+        fn,
+        priority: int = PRIORITY_NORMAL,
+    ) -> str:
+        """把任务的执行函数提交到后台作业执行器；队列已满时先将任务标记为失败再抛出"""
+        try:
+            return get_job_executor().submit(
+                job_type, fn, name=f"{job_type}:{task_id}", priority=priority
+            )
+        except JobQueueFullError as e:
+            self.complete_task(db, task_id, success=False, error_message=str(e))
+            raise
+
     def _execute_cluster_scan(
         self,
         db: Session,
@@ -8,6 +8,7 @@ import logging
 import threading
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from time import monotonic
 from typing import Any, Dict, List, Optional, Tuple
@@ -15,6 +16,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.config.database import SessionLocal
+from app.config.settings import settings
 from app.models.cluster import Cluster
 from app.models.test_table_task import TestTableTask as TestTableTaskModel
 from app.models.test_table_task_log import TestTableTaskLog
@@ -25,7 +27,10 @@ from app.schemas.test_table import (
     TestTableVerifyRequest,
     TestTableVerifyResult,
 )
+from app.services.job_executor import JobQueueFullError, get_job_executor
+from app.services.scan_service import _sanitize_log_text
 from app.services.websocket_service import websocket_manager
+from app.utils.webhdfs_client import WebHDFSClientPool
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +65,7 @@ class TestTableService:
         entry = TestTableTaskLog(
             task_id=task_id,
             log_level=level.upper(),
-            message=str(message),
+            message=_sanitize_log_text(str(message)),
             phase=phase,
             details=normalized_details,
             progress_percentage=progress,
@@ -88,7 +93,7 @@ class TestTableService:
             return True
         return False
 
-    async def create_test_table(
+    def create_test_table(
         self, request: TestTableCreateRequest, db: Session
     ) -> TestTableTask:
         """创建测试表"""
@@ -119,8 +124,15 @@ class TestTableService:
                 self._execute_create_task(task_id, request.cluster_id, force_recreate)
             )
 
-        thread = threading.Thread(target=run_task, daemon=True)
-        thread.start()
+        try:
+            get_job_executor().submit(
+                "test_table", run_task, name=f"test_table:{task_id}"
+            )
+        except JobQueueFullError as e:
+            db_task.status = "failed"
+            db_task.error_message = str(e)
+            db.commit()
+            raise
 
         return TestTableTask(**db_task.to_dict())
 
@@ -627,8 +639,17 @@ class TestTableService:
         hdfs_client,
         config_dict,
         total_files: int,
+        cluster: Optional[Cluster] = None,
     ) -> tuple[int, int, List[Dict[str, Any]]]:
-        """生成数据文件，并返回成功/失败统计."""
+        """
+        生成数据文件，并返回成功/失败统计
+        写入在线程池中并发执行（不阻塞事件循环），多个分区同时写入：
+        - 总并发由 TEST_TABLE_WRITE_CONCURRENCY 限制，同时写入的分区数由
+          TEST_TABLE_PARTITION_CONCURRENCY 限制
+        - 传入 cluster 时各线程从 WebHDFSClientPool 借用客户端，否则共用 hdfs_client
+        - 文件内容只编码一次，所有写入共用同一个 bytes 缓冲
+        进度、日志与数据库提交只在事件循环线程中进行
+        """
 
         hdfs_base_path = config_dict.get(
             "hdfs_base_path", "/user/test/small_files_test"
@@ -638,9 +659,14 @@ class TestTableService:
         file_size_kb = config_dict.get("file_size_kb", 50)
 
         content_size_bytes = file_size_kb * 1024
-        sample_line = "test_data_row_with_some_content_to_reach_target_size\n"
-        lines_needed = max(1, content_size_bytes // len(sample_line.encode("utf-8")))
-        file_content = sample_line * lines_needed
+        sample_line = b"test_data_row_with_some_content_to_reach_target_size\n"
+        lines_needed = max(1, content_size_bytes // len(sample_line))
+        payload = sample_line * lines_needed
+
+        write_concurrency = max(1, settings.TEST_TABLE_WRITE_CONCURRENCY)
+        partition_semaphore = asyncio.Semaphore(
+            max(1, settings.TEST_TABLE_PARTITION_CONCURRENCY)
+        )
 
         files_created = 0
         files_failed = 0
@@ -648,51 +674,79 @@ class TestTableService:
         progress_start = 65.0
         progress_span = 25.0
 
-        for partition_id in range(partition_count):
+        client_pool = (
+            WebHDFSClientPool(cluster, size=write_concurrency)
+            if cluster is not None and write_concurrency > 1
+            else None
+        )
+
+        def write_one(file_path: str) -> Tuple[bool, str]:
+            if client_pool is None:
+                return hdfs_client.write_file(file_path, payload)
+            with client_pool.client() as pooled_client:
+                return pooled_client.write_file(file_path, payload)
+
+        async def report_progress(partition_value: str) -> None:
+            processed = files_created + files_failed
+            if total_files <= 0 or not self._should_emit_progress(
+                task_id, "data_generation", interval_seconds=3.0
+            ):
+                return
+            phase_ratio = min(1.0, processed / max(1, total_files))
+            task.progress_percentage = progress_start + phase_ratio * progress_span
+            task.current_operation = f"写入数据文件 {processed}/{total_files}"
+            db.commit()
+            await self._broadcast_task_update_from_db(task)
+            self._log_task_event(
+                db,
+                task_id,
+                "INFO",
+                "数据文件生成进度更新",
+                phase="data_generation",
+                details={
+                    "processed_files": processed,
+                    "total_files": total_files,
+                    "current_partition": partition_value,
+                },
+                progress=task.progress_percentage,
+            )
+
+        async def write_partition(partition_id: int, executor) -> None:
+            nonlocal files_created, files_failed
             partition_value = f"partition_{partition_id:04d}"
             partition_dir = f"{hdfs_base_path}/{partition_value}"
+            loop = asyncio.get_running_loop()
 
-            created_in_partition = 0
-            failed_in_partition: List[Dict[str, Any]] = []
+            async with partition_semaphore:
+                created_in_partition = 0
+                failed_in_partition: List[Dict[str, Any]] = []
 
-            for file_id in range(files_per_partition):
-                file_path = f"{partition_dir}/data_{file_id:06d}.txt"
-                try:
-                    hdfs_client.write_file(file_path, file_content.encode("utf-8"))
-                    files_created += 1
-                    created_in_partition += 1
-                except Exception as e:
-                    files_failed += 1
-                    error_entry = {"file": file_path, "error": str(e)}
-                    failed_in_partition.append(error_entry)
-                    if len(failure_samples) < 20:
-                        failure_samples.append(error_entry)
-                    logger.warning(f"Failed to create file {file_path}: {e}")
-
-                processed = files_created + files_failed
-                if total_files > 0 and self._should_emit_progress(
-                    task_id, "data_generation", interval_seconds=3.0
-                ):
-                    phase_ratio = min(1.0, processed / max(1, total_files))
-                    task.progress_percentage = (
-                        progress_start + phase_ratio * progress_span
-                    )
-                    task.current_operation = f"写入数据文件 {processed}/{total_files}"
-                    db.commit()
-                    await self._broadcast_task_update_from_db(task)
-                    self._log_task_event(
-                        db,
-                        task_id,
-                        "INFO",
-                        "数据文件生成进度更新",
-                        phase="data_generation",
-                        details={
-                            "processed_files": processed,
-                            "total_files": total_files,
-                            "current_partition": partition_value,
-                        },
-                        progress=task.progress_percentage,
-                    )
+                async def write_file(file_path: str):
+                    try:
+                        ok, message = await loop.run_in_executor(
+                            executor, write_one, file_path
+                        )
+                    except Exception as e:
+                        ok, message = False, str(e)
+                    return file_path, ok, message
+
+                pending = [
+                    write_file(f"{partition_dir}/data_{file_id:06d}.txt")
+                    for file_id in range(files_per_partition)
+                ]
+                for next_done in asyncio.as_completed(pending):
+                    file_path, ok, message = await next_done
+                    if ok:
+                        files_created += 1
+                        created_in_partition += 1
+                    else:
+                        files_failed += 1
+                        error_entry = {"file": file_path, "error": message}
+                        failed_in_partition.append(error_entry)
+                        if len(failure_samples) < 20:
+                            failure_samples.append(error_entry)
+                        logger.warning(f"Failed to create file {file_path}: {message}")
+                    await report_progress(partition_value)
 
             level = "WARN" if failed_in_partition else "INFO"
             self._log_task_event(
@@ -709,6 +763,20 @@ class TestTableService:
                 },
             )
 
+        try:
+            with ThreadPoolExecutor(
+                max_workers=write_concurrency, thread_name_prefix="test-table-write"
+            ) as executor:
+                await asyncio.gather(
+                    *(
+                        write_partition(partition_id, executor)
+                        for partition_id in range(partition_count)
+                    )
+                )
+        finally:
+            if client_pool is not None:
+                client_pool.close()
+
         return files_created, files_failed, failure_samples
 
     async def _create_hive_table(self, hive_conn, config_dict):
@@ -1046,7 +1114,7 @@ class TestTableService:
             return TestTableTask(**db_task.to_dict())
         return None
 
-    async def delete_test_table(
+    def delete_test_table(
         self, request: TestTableDeleteRequest, db: Session
     ) -> Dict[str, str]:
         """删除测试表"""
@@ -1147,7 +1215,7 @@ class TestTableService:
             logger.error(f"删除测试表失败: {str(e)}")
             return {"message": "错误", "error": str(e)}
 
-    async def verify_test_table(
+    def verify_test_table(
         self, request: TestTableVerifyRequest, db: Session
     ) -> TestTableVerifyResult:
         """验证测试表"""
@@ -3,17 +3,41 @@ WebSocket 实时推送服务
 负责向前端推送集群状态变更、连接测试结果等实时数据
 """
 
+import asyncio
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 from fastapi import WebSocket
 
+from app.config.settings import settings
+from app.utils.redis_client import get_redis_client
+
 logger = logging.getLogger(__name__)
 
 
+# 任务级主题: 每个任务独立的进度/日志推送通道
+def scan_progress_topic(task_id: str) -> str:
+    return f"scan_progress:{task_id}"
+
+
+def scan_logs_topic(task_id: str) -> str:
+    return f"scan_logs:{task_id}"
+
+
+def task_progress_topic(task_id: Any) -> str:
+    return f"task_progress:{task_id}"
+
+
+def task_logs_topic(task_id: Any) -> str:
+    return f"task_logs:{task_id}"
+
+
 @dataclass
 class WebSocketMessage:
     """WebSocket消息结构"""
@@ -21,36 +45,295 @@ class WebSocketMessage:
     type: str  # connection_status, cluster_stats, health_update, scan_progress, task_update
     data: Dict[str, Any]
     timestamp: str = None
+    topic: Optional[str] = None  # 发布到任务级主题时携带
+    offset: Optional[int] = None  # 主题内单调递增序号,用于断线重放
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now().isoformat()
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"type": self.type, "data": self.data, "timestamp": self.timestamp}
+        payload = {"type": self.type, "data": self.data, "timestamp": self.timestamp}
+        if self.topic is not None:
+            payload["topic"] = self.topic
+        if self.offset is not None:
+            payload["offset"] = self.offset
+        return payload
+
+
+class _TopicState:
+    """单个主题的合并发送状态与重放缓冲"""
+
+    __slots__ = (
+        "pending_type",
+        "latest",
+        "entries",
+        "last_flush",
+        "scheduled",
+        "offset",
+        "history",
+    )
+
+    def __init__(self, history_size: int):
+        self.pending_type: Optional[str] = None
+        self.latest: Optional[Dict[str, Any]] = None
+        self.entries: List[Dict[str, Any]] = []
+        self.last_flush = 0.0
+        self.scheduled = False
+        self.offset = 0
+        self.history: Deque[WebSocketMessage] = deque(maxlen=history_size)
+
+
+class RedisTopicBridge:
+    """基于Redis pub/sub的跨进程主题转发
+
+    任意进程(API worker / Celery worker)把主题消息发布到 Redis 频道,
+    每个 API worker 的监听线程订阅全部频道并转发给本进程的 WebSocket 连接。
+    任务级主题的 offset 由 Redis INCR 分配,重放缓冲保存在 Redis 列表中,
+    因此断线重连到任意 API worker 都能按 offset 补齐消息。
+    """
+
+    CHANNEL_PREFIX = "hsfp:ws:topic:"
+    OFFSET_PREFIX = "hsfp:ws:offset:"
+    HISTORY_PREFIX = "hsfp:ws:history:"
+
+    def __init__(
+        self, client, history_size: int = 500, history_ttl_seconds: int = 86400
+    ):
+        self.client = client
+        self.history_size = history_size
+        self.history_ttl_seconds = history_ttl_seconds
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # 监听线程完成频道订阅后置位,断线重连期间清除
+        self._subscribed = threading.Event()
+
+    @classmethod
+    def from_settings(cls) -> Optional["RedisTopicBridge"]:
+        """使用共享 Redis 客户端创建转发桥,不可用时返回 None(调用方降级为进程内广播)"""
+        client = get_redis_client()
+        if client is None:
+            return None
+        return cls(client, history_size=settings.WS_REPLAY_BUFFER_SIZE)
+
+    def next_offset(self, topic: str) -> int:
+        return int(self.client.incr(f"{self.OFFSET_PREFIX}{topic}"))
+
+    def publish(self, message: WebSocketMessage):
+        """发布消息;带 offset 的任务级消息同时写入重放缓冲"""
+        payload = json.dumps(message.to_dict(), ensure_ascii=False, default=str)
+        pipe = self.client.pipeline(transaction=False)
+        if message.offset is not None:
+            history_key = f"{self.HISTORY_PREFIX}{message.topic}"
+            pipe.rpush(history_key, payload)
+            pipe.ltrim(history_key, -self.history_size, -1)
+            pipe.expire(history_key, self.history_ttl_seconds)
+            pipe.expire(
+                f"{self.OFFSET_PREFIX}{message.topic}", self.history_ttl_seconds
+            )
+        pipe.publish(f"{self.CHANNEL_PREFIX}{message.topic}", payload)
+        pipe.execute()
+
+    def replay(
+        self, topic: str, from_offset: int
+    ) -> Tuple[List[WebSocketMessage], int, bool]:
+        raw = self.client.lrange(f"{self.HISTORY_PREFIX}{topic}", 0, -1) or []
+        history = [WebSocketMessage(**json.loads(item)) for item in raw]
+        latest = int(self.client.get(f"{self.OFFSET_PREFIX}{topic}") or 0)
+        messages = [m for m in history if (m.offset or 0) > from_offset]
+        oldest = history[0].offset if history else latest + 1
+        gap = from_offset + 1 < oldest and from_offset < latest
+        return messages, latest, gap
+
+    def start_listener(self, on_message: Callable[[WebSocketMessage], None]):
+        """启动订阅线程(每个 API worker 一个),断线后自动重连"""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(
+            target=self._listen, args=(on_message,), name="ws-redis-fanout", daemon=True
+        )
+        self._listener.start()
+
+    @property
+    def listening(self) -> bool:
+        """监听线程是否已订阅频道(发布到Redis的消息能回送到本进程)"""
+        return (
+            self._listener is not None
+            and self._listener.is_alive()
+            and self._subscribed.is_set()
+        )
+
+    def stop(self):
+        self._stop.set()
+
+    def _listen(self, on_message: Callable[[WebSocketMessage], None]):
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+                self._subscribed.set()
+                while not self._stop.is_set():
+                    item = pubsub.get_message(timeout=1.0)
+                    if not item or item.get("type") != "pmessage":
+                        continue
+                    try:
+                        on_message(WebSocketMessage(**json.loads(item["data"])))
+                    except Exception as e:
+                        logger.warning(f"Invalid WebSocket fan-out message: {e}")
+            except Exception as e:
+                self._subscribed.clear()
+                logger.warning(f"Redis WebSocket fan-out listener error: {e}")
+                self._stop.wait(5)
+            finally:
+                self._subscribed.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+class _ConnectionSender:
+    """单个连接的有界发送队列
+
+    广播只负责入队,由每个连接独立的发送协程写出,慢连接只会积压自己的队列:
+    - 携带合并键的消息(任务级进度)在队列中只保留最新一条
+    - 队列已满时丢弃最旧的消息
+    - 单次发送超时或失败时回调 on_failure 断开该连接
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        send: Callable[[WebSocket, WebSocketMessage], Awaitable[None]],
+        on_failure: Callable[[WebSocket, Exception], Awaitable[None]],
+        max_size: int,
+        send_timeout: float,
+    ):
+        self.websocket = websocket
+        self.send = send
+        self.on_failure = on_failure
+        self.max_size = max(1, max_size)
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # 队列元素为 [合并键, 消息],合并时原地替换消息
+        self._queue: Deque[List[Any]] = deque()
+        self._pending: Dict[str, List[Any]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def enqueue(
+        self, message: WebSocketMessage, coalesce_key: Optional[str] = None
+    ) -> bool:
+        """非阻塞入队,返回是否接收(连接已关闭时为False)"""
+        if self.closed:
+            return False
+        if coalesce_key is not None and coalesce_key in self._pending:
+            self._pending[coalesce_key][1] = message
+            self.coalesced += 1
+            return True
+        if len(self._queue) >= self.max_size:
+            self._pop()
+            self.dropped += 1
+        entry = [coalesce_key, message]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = entry
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return True
+
+    def _pop(self) -> WebSocketMessage:
+        key, message = self._queue.popleft()
+        if key is not None:
+            self._pending.pop(key, None)
+        return message
+
+    async def _run(self):
+        while self._queue and not self.closed:
+            message = self._pop()
+            try:
+                await asyncio.wait_for(
+                    self.send(self.websocket, message), self.send_timeout
+                )
+            except Exception as e:
+                self.close()
+                await self.on_failure(self.websocket, e)
+                return
+
+    async def wait_idle(self):
+        """等待当前队列发送完毕"""
+        task = self._task
+        if task is not None and not task.done():
+            await asyncio.wait([task])
+
+    def close(self):
+        self.closed = True
+        self._queue.clear()
+        self._pending.clear()
+        task = self._task
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
 
 
 class WebSocketManager:
     """WebSocket连接管理器"""
 
-    def __init__(self):
+    def __init__(self, fanout_backend: Optional[str] = None):
         # 活跃连接：user_id -> Set[WebSocket]
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # 订阅：user_id -> Set[topic]
         self.subscriptions: Dict[str, Set[str]] = {}
         # 连接元数据
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
+        # 主题索引：topic -> Set[user_id]，广播只遍历该主题的订阅者
+        self.topic_subscribers: Dict[str, Set[str]] = {}
+        # 每个连接的发送队列
+        self._senders: Dict[WebSocket, _ConnectionSender] = {}
+        self.send_queue_size = settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = settings.WS_SEND_TIMEOUT_SECONDS
+
+        # 任务级主题发布: 后台线程调用 publish(),事件循环内按频率合并后广播
+        self.max_updates_per_second = max(1, settings.WS_MAX_UPDATES_PER_SECOND)
+        self.replay_buffer_size = settings.WS_REPLAY_BUFFER_SIZE
+        self.max_tracked_topics = 1000
+        self._topics: "OrderedDict[str, _TopicState]" = OrderedDict()
+        self._publish_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 跨进程转发: "redis"(不可用时降级为进程内) 或 "local"
+        self.fanout_backend = fanout_backend or settings.WS_FANOUT_BACKEND
+        self._bridge: Optional[RedisTopicBridge] = None
+        self._bridge_lock = threading.Lock()
+        # 本进程是否需要监听Redis回送(API worker 启动监听后置位)
+        self._fanout_listening = False
 
     async def connect(self, websocket: WebSocket, user_id: str = "anonymous") -> bool:
         """建立WebSocket连接"""
         try:
             await websocket.accept()
+            # 记录所在事件循环,供后台线程投递推送
+            self._loop = asyncio.get_running_loop()
 
             if user_id not in self.active_connections:
                 self.active_connections[user_id] = set()
                 self.subscriptions[user_id] = set()
 
             self.active_connections[user_id].add(websocket)
+            self._senders[websocket] = _ConnectionSender(
+                websocket,
+                lambda ws, msg: self._send_to_websocket(ws, msg),
+                self._on_send_failure,
+                self.send_queue_size,
+                self.send_timeout,
+            )
             self.connection_metadata[websocket] = {
                 "user_id": user_id,
                 "connected_at": datetime.now().isoformat(),
@@ -91,12 +374,17 @@ class WebSocketManager:
             metadata = self.connection_metadata.get(websocket, {})
             user_id = metadata.get("user_id", "unknown")
 
+            sender = self._senders.pop(websocket, None)
+            if sender is not None:
+                sender.close()
+
             # 清理连接
             if user_id in self.active_connections:
                 self.active_connections[user_id].discard(websocket)
                 if not self.active_connections[user_id]:
                     del self.active_connections[user_id]
-                    del self.subscriptions[user_id]
+                    topics = self.subscriptions.pop(user_id, set())
+                    self._unindex_topics(user_id, topics)
 
             self.connection_metadata.pop(websocket, None)
 
@@ -111,33 +399,283 @@ class WebSocketManager:
         """订阅指定主题"""
         if user_id in self.subscriptions:
             self.subscriptions[user_id].update(topics)
+            for topic in topics:
+                self.topic_subscribers.setdefault(topic, set()).add(user_id)
             logger.info(f"User {user_id} subscribed to topics: {topics}")
 
     async def unsubscribe(self, user_id: str, topics: List[str]):
         """取消订阅指定主题"""
         if user_id in self.subscriptions:
-            self.subscriptions[user_id] -= set(topics)
+            removed = self.subscriptions[user_id] & set(topics)
+            self.subscriptions[user_id] -= removed
+            self._unindex_topics(user_id, removed)
             logger.info(f"User {user_id} unsubscribed from topics: {topics}")
 
+    def _unindex_topics(self, user_id: str, topics: Set[str]):
+        for topic in topics:
+            subscribers = self.topic_subscribers.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(user_id)
+            if not subscribers:
+                del self.topic_subscribers[topic]
+
     async def broadcast_to_topic(self, topic: str, message: WebSocketMessage):
-        """向订阅了指定主题的所有用户广播消息"""
-        sent_count = 0
-        failed_count = 0
+        """向订阅了指定主题的所有连接广播消息
+
+        只投递到各连接的发送队列即返回,由各连接的发送协程并发写出,
+        慢连接或失效连接不会阻塞其他订阅者。
+        """
+        user_ids = self.topic_subscribers.get(topic)
+        if not user_ids:
+            return
+
+        coalesce_key = self._coalesce_key(topic, message)
+        queued_count = 0
+        for user_id in list(user_ids):
+            for websocket in self.active_connections.get(user_id, ()):
+                sender = self._senders.get(websocket)
+                if sender is not None and sender.enqueue(message, coalesce_key):
+                    queued_count += 1
+
+        logger.debug(f"Broadcast to topic '{topic}': queued={queued_count}")
+
+    @staticmethod
+    def _coalesce_key(topic: str, message: WebSocketMessage) -> Optional[str]:
+        """任务级主题的进度类消息(非日志批量)只需保留最新一条"""
+        if message.offset is None or "entries" in message.data:
+            return None
+        return f"{topic}|{message.type}"
+
+    async def _on_send_failure(self, websocket: WebSocket, error: Exception):
+        user_id = self.connection_metadata.get(websocket, {}).get("user_id")
+        logger.warning(f"Failed to send message to {user_id}: {error!r}")
+        await self.disconnect(websocket)
+
+    async def wait_for_pending_sends(self):
+        """等待所有连接的发送队列清空(关闭前或测试中使用)"""
+        await asyncio.gather(
+            *(sender.wait_idle() for sender in list(self._senders.values()))
+        )
 
-        # Iterate over a snapshot to avoid mutation during disconnect()
-        for user_id, subscribed_topics in list(self.subscriptions.items()):
-            if topic in subscribed_topics and user_id in self.active_connections:
-                for websocket in self.active_connections[user_id].copy():
-                    try:
-                        await self._send_to_websocket(websocket, message)
-                        sent_count += 1
-                    except Exception as e:
-                        logger.warning(f"Failed to send message to {user_id}: {e}")
-                        await self.disconnect(websocket)
-                        failed_count += 1
+    def publish(
+        self,
+        topic: str,
+        message_type: str,
+        data: Dict[str, Any],
+        append: bool = False,
+    ):
+        """发布任务级主题消息(线程安全,可在扫描/合并后台线程中调用)
+
+        同一主题每秒最多推送 max_updates_per_second 次:
+        - append=False(进度): 窗口内只保留最新一条
+        - append=True(日志): 窗口内累积为一条 {"entries": [...]} 批量消息
+        每条推送消息分配主题内递增 offset 并进入重放缓冲。
+        """
+        with self._publish_lock:
+            state = self._get_topic_state(topic)
+            state.pending_type = message_type
+            if append:
+                state.entries.append(data)
+                # 无事件循环消费时避免无限堆积
+                if len(state.entries) > self.replay_buffer_size:
+                    del state.entries[: -self.replay_buffer_size]
+            else:
+                state.latest = data
+            if state.scheduled:
+                return
+            state.scheduled = True
+            delay = max(
+                0.0,
+                state.last_flush + 1.0 / self.max_updates_per_second - time.monotonic(),
+            )
+
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                loop.call_soon_threadsafe(self._schedule_flush, topic, delay)
+                return
+            except RuntimeError:
+                pass
+        # 当前进程没有WebSocket事件循环(如Celery worker): 经Redis转发,同样按频率合并
+        if delay > 0 and self._get_bridge() is not None:
+            timer = threading.Timer(delay, self._forward_topic, args=(topic,))
+            timer.daemon = True
+            timer.start()
+            return
+        self._forward_topic(topic)
+
+    def replay(
+        self, topic: str, from_offset: int
+    ) -> Tuple[List[WebSocketMessage], int, bool]:
+        """返回主题内 offset 大于 from_offset 的已推送消息
+
+        Returns:
+            (消息列表, 当前最新offset, 是否存在缺口(缓冲已淘汰所需消息))
+        """
+        bridge = self._get_bridge()
+        if bridge is not None:
+            try:
+                return bridge.replay(topic, from_offset)
+            except Exception as e:
+                logger.warning(f"Redis replay failed, using local buffer: {e}")
+
+        with self._publish_lock:
+            state = self._topics.get(topic)
+            if state is None:
+                return [], 0, from_offset > 0
+            messages = [m for m in state.history if m.offset > from_offset]
+            oldest = state.history[0].offset if state.history else state.offset + 1
+            gap = from_offset + 1 < oldest and from_offset < state.offset
+            return messages, state.offset, gap
+
+    def _get_topic_state(self, topic: str) -> _TopicState:
+        state = self._topics.get(topic)
+        if state is None:
+            state = _TopicState(self.replay_buffer_size)
+            self._topics[topic] = state
+            # 只跟踪最近活跃的主题,淘汰最久未发布的
+            while len(self._topics) > self.max_tracked_topics:
+                self._topics.popitem(last=False)
+        else:
+            self._topics.move_to_end(topic)
+        return state
+
+    def _schedule_flush(self, topic: str, delay: float):
+        loop = asyncio.get_running_loop()
+        loop.call_later(delay, lambda: asyncio.ensure_future(self._flush_topic(topic)))
+
+    def _drain_topic(
+        self, topic: str, bridge: Optional[RedisTopicBridge] = None
+    ) -> Optional[WebSocketMessage]:
+        """取出主题待发送内容,生成带 offset 的消息并写入重放缓冲"""
+        with self._publish_lock:
+            state = self._topics.get(topic)
+            if state is None:
+                return None
+            state.scheduled = False
+            state.last_flush = time.monotonic()
+            if state.entries:
+                data: Optional[Dict[str, Any]] = {"entries": state.entries}
+                state.entries = []
+            else:
+                data = state.latest
+            state.latest = None
+            message_type = state.pending_type or "topic_update"
+        if data is None:
+            return None
+
+        # 有Redis时使用全局 offset,保证跨进程单调递增
+        offset = None
+        if bridge is not None:
+            try:
+                offset = bridge.next_offset(topic)
+            except Exception as e:
+                logger.warning(f"Failed to allocate Redis offset for {topic}: {e}")
 
-        logger.debug(
-            f"Broadcast to topic '{topic}': sent={sent_count}, failed={failed_count}"
+        with self._publish_lock:
+            state = self._get_topic_state(topic)
+            state.offset = offset if offset is not None else state.offset + 1
+            message = WebSocketMessage(
+                type=message_type, data=data, topic=topic, offset=state.offset
+            )
+            state.history.append(message)
+        return message
+
+    def _forward_topic(self, topic: str) -> Tuple[Optional[WebSocketMessage], bool]:
+        """生成主题消息并尝试经Redis发布,返回 (消息, 是否已交给Redis转发)"""
+        bridge = self._get_bridge()
+        message = self._drain_topic(topic, bridge)
+        if message is None or bridge is None:
+            return message, False
+        try:
+            bridge.publish(message)
+            return message, True
+        except Exception as e:
+            logger.warning(f"Redis fan-out publish failed for {topic}: {e}")
+            return message, False
+
+    async def _flush_topic(self, topic: str):
+        loop = asyncio.get_running_loop()
+        # Redis 调用放到线程池,避免阻塞事件循环
+        message, published = await loop.run_in_executor(
+            None, self._forward_topic, topic
+        )
+        # 已发布到Redis且监听线程在线时由监听线程统一回送,避免重复推送;
+        # 否则本进程直接广播,避免消息丢失
+        if message is not None and not self._delivered_remotely(published):
+            await self.broadcast_to_topic(topic, message)
+
+    async def fanout(self, topic: str, message: WebSocketMessage):
+        """向所有进程中订阅了该主题的连接广播(无Redis时仅本进程)"""
+        bridge = self._get_bridge()
+        if bridge is not None:
+            message.topic = topic
+            try:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, bridge.publish, message)
+                if self._delivered_remotely(True):
+                    return
+            except Exception as e:
+                logger.warning(f"Redis fan-out publish failed for {topic}: {e}")
+        await self.broadcast_to_topic(topic, message)
+
+    def _delivered_remotely(self, published: bool) -> bool:
+        """消息已发布到Redis且本进程监听线程在线,会经监听回送给本进程连接"""
+        bridge = self._bridge
+        return published and bridge is not None and bridge.listening
+
+    def _get_bridge(self) -> Optional[RedisTopicBridge]:
+        """按需建立Redis转发;连接失败后按共享客户端的重试间隔再尝试"""
+        if self._bridge is not None or self.fanout_backend != "redis":
+            return self._bridge
+        with self._bridge_lock:
+            if self._bridge is None:
+                self._bridge = RedisTopicBridge.from_settings()
+                if self._bridge is not None:
+                    # 启动时Redis不可用、之后才连上: 补启监听线程
+                    self._start_bridge_listener(self._bridge)
+        return self._bridge
+
+    def attach_bridge(self, bridge: Optional[RedisTopicBridge]):
+        """显式设置转发桥(测试或自定义部署使用)"""
+        self._bridge = bridge
+        if bridge is not None:
+            self._start_bridge_listener(bridge)
+
+    def _start_bridge_listener(self, bridge: RedisTopicBridge):
+        if not self._fanout_listening:
+            return
+        bridge.start_listener(self._on_remote_message)
+        logger.info("WebSocket Redis fan-out listener started")
+
+    async def start_fanout_listener(self) -> bool:
+        """在API worker启动时调用: 订阅Redis频道并转发给本进程连接
+
+        Redis 暂不可用时返回 False,之后 _get_bridge() 重连成功会自动启动监听。
+        """
+        self._loop = asyncio.get_running_loop()
+        self._fanout_listening = True
+        bridge = await self._loop.run_in_executor(None, self._get_bridge)
+        if bridge is None:
+            return False
+        self._start_bridge_listener(bridge)
+        return True
+
+    def stop_fanout_listener(self):
+        self._fanout_listening = False
+        if self._bridge is not None:
+            self._bridge.stop()
+
+    def _on_remote_message(self, message: WebSocketMessage):
+        """监听线程回调: 切回事件循环向本进程连接广播"""
+        loop = self._loop
+        if loop is None or not loop.is_running() or not message.topic:
+            return
+        loop.call_soon_threadsafe(
+            lambda: asyncio.ensure_future(
+                self.broadcast_to_topic(message.topic, message)
+            )
         )
 
     async def broadcast_to_group(self, group_name: str, message: dict):
@@ -183,16 +721,19 @@ class WebSocketManager:
         total_connections = self._get_total_connections()
         total_users = len(self.active_connections)
 
-        topic_stats = {}
-        for user_id, topics in self.subscriptions.items():
-            for topic in topics:
-                topic_stats[topic] = topic_stats.get(topic, 0) + 1
+        topic_stats = {
+            topic: len(user_ids) for topic, user_ids in self.topic_subscribers.items()
+        }
+        senders = list(self._senders.values())
 
         return {
             "total_connections": total_connections,
             "total_users": total_users,
             "topic_subscriptions": topic_stats,
             "avg_connections_per_user": total_connections / max(total_users, 1),
+            "queued_messages": sum(sender.queued for sender in senders),
+            "dropped_messages": sum(sender.dropped for sender in senders),
+            "coalesced_messages": sum(sender.coalesced for sender in senders),
         }
 
 
@@ -216,7 +757,7 @@ class RealTimeNotificationService:
                 "suggestions": connection_results.get("suggestions", []),
             },
         )
-        await self.ws_manager.broadcast_to_topic("cluster_status", message)
+        await self.ws_manager.fanout("cluster_status", message)
 
     async def notify_health_check_completed(
         self, cluster_id: int, health_status: str, details: Optional[Dict] = None
@@ -231,7 +772,7 @@ class RealTimeNotificationService:
                 "check_time": datetime.now().isoformat(),
             },
         )
-        await self.ws_manager.broadcast_to_topic("health_check", message)
+        await self.ws_manager.fanout("health_check", message)
 
     async def notify_scan_progress(
         self,
@@ -250,7 +791,7 @@ class RealTimeNotificationService:
                 "current_table": current_table,
             },
         )
-        await self.ws_manager.broadcast_to_topic("scan_progress", message)
+        await self.ws_manager.fanout("scan_progress", message)
 
     async def notify_task_status_changed(
         self, task_id: int, task_type: str, new_status: str, progress: float = None
@@ -265,7 +806,7 @@ class RealTimeNotificationService:
                 "progress": progress,
             },
         )
-        await self.ws_manager.broadcast_to_topic("task_updates", message)
+        await self.ws_manager.fanout("task_updates", message)
 
     async def notify_cluster_stats_updated(
         self, cluster_id: int, stats: Dict[str, Any]
@@ -279,7 +820,7 @@ class RealTimeNotificationService:
                 "updated_at": datetime.now().isoformat(),
             },
         )
-        await self.ws_manager.broadcast_to_topic("cluster_status", message)
+        await self.ws_manager.fanout("cluster_status", message)
 
 
 # 全局实例
@@ -0,0 +1,104 @@
+"""
+归档/恢复文件移动报告
+
+RENAME 之后默认只用 GETCONTENTSUMMARY 汇总文件数与字节数，不再列出全部文件；
+需要逐文件记录时以 JSON Lines 流式写入清单文件，响应体与内存占用不随文件数增长。
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.config.settings import settings
+from app.utils.webhdfs_client import WebHDFSClient
+
+logger = logging.getLogger(__name__)
+
+REPORT_MODES = ("summary", "full")
+
+
+def _manifest_path(manifest_dir: str, target_path: str) -> str:
+    name = re.sub(r"[^\w.=-]+", "_", target_path.strip("/")) or "root"
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    return os.path.join(manifest_dir, f"{name}-{timestamp}.jsonl")
+
+
+def build_move_report(
+    hdfs_client: WebHDFSClient,
+    source_path: str,
+    target_path: str,
+    source_key: str = "source",
+    target_key: str = "target",
+    mode: Optional[str] = None,
+    manifest_dir: Optional[str] = None,
+) -> Dict:
+    """
+    生成目录移动后的文件报告
+    Args:
+        hdfs_client: WebHDFS客户端
+        source_path: 移动前目录
+        target_path: 移动后目录
+        source_key/target_key: 逐文件记录中两个路径的键名
+        mode: summary（仅汇总）或 full（响应中包含逐文件列表），默认 ARCHIVE_FILE_REPORT
+        manifest_dir: 清单文件目录，默认 ARCHIVE_MANIFEST_DIR，为空则不写清单
+    Returns:
+        {"file_count", "directory_count", "total_bytes", "files", "manifest_path"}
+    """
+    mode = (mode or settings.ARCHIVE_FILE_REPORT or "summary").lower()
+    if mode not in REPORT_MODES:
+        raise ValueError(f"不支持的归档文件报告模式: {mode}")
+    if manifest_dir is None:
+        manifest_dir = settings.ARCHIVE_MANIFEST_DIR
+
+    report = {
+        "file_count": 0,
+        "directory_count": 0,
+        "total_bytes": 0,
+        "files": [],
+        "manifest_path": None,
+    }
+
+    if mode == "summary" and not manifest_dir:
+        summary = hdfs_client.get_content_summary(target_path)
+        if summary.get("success"):
+            content = summary["content_summary"]
+            report["file_count"] = content.get("fileCount", 0)
+            # directoryCount 包含目录自身
+            report["directory_count"] = max(content.get("directoryCount", 1) - 1, 0)
+            report["total_bytes"] = content.get("length", 0)
+            return report
+        logger.warning(
+            f"GETCONTENTSUMMARY 失败，改为分页统计 {target_path}: {summary.get('error')}"
+        )
+
+    manifest = None
+    if manifest_dir:
+        os.makedirs(manifest_dir, exist_ok=True)
+        report["manifest_path"] = _manifest_path(manifest_dir, target_path)
+        manifest = open(report["manifest_path"], "w", encoding="utf-8")
+    try:
+        for file_info in hdfs_client.iter_directory(target_path, recursive=True):
+            if file_info.is_directory:
+                report["directory_count"] += 1
+                continue
+            report["file_count"] += 1
+            report["total_bytes"] += file_info.size
+            if manifest is None and mode != "full":
+                continue
+            relative_path = os.path.relpath(file_info.path, target_path)
+            record = {
+                source_key: os.path.join(source_path, relative_path).replace("\\", "/"),
+                target_key: file_info.path,
+                "size": file_info.size,
+            }
+            if manifest is not None:
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if mode == "full":
+                report["files"].append(record)
+    finally:
+        if manifest is not None:
+            manifest.close()
+    return report
@@ -0,0 +1,328 @@
+"""
+HiveServer2 连接池
+合并引擎及其校验/元数据/原子交换等辅助类原先各自新建 PyHive 连接，一次合并内要重复多次
+SASL/Kerberos 握手。连接池按连接参数（即集群 + 库 + 认证信息）复用连接：
+- 借出的是 PooledHiveConnection，调用方沿用 cursor()/close() 写法，close() 即归还
+- 会话中执行过 SET/USE 等语句时归还前执行 RESET 并切回原库，避免状态泄漏给下一个借用者
+- 空闲超过阈值的连接借出前用 SELECT 1 检查存活，超过最大生命周期的连接直接关闭
+- 借出/归还/新建/复用/丢弃均计入 metrics，stats() 返回每个池的当前状态
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.utils.metrics import increment_hive_pool_event
+
+logger = logging.getLogger(__name__)
+
+# 会改变会话配置、归还前需要 RESET 的语句前缀
+_SESSION_STATE_PREFIXES = (
+    "SET",
+    "RESET",
+    "USE",
+    "ADD",
+    "DELETE JAR",
+    "DELETE FILE",
+    "DELETE ARCHIVE",
+)
+# 会话级临时对象无法 RESET 清除，这类连接归还时直接关闭
+_TEMPORARY_OBJECT_PREFIXES = ("CREATE TEMPORARY",)
+
+
+def _statement_prefix(operation: str) -> str:
+    return " ".join(str(operation).strip().split()[:2]).upper()
+
+
+class _TrackedCursor:
+    """记录会话级语句与执行异常的游标包装"""
+
+    def __init__(self, owner: "PooledHiveConnection", cursor):
+        self._owner = owner
+        self._cursor = cursor
+        self.closed = False
+
+    def execute(self, operation, *args, **kwargs):
+        prefix = _statement_prefix(operation)
+        if prefix.startswith(_SESSION_STATE_PREFIXES):
+            self._owner.session_dirty = True
+        elif prefix.startswith(_TEMPORARY_OBJECT_PREFIXES):
+            self._owner.reusable = False
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        except Exception:
+            self._owner.failed = True
+            raise
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class PooledHiveConnection:
+    """从连接池借出的 HS2 连接；close() 归还连接池而不是断开"""
+
+    def __init__(self, pool: "HiveConnectionPool", key: Tuple, connection, params):
+        self.connection = connection
+        self._pool = pool
+        self._key = key
+        self._params = params
+        self._cursors: List[_TrackedCursor] = []
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.session_dirty = False
+        self.failed = False
+        self.reusable = True
+        self.checked_out = False
+
+    @property
+    def database(self) -> str:
+        return self._params.get("database") or "default"
+
+    def cursor(self, *args, **kwargs) -> _TrackedCursor:
+        cursor = _TrackedCursor(self, self.connection.cursor(*args, **kwargs))
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self) -> None:
+        if self.checked_out:
+            self._pool._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.failed = True
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    # ---- 连接池内部使用 ----
+    def _close_cursors(self) -> None:
+        for cursor in self._cursors:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self._cursors = []
+
+    def _ping(self) -> bool:
+        try:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            logger.debug(f"HS2 pooled connection ping failed: {e}")
+            return False
+
+    def _reset_session(self) -> bool:
+        """RESET 会话配置并切回原库，再补回建连时传入的 configuration"""
+        try:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("RESET")
+                cursor.execute(f"USE `{self.database}`")
+                for key, value in (self._params.get("configuration") or {}).items():
+                    cursor.execute(f"SET {key}={value}")
+            finally:
+                cursor.close()
+            self.session_dirty = False
+            return True
+        except Exception as e:
+            logger.debug(f"HS2 pooled connection session reset failed: {e}")
+            return False
+
+    def _disconnect(self) -> None:
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class HiveConnectionPool:
+    """按连接参数分组的 HS2 连接池（线程安全；借出数量不设上限，只限制空闲数量）"""
+
+    def __init__(
+        self,
+        max_idle_per_key: Optional[int] = None,
+        max_lifetime_seconds: Optional[float] = None,
+        idle_timeout_seconds: Optional[float] = None,
+        validate_after_idle_seconds: Optional[float] = None,
+    ):
+        self.max_idle_per_key = (
+            settings.HIVE_POOL_MAX_IDLE_PER_KEY
+            if max_idle_per_key is None
+            else max_idle_per_key
+        )
+        self.max_lifetime_seconds = (
+            settings.HIVE_POOL_MAX_LIFETIME_SECONDS
+            if max_lifetime_seconds is None
+            else max_lifetime_seconds
+        )
+        self.idle_timeout_seconds = (
+            settings.HIVE_POOL_IDLE_TIMEOUT_SECONDS
+            if idle_timeout_seconds is None
+            else idle_timeout_seconds
+        )
+        self.validate_after_idle_seconds = (
+            settings.HIVE_POOL_VALIDATE_AFTER_IDLE_SECONDS
+            if validate_after_idle_seconds is None
+            else validate_after_idle_seconds
+        )
+        self._idle: Dict[Tuple, List[PooledHiveConnection]] = {}
+        self._labels: Dict[Tuple, str] = {}
+        self._checked_out: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pool_key(factory: Callable, params: Dict[str, Any]) -> Tuple[Tuple, str]:
+        """连接参数（含认证信息）决定能否复用；密码只参与摘要，不出现在标签里"""
+        digest = hashlib.sha1(
+            repr(sorted(params.items(), key=lambda kv: kv[0])).encode("utf-8")
+        ).hexdigest()
+        label = (
+            f"{params.get('username') or ''}@{params.get('host')}:"
+            f"{params.get('port')}/{params.get('database') or 'default'}"
+        )
+        return (factory, digest), label
+
+    def connect(self, factory: Callable, **params) -> Any:
+        """
+        借出连接：优先复用空闲连接，没有可用连接时调用 factory(**params) 新建
+        Args:
+            factory: 建连函数（通常为 pyhive.hive.Connection）
+            params: 建连参数
+        Returns:
+            PooledHiveConnection；连接池关闭时直接返回新建的原始连接
+        """
+        if not settings.HIVE_POOL_ENABLED:
+            return factory(**params)
+
+        key, label = self._pool_key(factory, params)
+        increment_hive_pool_event("borrow")
+        while True:
+            with self._lock:
+                self._labels[key] = label
+                idle = self._idle.get(key)
+                pooled = idle.pop() if idle else None
+            if pooled is None:
+                break
+            now = time.monotonic()
+            if self._expired(pooled, now):
+                self._discard(pooled, "expired")
+                continue
+            if now - pooled.last_used_at >= self.validate_after_idle_seconds:
+                if not pooled._ping():
+                    self._discard(pooled, "validation_failed")
+                    continue
+            increment_hive_pool_event("reused")
+            return self._checkout(pooled)
+
+        started = time.monotonic()
+        connection = factory(**params)
+        increment_hive_pool_event("created")
+        logger.debug(
+            f"Opened HS2 connection {label} in {time.monotonic() - started:.3f}s"
+        )
+        return self._checkout(PooledHiveConnection(self, key, connection, params))
+
+    def _checkout(self, pooled: PooledHiveConnection) -> PooledHiveConnection:
+        pooled.checked_out = True
+        pooled.failed = False
+        with self._lock:
+            self._checked_out[pooled._key] += 1
+        return pooled
+
+    def _release(self, pooled: PooledHiveConnection) -> None:
+        pooled.checked_out = False
+        pooled._close_cursors()
+        with self._lock:
+            self._checked_out[pooled._key] -= 1
+        increment_hive_pool_event("return")
+
+        if self._expired(pooled, time.monotonic()):
+            self._discard(pooled, "expired")
+            return
+        if not pooled.reusable:
+            self._discard(pooled, "temporary_objects")
+            return
+        # 执行出错的连接可能已断开，确认存活后才放回
+        if pooled.failed and not pooled._ping():
+            self._discard(pooled, "broken")
+            return
+        if pooled.session_dirty:
+            if not pooled._reset_session():
+                self._discard(pooled, "reset_failed")
+                return
+            increment_hive_pool_event("session_reset")
+
+        pooled.last_used_at = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(pooled._key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append(pooled)
+                return
+        self._discard(pooled, "overflow")
+
+    def _expired(self, pooled: PooledHiveConnection, now: float) -> bool:
+        return (
+            now - pooled.created_at >= self.max_lifetime_seconds
+            or now - pooled.last_used_at >= self.idle_timeout_seconds
+        )
+
+    def _discard(self, pooled: PooledHiveConnection, reason: str) -> None:
+        increment_hive_pool_event(f"discarded_{reason}")
+        pooled._disconnect()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """每个池（按标签）的空闲与借出数量"""
+        with self._lock:
+            return {
+                self._labels.get(key, key): {
+                    "idle": len(self._idle.get(key, [])),
+                    "checked_out": self._checked_out.get(key, 0),
+                }
+                for key in set(self._idle) | set(self._checked_out)
+            }
+
+    def close_all(self) -> None:
+        """关闭所有空闲连接（借出中的连接归还时按正常流程处理）"""
+        with self._lock:
+            idle = [
+                pooled for pooled_list in self._idle.values() for pooled in pooled_list
+            ]
+            self._idle.clear()
+        for pooled in idle:
+            self._discard(pooled, "closed")
+
+
+_pool: Optional[HiveConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_hive_connection_pool() -> HiveConnectionPool:
+    """获取全局 HS2 连接池"""
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HiveConnectionPool()
+        return _pool
@@ -0,0 +1,330 @@
+"""
+Kerberos 票据管理
+按 principal + keytab 维护私有票据缓存（krb5cc 文件）：
+- 首次使用时 kinit 一次，之后建立连接直接复用缓存路径，不再每次 fork kinit
+- 通过 klist 解析票据到期时间，后台线程在到期前提前续票
+- 客户端拿到各自的缓存路径（子进程 env / GSSAPI 握手时临时指定），
+  不再修改进程级 KRB5CCNAME，多个集群互不覆盖
+"""
+
+import hashlib
+import logging
+import os
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.utils.kerberos_diagnostics import (
+    KerberosDiagnosticCode,
+    KerberosDiagnosticError,
+    build_diagnostic,
+)
+from app.utils.metrics import increment_ticket_event
+
+logger = logging.getLogger(__name__)
+
+# klist 在不同版本/区域设置下的时间格式
+_KLIST_TIME_FORMATS = (
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%y %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+)
+_KLIST_TIME = re.compile(
+    r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}"
+    r"|\d{1,2}[/.]\d{1,2}[/.]\d{2,4} \d{2}:\d{2}:\d{2})"
+)
+
+# 进程级 KRB5CCNAME 只在 GSSAPI 握手期间临时切换，由该锁串行化
+_environ_lock = threading.RLock()
+
+
+def _parse_klist_time(value: str) -> Optional[datetime]:
+    for fmt in _KLIST_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_klist_expiry(output: str) -> Optional[datetime]:
+    """
+    从 klist 输出中解析 TGT（krbtgt/...）的到期时间
+    Examples:
+        10/19/2026 10:00:00  10/20/2026 10:00:00  krbtgt/EXAMPLE.COM@EXAMPLE.COM
+    Returns:
+        到期时间，未找到TGT时返回None
+    """
+    for line in (output or "").splitlines():
+        if "krbtgt/" not in line:
+            continue
+        times = _KLIST_TIME.findall(line)
+        if len(times) >= 2:
+            return _parse_klist_time(times[1])
+    return None
+
+
+@dataclass
+class KerberosTicket:
+    """一个 principal 的私有票据缓存"""
+
+    principal: str
+    keytab_path: str
+    cache_path: str
+    expires_at: Optional[datetime] = None
+    obtained_at: Optional[datetime] = None
+
+    def needs_renewal(self, now: datetime, margin_seconds: int) -> bool:
+        if self.expires_at is None:
+            return True
+        return now >= self.expires_at - timedelta(seconds=margin_seconds)
+
+
+class KerberosTicketManager:
+    """
+    Kerberos 票据管理器
+    get_cache() 返回可用的票据缓存路径；票据在后台线程中按到期时间续期
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        renew_margin_seconds: Optional[int] = None,
+        check_interval_seconds: Optional[int] = None,
+        timeout: int = 30,
+    ):
+        self.cache_dir = os.path.abspath(
+            os.path.expanduser(cache_dir or settings.KERBEROS_CACHE_DIR)
+        )
+        self.renew_margin_seconds = (
+            settings.KERBEROS_RENEW_MARGIN_SECONDS
+            if renew_margin_seconds is None
+            else renew_margin_seconds
+        )
+        self.check_interval_seconds = (
+            settings.KERBEROS_RENEW_CHECK_SECONDS
+            if check_interval_seconds is None
+            else check_interval_seconds
+        )
+        self.timeout = timeout
+        self._tickets: Dict[Tuple[str, str], KerberosTicket] = {}
+        self._ticket_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._renew_thread: Optional[threading.Thread] = None
+
+    def get_cache(
+        self,
+        principal: str,
+        keytab_path: Optional[str] = None,
+        cache_path: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        获取 principal 的票据缓存路径，必要时先 kinit
+        Args:
+            principal: 完整 principal（含 REALM）
+            keytab_path: keytab 路径，为空时假定外部已准备好票据
+            cache_path: 指定的缓存路径，为空则在 KERBEROS_CACHE_DIR 下按 principal 生成
+        Returns:
+            缓存路径；未提供 keytab 且未指定缓存时返回None（使用系统默认缓存）
+        """
+        if cache_path:
+            cache_path = os.path.expanduser(cache_path)
+        if not keytab_path:
+            logger.debug("未提供 Kerberos keytab，假定外部票据已准备就绪")
+            return cache_path
+
+        keytab_path = os.path.expanduser(keytab_path)
+        key = (principal, keytab_path)
+        with self._lock:
+            ticket = self._tickets.get(key)
+            if ticket is None:
+                ticket = KerberosTicket(
+                    principal=principal,
+                    keytab_path=keytab_path,
+                    cache_path=cache_path or self._default_cache_path(key),
+                )
+                self._tickets[key] = ticket
+                self._ticket_locks[key] = threading.Lock()
+            ticket_lock = self._ticket_locks[key]
+
+        if ticket.needs_renewal(datetime.now(), self.renew_margin_seconds):
+            # 同一 principal 并发建立连接时只执行一次 kinit
+            with ticket_lock:
+                if ticket.needs_renewal(datetime.now(), self.renew_margin_seconds):
+                    self._kinit(ticket)
+            self._ensure_renew_thread()
+        else:
+            increment_ticket_event("kerberos_ticket_cache_hit")
+        return ticket.cache_path
+
+    def tickets(self) -> List[KerberosTicket]:
+        with self._lock:
+            return list(self._tickets.values())
+
+    def renew_due(self) -> int:
+        """续期所有即将到期的票据，返回续期数量"""
+        renewed = 0
+        now = datetime.now()
+        with self._lock:
+            due = [
+                (ticket, self._ticket_locks[key])
+                for key, ticket in self._tickets.items()
+                if ticket.needs_renewal(now, self.renew_margin_seconds)
+            ]
+        for ticket, ticket_lock in due:
+            try:
+                with ticket_lock:
+                    self._kinit(ticket)
+                renewed += 1
+            except Exception as e:
+                logger.warning(f"Kerberos 票据续期失败: {ticket.principal}: {e}")
+        return renewed
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._renew_thread is not None:
+            self._renew_thread.join(timeout=5)
+            self._renew_thread = None
+
+    def _default_cache_path(self, key: Tuple[str, str]) -> str:
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:12]
+        name = re.sub(r"[^\w.-]+", "_", key[0])
+        return os.path.join(self.cache_dir, f"krb5cc_{name}_{digest}")
+
+    def _kinit(self, ticket: KerberosTicket) -> None:
+        if not os.path.exists(ticket.keytab_path):
+            raise KerberosDiagnosticError(
+                build_diagnostic(
+                    KerberosDiagnosticCode.KEYTAB_MISSING,
+                    detail=f"Kerberos keytab 不存在: {ticket.keytab_path}",
+                )
+            )
+        cache_dir = os.path.dirname(ticket.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+        env = os.environ.copy()
+        env["KRB5CCNAME"] = ticket.cache_path
+        try:
+            subprocess.run(
+                [
+                    "kinit",
+                    "-k",
+                    "-t",
+                    ticket.keytab_path,
+                    "-c",
+                    ticket.cache_path,
+                    ticket.principal,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+                env=env,
+            )
+        except FileNotFoundError as exc:
+            raise KerberosDiagnosticError(
+                build_diagnostic(
+                    KerberosDiagnosticCode.KINIT_FAILURE,
+                    detail="未找到 kinit 命令，请确认 Kerberos 客户端已安装",
+                ),
+                original=exc,
+            )
+        except subprocess.CalledProcessError as exc:
+            detail = exc.stderr.strip() if exc.stderr else str(exc)
+            raise KerberosDiagnosticError(
+                build_diagnostic(
+                    KerberosDiagnosticCode.KINIT_FAILURE,
+                    detail=f"kinit failed for principal {ticket.principal}: {detail}",
+                ),
+                original=exc,
+            )
+
+        now = datetime.now()
+        renewing = ticket.obtained_at is not None
+        ticket.obtained_at = now
+        ticket.expires_at = self._read_expiry(ticket.cache_path) or now + timedelta(
+            seconds=settings.KERBEROS_DEFAULT_TICKET_LIFETIME_SECONDS
+        )
+        increment_ticket_event("kerberos_kinit_success")
+        increment_ticket_event("kerberos_ticket_renewed")
+        logger.info(
+            f"Kerberos 票据{'续期' if renewing else '获取'}成功: {ticket.principal}, "
+            f"到期时间 {ticket.expires_at.isoformat()}"
+        )
+
+    def _read_expiry(self, cache_path: str) -> Optional[datetime]:
+        try:
+            completed = subprocess.run(
+                ["klist", "-c", cache_path],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            logger.debug(f"klist 执行失败，使用默认票据有效期: {e}")
+            return None
+        expiry = parse_klist_expiry(completed.stdout)
+        if expiry is None:
+            logger.debug("无法从 klist 输出解析票据到期时间，使用默认票据有效期")
+        return expiry
+
+    def _ensure_renew_thread(self) -> None:
+        with self._lock:
+            if self._renew_thread is not None and self._renew_thread.is_alive():
+                return
+            self._stop.clear()
+            self._renew_thread = threading.Thread(
+                target=self._renew_loop, name="kerberos-ticket-renewer", daemon=True
+            )
+            self._renew_thread.start()
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.check_interval_seconds):
+            self.renew_due()
+
+
+@contextmanager
+def use_ticket_cache(cache_path: Optional[str]) -> Iterator[None]:
+    """
+    在进程内短暂切换 KRB5CCNAME（用于只读取环境变量的 GSSAPI 握手），退出时恢复
+    切换期间持有全局锁，不同集群的握手串行执行，互不覆盖
+    """
+    if not cache_path:
+        yield
+        return
+    with _environ_lock:
+        previous = os.environ.get("KRB5CCNAME")
+        os.environ["KRB5CCNAME"] = cache_path
+        try:
+            yield
+        finally:
+            if previous is None:
+                os.environ.pop("KRB5CCNAME", None)
+            else:
+                os.environ["KRB5CCNAME"] = previous
+
+
+_ticket_manager: Optional[KerberosTicketManager] = None
+_ticket_manager_lock = threading.Lock()
+
+
+def get_ticket_manager() -> KerberosTicketManager:
+    """获取全局 Kerberos 票据管理器"""
+    global _ticket_manager
+    if _ticket_manager is not None:
+        return _ticket_manager
+    with _ticket_manager_lock:
+        if _ticket_manager is None:
+            _ticket_manager = KerberosTicketManager()
+        return _ticket_manager
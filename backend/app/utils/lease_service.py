@@ -0,0 +1,469 @@
+"""
+分布式租约服务
+基于 Celery 已在使用的 Redis，为合并、归档、恢复等表级操作提供跨进程互斥：
+- TTL 租约 + 后台续约，持有者异常退出后租约自然过期
+- 单调递增的 fencing token，用于在提交元数据前确认租约仍然有效
+- 租约查询（单个资源 / 按前缀列出）
+Redis 不可用时拒绝加锁（抛出 LeaseBackendUnavailableError），不会退化为进程内互斥；
+共享 Redis 客户端的重试间隔过后再次连接。仅 LEASE_BACKEND=local 时使用进程内实现
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config.settings import settings
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseUnavailableError(RuntimeError):
+    """租约已被其他持有者占用，或持有期间丢失"""
+
+    def __init__(self, resource: str, holder: Optional[Dict] = None):
+        self.resource = resource
+        self.holder = holder
+        owner = (holder or {}).get("owner")
+        message = f"Resource {resource} is locked"
+        if owner:
+            message += f" by {owner}"
+        super().__init__(message)
+
+
+class LeaseBackendUnavailableError(RuntimeError):
+    """租约后端（Redis）不可用，无法保证跨进程互斥"""
+
+
+@dataclass
+class Lease:
+    """已获取的租约"""
+
+    resource: str
+    owner: str
+    token: int
+    ttl_seconds: float
+    acquired_at: float
+    _stop_renewal: Optional[threading.Event] = field(default=None, repr=False)
+    lost: bool = False
+
+
+def table_resource(cluster_id: int, database_name: str, table_name: str) -> str:
+    """表级资源名（合并与表归档/恢复共用，保证互斥）"""
+    return f"table:{cluster_id}:{database_name}:{table_name}"
+
+
+def partition_resource(
+    cluster_id: int, database_name: str, table_name: str, partition_name: str
+) -> str:
+    """分区级资源名"""
+    return f"partition:{cluster_id}:{database_name}:{table_name}:{partition_name}"
+
+
+def default_owner(label: str) -> str:
+    """生成可读的持有者标识：主机名:进程号:业务标签"""
+    return f"{socket.gethostname()}:{os.getpid()}:{label}"
+
+
+class BaseLeaseService(ABC):
+    """租约服务公共逻辑：等待重试、自动续约"""
+
+    backend = "base"
+
+    def __init__(self, default_ttl_seconds: float = 60.0):
+        self.default_ttl_seconds = default_ttl_seconds
+
+    def acquire(
+        self,
+        resource: str,
+        owner: str,
+        ttl_seconds: Optional[float] = None,
+        wait_timeout: float = 0.0,
+        retry_interval: float = 0.2,
+        auto_renew: bool = False,
+    ) -> Optional[Lease]:
+        """
+        获取租约
+
+        Args:
+            resource: 资源名
+            owner: 持有者标识
+            ttl_seconds: 租约时长（秒）
+            wait_timeout: 被占用时的最长等待时间（秒），0 表示不等待
+            retry_interval: 等待期间的重试间隔（秒）
+            auto_renew: 是否启动后台线程按 1/3 TTL 自动续约
+
+        Returns:
+            获取成功返回 Lease，否则返回 None
+        """
+        ttl = ttl_seconds or self.default_ttl_seconds
+        deadline = time.monotonic() + max(0.0, wait_timeout)
+        while True:
+            token = self._try_acquire(resource, owner, ttl)
+            if token is not None:
+                lease = Lease(
+                    resource=resource,
+                    owner=owner,
+                    token=int(token),
+                    ttl_seconds=ttl,
+                    acquired_at=time.time(),
+                )
+                if auto_renew:
+                    self._start_renewal(lease)
+                logger.debug(f"Lease acquired: {resource} token={lease.token}")
+                return lease
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(retry_interval)
+
+    def acquire_or_raise(
+        self,
+        resource: str,
+        owner: str,
+        ttl_seconds: Optional[float] = None,
+        wait_timeout: float = 0.0,
+        auto_renew: bool = True,
+    ) -> Lease:
+        """获取租约，失败时抛出 LeaseUnavailableError（附带当前持有者信息）"""
+        lease = self.acquire(
+            resource,
+            owner,
+            ttl_seconds=ttl_seconds,
+            wait_timeout=wait_timeout,
+            auto_renew=auto_renew,
+        )
+        if lease is None:
+            raise LeaseUnavailableError(resource, self.get_lease(resource))
+        return lease
+
+    def release(self, lease: Lease) -> bool:
+        """释放租约；仅当 fencing token 仍匹配时才会删除"""
+        if lease._stop_renewal is not None:
+            lease._stop_renewal.set()
+        released = self._release(lease)
+        if not released:
+            logger.warning(
+                f"Lease {lease.resource} token={lease.token} was already lost"
+            )
+        return released
+
+    def validate(self, lease: Lease) -> bool:
+        """确认租约仍由本持有者持有（fencing token 未被替换）"""
+        current = self.get_lease(lease.resource)
+        return bool(current) and int(current.get("token", -1)) == lease.token
+
+    def ensure_valid(self, lease: Lease) -> None:
+        """提交不可逆变更前调用：租约已丢失时抛出 LeaseUnavailableError"""
+        if lease.lost or not self.validate(lease):
+            lease.lost = True
+            raise LeaseUnavailableError(lease.resource, self.get_lease(lease.resource))
+
+    def _start_renewal(self, lease: Lease) -> None:
+        stop = threading.Event()
+        lease._stop_renewal = stop
+        interval = max(0.1, lease.ttl_seconds / 3)
+
+        def _renew():
+            while not stop.wait(interval):
+                try:
+                    if not self.renew(lease):
+                        lease.lost = True
+                        logger.warning(
+                            f"Lease {lease.resource} token={lease.token} lost during renewal"
+                        )
+                        return
+                except Exception as e:
+                    # 瞬时错误不立即判定丢失，等待下次续约或 TTL 到期
+                    logger.warning(f"Failed to renew lease {lease.resource}: {e}")
+
+        threading.Thread(
+            target=_renew, name=f"lease-renew-{lease.resource}", daemon=True
+        ).start()
+
+    # ---- backend hooks ----
+    @abstractmethod
+    def _try_acquire(self, resource: str, owner: str, ttl: float) -> Optional[int]:
+        """原子地创建租约，成功返回新的 fencing token，已被占用返回 None"""
+
+    @abstractmethod
+    def _release(self, lease: Lease) -> bool:
+        """token 匹配时删除租约"""
+
+    @abstractmethod
+    def renew(self, lease: Lease, ttl_seconds: Optional[float] = None) -> bool:
+        """token 匹配时延长租约"""
+
+    @abstractmethod
+    def get_lease(self, resource: str) -> Optional[Dict]:
+        """查询资源当前的租约信息"""
+
+    @abstractmethod
+    def list_leases(self, prefix: str = "") -> List[Dict]:
+        """按资源名前缀列出租约"""
+
+
+class RedisLeaseService(BaseLeaseService):
+    """基于 Redis 的租约服务，所有状态变更均通过 Lua 脚本原子执行"""
+
+    backend = "redis"
+    KEY_PREFIX = "hsfp:lease"
+
+    _ACQUIRE_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return nil
+end
+local token = redis.call('incr', KEYS[2])
+redis.call('hset', KEYS[1], 'owner', ARGV[1], 'token', token,
+           'acquired_at', ARGV[3], 'renewed_at', ARGV[3])
+redis.call('pexpire', KEYS[1], ARGV[2])
+return token
+"""
+
+    _RENEW_SCRIPT = """
+if redis.call('hget', KEYS[1], 'token') == ARGV[1] then
+    redis.call('hset', KEYS[1], 'renewed_at', ARGV[3])
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+    _RELEASE_SCRIPT = """
+if redis.call('hget', KEYS[1], 'token') == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(
+        self,
+        client=None,
+        key_prefix: str = KEY_PREFIX,
+        default_ttl_seconds: float = 60.0,
+        client_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            client: 已连接的 Redis 客户端
+            client_factory: 未传 client 时用于（重新）连接 Redis 的函数，
+                连接失败时每次操作都会重试
+        """
+        super().__init__(default_ttl_seconds)
+        self.key_prefix = key_prefix
+        self._client_factory = client_factory
+        self._connect_lock = threading.Lock()
+        self.client = None
+        if client is not None:
+            self._bind(client)
+
+    def _bind(self, client) -> None:
+        self._acquire_script = client.register_script(self._ACQUIRE_SCRIPT)
+        self._renew_script = client.register_script(self._RENEW_SCRIPT)
+        self._release_script = client.register_script(self._RELEASE_SCRIPT)
+        self.client = client
+
+    def _ensure_client(self):
+        """返回 Redis 客户端；未连接时重新连接，失败抛出 LeaseBackendUnavailableError"""
+        if self.client is not None:
+            return self.client
+        with self._connect_lock:
+            if self.client is None:
+                if self._client_factory is None:
+                    raise LeaseBackendUnavailableError("Redis lease client not set")
+                try:
+                    self._bind(self._client_factory())
+                except Exception as e:
+                    logger.error(
+                        f"Redis lease backend unavailable, refusing to lock: {e}"
+                    )
+                    raise LeaseBackendUnavailableError(
+                        f"Redis lease backend unavailable: {e}"
+                    ) from e
+                logger.info("Connected Redis lease service for table-level locking")
+            return self.client
+
+    def _lease_key(self, resource: str) -> str:
+        return f"{self.key_prefix}:{resource}"
+
+    def _fence_key(self, resource: str) -> str:
+        return f"{self.key_prefix}:fence:{resource}"
+
+    def _try_acquire(self, resource: str, owner: str, ttl: float) -> Optional[int]:
+        self._ensure_client()
+        token = self._acquire_script(
+            keys=[self._lease_key(resource), self._fence_key(resource)],
+            args=[owner, int(ttl * 1000), int(time.time() * 1000)],
+        )
+        return int(token) if token is not None else None
+
+    def renew(self, lease: Lease, ttl_seconds: Optional[float] = None) -> bool:
+        ttl = ttl_seconds or lease.ttl_seconds
+        self._ensure_client()
+        renewed = self._renew_script(
+            keys=[self._lease_key(lease.resource)],
+            args=[str(lease.token), int(ttl * 1000), int(time.time() * 1000)],
+        )
+        return bool(renewed)
+
+    def _release(self, lease: Lease) -> bool:
+        self._ensure_client()
+        released = self._release_script(
+            keys=[self._lease_key(lease.resource)], args=[str(lease.token)]
+        )
+        return bool(released)
+
+    def get_lease(self, resource: str) -> Optional[Dict]:
+        client = self._ensure_client()
+        key = self._lease_key(resource)
+        data = client.hgetall(key)
+        if not data:
+            return None
+        return self._describe(resource, data, client.pttl(key))
+
+    def list_leases(self, prefix: str = "") -> List[Dict]:
+        fence_prefix = f"{self.key_prefix}:fence:"
+        leases = []
+        for key in self._ensure_client().scan_iter(
+            match=f"{self.key_prefix}:{prefix}*"
+        ):
+            key = key.decode() if isinstance(key, bytes) else key
+            if key.startswith(fence_prefix):
+                continue
+            resource = key[len(self.key_prefix) + 1 :]
+            info = self.get_lease(resource)
+            if info:
+                leases.append(info)
+        return leases
+
+    @staticmethod
+    def _describe(resource: str, data: Dict, pttl_ms: int) -> Dict:
+        data = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in data.items()
+        }
+        return {
+            "resource": resource,
+            "owner": data.get("owner"),
+            "token": int(data.get("token", 0)),
+            "acquired_at": int(data.get("acquired_at", 0)) / 1000,
+            "renewed_at": int(data.get("renewed_at", 0)) / 1000,
+            "ttl_remaining_seconds": max(pttl_ms or 0, 0) / 1000,
+        }
+
+
+class LocalLeaseService(BaseLeaseService):
+    """进程内租约服务（LEASE_BACKEND=local，仅保证单进程互斥，用于开发与测试）"""
+
+    backend = "local"
+
+    def __init__(self, default_ttl_seconds: float = 60.0):
+        super().__init__(default_ttl_seconds)
+        self._lock = threading.Lock()
+        self._leases: Dict[str, Dict] = {}
+        self._fences: Dict[str, int] = {}
+
+    def _expired(self, entry: Dict) -> bool:
+        return entry["expires_at"] <= time.time()
+
+    def _try_acquire(self, resource: str, owner: str, ttl: float) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            entry = self._leases.get(resource)
+            if entry is not None and not self._expired(entry):
+                return None
+            token = self._fences.get(resource, 0) + 1
+            self._fences[resource] = token
+            self._leases[resource] = {
+                "owner": owner,
+                "token": token,
+                "acquired_at": now,
+                "renewed_at": now,
+                "expires_at": now + ttl,
+            }
+            return token
+
+    def renew(self, lease: Lease, ttl_seconds: Optional[float] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._leases.get(lease.resource)
+            if entry is None or entry["token"] != lease.token or self._expired(entry):
+                return False
+            entry["renewed_at"] = now
+            entry["expires_at"] = now + (ttl_seconds or lease.ttl_seconds)
+            return True
+
+    def _release(self, lease: Lease) -> bool:
+        with self._lock:
+            entry = self._leases.get(lease.resource)
+            if entry is None or entry["token"] != lease.token:
+                return False
+            del self._leases[lease.resource]
+            return True
+
+    def get_lease(self, resource: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._leases.get(resource)
+            if entry is None or self._expired(entry):
+                return None
+            return self._describe(resource, entry)
+
+    def list_leases(self, prefix: str = "") -> List[Dict]:
+        with self._lock:
+            return [
+                self._describe(resource, entry)
+                for resource, entry in self._leases.items()
+                if resource.startswith(prefix) and not self._expired(entry)
+            ]
+
+    @staticmethod
+    def _describe(resource: str, entry: Dict) -> Dict:
+        return {
+            "resource": resource,
+            "owner": entry["owner"],
+            "token": entry["token"],
+            "acquired_at": entry["acquired_at"],
+            "renewed_at": entry["renewed_at"],
+            "ttl_remaining_seconds": max(entry["expires_at"] - time.time(), 0),
+        }
+
+
+_lease_service: Optional[BaseLeaseService] = None
+_lease_service_lock = threading.Lock()
+
+
+def get_lease_service() -> BaseLeaseService:
+    """
+    获取全局租约服务
+    LEASE_BACKEND=redis 时始终返回 Redis 实现：Redis 不可用时加锁操作抛出
+    LeaseBackendUnavailableError（拒绝执行），并在之后的调用中重新连接
+    """
+    global _lease_service
+    if _lease_service is not None:
+        return _lease_service
+    with _lease_service_lock:
+        if _lease_service is None:
+            _lease_service = _create_lease_service()
+        return _lease_service
+
+
+def _connect_lease_redis():
+    client = get_redis_client()
+    if client is None:
+        raise LeaseBackendUnavailableError("Redis is unavailable")
+    return client
+
+
+def _create_lease_service() -> BaseLeaseService:
+    ttl = settings.LEASE_DEFAULT_TTL_SECONDS
+    if settings.LEASE_BACKEND == "local":
+        logger.warning("Using in-process leases: no cross-process mutual exclusion")
+        return LocalLeaseService(default_ttl_seconds=ttl)
+    return RedisLeaseService(
+        default_ttl_seconds=ttl, client_factory=_connect_lease_redis
+    )
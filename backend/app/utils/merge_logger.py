@@ -9,11 +9,12 @@ import time
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.merge_task import MergeTask
+from app.utils.task_log_writer import TaskLogWriter
 
 
 class MergeLogLevel(Enum):
@@ -66,11 +67,19 @@ class MergeLogEntry:
 class MergeTaskLogger:
     """合并任务详尽日志记录器"""
 
-    def __init__(self, task: MergeTask, db_session: Session):
+    def __init__(
+        self,
+        task: MergeTask,
+        db_session: Session,
+        session_factory: Optional[Callable[[], Session]] = None,
+    ):
         self.task = task
         self.db_session = db_session
         self.logger = logging.getLogger(f"merge_task_{task.id}")
 
+        # TaskLog 由独立写线程使用自己的会话批量写入,不占用合并任务的事务会话
+        self.log_writer = self._create_log_writer(db_session, session_factory)
+
         # 创建任务专用的日志处理器
         self.setup_task_logger()
 
@@ -81,6 +90,33 @@ class MergeTaskLogger:
         # 记录任务开始
         self.log_task_start()
 
+    @staticmethod
+    def _create_log_writer(
+        db_session: Optional[Session],
+        session_factory: Optional[Callable[[], Session]],
+    ) -> Optional[TaskLogWriter]:
+        """创建TaskLog写入器;未提供会话工厂时复用合并会话所绑定的引擎"""
+        if session_factory is None:
+            if not isinstance(db_session, Session):
+                return None
+            try:
+                bind = db_session.get_bind()
+            except Exception:
+                return None
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+        return TaskLogWriter(session_factory)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """等待已记录的日志全部写入数据库"""
+        if self.log_writer is None:
+            return True
+        return self.log_writer.flush(timeout)
+
+    def close(self):
+        """刷新剩余日志并停止写线程(任务结束时调用)"""
+        if self.log_writer is not None:
+            self.log_writer.close()
+
     def setup_task_logger(self):
         """设置任务专用的日志处理器"""
         # 创建格式化器
@@ -155,6 +191,7 @@ class MergeTaskLogger:
             details=details or {},
             duration_ms=duration_ms,
         )
+        self.flush()
 
     def log(
         self,
@@ -218,6 +255,13 @@ class MergeTaskLogger:
         # 保存到数据库
         self._save_to_database(log_entry)
 
+        # 推送到任务级日志主题(按频率合并)
+        self._publish_log_entry(log_entry)
+
+        # 错误日志立即落库,避免进程随后崩溃丢失现场
+        if level in (MergeLogLevel.ERROR, MergeLogLevel.CRITICAL):
+            self.flush()
+
     def _default_code(
         self, phase: MergePhase, level: MergeLogLevel, message: str
     ) -> str:
@@ -435,6 +479,7 @@ class MergeTaskLogger:
             details=details,
             duration_ms=total_duration_ms,
         )
+        self.flush()
 
     def get_log_summary(self) -> Dict[str, Any]:
         """获取日志摘要"""
@@ -527,49 +572,81 @@ class MergeTaskLogger:
 
         return " ".join(parts)
 
-    def _save_to_database(self, entry: MergeLogEntry):
-        """保存日志条目到数据库"""
+    def _publish_log_entry(self, entry: MergeLogEntry):
+        """推送日志条目到WebSocket任务日志主题"""
         try:
-            # 导入TaskLog模型
-            import json
-
-            from app.models.task_log import TaskLog
             from app.services.scan_service import _sanitize_log_text
+            from app.services.websocket_service import (
+                task_logs_topic,
+                websocket_manager,
+            )
 
-            # 创建数据库日志条目
-            task_log = TaskLog(
-                task_id=entry.task_id,
-                log_level=entry.level,
-                message=_sanitize_log_text(entry.message),
-                details=(
-                    json.dumps(entry.details, ensure_ascii=False)
-                    if entry.details
-                    else None
-                ),
-                phase=entry.phase,
-                duration_ms=entry.duration_ms,
-                sql_statement=entry.sql_statement,
-                affected_rows=entry.affected_rows,
-                files_before=entry.files_before,
-                files_after=entry.files_after,
-                hdfs_stats=(
-                    json.dumps(entry.hdfs_stats, ensure_ascii=False)
-                    if entry.hdfs_stats
-                    else None
-                ),
-                yarn_application_id=entry.yarn_application_id,
-                progress_percentage=None,  # 可以从details中提取
+            websocket_manager.publish(
+                task_logs_topic(entry.task_id),
+                "task_logs",
+                {
+                    "timestamp": entry.timestamp,
+                    "log_level": entry.level,
+                    "phase": entry.phase,
+                    "message": _sanitize_log_text(entry.message),
+                    "duration_ms": entry.duration_ms,
+                    "yarn_application_id": entry.yarn_application_id,
+                },
+                append=True,
             )
+        except Exception:
+            pass
+
+    def _build_task_log_row(self, entry: MergeLogEntry) -> Dict[str, Any]:
+        """将日志条目转换为TaskLog字段字典"""
+        from app.services.scan_service import _sanitize_log_text
+
+        return {
+            "task_id": entry.task_id,
+            "log_level": entry.level,
+            "message": _sanitize_log_text(entry.message),
+            "details": (
+                json.dumps(entry.details, ensure_ascii=False) if entry.details else None
+            ),
+            "phase": entry.phase,
+            "duration_ms": entry.duration_ms,
+            "sql_statement": entry.sql_statement,
+            "affected_rows": entry.affected_rows,
+            "files_before": entry.files_before,
+            "files_after": entry.files_after,
+            "hdfs_stats": (
+                json.dumps(entry.hdfs_stats, ensure_ascii=False)
+                if entry.hdfs_stats
+                else None
+            ),
+            "yarn_application_id": entry.yarn_application_id,
+            "progress_percentage": None,  # 可以从details中提取
+        }
+
+    def _save_to_database(self, entry: MergeLogEntry):
+        """保存日志条目到数据库(有写线程时异步批量写入)"""
+        try:
+            row = self._build_task_log_row(entry)
+
+            if self.log_writer is not None:
+                self.log_writer.submit(row)
+                return
+
+            if self.db_session is None:
+                return
+
+            # 无法创建独立会话时(如测试替身)同步写入
+            from app.models.task_log import TaskLog
 
-            # 添加到数据库会话
-            self.db_session.add(task_log)
+            self.db_session.add(TaskLog(**row))
             self.db_session.commit()
 
         except Exception as e:
             # 日志保存失败不应该影响主要流程
             self.logger.error(f"Failed to save log entry to database: {e}")
             # 回滚以保持会话状态
-            self.db_session.rollback()
+            if self.log_writer is None and self.db_session is not None:
+                self.db_session.rollback()
 
 
 # 测试函数
@@ -5,6 +5,7 @@ from typing import Dict
 _lock = threading.Lock()
 _kerberos_failure_counter = Counter()
 _kerberos_ticket_events = Counter()
+_hive_pool_events = Counter()
 
 
 def increment_kerberos_failure(code: str) -> None:
@@ -17,11 +18,17 @@ def increment_ticket_event(event: str) -> None:
         _kerberos_ticket_events[event] += 1
 
 
+def increment_hive_pool_event(event: str) -> None:
+    with _lock:
+        _hive_pool_events[event] += 1
+
+
 def snapshot_metrics() -> Dict[str, Dict[str, int]]:
     with _lock:
         return {
             "kerberos_failures": dict(_kerberos_failure_counter),
             "kerberos_ticket_events": dict(_kerberos_ticket_events),
+            "hive_pool_events": dict(_hive_pool_events),
         }
 
 
@@ -29,3 +36,4 @@ def reset_metrics() -> None:
     with _lock:
         _kerberos_failure_counter.clear()
         _kerberos_ticket_events.clear()
+        _hive_pool_events.clear()
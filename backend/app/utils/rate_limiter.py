@@ -0,0 +1,46 @@
+"""
+线程安全的令牌桶限流器
+用于限制批量 HDFS 操作对 NameNode 的请求速率（ops/sec），多个工作线程共享同一个桶
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """令牌桶：按 rate 每秒补充令牌，最多积累 burst 个"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 每秒允许的操作数，<=0 表示不限速
+            burst: 桶容量，允许的瞬时突发数
+        """
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        获取令牌，不足时阻塞等待
+        Returns:
+            本次等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,68 @@
+"""
+共享 Redis 客户端
+连接状态缓存、分布式租约、WebSocket 跨进程转发统一从这里获取 Redis 客户端：
+- 统一使用 REDIS_URL，同一 URL 在进程内只建一个客户端（redis-py 连接池线程安全）
+- 连接失败或使用方上报操作失败后，REDIS_RETRY_INTERVAL_SECONDS 秒内直接返回 None，
+  之后的调用重新连接；各使用方在拿到 None 时自行决定降级或拒绝执行
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, Any] = {}
+_retry_at: Dict[str, float] = {}
+_clients_lock = threading.Lock()
+
+
+def get_redis_client(url: Optional[str] = None) -> Optional[Any]:
+    """返回已 ping 通的共享客户端；不可用或处于重试间隔内时返回 None"""
+    url = url or settings.REDIS_URL
+    client = _clients.get(url)
+    if client is not None:
+        return client
+    if time.monotonic() < _retry_at.get(url, 0.0):
+        return None
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is not None or time.monotonic() < _retry_at.get(url, 0.0):
+            return client
+        try:
+            import redis
+
+            client = redis.from_url(
+                url,
+                decode_responses=True,
+                socket_timeout=5,
+                socket_connect_timeout=2,
+            )
+            client.ping()
+        except Exception as e:
+            _retry_at[url] = time.monotonic() + settings.REDIS_RETRY_INTERVAL_SECONDS
+            logger.warning(
+                f"Redis unavailable, retrying in {settings.REDIS_RETRY_INTERVAL_SECONDS}s: {e}"
+            )
+            return None
+        _clients[url] = client
+        _retry_at.pop(url, None)
+        return client
+
+
+def mark_redis_unavailable(url: Optional[str] = None) -> None:
+    """使用方操作失败时调用：丢弃共享客户端，重试间隔内不再连接"""
+    url = url or settings.REDIS_URL
+    with _clients_lock:
+        _clients.pop(url, None)
+        _retry_at[url] = time.monotonic() + settings.REDIS_RETRY_INTERVAL_SECONDS
+
+
+def reset_redis_clients() -> None:
+    """清空共享客户端与重试状态（测试使用）"""
+    with _clients_lock:
+        _clients.clear()
+        _retry_at.clear()
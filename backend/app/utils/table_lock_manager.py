@@ -4,19 +4,37 @@
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.merge_task import MergeTask
+from app.models.table_lock import TableLock
 
 logger = logging.getLogger(__name__)
 
+# 支持 INSERT ... ON CONFLICT DO UPDATE ... WHERE 的方言
+_DIALECT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
 
 class TableLockManager:
-    """表级别资源锁管理器"""
+    """表级别资源锁管理器
+
+    锁的权威状态保存在 ``table_locks`` 表中：(cluster_id, database_name,
+    table_name) 上的唯一约束保证同一张表至多一个租约，获取操作是一条
+    ``INSERT ... ON CONFLICT DO UPDATE ... WHERE 已过期`` 语句（不支持的方言
+    退化为条件 UPDATE + INSERT），无需先读后写。``merge_tasks`` 上的
+    ``table_lock_acquired``/``lock_holder`` 仅作为展示用的镜像字段。
+    """
 
     @classmethod
     def acquire_table_lock(
@@ -37,51 +55,54 @@ class TableLockManager:
             database_name: 数据库名
             table_name: 表名
             task_id: 任务ID
-            lock_timeout_minutes: 锁超时时间（分钟）
+            lock_timeout_minutes: 租约时长（分钟），持有者需在到期前续约
 
         Returns:
             锁获取结果
         """
         try:
-            # 检查是否有其他运行中的任务锁定了这个表
-            existing_lock = (
-                db.query(MergeTask)
-                .filter(
-                    and_(
-                        MergeTask.cluster_id == cluster_id,
-                        MergeTask.database_name == database_name,
-                        MergeTask.table_name == table_name,
-                        MergeTask.table_lock_acquired == True,
-                        MergeTask.status.in_(["pending", "running"]),
-                        MergeTask.id != task_id,  # 排除自己
-                    )
-                )
-                .first()
+            current_task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
+            if not current_task:
+                return {"success": False, "message": f"Task {task_id} not found"}
+
+            holder = f"task_{task_id}"
+            # 仅用于接管过期租约后清理原持有任务的镜像字段，不参与互斥判断
+            previous = cls._get_lease(db, cluster_id, database_name, table_name)
+
+            acquired = cls._try_acquire_lease(
+                db,
+                cluster_id,
+                database_name,
+                table_name,
+                task_id,
+                holder,
+                lock_timeout_minutes,
             )
 
-            if existing_lock:
-                # 检查锁是否已过期
-                if cls._is_lock_expired(existing_lock, lock_timeout_minutes):
+            if not acquired:
+                db.rollback()
+                lease = cls._get_lease(db, cluster_id, database_name, table_name)
+                locked_by = lease.task_id if lease else None
+                return {
+                    "success": False,
+                    "message": f"Table {database_name}.{table_name} is locked by task {locked_by}",
+                    "locked_by_task": locked_by,
+                    "lock_holder": lease.holder if lease else None,
+                }
+
+            if previous is not None and previous.task_id not in (None, task_id):
+                expired_task = (
+                    db.query(MergeTask).filter(MergeTask.id == previous.task_id).first()
+                )
+                if expired_task is not None and expired_task.table_lock_acquired:
                     logger.warning(
-                        f"Found expired lock on table {database_name}.{table_name}, releasing it"
+                        f"Took over expired lock on table {database_name}.{table_name} "
+                        f"from task {previous.task_id}"
                     )
-                    cls._force_release_lock(db, existing_lock)
-                else:
-                    return {
-                        "success": False,
-                        "message": f"Table {database_name}.{table_name} is locked by task {existing_lock.id}",
-                        "locked_by_task": existing_lock.id,
-                        "lock_holder": existing_lock.lock_holder,
-                    }
-
-            # 获取当前任务并设置锁
-            current_task = db.query(MergeTask).filter(MergeTask.id == task_id).first()
-            if not current_task:
-                return {"success": False, "message": f"Task {task_id} not found"}
+                    cls._force_release_lock(db, expired_task)
 
-            # 设置锁
             current_task.table_lock_acquired = True
-            current_task.lock_holder = f"task_{task_id}"
+            current_task.lock_holder = holder
             db.commit()
 
             logger.info(
@@ -91,7 +112,7 @@ class TableLockManager:
             return {
                 "success": True,
                 "message": f"Table lock acquired for {database_name}.{table_name}",
-                "lock_holder": f"task_{task_id}",
+                "lock_holder": holder,
             }
 
         except Exception as e:
@@ -99,6 +120,80 @@ class TableLockManager:
             db.rollback()
             return {"success": False, "message": f"Failed to acquire lock: {str(e)}"}
 
+    @classmethod
+    def renew_table_lock(
+        cls, db: Session, task_id: int, lock_timeout_minutes: int = 120
+    ) -> bool:
+        """
+        续约任务持有的表锁（心跳）
+
+        Args:
+            db: 数据库会话
+            task_id: 任务ID
+            lock_timeout_minutes: 续约后的租约时长（分钟）
+
+        Returns:
+            是否仍持有租约；租约已被其他任务接管时返回False
+        """
+        try:
+            now = datetime.utcnow()
+            renewed = (
+                db.query(TableLock)
+                .filter(TableLock.task_id == task_id)
+                .update(
+                    {
+                        TableLock.heartbeat_at: now,
+                        TableLock.expires_at: now
+                        + timedelta(minutes=lock_timeout_minutes),
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return bool(renewed)
+        except Exception as e:
+            logger.error(f"Failed to renew table lock for task {task_id}: {e}")
+            db.rollback()
+            return False
+
+    @classmethod
+    def start_lock_heartbeat(
+        cls,
+        session_factory: Callable[[], Session],
+        task_id: int,
+        lock_timeout_minutes: int,
+        interval_seconds: Optional[float] = None,
+    ) -> threading.Event:
+        """
+        启动后台续约线程，返回用于停止续约的事件
+
+        Args:
+            session_factory: 创建独立数据库会话的工厂（不能与任务主会话共用）
+            task_id: 任务ID
+            lock_timeout_minutes: 租约时长（分钟）
+            interval_seconds: 续约间隔，默认租约时长的三分之一
+
+        Returns:
+            停止事件，set() 后线程退出
+        """
+        stop = threading.Event()
+        interval = interval_seconds or max(1.0, lock_timeout_minutes * 60 / 3)
+
+        def _heartbeat():
+            while not stop.wait(interval):
+                db = session_factory()
+                try:
+                    if not cls.renew_table_lock(db, task_id, lock_timeout_minutes):
+                        logger.warning(f"Task {task_id} no longer holds its table lock")
+                        return
+                finally:
+                    db.close()
+
+        threading.Thread(
+            target=_heartbeat, name=f"table-lock-heartbeat-{task_id}", daemon=True
+        ).start()
+        return stop
+
     @classmethod
     def release_table_lock(cls, db: Session, task_id: int) -> Dict[str, Any]:
         """
@@ -116,6 +211,11 @@ class TableLockManager:
             if not task:
                 return {"success": False, "message": f"Task {task_id} not found"}
 
+            # 只删除自己持有的租约，已被接管的租约不受影响
+            db.query(TableLock).filter(TableLock.task_id == task_id).delete(
+                synchronize_session=False
+            )
+
             if task.table_lock_acquired:
                 task.table_lock_acquired = False
                 task.lock_holder = None
@@ -130,6 +230,7 @@ class TableLockManager:
                     "message": f"Table lock released for {task.database_name}.{task.table_name}",
                 }
             else:
+                db.commit()
                 return {"success": True, "message": "No lock was held by this task"}
 
         except Exception as e:
@@ -154,28 +255,21 @@ class TableLockManager:
             锁状态信息
         """
         try:
-            active_lock = (
-                db.query(MergeTask)
-                .filter(
-                    and_(
-                        MergeTask.cluster_id == cluster_id,
-                        MergeTask.database_name == database_name,
-                        MergeTask.table_name == table_name,
-                        MergeTask.table_lock_acquired == True,
-                        MergeTask.status.in_(["pending", "running"]),
-                    )
-                )
-                .first()
-            )
+            lease = cls._get_lease(db, cluster_id, database_name, table_name)
 
-            if active_lock:
+            if lease and lease.expires_at >= datetime.utcnow():
+                task = (
+                    db.query(MergeTask).filter(MergeTask.id == lease.task_id).first()
+                    if lease.task_id
+                    else None
+                )
                 return {
                     "locked": True,
-                    "locked_by_task": active_lock.id,
-                    "lock_holder": active_lock.lock_holder,
-                    "task_status": active_lock.status,
-                    "locked_since": active_lock.started_time
-                    or active_lock.created_time,
+                    "locked_by_task": lease.task_id,
+                    "lock_holder": lease.holder,
+                    "task_status": task.status if task else None,
+                    "locked_since": lease.acquired_at,
+                    "expires_at": lease.expires_at,
                 }
             else:
                 return {
@@ -196,14 +290,23 @@ class TableLockManager:
 
         Args:
             db: 数据库会话
-            lock_timeout_minutes: 锁超时时间（分钟）
+            lock_timeout_minutes: 无租约记录的遗留镜像锁的超时时间（分钟）
 
         Returns:
             清理结果
         """
         try:
-            # 查找所有持有锁但已过期的任务
-            expired_tasks = (
+            now = datetime.utcnow()
+            expired_leases = (
+                db.query(TableLock).filter(TableLock.expires_at < now).all()
+            )
+            expired_task_ids = {l.task_id for l in expired_leases if l.task_id}
+            cleaned_count = len(expired_leases)
+            for lease in expired_leases:
+                db.delete(lease)
+
+            # 查找所有持有锁但已过期的任务（租约过期或遗留的镜像字段超时）
+            locked_tasks = (
                 db.query(MergeTask)
                 .filter(
                     and_(
@@ -214,9 +317,10 @@ class TableLockManager:
                 .all()
             )
 
-            cleaned_count = 0
-            for task in expired_tasks:
-                if cls._is_lock_expired(task, lock_timeout_minutes):
+            for task in locked_tasks:
+                if task.id in expired_task_ids:
+                    cls._force_release_lock(db, task)
+                elif cls._is_lock_expired(task, lock_timeout_minutes):
                     cls._force_release_lock(db, task)
                     cleaned_count += 1
 
@@ -235,6 +339,98 @@ class TableLockManager:
             db.rollback()
             return {"success": False, "error": str(e)}
 
+    @classmethod
+    def _get_lease(
+        cls, db: Session, cluster_id: int, database_name: str, table_name: str
+    ) -> Optional[TableLock]:
+        return (
+            db.query(TableLock)
+            .filter(
+                and_(
+                    TableLock.cluster_id == cluster_id,
+                    TableLock.database_name == database_name,
+                    TableLock.table_name == table_name,
+                )
+            )
+            .first()
+        )
+
+    @classmethod
+    def _try_acquire_lease(
+        cls,
+        db: Session,
+        cluster_id: int,
+        database_name: str,
+        table_name: str,
+        task_id: int,
+        holder: str,
+        lock_timeout_minutes: int,
+    ) -> bool:
+        """
+        以单条语句原子地获取租约
+
+        表上无租约时插入；已有租约但已过期（或本任务重入）时接管；否则不做修改。
+
+        Returns:
+            是否获取成功
+        """
+        now = datetime.utcnow()
+        values = {
+            "cluster_id": cluster_id,
+            "database_name": database_name,
+            "table_name": table_name,
+            "task_id": task_id,
+            "holder": holder,
+            "acquired_at": now,
+            "heartbeat_at": now,
+            "expires_at": now + timedelta(minutes=lock_timeout_minutes),
+        }
+        takeover = or_(TableLock.expires_at < now, TableLock.task_id == task_id)
+
+        dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(TableLock).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["cluster_id", "database_name", "table_name"],
+                set_={
+                    key: stmt.excluded[key]
+                    for key in (
+                        "task_id",
+                        "holder",
+                        "acquired_at",
+                        "heartbeat_at",
+                        "expires_at",
+                    )
+                },
+                where=takeover,
+            )
+            return db.execute(stmt).rowcount == 1
+
+        # 其他方言（如 MySQL）：条件 UPDATE 接管，未命中再 INSERT，由唯一约束兜底
+        updated = (
+            db.query(TableLock)
+            .filter(
+                and_(
+                    TableLock.cluster_id == cluster_id,
+                    TableLock.database_name == database_name,
+                    TableLock.table_name == table_name,
+                    takeover,
+                )
+            )
+            .update(
+                {getattr(TableLock, k): v for k, v in values.items()},
+                synchronize_session=False,
+            )
+        )
+        if updated:
+            return True
+        try:
+            with db.begin_nested():
+                db.execute(insert(TableLock).values(**values))
+            return True
+        except IntegrityError:
+            return False
+
     @classmethod
     def _is_lock_expired(cls, task: MergeTask, timeout_minutes: int) -> bool:
         """
@@ -296,24 +492,27 @@ class TableLockManager:
             所有锁信息
         """
         try:
-            query = db.query(MergeTask).filter(MergeTask.table_lock_acquired == True)
+            query = db.query(TableLock, MergeTask).outerjoin(
+                MergeTask, MergeTask.id == TableLock.task_id
+            )
 
             if cluster_id:
-                query = query.filter(MergeTask.cluster_id == cluster_id)
-
-            locked_tasks = query.all()
+                query = query.filter(TableLock.cluster_id == cluster_id)
 
             locks_info = []
-            for task in locked_tasks:
+            for lease, task in query.all():
                 locks_info.append(
                     {
-                        "task_id": task.id,
-                        "cluster_id": task.cluster_id,
-                        "database_name": task.database_name,
-                        "table_name": task.table_name,
-                        "lock_holder": task.lock_holder,
-                        "task_status": task.status,
-                        "locked_since": task.started_time or task.created_time,
+                        "task_id": lease.task_id,
+                        "cluster_id": lease.cluster_id,
+                        "database_name": lease.database_name,
+                        "table_name": lease.table_name,
+                        "lock_holder": lease.holder,
+                        "task_status": task.status if task else None,
+                        "locked_since": lease.acquired_at,
+                        "heartbeat_at": lease.heartbeat_at,
+                        "expires_at": lease.expires_at,
+                        "expired": lease.expires_at < datetime.utcnow(),
                         "strategy": "unified_safe_merge",
                     }
                 )
@@ -0,0 +1,174 @@
+"""
+合并任务日志异步批量写入器
+
+MergeTaskLogger 产生的 TaskLog 记录通过有界队列交给独立的写线程,
+写线程使用自己的数据库会话批量插入,合并任务自身的事务会话不再承担日志提交,
+心跳线程也不再跨线程共用该会话。
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class _FlushRequest:
+    """刷新请求标记: 写线程处理到该标记时写入此前的所有记录并通知调用方"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class TaskLogWriter:
+    """TaskLog 异步批量写入器
+
+    - submit(): 非阻塞投递(队列满时最多等待 put_timeout 秒,仍满则丢弃并计数)
+    - flush(): 阻塞直到已投递的记录全部落库(阶段结束/任务完成/异常时调用)
+    - close(): 刷新后停止写线程
+
+    写线程按需启动,空闲超过 idle_timeout 秒自动退出,下次投递时重新拉起,
+    即使调用方遗漏 close() 也不会遗留常驻线程。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_queue_size: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        put_timeout: float = 2.0,
+        idle_timeout: float = 30.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.idle_timeout = idle_timeout
+        self.dropped = 0
+        self.written = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """投递一条 TaskLog 字段字典,返回是否成功入队"""
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+            # 写线程可能恰好在投递前因空闲退出,投递后再确认一次
+            self._ensure_thread()
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(
+                f"TaskLog queue full, dropped log entry (dropped={self.dropped})"
+            )
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """等待已投递的记录全部写入数据库"""
+        with self._lock:
+            thread_alive = self._thread is not None and self._thread.is_alive()
+        if not thread_alive and self._queue.empty():
+            return True
+        self._ensure_thread()
+        request = _FlushRequest()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        return request.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """刷新剩余记录并停止写线程"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="task-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        pending: List[Dict[str, Any]] = []
+        last_activity = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if pending:
+                    self._write_batch(pending)
+                    pending = []
+                    last_activity = time.monotonic()
+                    continue
+                if time.monotonic() - last_activity >= self.idle_timeout:
+                    with self._lock:
+                        # 释放锁前再次确认队列为空,避免与新投递竞争
+                        if self._queue.empty():
+                            self._thread = None
+                            return
+                continue
+
+            last_activity = time.monotonic()
+            if item is None:
+                if pending:
+                    self._write_batch(pending)
+                return
+            if isinstance(item, _FlushRequest):
+                if pending:
+                    self._write_batch(pending)
+                    pending = []
+                item.done.set()
+                continue
+
+            pending.append(item)
+            if len(pending) >= self.batch_size:
+                self._write_batch(pending)
+                pending = []
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        from app.models.task_log import TaskLog
+
+        session = None
+        try:
+            session = self.session_factory()
+            session.add_all([TaskLog(**row) for row in rows])
+            session.commit()
+            self.written += len(rows)
+        except Exception as e:
+            # 日志保存失败不应该影响主要流程
+            logger.error(f"Failed to write {len(rows)} task log entries: {e}")
+            if session is not None:
+                try:
+                    session.rollback()
+                except Exception:
+                    pass
+        finally:
+            if session is not None:
+                try:
+                    session.close()
+                except Exception:
+                    pass
@@ -5,10 +5,12 @@ WebHDFS客户端工具类
 
 import logging
 import os
-import subprocess
+import queue
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
-from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlparse
 
 import requests
 from requests import exceptions as requests_exceptions
@@ -22,7 +24,8 @@ from app.utils.kerberos_diagnostics import (
     map_exception_to_diagnostic,
     raise_diagnostic_error,
 )
-from app.utils.metrics import increment_kerberos_failure, increment_ticket_event
+from app.utils.kerberos_ticket_manager import get_ticket_manager, use_ticket_cache
+from app.utils.metrics import increment_kerberos_failure
 
 logger = logging.getLogger(__name__)
 
@@ -95,7 +98,6 @@ class WebHDFSClient:
         self.kerberos_realm = kerberos_realm
         self.kerberos_ticket_cache = kerberos_ticket_cache
         self._ticket_cache_env: Optional[str] = None
-        self._previous_ticket_cache: Optional[str] = None
         self._last_diagnostic: Optional[KerberosDiagnostic] = None
         self.session = requests.Session()
         self.session.timeout = timeout
@@ -164,64 +166,37 @@ class WebHDFSClient:
             principal = f"{principal}@{self.kerberos_realm}"
         self.kerberos_principal = principal
 
-        if self.kerberos_ticket_cache:
-            expanded = os.path.expanduser(self.kerberos_ticket_cache)
-            self._previous_ticket_cache = os.environ.get("KRB5CCNAME")
-            os.environ["KRB5CCNAME"] = expanded
-            self._ticket_cache_env = expanded
-            logger.debug("Using Kerberos ticket cache: %s", expanded)
-
-        if self.kerberos_keytab_path:
-            path = os.path.expanduser(self.kerberos_keytab_path)
-            if not os.path.exists(path):
-                raise_diagnostic_error(
-                    KerberosDiagnosticCode.KEYTAB_MISSING,
-                    detail=f"Keytab 路径不存在: {path}",
-                    logger=logger,
-                )
-            self._run_kinit(path, principal)
-            increment_ticket_event("kerberos_ticket_renewed")
-        else:
-            logger.debug(
-                "Kerberos keytab path not provided; assuming valid ticket cache exists"
+        # 票据由全局票据管理器维护（私有缓存 + 后台续期），此处只取缓存路径
+        try:
+            self._ticket_cache_env = get_ticket_manager().get_cache(
+                principal, self.kerberos_keytab_path, self.kerberos_ticket_cache
             )
+        except KerberosDiagnosticError as exc:
+            self._record_diagnostic(exc.diagnostic, extra={"stage": "webhdfs_kinit"})
+            raise
+        if self._ticket_cache_env:
+            logger.debug("Using Kerberos ticket cache: %s", self._ticket_cache_env)
 
-        self.session.auth = HTTPKerberosAuth(  # type: ignore[call-arg]
-            mutual_authentication=KRB_OPTIONAL
+        self.session.auth = self._bind_ticket_cache(
+            HTTPKerberosAuth(  # type: ignore[call-arg]
+                mutual_authentication=KRB_OPTIONAL
+            )
         )
         logger.info("Configured WebHDFS client with Kerberos authentication")
 
-    def _run_kinit(self, keytab_path: str, principal: str) -> None:
-        env = os.environ.copy()
-        if self._ticket_cache_env:
-            env["KRB5CCNAME"] = self._ticket_cache_env
-        cmd = ["kinit", "-k", "-t", keytab_path, principal]
-        try:
-            completed = subprocess.run(
-                cmd,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                env=env,
-                text=True,
-            )
-            logger.debug("kinit executed successfully for principal %s", principal)
-            increment_ticket_event("kerberos_kinit_success")
-        except FileNotFoundError as exc:
-            diagnostic = build_diagnostic(
-                KerberosDiagnosticCode.KINIT_FAILURE,
-                detail="未找到 kinit 命令，请确认 Kerberos 客户端已安装",
-            )
-            self._record_diagnostic(diagnostic)
-            raise KerberosDiagnosticError(diagnostic, original=exc)
-        except subprocess.CalledProcessError as exc:
-            stderr = exc.stderr.strip() if exc.stderr else ""
-            diagnostic = build_diagnostic(
-                KerberosDiagnosticCode.KINIT_FAILURE,
-                detail=f"kinit failed for principal {principal}: {stderr or exc}",
-            )
-            self._record_diagnostic(diagnostic)
-            raise KerberosDiagnosticError(diagnostic, original=exc)
+    def _bind_ticket_cache(self, auth):
+        """GSSAPI 握手时临时指定本客户端的票据缓存，而不是修改进程级 KRB5CCNAME"""
+        cache_path = self._ticket_cache_env
+        generate = getattr(auth, "generate_request_header", None)
+        if not cache_path or generate is None:
+            return auth
+
+        def generate_with_cache(*args, **kwargs):
+            with use_ticket_cache(cache_path):
+                return generate(*args, **kwargs)
+
+        auth.generate_request_header = generate_with_cache
+        return auth
 
     def _build_url(self, path: str, operation: str, **params) -> str:
         """构建WebHDFS API URL（自动归一化 hdfs:// 路径为 HTTP 路径）"""
@@ -552,6 +527,72 @@ class WebHDFSClient:
             logger.error(f"Error listing directory {path}: {str(e)}")
             return []
 
+    def iter_directory(
+        self, path: str, recursive: bool = False
+    ) -> Iterator[HDFSFileInfo]:
+        """
+        分页流式列出目录内容（LISTSTATUS_BATCH），不在内存中保留完整列表
+
+        Args:
+            path: 目录路径
+            recursive: 是否递归子目录
+
+        Yields:
+            文件信息；服务端不支持 LISTSTATUS_BATCH 时回退为 LISTSTATUS
+        """
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            start_after = None
+            while True:
+                url = self._build_url(
+                    directory, "LISTSTATUS_BATCH", startAfter=start_after
+                )
+                try:
+                    response = self.session.get(url, timeout=self.timeout)
+                except Exception as e:
+                    logger.error(f"Failed to list directory {directory}: {e}")
+                    break
+                if response.status_code != 200:
+                    if start_after is None:
+                        # HttpFS 等不支持分页的服务端回退到一次性列出
+                        page = self.list_directory(directory)
+                        for file_info in page:
+                            if recursive and file_info.is_directory:
+                                pending.append(file_info.path)
+                            yield file_info
+                    else:
+                        logger.error(
+                            f"Failed to list directory {directory}: "
+                            f"HTTP {response.status_code}"
+                        )
+                    break
+
+                listing = response.json()["DirectoryListing"]
+                file_statuses = listing["partialListing"]["FileStatuses"]["FileStatus"]
+                for file_status in file_statuses:
+                    file_path = os.path.join(
+                        directory, file_status["pathSuffix"]
+                    ).replace("\\", "/")
+                    file_info = HDFSFileInfo(
+                        path=file_path,
+                        size=file_status["length"],
+                        modification_time=file_status["modificationTime"],
+                        is_directory=file_status["type"] == "DIRECTORY",
+                        block_size=file_status.get("blockSize", 0),
+                        replication=file_status.get("replication", 0),
+                        permission=file_status["permission"],
+                        owner=file_status["owner"],
+                        group=file_status["group"],
+                    )
+                    if recursive and file_info.is_directory:
+                        pending.append(file_info.path)
+                    yield file_info
+                if not file_statuses or not listing.get("remainingEntries"):
+                    break
+                # 每页条数由 NameNode 的 dfs.ls.limit 决定
+                start_after = quote(file_statuses[-1]["pathSuffix"], safe="")
+
     def scan_directory_stats(
         self,
         path: str,
@@ -1188,10 +1229,73 @@ class WebHDFSClient:
         if hasattr(self, "session"):
             self.session.close()
             logger.info("WebHDFS client session closed")
-        if self._ticket_cache_env and self._previous_ticket_cache is not None:
-            os.environ["KRB5CCNAME"] = self._previous_ticket_cache
-        elif self._ticket_cache_env:
-            os.environ.pop("KRB5CCNAME", None)
+
+
+class WebHDFSClientPool:
+    """
+    WebHDFS客户端池
+    批量操作在多个工作线程间复用固定数量的客户端（HTTP连接与Kerberos认证），
+    避免每个操作都新建客户端
+    """
+
+    def __init__(
+        self,
+        cluster: "Cluster",  # type: ignore[name-defined]
+        size: int = 4,
+        timeout: int = 30,
+    ):
+        self.cluster = cluster
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.Queue[WebHDFSClient]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self) -> Iterator[WebHDFSClient]:
+        """借出一个客户端，池中无空闲且已达上限时等待归还"""
+        hdfs_client = self._checkout()
+        try:
+            yield hdfs_client
+        finally:
+            self._idle.put(hdfs_client)
+
+    def _checkout(self) -> WebHDFSClient:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return WebHDFSClient.from_cluster(self.cluster, timeout=self.timeout)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    def close(self) -> None:
+        """关闭池中所有空闲客户端"""
+        while True:
+            try:
+                hdfs_client = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            hdfs_client.close()
+            with self._lock:
+                self._created -= 1
+
+    def __enter__(self) -> "WebHDFSClientPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 # 测试函数
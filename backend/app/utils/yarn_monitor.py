@@ -4,12 +4,17 @@ YARN任务监控工具类
 支持HA配置的ResourceManager集群
 """
 
+import asyncio
+import concurrent.futures
 import logging
+import threading
 import time
+import uuid
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import requests
 
@@ -59,6 +64,26 @@ class YarnApplicationInfo:
     vcore_seconds: int
     preempted_resource_mb: int
     preempted_resource_vcores: int
+    application_tags: str = ""
+
+
+class YarnProgressSample(NamedTuple):
+    """YARN应用进度采样（紧凑结构，用于环形缓冲区）"""
+
+    timestamp: float
+    progress: float
+    state: str
+    final_status: str
+    elapsed_time: int
+
+
+_TERMINAL_APPLICATION_STATES = frozenset(
+    {
+        YarnApplicationState.FINISHED.value,
+        YarnApplicationState.FAILED.value,
+        YarnApplicationState.KILLED.value,
+    }
+)
 
 
 @dataclass
@@ -233,6 +258,8 @@ class YarnResourceManagerMonitor:
         user: Optional[str] = None,
         application_types: Optional[List[str]] = None,
         limit: int = 100,
+        started_time_begin: Optional[int] = None,
+        application_tags: Optional[List[str]] = None,
     ) -> List[YarnApplicationInfo]:
         """
         获取YARN应用列表
@@ -242,6 +269,8 @@ class YarnResourceManagerMonitor:
             user: 用户过滤
             application_types: 应用类型过滤（如["MAPREDUCE", "TEZ"]）
             limit: 返回结果限制
+            started_time_begin: 仅返回该时间（毫秒时间戳）之后启动的应用
+            application_tags: 应用标签过滤（任一匹配即可）
 
         Returns:
             应用信息列表
@@ -262,6 +291,10 @@ class YarnResourceManagerMonitor:
                 params["applicationTypes"] = ",".join(application_types)
             if limit:
                 params["limit"] = limit
+            if started_time_begin:
+                params["startedTimeBegin"] = int(started_time_begin)
+            if application_tags:
+                params["applicationTags"] = ",".join(application_tags)
 
             response = self.session.get(url, params=params, timeout=self.timeout)
 
@@ -295,6 +328,7 @@ class YarnResourceManagerMonitor:
                             preempted_resource_vcores=app.get(
                                 "preemptedResourceVCores", 0
                             ),
+                            application_tags=app.get("applicationTags", "") or "",
                         )
                     )
 
@@ -349,6 +383,7 @@ class YarnResourceManagerMonitor:
                     vcore_seconds=app.get("vcoreSeconds", 0),
                     preempted_resource_mb=app.get("preemptedResourceMB", 0),
                     preempted_resource_vcores=app.get("preemptedResourceVCores", 0),
+                    application_tags=app.get("applicationTags", "") or "",
                 )
             else:
                 logger.warning(
@@ -394,75 +429,176 @@ class YarnResourceManagerMonitor:
         return hive_apps
 
     def monitor_application_progress(
-        self, application_id: str, check_interval: int = 5, max_wait: int = 3600
+        self,
+        application_id: str,
+        check_interval: int = 5,
+        max_wait: int = 3600,
+        history_size: int = 240,
     ) -> Dict:
         """
-        监控应用执行进度
+        监控应用执行进度（同步封装）
+
+        监控协程提交到进程内共享的YARN监控事件循环执行，调用线程只等待结果；
+        不使用 asyncio.run，因此在已有运行中事件循环的线程里调用也不会报错
+        （但会阻塞该事件循环，协程中应直接 await monitor_applications_async）。
 
         Args:
             application_id: 应用ID
             check_interval: 检查间隔（秒）
             max_wait: 最大等待时间（秒）
+            history_size: 进度历史保留的最大采样数
 
         Returns:
             监控结果字典
         """
+        try:
+            asyncio.get_running_loop()
+            logger.warning(
+                "monitor_application_progress called from a running event loop; "
+                "await monitor_applications_async() instead to avoid blocking it"
+            )
+        except RuntimeError:
+            pass
+        results = self.watch_applications(
+            [application_id],
+            min_interval=check_interval,
+            max_interval=check_interval,
+            max_wait=max_wait,
+            history_size=history_size,
+        ).result()
+        result = results[application_id]
+        result["progress_history"] = [
+            {
+                **sample._asdict(),
+                "timestamp": datetime.fromtimestamp(sample.timestamp).isoformat(),
+            }
+            for sample in result["progress_history"]
+        ]
+        return result
+
+    def watch_applications(
+        self, application_ids: List[str], **kwargs
+    ) -> "concurrent.futures.Future[Dict[str, Dict]]":
+        """
+        非阻塞监控：把 monitor_applications_async 提交到共享监控事件循环
+
+        供 Celery 等同步工作线程使用，立即返回 Future，多个任务提交的监控
+        共用一个事件循环，不再各自占用线程轮询。参数同 monitor_applications_async。
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.monitor_applications_async(application_ids, **kwargs),
+            get_yarn_monitor_loop(),
+        )
+
+    async def monitor_applications_async(
+        self,
+        application_ids: List[str],
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        max_wait: int = 3600,
+        history_size: int = 240,
+        concurrency: int = 16,
+    ) -> Dict[str, Dict]:
+        """
+        在单个事件循环中并发监控多个YARN应用
+
+        轮询间隔自适应：进度或状态变化时回落到 min_interval，否则按 1.5 倍
+        退避直到 max_interval。阻塞的 REST 调用放到线程池执行，并通过信号量
+        限制同时在途的请求数。
+
+        Args:
+            application_ids: 应用ID列表
+            min_interval: 最小轮询间隔（秒）
+            max_interval: 最大轮询间隔（秒）
+            max_wait: 单个应用最大等待时间（秒）
+            history_size: 每个应用保留的进度采样数（环形缓冲区）
+            concurrency: 同时在途的RM请求上限
+
+        Returns:
+            {application_id: 监控结果字典}，progress_history 为
+            YarnProgressSample 组成的定长 deque
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        watchers = [
+            self._watch_application(
+                app_id,
+                semaphore,
+                min_interval,
+                max(min_interval, max_interval),
+                max_wait,
+                history_size,
+            )
+            for app_id in dict.fromkeys(application_ids)
+        ]
+        results = await asyncio.gather(*watchers)
+        return {r["application_id"]: r for r in results}
+
+    async def _watch_application(
+        self,
+        application_id: str,
+        semaphore: asyncio.Semaphore,
+        min_interval: float,
+        max_interval: float,
+        max_wait: int,
+        history_size: int,
+    ) -> Dict:
         logger.info(f"Starting to monitor application: {application_id}")
 
+        loop = asyncio.get_running_loop()
         start_time = time.time()
-        progress_history = []
+        history: Deque[YarnProgressSample] = deque(maxlen=max(1, history_size))
+        interval = min_interval
+        last_info: Optional[YarnApplicationInfo] = None
 
         while time.time() - start_time < max_wait:
-            app_info = self.get_application_by_id(application_id)
+            async with semaphore:
+                app_info = await loop.run_in_executor(
+                    None, self.get_application_by_id, application_id
+                )
 
             if not app_info:
                 logger.warning(f"Application {application_id} not found")
                 break
 
-            current_time = datetime.now().isoformat()
-            progress_info = {
-                "timestamp": current_time,
-                "progress": app_info.progress,
-                "state": app_info.state,
-                "final_status": app_info.final_status,
-                "elapsed_time": app_info.elapsed_time,
-            }
-            progress_history.append(progress_info)
-
-            logger.info(
-                f"Application {application_id} progress: {app_info.progress}%, "
-                f"state: {app_info.state}, final_status: {app_info.final_status}"
+            last_info = app_info
+            previous = history[-1] if history else None
+            history.append(
+                YarnProgressSample(
+                    timestamp=time.time(),
+                    progress=app_info.progress,
+                    state=app_info.state,
+                    final_status=app_info.final_status,
+                    elapsed_time=app_info.elapsed_time,
+                )
             )
 
-            # 检查是否完成
-            if app_info.state in [
-                YarnApplicationState.FINISHED.value,
-                YarnApplicationState.FAILED.value,
-                YarnApplicationState.KILLED.value,
-            ]:
+            if app_info.state in _TERMINAL_APPLICATION_STATES:
                 logger.info(
                     f"Application {application_id} completed with state: {app_info.state}"
                 )
                 break
 
-            time.sleep(check_interval)
+            if (
+                previous is None
+                or previous.progress != app_info.progress
+                or previous.state != app_info.state
+            ):
+                interval = min_interval
+            else:
+                interval = min(interval * 1.5, max_interval)
 
-        final_app_info = self.get_application_by_id(application_id)
+            remaining = max_wait - (time.time() - start_time)
+            await asyncio.sleep(max(0.0, min(interval, remaining)))
 
+        final_state = last_info.state if last_info else "UNKNOWN"
+        final_status = last_info.final_status if last_info else "UNKNOWN"
         return {
             "application_id": application_id,
             "monitoring_duration": time.time() - start_time,
-            "progress_history": progress_history,
-            "final_state": final_app_info.state if final_app_info else "UNKNOWN",
-            "final_status": (
-                final_app_info.final_status if final_app_info else "UNKNOWN"
-            ),
-            "success": (
-                final_app_info.final_status
-                == YarnApplicationFinalStatus.SUCCEEDED.value
-                if final_app_info
-                else False
-            ),
+            "progress_history": history,
+            "final_state": final_state,
+            "final_status": final_status,
+            "success": final_status == YarnApplicationFinalStatus.SUCCEEDED.value,
         }
 
     def close(self):
@@ -472,6 +608,334 @@ class YarnResourceManagerMonitor:
             logger.info("YARN monitor session closed")
 
 
+_monitor_loop: Optional[asyncio.AbstractEventLoop] = None
+_monitor_loop_lock = threading.Lock()
+
+
+def get_yarn_monitor_loop() -> asyncio.AbstractEventLoop:
+    """获取进程内共享的YARN监控事件循环（在后台守护线程中运行）"""
+    global _monitor_loop
+    with _monitor_loop_lock:
+        # 循环线程未能运行（或已退出）时重新创建
+        if _monitor_loop is None or not _monitor_loop.is_running():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            loop.call_soon(ready.set)
+            threading.Thread(
+                target=loop.run_forever, name="yarn-monitor-loop", daemon=True
+            ).start()
+            if not ready.wait(timeout=1.0):
+                logger.warning("YARN monitor event loop did not start in time")
+            _monitor_loop = loop
+        return _monitor_loop
+
+
+def build_yarn_query_tag(task_id: Optional[int]) -> str:
+    """生成合并SQL的YARN应用标签（YARN会将标签统一转为小写）"""
+    return f"hsfp-merge-{task_id or 0}-{uuid.uuid4().hex[:8]}"
+
+
+def _current_execution_engine(cursor) -> Optional[str]:
+    """读取当前会话的 hive.execution.engine，读取失败时返回None"""
+    try:
+        cursor.execute("SET hive.execution.engine")
+        for row in cursor.fetchall() or []:
+            text = str(row[0] if isinstance(row, (list, tuple)) else row)
+            key, _, value = text.partition("=")
+            if key.strip() == "hive.execution.engine" and value.strip():
+                return value.strip().lower()
+    except Exception as e:
+        logger.debug(f"Failed to read hive.execution.engine: {e}")
+    return None
+
+
+def apply_yarn_query_tag(cursor, tag: str) -> bool:
+    """
+    在当前HiveServer2会话上设置查询标签，使后续提交的TEZ/MR应用带上该标签
+
+    Hive 3 会把 hive.query.tag 写入 YARN applicationTags；MR 作业额外使用
+    mapreduce.job.tags。配置项可能受白名单限制，设置失败时忽略。
+
+    Returns:
+        标签能否唯一定位本次SQL的YARN应用。仅当 hive.query.tag 被接受且执行
+        引擎不是 Tez 时为True：Tez 会话的 AM 在会话启动时就确定了
+        applicationTags，同一会话（含连接池复用的会话、HS2 预热会话）后续的
+        SQL 复用该 AM 而不会带上新标签；只有 mapreduce.job.tags 生效时 Tez
+        应用同样没有标签。返回False时调用方保留按启动时间的兜底匹配。
+    """
+    query_tag_accepted = False
+    for key in ("hive.query.tag", "mapreduce.job.tags"):
+        try:
+            cursor.execute(f"SET {key}={tag}")
+            if key == "hive.query.tag":
+                query_tag_accepted = True
+        except Exception as e:
+            logger.debug(f"Failed to set {key} for YARN tagging: {e}")
+    if not query_tag_accepted:
+        return False
+    # 读不到执行引擎时按 Hive 3 默认的 Tez 处理
+    engine = _current_execution_engine(cursor) or "tez"
+    return engine != "tez"
+
+
+@dataclass
+class YarnApplicationSubscription:
+    """单个合并SQL对YARN应用的订阅，由共享轮询器负责填充最新状态"""
+
+    subscription_id: str
+    started_after_ms: int
+    tag: Optional[str] = None
+    name_hint: Optional[str] = None
+    application_id: Optional[str] = None
+    allow_fallback: bool = True
+    # 按启动时间兜底匹配的绑定只是临时的，出现确定匹配的应用后会被改绑
+    provisional: bool = False
+    latest: Optional[YarnApplicationInfo] = None
+    updated_at: float = 0.0
+
+
+class YarnApplicationPoller:
+    """
+    按集群共享的YARN应用轮询器
+
+    每个轮询周期只向ResourceManager发起一次 startedTimeBegin 过滤的查询，
+    再按标签/作业名/应用ID把应用分派给订阅的合并任务，避免并发合并各自
+    轮询RM，也避免互相认领对方的YARN作业。轮询循环作为协程运行在共享的
+    YARN监控事件循环上，各集群的轮询器不再各占一个线程。
+    """
+
+    APPLICATION_TYPES = ["TEZ", "MAPREDUCE"]
+    # 启动时间过滤向前放宽，兼容RM与本机的时钟偏差
+    CLOCK_SKEW_MS = 30_000
+
+    def __init__(
+        self,
+        monitor: YarnResourceManagerMonitor,
+        interval: float = 5.0,
+        limit: int = 200,
+    ):
+        self.monitor = monitor
+        self.interval = interval
+        self.limit = limit
+        self._subscriptions: Dict[str, YarnApplicationSubscription] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._future: Optional[concurrent.futures.Future] = None
+        # 标识当前轮询协程，退出时只清理自己对应的 _future
+        self._run_token: Optional[object] = None
+
+    def subscribe(
+        self,
+        tag: Optional[str] = None,
+        name_hint: Optional[str] = None,
+        application_id: Optional[str] = None,
+        started_after_ms: Optional[int] = None,
+        allow_fallback: bool = True,
+    ) -> YarnApplicationSubscription:
+        """注册订阅，必要时在共享监控事件循环上启动轮询协程"""
+        sub = YarnApplicationSubscription(
+            subscription_id=uuid.uuid4().hex,
+            started_after_ms=int(
+                started_after_ms if started_after_ms is not None else time.time() * 1000
+            ),
+            tag=tag.lower() if tag else None,
+            name_hint=name_hint,
+            application_id=application_id,
+            allow_fallback=allow_fallback,
+        )
+        with self._lock:
+            self._subscriptions[sub.subscription_id] = sub
+            # 轮询协程退出前会在锁内把 _future 置为 None；done() 兜底处理被取消的情况
+            if self._future is None or self._future.done():
+                self._stop.clear()
+                token = object()
+                self._run_token = token
+                self._future = asyncio.run_coroutine_threadsafe(
+                    self._run(token), get_yarn_monitor_loop()
+                )
+        return sub
+
+    def unsubscribe(self, subscription: YarnApplicationSubscription) -> None:
+        """取消订阅；最后一个订阅取消后轮询协程会自行退出"""
+        with self._lock:
+            self._subscriptions.pop(subscription.subscription_id, None)
+
+    def subscription_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+    def stop(self) -> None:
+        """停止轮询协程"""
+        self._stop.set()
+        future = self._future
+        if future is not None:
+            future.cancel()
+
+    async def _run(self, token: object) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            with self._lock:
+                if self._stop.is_set() or not self._subscriptions:
+                    # future 要等事件循环执行完成回调才算 done；先在锁内清空，
+                    # 避免此间隙内的 subscribe 认为轮询仍在运行而不重启
+                    if self._run_token is token:
+                        self._future = None
+                        self._run_token = None
+                    return
+            try:
+                # RM 请求是阻塞调用，放到线程池执行
+                await loop.run_in_executor(None, self.poll_once)
+            except Exception as e:
+                # 轮询失败不影响合并主流程
+                logger.warning(f"YARN application poll failed: {e}")
+
+    def poll_once(self) -> None:
+        """执行一次轮询并把结果分派给所有订阅"""
+        with self._lock:
+            subs = list(self._subscriptions.values())
+        if not subs:
+            return
+
+        begin = min(s.started_after_ms for s in subs) - self.CLOCK_SKEW_MS
+        apps = self.monitor.get_applications(
+            application_types=self.APPLICATION_TYPES,
+            limit=self.limit,
+            started_time_begin=max(begin, 0),
+        )
+        self._dispatch(subs, apps)
+
+    def _dispatch(
+        self,
+        subs: List[YarnApplicationSubscription],
+        apps: List[YarnApplicationInfo],
+    ) -> None:
+        now = time.time()
+        by_id = {a.id: a for a in apps}
+
+        def _assign(
+            sub: YarnApplicationSubscription,
+            app: YarnApplicationInfo,
+            provisional: bool = False,
+        ):
+            sub.application_id = app.id
+            sub.provisional = provisional
+            sub.latest = app
+            sub.updated_at = now
+
+        # 第一轮：已确定绑定的应用ID直接刷新
+        firm = set()
+        for sub in subs:
+            if sub.application_id and not sub.provisional:
+                firm.add(sub.application_id)
+                app = by_id.get(sub.application_id)
+                if app is not None:
+                    _assign(sub, app)
+
+        # 第二轮：标签、作业名等确定性匹配；临时绑定的订阅找到确定匹配后改绑
+        for sub in subs:
+            if sub.application_id and not sub.provisional:
+                continue
+            app = self._match_exact(sub, apps, firm)
+            if app is not None:
+                _assign(sub, app)
+                firm.add(app.id)
+
+        # 临时绑定的应用被其他订阅确定认领时解除绑定，重新参与兜底匹配
+        claimed = set(firm)
+        pending = []
+        for sub in subs:
+            if sub.provisional:
+                if sub.application_id not in firm:
+                    claimed.add(sub.application_id)
+                    app = by_id.get(sub.application_id)
+                    if app is not None:
+                        _assign(sub, app, provisional=True)
+                    continue
+                sub.application_id = None
+                sub.provisional = False
+                sub.latest = None
+            if not sub.application_id and sub.allow_fallback:
+                pending.append(sub)
+
+        # 第三轮：无法确定匹配时，按启动时间临时挑选尚未被认领的最早应用
+        for sub in sorted(pending, key=lambda s: s.started_after_ms):
+            candidates = [
+                a
+                for a in apps
+                if a.id not in claimed
+                and (a.start_time or 0) >= sub.started_after_ms - self.CLOCK_SKEW_MS
+            ]
+            if candidates:
+                app = min(candidates, key=lambda a: a.start_time or 0)
+                _assign(sub, app, provisional=True)
+                claimed.add(app.id)
+
+    @staticmethod
+    def _match_exact(
+        sub: YarnApplicationSubscription,
+        apps: List[YarnApplicationInfo],
+        claimed: set,
+    ) -> Optional[YarnApplicationInfo]:
+        for app in apps:
+            if app.id in claimed:
+                continue
+            if sub.tag:
+                tags = [
+                    t.strip().lower()
+                    for t in str(app.application_tags or "").split(",")
+                ]
+                if sub.tag in tags or sub.tag in str(app.name or "").lower():
+                    return app
+            if sub.name_hint and sub.name_hint in str(app.name or ""):
+                return app
+        return None
+
+
+_shared_pollers: Dict[Tuple, YarnApplicationPoller] = {}
+_shared_pollers_lock = threading.Lock()
+
+
+def get_shared_yarn_poller(
+    monitor: YarnResourceManagerMonitor,
+) -> YarnApplicationPoller:
+    """获取（或创建）与监控器所属集群绑定的共享轮询器"""
+    urls = getattr(monitor, "resource_manager_urls", None)
+    key = tuple(urls) if isinstance(urls, (list, tuple)) else (id(monitor),)
+    with _shared_pollers_lock:
+        poller = _shared_pollers.get(key)
+        if poller is None:
+            poller = YarnApplicationPoller(monitor)
+            _shared_pollers[key] = poller
+        return poller
+
+
+def subscribe_yarn_application(
+    monitor: Optional[YarnResourceManagerMonitor],
+    cursor,
+    task_id: Optional[int],
+) -> Tuple[Optional[YarnApplicationPoller], Optional[YarnApplicationSubscription]]:
+    """
+    为即将执行的SQL打上YARN标签并订阅集群共享轮询器
+
+    标签能唯一定位应用时（见 apply_yarn_query_tag）只按标签匹配，不做启动时间
+    兜底，避免认领其他用户的作业；否则允许兜底，且兜底匹配只是临时绑定，
+    出现带标签的应用后会被改绑。
+    Returns:
+        (poller, subscription)；未配置 RM 或订阅失败时均为 None
+    """
+    if monitor is None:
+        return None, None
+    try:
+        poller = get_shared_yarn_poller(monitor)
+        tag = build_yarn_query_tag(task_id)
+        tagged = apply_yarn_query_tag(cursor, tag)
+        return poller, poller.subscribe(tag=tag, allow_fallback=not tagged)
+    except Exception as e:
+        logger.debug(f"YARN subscription unavailable: {e}")
+        return None, None
+
+
 # 测试函数
 if __name__ == "__main__":
     # 测试YARN监控器
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+API 并发压测脚本
+并发请求仪表盘接口的同时持续推送 WebSocket 消息,统计 HTTP 延迟、WebSocket
+推送延迟与事件循环停顿的 p50/p95/p99,用于验证阻塞调用不再卡住事件循环。
+
+用法:
+    # 进程内压测(与应用共用一个事件循环,最能暴露阻塞调用)
+    python scripts/load_test_api.py --concurrency 32 --requests 500
+
+    # 压测已启动的服务(WebSocket 部分需要安装 websockets 包)
+    python scripts/load_test_api.py --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+# 添加项目根目录到路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/dashboard/summary",
+    "/api/v1/dashboard/trends",
+    "/api/v1/dashboard/file-distribution",
+    "/api/v1/dashboard/top-tables",
+    "/api/v1/dashboard/recent-tasks",
+    "/api/v1/dashboard/cluster-stats",
+]
+WS_TOPIC = "load_test"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, samples: List[float], errors: int = 0) -> Dict[str, float]:
+    result = {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+        "mean_ms": statistics.mean(samples) * 1000 if samples else 0.0,
+    }
+    print(
+        f"{name:<12} n={result['count']:<6} err={errors:<4} "
+        f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+        f"p99={result['p99_ms']:.1f}ms max={result['max_ms']:.1f}ms"
+    )
+    return result
+
+
+async def run_http_load(
+    client: httpx.AsyncClient,
+    paths: List[str],
+    total_requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            path = paths[index % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize("http", latencies, errors)
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> List[float]:
+    """事件循环停顿: 实际唤醒时间超出预期 sleep 的部分"""
+    lags: List[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+    return lags
+
+
+class _LatencySocket:
+    """进程内WebSocket替身: 记录每条推送从发布到写出的耗时"""
+
+    def __init__(self, latencies: List[float]):
+        self.latencies = latencies
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        payload = json.loads(text)
+        sent_at = payload.get("data", {}).get("sent_at")
+        if sent_at is not None:
+            self.latencies.append(time.perf_counter() - sent_at)
+
+
+async def run_inprocess_ws(
+    clients: int, interval: float, stop: asyncio.Event
+) -> List[float]:
+    from app.services.websocket_service import WebSocketMessage, websocket_manager
+
+    latencies: List[float] = []
+    sockets = [_LatencySocket(latencies) for _ in range(clients)]
+    for index, socket in enumerate(sockets):
+        user_id = f"load-test-{index}"
+        await websocket_manager.connect(socket, user_id=user_id)
+        await websocket_manager.subscribe(user_id, [WS_TOPIC])
+    try:
+        while not stop.is_set():
+            await websocket_manager.broadcast_to_topic(
+                WS_TOPIC,
+                WebSocketMessage(
+                    type="load_test", data={"sent_at": time.perf_counter()}
+                ),
+            )
+            await asyncio.sleep(interval)
+        await websocket_manager.wait_for_pending_sends()
+    finally:
+        for socket in sockets:
+            await websocket_manager.disconnect(socket)
+    return latencies
+
+
+async def run_remote_ws(
+    base_url: str, clients: int, interval: float, stop: asyncio.Event
+) -> Optional[List[float]]:
+    """通过 ping/pong 往返测量线上服务的 WebSocket 响应延迟"""
+    try:
+        import websockets
+    except ImportError:
+        print("websockets 未安装,跳过 WebSocket 压测")
+        return None
+
+    ws_url = base_url.replace("http", "ws", 1).rstrip("/") + "/api/v1/ws"
+    latencies: List[float] = []
+
+    async def client(index: int):
+        async with websockets.connect(f"{ws_url}?user_id=load-test-{index}") as ws:
+            await ws.recv()  # connection_established
+            while not stop.is_set():
+                started = time.perf_counter()
+                await ws.send(json.dumps({"type": "ping", "timestamp": started}))
+                while True:
+                    payload = json.loads(await ws.recv())
+                    if payload.get("type") == "pong":
+                        break
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(interval)
+
+    await asyncio.gather(*(client(i) for i in range(clients)), return_exceptions=True)
+    return latencies
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    paths = args.paths or DEFAULT_PATHS
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        import anyio
+
+        from app.config.settings import settings
+        from app.main import app
+
+        # 与应用启动时的线程池配置保持一致
+        anyio.to_thread.current_default_thread_limiter().total_tokens = (
+            settings.API_THREADPOOL_SIZE
+        )
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://load-test",
+            timeout=args.timeout,
+        )
+
+    stop = asyncio.Event()
+    lag_task = asyncio.ensure_future(monitor_loop_lag(stop))
+    if args.base_url:
+        ws_task = asyncio.ensure_future(
+            run_remote_ws(args.base_url, args.ws_clients, args.ws_interval, stop)
+        )
+    else:
+        ws_task = asyncio.ensure_future(
+            run_inprocess_ws(args.ws_clients, args.ws_interval, stop)
+        )
+
+    print(
+        f"压测开始: requests={args.requests}, concurrency={args.concurrency}, "
+        f"ws_clients={args.ws_clients}"
+    )
+    async with client:
+        report = {
+            "http": await run_http_load(client, paths, args.requests, args.concurrency)
+        }
+    stop.set()
+
+    ws_latencies = await ws_task
+    if ws_latencies is not None:
+        report["websocket"] = summarize("websocket", ws_latencies)
+    report["loop_lag"] = summarize("loop_lag", await lag_task)
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="仪表盘 + WebSocket 并发压测")
+    parser.add_argument("--base-url", help="已启动服务地址,不指定则进程内压测")
+    parser.add_argument("--requests", type=int, default=300, help="HTTP 请求总数")
+    parser.add_argument("--concurrency", type=int, default=16, help="HTTP 并发数")
+    parser.add_argument("--ws-clients", type=int, default=20, help="WebSocket 连接数")
+    parser.add_argument(
+        "--ws-interval", type=float, default=0.05, help="WebSocket 推送/ping 间隔(秒)"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP 超时(秒)")
+    parser.add_argument("--paths", nargs="*", help="压测的接口路径,默认仪表盘接口")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出统计结果")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    result = asyncio.run(main(cli_args))
+    if cli_args.json:
+        print(json.dumps(result, indent=2))
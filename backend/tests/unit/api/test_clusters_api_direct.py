@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 
 import pytest
@@ -51,26 +52,26 @@ async def test_create_list_get_update_delete_cluster(db_session, monkeypatch):
     bad = _cluster_payload("bad")
     bad["hive_metastore_url"] = "xxx://invalid"
     with pytest.raises(Exception):
-        await clusters_api.create_cluster(ClusterCreate(**bad), False, db_session)
+        clusters_api.create_cluster(ClusterCreate(**bad), False, db_session)
 
     bad2 = _cluster_payload("bad2")
     bad2["hdfs_namenode_url"] = "ftp://invalid"
     with pytest.raises(Exception):
-        await clusters_api.create_cluster(ClusterCreate(**bad2), False, db_session)
+        clusters_api.create_cluster(ClusterCreate(**bad2), False, db_session)
 
     # success create
     ok = _cluster_payload("ok1")
-    created = await clusters_api.create_cluster(ClusterCreate(**ok), False, db_session)
+    created = clusters_api.create_cluster(ClusterCreate(**ok), False, db_session)
     assert created.id and created.name == "ok1"
 
     # list and get
-    lst = await clusters_api.list_clusters(db_session)
+    lst = clusters_api.list_clusters(db_session)
     assert any(x.id == created.id for x in lst)
-    one = await clusters_api.get_cluster(created.id, db_session)
+    one = clusters_api.get_cluster(created.id, db_session)
     assert one.id == created.id
 
     # update
-    upd = await clusters_api.update_cluster(
+    upd = clusters_api.update_cluster(
         created.id, ClusterUpdate(description="d1"), db_session
     )
     assert upd.description == "d1"
@@ -104,10 +105,10 @@ async def test_cluster_stats_and_databases(db_session):
         db_session.add(m)
     db_session.commit()
 
-    stats = await clusters_api.get_cluster_stats(c.id, db_session)
+    stats = clusters_api.get_cluster_stats(c.id, db_session)
     assert stats["total_databases"] == 2 and stats["total_tables"] >= 3
 
-    dbs = await clusters_api.get_cluster_databases(c.id, db_session)
+    dbs = clusters_api.get_cluster_databases(c.id, db_session)
     assert set(dbs) == {"db1", "db2"}
 
 
@@ -135,7 +136,7 @@ async def test_get_cluster_databases_when_empty_uses_metastore_error_path(
 
     monkeypatch.setattr(meta_mod, "MySQLHiveMetastoreConnector", lambda url: _Conn())
 
-    res = await clusters_api.get_cluster_databases(c.id, db_session)
+    res = clusters_api.get_cluster_databases(c.id, db_session)
     assert isinstance(res, dict) and res.get("databases") == [] and "warning" in res
 
 
@@ -149,7 +150,7 @@ async def test_health_and_batch_checks(db_session, monkeypatch):
         "get_cluster_health_metrics",
         lambda db, days: {"ok": True},
     )
-    r = await clusters_api.get_health_metrics(7, db_session)
+    r = clusters_api.get_health_metrics(7, db_session)
     assert r["ok"] is True
 
     async def fake_batch(db, ids, limit):
@@ -158,7 +159,10 @@ async def test_health_and_batch_checks(db_session, monkeypatch):
     monkeypatch.setattr(
         clusters_api.cluster_status_service, "batch_health_check", fake_batch
     )
-    r2 = await clusters_api.batch_health_check([1, 2], 5, db_session)
+    # 同步端点由 FastAPI 在线程池中执行
+    r2 = await asyncio.to_thread(
+        clusters_api.batch_health_check, [1, 2], 5, db_session
+    )
     assert r2["successful_checks"] == 2 and r2["total_clusters"] == 2
 
 
@@ -187,7 +191,7 @@ async def test_create_cluster_with_validation_failure(db_session, monkeypatch):
 
     payload = _cluster_payload("c-validate")
     with pytest.raises(Exception):
-        await clusters_api.create_cluster(ClusterCreate(**payload), True, db_session)
+        clusters_api.create_cluster(ClusterCreate(**payload), True, db_session)
 
 
 @pytest.mark.unit
@@ -208,7 +212,7 @@ async def test_create_cluster_requires_kerberos_fields(db_session):
     kerb_payload["kerberos_realm"] = "EXAMPLE.COM"
     kerb_payload["kerberos_ticket_cache"] = "/tmp/krb5cc_test"
 
-    created = await clusters_api.create_cluster(
+    created = clusters_api.create_cluster(
         ClusterCreate(**kerb_payload), False, db_session
     )
     assert created.auth_type == "KERBEROS"
@@ -226,7 +230,7 @@ async def test_get_kerberos_metrics_endpoint(monkeypatch):
         lambda: {"kerberos_failures": {"KERBEROS_AUTHENTICATION_FAILED": 3}},
     )
 
-    payload = await clusters_api.get_kerberos_metrics()
+    payload = clusters_api.get_kerberos_metrics()
 
     assert "metrics" in payload
     assert (
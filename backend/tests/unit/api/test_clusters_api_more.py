@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 
@@ -30,7 +32,7 @@ async def test_cluster_status_and_history_and_cache(db_session, monkeypatch):
         "get_cluster_connection_summary",
         lambda db, cid: {"ok": True},
     )
-    s = await clusters_api.get_cluster_status(c.id, db_session)
+    s = clusters_api.get_cluster_status(c.id, db_session)
     assert s["ok"] is True
 
     class _Rec:
@@ -52,7 +54,7 @@ async def test_cluster_status_and_history_and_cache(db_session, monkeypatch):
         "get_cluster_status_history",
         lambda db, cid, limit: [_Rec()],
     )
-    h = await clusters_api.get_cluster_status_history(c.id, 5, db_session)
+    h = clusters_api.get_cluster_status_history(c.id, 5, db_session)
     assert h["total_records"] == 1 and h["cluster_id"] == c.id
 
     # clear cache
@@ -64,7 +66,7 @@ async def test_cluster_status_and_history_and_cache(db_session, monkeypatch):
     monkeypatch.setattr(
         clusters_api.cluster_status_service, "clear_connection_cache", fake_clear
     )
-    cc = await clusters_api.clear_cluster_cache(c.id, db_session)
+    cc = clusters_api.clear_cluster_cache(c.id, db_session)
     assert called["clr"] is True and "cleared" in cc["message"]
 
 
@@ -80,7 +82,7 @@ async def test_connection_history_and_statistics(db_session, monkeypatch):
         "get_connection_history",
         lambda cid, limit: [{"status": "ok"}],
     )
-    rh = await clusters_api.get_connection_history(c.id, 10, db_session)
+    rh = clusters_api.get_connection_history(c.id, 10, db_session)
     assert rh["total_records"] == 1
 
     monkeypatch.setattr(
@@ -88,7 +90,7 @@ async def test_connection_history_and_statistics(db_session, monkeypatch):
         "get_connection_statistics",
         lambda cid, hours: {"success_rate": 1.0},
     )
-    rs = await clusters_api.get_connection_statistics(c.id, 24, db_session)
+    rs = clusters_api.get_connection_statistics(c.id, 24, db_session)
     assert rs["success_rate"] == 1.0
 
 
@@ -101,8 +103,12 @@ async def test_connection_tests(db_session, monkeypatch):
 
     # invalid types
     with pytest.raises(Exception):
-        await clusters_api.test_cluster_connection_enhanced(
-            c.id, ["bad"], False, db_session
+        await asyncio.to_thread(
+            clusters_api.test_cluster_connection_enhanced,
+            c.id,
+            ["bad"],
+            False,
+            db_session,
         )
 
     # enhanced ok
@@ -112,14 +118,22 @@ async def test_connection_tests(db_session, monkeypatch):
     monkeypatch.setattr(
         clusters_api.cluster_status_service, "test_cluster_connections", fake_test
     )
-    eok = await clusters_api.test_cluster_connection_enhanced(
-        c.id, ["metastore"], True, db_session
+    eok = await asyncio.to_thread(
+        clusters_api.test_cluster_connection_enhanced,
+        c.id,
+        ["metastore"],
+        True,
+        db_session,
     )
     assert eok["test_mode"] == "enhanced" and eok["force_refresh"] is True
 
     # real mode
-    rok = await clusters_api.test_cluster_connection(
-        c.id, mode="real", force_refresh=False, db=db_session
+    rok = await asyncio.to_thread(
+        clusters_api.test_cluster_connection,
+        c.id,
+        mode="real",
+        force_refresh=False,
+        db=db_session,
     )
     assert rok["test_mode"] == "real" and "tests" in rok
 
@@ -138,8 +152,12 @@ async def test_connection_tests(db_session, monkeypatch):
             }
 
     monkeypatch.setattr(clusters_api, "HybridTableScanner", _Scanner)
-    mok = await clusters_api.test_cluster_connection(
-        c.id, mode="mock", force_refresh=False, db=db_session
+    mok = await asyncio.to_thread(
+        clusters_api.test_cluster_connection,
+        c.id,
+        mode="mock",
+        force_refresh=False,
+        db=db_session,
     )
     assert mok["overall_status"] in ("success", "failed") and "connections" in mok
 
@@ -168,9 +186,7 @@ async def test_update_cluster_status(db_session, monkeypatch):
         "record_status_change",
         lambda db, cid, new_status, reason, message: _Rec(),
     )
-    r = await clusters_api.update_cluster_status(
-        c.id, new_status="inactive", db=db_session
-    )
+    r = clusters_api.update_cluster_status(c.id, new_status="inactive", db=db_session)
     assert r["new_status"] == "inactive" and r["old_status"] == "active"
 
 
@@ -209,7 +225,5 @@ async def test_scan_all_cluster_tables_simple(db_session, monkeypatch):
 
     monkeypatch.setattr(meta_mod, "MySQLHiveMetastoreConnector", lambda url: _Conn())
 
-    res = await clusters_api.scan_all_cluster_tables(
-        c.id, max_tables_per_db=2, db=db_session
-    )
+    res = clusters_api.scan_all_cluster_tables(c.id, max_tables_per_db=2, db=db_session)
     assert res["cluster_id"] == c.id and "databases" in res
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.cluster import Cluster
+from app.models.partition_metric import PartitionMetric
+from app.models.table_metric import TableMetric
+
+GB = 1024**3
+
+
+@pytest.mark.unit
+def test_enhanced_coldness_distribution_buckets_by_days_and_size(client, db_session):
+    c = Cluster(
+        name="c-coldness",
+        hive_host="h",
+        hive_port=10000,
+        hive_metastore_url="mysql://u:p@h:3306/db",
+        hdfs_namenode_url="hdfs://nn:8020",
+    )
+    db_session.add(c)
+    db_session.commit()
+    db_session.refresh(c)
+
+    now = datetime.now()
+    old = TableMetric(
+        cluster_id=c.id,
+        database_name="db",
+        table_name="t1",
+        total_size=GB,
+        days_since_last_access=400,
+        scan_time=now - timedelta(days=2),
+    )
+    # 同一张表的最新一次扫描结果覆盖旧记录
+    latest = TableMetric(
+        cluster_id=c.id,
+        database_name="db",
+        table_name="t1",
+        total_size=2 * GB,
+        days_since_last_access=100,
+        scan_time=now,
+    )
+    inferred = TableMetric(
+        cluster_id=c.id,
+        database_name="db",
+        table_name="t2",
+        total_size=GB,
+        scan_time=now - timedelta(days=3),
+    )
+    db_session.add_all([old, latest, inferred])
+    db_session.commit()
+    db_session.add_all(
+        [
+            PartitionMetric(
+                table_metric_id=latest.id,
+                partition_name="dt=1",
+                partition_path="/p/1",
+                total_size=GB,
+                days_since_last_access=0,
+            ),
+            PartitionMetric(
+                table_metric_id=latest.id,
+                partition_name="dt=2",
+                partition_path="/p/2",
+                total_size=GB,
+                days_since_last_access=2000,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    r = client.get(
+        "/api/v1/dashboard/enhanced-coldness-distribution",
+        params={"cluster_id": c.id},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    dist = body["distribution"]
+    assert dist["month_3_to_6"]["tables"] == {"count": 1, "size_gb": 2.0}
+    assert dist["day_1_to_7"]["tables"]["count"] == 1
+    assert dist["year_1_to_3"]["tables"]["count"] == 0
+    assert dist["within_1_day"]["partitions"] == {"count": 1, "size_gb": 1.0}
+    assert dist["over_3_years"]["partitions"]["count"] == 1
+    assert body["summary"]["total_tables"] == 2
+    assert body["summary"]["total_partitions"] == 2
+    assert body["summary"]["total_size_gb"] == 3.0
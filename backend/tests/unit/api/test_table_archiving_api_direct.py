@@ -50,9 +50,9 @@ async def test_cold_summary_and_list(db_session):
     c = _mk_cluster(db_session)
     _mk_metric(db_session, c.id, "dbA", "t1", is_cold=1)
     _mk_metric(db_session, c.id, "dbA", "t2", is_cold=1)
-    s = await ta.get_cold_data_summary(c.id, db_session)
+    s = ta.get_cold_data_summary(c.id, db_session)
     assert s["cold_data_summary"]["cold_table_count"] >= 2
-    lst = await ta.get_cold_data_list(
+    lst = ta.get_cold_data_list(
         c.id,
         database_name=None,
         min_days_since_access=0,
@@ -90,7 +90,7 @@ async def test_scan_cold_data_updates_flags(db_session, monkeypatch):
             }
 
     monkeypatch.setattr(ta, "SimpleColdDataScanner", _Cold)
-    res = await ta.scan_cold_data(
+    res = ta.scan_cold_data(
         c.id,
         cold_days_threshold=15,
         cold_threshold_days=None,
@@ -110,7 +110,7 @@ async def test_archive_and_restore_table(db_session):
     m = _mk_metric(db_session, c.id, "dbC", "t4", status="active")
 
     # 测试归档状态查询
-    status = await ta.get_archive_status(c.id, "dbC", "t4", db_session)
+    status = ta.get_archive_status(c.id, "dbC", "t4", db_session)
     assert status["table_info"]["database_name"] == "dbC"
 
     # mark archived in DB to test list
@@ -119,10 +119,10 @@ async def test_archive_and_restore_table(db_session):
     m.archived_at = datetime.utcnow()
     db_session.commit()
 
-    lst = await ta.list_archived_tables(
+    lst = ta.list_archived_tables(
         c.id, database_name=None, page=1, page_size=10, db=db_session
     )
     assert lst["pagination"]["total_count"] >= 1
 
-    stats = await ta.get_archive_statistics(c.id, days_range=7, db=db_session)
+    stats = ta.get_archive_statistics(c.id, days_range=7, db=db_session)
     assert "overall_statistics" in stats
@@ -55,27 +55,25 @@ async def test_table_management_endpoints_direct(db_session):
     _mk_metric(db_session, c.id, "dbx", "t2", now)
 
     # metrics
-    ms = await tm.get_table_metrics(cluster_id=c.id, database_name=None, db=db_session)
+    ms = tm.get_table_metrics(cluster_id=c.id, database_name=None, db=db_session)
     assert len(ms) >= 2
 
     # small files summary
-    sm = await tm.get_small_file_summary(
-        cluster_id=c.id, database_name="dbx", db=db_session
-    )
+    sm = tm.get_small_file_summary(cluster_id=c.id, database_name="dbx", db=db_session)
     assert sm["total_tables"] >= 1
 
     # databases
-    dbs = await tm.get_databases(c.id, db_session)
+    dbs = tm.get_databases(c.id, db_session)
     assert dbs["databases"] == ["dbx"]
 
     # tables
-    tbls = await tm.get_tables(c.id, "dbx", db_session)
+    tbls = tm.get_tables(c.id, "dbx", db_session)
     assert "t1" in tbls["tables"]
 
     # detail
-    detail = await tm.get_table_detail(c.id, "dbx", "t1", db_session)
+    detail = tm.get_table_detail(c.id, "dbx", "t1", db_session)
     assert detail["file_metrics"]["total_files"] >= 10
 
     # history
-    hist = await tm.get_table_scan_history(c.id, "dbx", "t1", 10, db_session)
+    hist = tm.get_table_scan_history(c.id, "dbx", "t1", 10, db_session)
     assert hist["scan_count"] >= 2
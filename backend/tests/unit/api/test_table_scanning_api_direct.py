@@ -46,12 +46,12 @@ async def test_scan_tables_single_table_and_database(db_session, monkeypatch):
     from app.schemas.table_metric import ScanRequest
 
     req = ScanRequest(cluster_id=c.id, database_name="dbA", table_name="tA")
-    r1 = await ts.scan_tables(req, strict_real=False, db=db_session)
+    r1 = ts.scan_tables(req, strict_real=False, db=db_session)
     assert r1["scanned_tables"] == 1 and r1["result"]["ok"] is True
 
     # single database path
     req2 = ScanRequest(cluster_id=c.id, database_name="dbB", table_name=None)
-    r2 = await ts.scan_tables(req2, strict_real=True, db=db_session)
+    r2 = ts.scan_tables(req2, strict_real=True, db=db_session)
     assert r2["scanned_tables"] == 2 and r2["results"][0]["table_name"] == "t1"
 
 
@@ -65,7 +65,7 @@ async def test_scan_tables_invalid_and_not_found(db_session):
 
     # cluster not found
     with pytest.raises(HTTPException) as ei:
-        await ts.scan_tables(
+        ts.scan_tables(
             ScanRequest(cluster_id=9999, database_name="db", table_name="t"),
             db=db_session,
         )
@@ -74,7 +74,7 @@ async def test_scan_tables_invalid_and_not_found(db_session):
     # invalid request (missing database_name) — current implementation wraps to 500
     c = _mk_cluster(db_session)
     with pytest.raises(HTTPException) as ei2:
-        await ts.scan_tables(
+        ts.scan_tables(
             ScanRequest(cluster_id=c.id, database_name=None, table_name=None),
             db=db_session,
         )
@@ -99,12 +99,12 @@ async def test_scan_database_tables_and_real(db_session, monkeypatch):
 
     monkeypatch.setattr(ts, "HybridTableScanner", _Scanner)
 
-    r1 = await ts.scan_database_tables(
+    r1 = ts.scan_database_tables(
         c.id, "dbX", strict_real=False, max_tables=0, db=db_session
     )
     assert r1["database_name"] == "dbX" and r1["scanned_tables"] == 1
 
-    r2 = await ts.scan_database_tables_real(
+    r2 = ts.scan_database_tables_real(
         c.id, "dbX", max_tables=5, strict_real=True, db=db_session
     )
     assert r2["strict_real"] is True and r2["scanned_tables"] == 1
@@ -121,7 +121,7 @@ async def test_get_partition_metrics_paths(db_session):
 
     # no table metric -> 404
     with pytest.raises(HTTPException) as ei:
-        await ts.get_partition_metrics(
+        ts.get_partition_metrics(
             cluster_id=c.id, database_name="dbM", table_name="tM", db=db_session
         )
     assert ei.value.status_code == 404
@@ -143,7 +143,7 @@ async def test_get_partition_metrics_paths(db_session):
     db_session.commit()
 
     with pytest.raises(HTTPException) as ei2:
-        await ts.get_partition_metrics(
+        ts.get_partition_metrics(
             cluster_id=c.id, database_name="dbM", table_name="tM", db=db_session
         )
     assert ei2.value.status_code == 400
@@ -153,7 +153,7 @@ async def test_get_partition_metrics_paths(db_session):
     tm.partition_count = 12
     db_session.commit()
 
-    res = await ts.get_partition_metrics(
+    res = ts.get_partition_metrics(
         cluster_id=c.id,
         database_name="dbM",
         table_name="tM",
@@ -182,7 +182,7 @@ async def test_scan_single_table_and_progress_and_logs(db_session, monkeypatch):
 
     monkeypatch.setattr(ts, "HybridTableScanner", _Scanner)
 
-    r = await ts.scan_single_table(c.id, "dbZ", "tZ", strict_real=False, db=db_session)
+    r = ts.scan_single_table(c.id, "dbZ", "tZ", strict_real=False, db=db_session)
     assert r["table_name"].endswith("dbZ.tZ") and r["strict_real"] is False
 
     # progress ok
@@ -198,7 +198,7 @@ async def test_scan_single_table_and_progress_and_logs(db_session, monkeypatch):
     monkeypatch.setattr(
         ts.scan_task_manager, "get_task_progress", lambda tid: prog, raising=False
     )
-    pr = await ts.get_scan_task_progress("tid-1")
+    pr = ts.get_scan_task_progress("tid-1")
     assert pr.task_id == "tid-1" and pr.status == "running"
 
     # cluster overview
@@ -208,7 +208,7 @@ async def test_scan_single_table_and_progress_and_logs(db_session, monkeypatch):
         lambda cid: {"cluster_id": cid, "ok": True},
         raising=False,
     )
-    ov = await ts.get_scan_progress(c.id)
+    ov = ts.get_scan_progress(c.id)
     assert ov["cluster_id"] == c.id and ov["ok"] is True
 
     # logs
@@ -218,7 +218,7 @@ async def test_scan_single_table_and_progress_and_logs(db_session, monkeypatch):
         "get_task_logs",
         lambda tid, limit=100, level=None: log_items,
     )
-    lg = await ts.get_scan_task_logs("tid-1", limit=1, level="INFO")
+    lg = ts.get_scan_task_logs("tid-1", limit=1, level="INFO")
     assert lg["task_id"] == "tid-1" and lg["log_count"] == 1
 
 
@@ -233,7 +233,7 @@ async def test_get_scan_task_progress_not_found(db_session, monkeypatch):
         ts.scan_task_manager, "get_task_progress", lambda tid: None, raising=False
     )
     with pytest.raises(HTTPException) as ei:
-        await ts.get_scan_task_progress("nope")
+        ts.get_scan_task_progress("nope")
     # current implementation wraps into 500 on exception handling
     assert ei.value.status_code == 500
 
@@ -253,7 +253,7 @@ async def test_scan_all_cluster_databases_with_progress(db_session, monkeypatch)
         raising=False,
     )
 
-    resp = await ts.scan_all_cluster_databases_with_progress(
+    resp = ts.scan_all_cluster_databases_with_progress(
         c.id, strict_real=True, max_tables_per_db=3, db=db_session
     )
     assert (
@@ -0,0 +1,15 @@
+import pytest
+
+from app.config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def _disable_hive_connection_pool(request, monkeypatch):
+    """引擎单测直接断言 PyHive 连接/游标的调用，关闭连接池避免 mock 连接跨用例复用
+
+    标记 @pytest.mark.hive_pool 的用例保留连接池，验证引擎经连接池借还连接
+    """
+    if request.node.get_closest_marker("hive_pool") is not None:
+        monkeypatch.setattr(settings, "HIVE_POOL_ENABLED", True)
+        return
+    monkeypatch.setattr(settings, "HIVE_POOL_ENABLED", False)
@@ -0,0 +1,161 @@
+"""
+引擎经 HS2 连接池借还连接
+
+本文件的用例标记 hive_pool，保留连接池：验证合并引擎各辅助类复用同一连接，
+以及执行出错时连接仍被归还（断开的连接被丢弃而不是泄漏）。
+"""
+
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from app.engines.hive_partition_path_resolver import HivePartitionPathResolver
+from app.engines.safe_hive_atomic_swap import HiveAtomicSwapManager
+from app.engines.safe_hive_file_counter import HiveFileCounter
+from app.engines.safe_hive_metadata_manager import SafeHiveMetadataManager
+from app.engines.safe_hive_temp_table import HiveTempTableManager
+from app.models.cluster import Cluster
+from app.models.merge_task import MergeTask
+from app.utils import hive_connection_pool as pool_module
+from app.utils.hive_connection_pool import HiveConnectionPool, PooledHiveConnection
+from app.utils.merge_logger import MergeTaskLogger
+from app.utils.webhdfs_client import WebHDFSClient
+
+pytestmark = pytest.mark.hive_pool
+
+
+@pytest.fixture
+def cluster():
+    cluster = Mock(spec=Cluster)
+    cluster.hive_host = "hs2.example"
+    cluster.hive_port = 10000
+    cluster.hive_database = "default"
+    cluster.auth_type = "NONE"
+    cluster.hive_username = None
+    return cluster
+
+
+@pytest.fixture
+def task():
+    task = Mock(spec=MergeTask)
+    task.id = 1
+    task.database_name = "test_db"
+    task.table_name = "user_logs"
+    return task
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = HiveConnectionPool(validate_after_idle_seconds=3600)
+    monkeypatch.setattr(pool_module, "_pool", pool)
+    return pool
+
+
+class _FakeHive:
+    """替换 pyhive 建连函数，记录新建的原始连接；broken 时新连接执行语句即失败"""
+
+    def __init__(self):
+        self.created = []
+        self.broken = False
+
+    def __call__(self, **params):
+        conn = MagicMock(name=f"hs2-conn-{len(self.created)}")
+        if self.broken:
+            conn.cursor.return_value.execute.side_effect = ConnectionError(
+                "HS2 connection reset"
+            )
+        self.created.append(conn)
+        return conn
+
+
+@pytest.fixture
+def hive(monkeypatch):
+    fake = _FakeHive()
+    monkeypatch.setattr("pyhive.hive.Connection", fake)
+    return fake
+
+
+def _managers(cluster):
+    webhdfs = Mock(spec=WebHDFSClient)
+    swap = HiveAtomicSwapManager(
+        cluster=cluster,
+        webhdfs_client=webhdfs,
+        extract_error_detail_func=str,
+        update_task_progress_func=Mock(),
+    )
+    counter = HiveFileCounter(cluster, webhdfs)
+    return swap, counter
+
+
+@pytest.mark.unit
+def test_helpers_reuse_pooled_connection(cluster, task, pool, hive):
+    swap, counter = _managers(cluster)
+
+    swap._atomic_table_swap(task, "user_logs_tmp", "user_logs_bak")
+    assert len(hive.created) == 1
+    assert pool.stats()["@hs2.example:10000/test_db"] == {
+        "idle": 1,
+        "checked_out": 0,
+    }
+
+    # 另一个辅助类以相同参数借连接：复用空闲连接，不再握手
+    conn = counter._create_hive_connection("test_db")
+    assert isinstance(conn, PooledHiveConnection)
+    assert conn.connection is hive.created[0]
+    assert len(hive.created) == 1
+    conn.close()
+    hive.created[0].close.assert_not_called()
+
+
+@pytest.mark.unit
+def test_failed_statement_releases_and_discards_broken_connection(
+    cluster, task, pool, hive
+):
+    swap, counter = _managers(cluster)
+    hive.broken = True
+
+    with pytest.raises(ConnectionError):
+        swap._atomic_table_swap(task, "user_logs_tmp", "user_logs_bak")
+    hive.broken = False
+
+    # 出错后连接已归还，存活检查失败被丢弃，没有借出中的泄漏连接
+    stats = pool.stats()["@hs2.example:10000/test_db"]
+    assert stats == {"idle": 0, "checked_out": 0}
+    hive.created[0].close.assert_called_once()
+
+    # 下一次借用新建连接
+    conn = counter._create_hive_connection("test_db")
+    assert conn.connection is hive.created[1]
+    conn.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda cluster, task: HiveTempTableManager(cluster)._validate_temp_table_data(
+            task, "user_logs_tmp"
+        ),
+        lambda cluster, task: SafeHiveMetadataManager(cluster)._get_table_partitions(
+            "test_db", "user_logs"
+        ),
+        lambda cluster, task: HivePartitionPathResolver(
+            cluster, Mock(spec=WebHDFSClient)
+        )._get_table_partitions("test_db", "user_logs"),
+        lambda cluster, task: HiveFileCounter(
+            cluster, Mock(spec=WebHDFSClient)
+        )._cleanup_temp_partition(
+            "test_db", "user_logs", "dt='tmp'", MagicMock(spec=MergeTaskLogger)
+        ),
+    ],
+    ids=["temp_table", "metadata", "path_resolver", "file_counter"],
+)
+def test_helpers_release_connection_when_statement_fails(
+    cluster, task, pool, hive, call
+):
+    hive.broken = True
+
+    # 这些辅助方法吞掉异常返回默认值，连接同样必须归还
+    call(cluster, task)
+
+    assert pool.stats()["@hs2.example:10000/test_db"]["checked_out"] == 0
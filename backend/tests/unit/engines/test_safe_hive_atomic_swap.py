@@ -963,8 +963,62 @@ class TestHiveAtomicSwapManagerExecuteSQLWithHeartbeat:
             interval=10,
         )
 
-        # Then
-        mock_cursor.execute.assert_called_once()
+        # Then: 先为会话打上 YARN 查询标签，再执行业务 SQL
+        executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+        assert executed[-1] == "INSERT INTO test_table SELECT * FROM source"
+        assert any(sql.startswith("SET hive.query.tag=") for sql in executed)
+
+    def test_heartbeat_never_commits_merge_session(
+        self, atomic_swap_manager, db_session
+    ):
+        """TC-9.4: 心跳线程通过独立会话写进度,不提交合并线程的会话"""
+        # Given
+        cluster = Cluster(
+            name="c1",
+            hive_host="localhost",
+            hive_metastore_url="mysql://u:p@localhost:3306/hive",
+            hdfs_namenode_url="hdfs://nn:9000",
+        )
+        db_session.add(cluster)
+        db_session.commit()
+        task = MergeTask(
+            cluster_id=cluster.id,
+            task_name="t",
+            table_name="tbl",
+            database_name="db",
+        )
+        db_session.add(task)
+        db_session.commit()
+
+        mock_cursor = MagicMock()
+        mock_cursor.execute.side_effect = lambda sql: (
+            time.sleep(0.3) if sql.startswith("INSERT") else None
+        )
+
+        # When
+        with patch.object(db_session, "commit") as merge_commit, patch.object(
+            db_session, "rollback"
+        ) as merge_rollback:
+            atomic_swap_manager._execute_sql_with_heartbeat(
+                cursor=mock_cursor,
+                sql="INSERT INTO t SELECT * FROM s",
+                phase=MagicMock(),
+                merge_logger=MagicMock(),
+                task=task,
+                db_session=db_session,
+                op_desc="插入数据",
+                execution_phase_name="data_insertion",
+                interval=0.05,
+            )
+
+        # Then: 合并会话未被跨线程提交/回滚,进度由独立会话落库
+        merge_commit.assert_not_called()
+        merge_rollback.assert_not_called()
+        atomic_swap_manager._update_task_progress.assert_not_called()
+        db_session.expire_all()
+        stored = db_session.get(MergeTask, task.id)
+        assert stored.execution_phase == "data_insertion"
+        assert stored.current_operation.startswith("插入数据")
 
 
 class TestHiveAtomicSwapManagerIntegration:
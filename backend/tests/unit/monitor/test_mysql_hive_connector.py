@@ -124,6 +124,44 @@ class TestMySQLHiveMetastoreConnector:
                 with self.connector as conn:
                     assert conn == self.connector
 
+    @pytest.mark.unit
+    def test_partition_access_info_incremental_filter(self):
+        """Test high-water mark filter for incremental partition extraction"""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [
+            {
+                "PART_ID": 42,
+                "database_name": "db1",
+                "table_name": "t1",
+                "partition_name": "dt=2024-01-01",
+                "partition_path": "/warehouse/t1/dt=2024-01-01",
+                "LAST_ACCESS_TIME": 0,
+                "CREATE_TIME": 1700000000,
+                "partition_size": "1024",
+            }
+        ]
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value = cursor
+        self.connector._connection = connection
+
+        rows = self.connector.get_partition_access_info(
+            "db1",
+            since={
+                "max_access_time": 0,
+                "max_create_time": 1700000000,
+                "max_object_id": 41,
+            },
+        )
+
+        query, params = cursor.execute.call_args[0]
+        assert "p.LAST_ACCESS_TIME >= %s OR p.CREATE_TIME >= %s" in query
+        assert "p.PART_ID > %s" in query
+        # 未记录访问时间(0)不应匹配所有行
+        assert params == ["db1", 1, 1700000000, 41]
+        assert rows[0]["metastore_id"] == 42
+        assert rows[0]["last_access_time"] is None
+        assert rows[0]["partition_size"] == 1024
+
 
 class TestMySQLConnectorIntegration:
     """Integration-style tests for MySQL connector"""
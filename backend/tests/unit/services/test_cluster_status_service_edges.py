@@ -43,9 +43,8 @@ def test_connection_cache_put_get_and_expire(db_session):
     assert cached and cached["status"] == "success"
 
     # 过期：将时间回拨
-    svc._connection_cache[c.id]["metastore"]["timestamp"] = datetime.now() - timedelta(
-        seconds=999
-    )
+    cached["timestamp"] = datetime.now() - timedelta(seconds=999)
+    svc._cache.put(c.id, "metastore", cached, ttl_seconds=60)
     svc._cache_ttl = 1
     assert svc.get_connection_status_cached(c.id, "metastore") is None
 
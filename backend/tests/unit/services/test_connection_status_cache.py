@@ -0,0 +1,182 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services.cluster_status_service import ClusterStatusService
+from app.services.connection_status_cache import (
+    LocalConnectionStatusCache,
+    RedisConnectionStatusCache,
+)
+from app.services.enhanced_connection_service import (
+    ConnectionResult,
+    ConnectionType,
+    EnhancedConnectionService,
+)
+
+
+class _FakeRedis:
+    """只实现缓存用到的 Hash 命令"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip("*")
+        return [key for key in self.hashes if key.startswith(prefix)]
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.ops.append((name, args))
+
+    def execute(self):
+        for name, args in self.ops:
+            getattr(self.client, name)(*args)
+
+
+@pytest.mark.unit
+def test_redis_cache_is_shared_between_service_instances():
+    client = _FakeRedis()
+    api_pod_a = ClusterStatusService(cache=RedisConnectionStatusCache(client))
+    api_pod_b = ClusterStatusService(cache=RedisConnectionStatusCache(client))
+
+    api_pod_a.cache_connection_status(7, "metastore", "success", {"ms": 5})
+    api_pod_a.cache_connection_status(7, "hdfs", "failed", {"ms": 9})
+
+    cached = api_pod_b._get_cached_cluster_test_result(7)
+    assert cached["overall_status"] == "failed"
+    assert cached["tests"]["metastore"] == {
+        "status": "success",
+        "cached": True,
+        "ms": 5,
+    }
+    assert isinstance(
+        api_pod_b.get_connection_status_cached(7, "hdfs")["timestamp"], datetime
+    )
+    assert client.ttls["hsfp:connection-status:7"] == api_pod_a._cache_ttl
+
+    api_pod_b.clear_connection_cache(7)
+    assert api_pod_a.get_connection_status_cached(7, "metastore") is None
+
+
+@pytest.mark.unit
+def test_redis_cache_uses_local_entries_while_redis_is_down(monkeypatch):
+    import app.services.connection_status_cache as module
+
+    client = _FakeRedis()
+    available = {"client": None}
+    marked = []
+    monkeypatch.setattr(module, "mark_redis_unavailable", lambda: marked.append(1))
+    cache = RedisConnectionStatusCache(client_factory=lambda: available["client"])
+    entry = {"status": "success", "details": {}, "timestamp": datetime.now()}
+
+    # Redis 不可用：读写进程内缓存
+    cache.put(3, "hdfs", entry, ttl_seconds=60)
+    assert cache.get(3)["hdfs"]["status"] == "success"
+    assert client.hashes == {}
+
+    # 重试间隔过后共享客户端恢复：切回 Redis
+    available["client"] = client
+    cache.put(3, "metastore", entry, ttl_seconds=60)
+    assert set(client.hashes["hsfp:connection-status:3"]) == {"metastore"}
+
+    # 操作失败时上报共享客户端不可用，本次改用进程内缓存
+    def _down(key):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(client, "hgetall", _down)
+    assert set(cache.get(3)) == {"hdfs"}
+    assert marked == [1]
+
+
+@pytest.mark.unit
+def test_local_cache_expires_cluster_entries():
+    cache = LocalConnectionStatusCache()
+    entry = {"status": "success", "details": {}, "timestamp": datetime.now()}
+    cache.put(1, "hdfs", entry, ttl_seconds=0)
+    time.sleep(0.01)
+    assert cache.get(1) == {}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_probes_of_all_clusters_run_concurrently_with_timeout(monkeypatch):
+    svc = EnhancedConnectionService()
+
+    class _Cluster:
+        def __init__(self, cluster_id):
+            self.id = cluster_id
+
+    def fake_retry(cluster, conn_type):
+        # HS2 卡住，其余服务 0.2 秒返回
+        time.sleep(1.0 if conn_type == ConnectionType.HIVESERVER2 else 0.2)
+        return ConnectionResult(conn_type, "success", 200.0)
+
+    monkeypatch.setattr(svc, "_test_connection_with_retry", fake_retry)
+
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(
+            svc.test_cluster_connections(_Cluster(i), probe_timeout=0.5)
+            for i in range(6)
+        )
+    )
+    elapsed = time.monotonic() - started
+
+    # 18 个探测同时进行：总耗时约等于单个探测超时，而不是逐批累加
+    assert elapsed < 0.9
+    for result in results:
+        assert result["tests"]["metastore"]["status"] == "success"
+        assert result["tests"]["hiveserver2"]["status"] == "timeout"
+        assert result["overall_status"] == "partial"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_batch_health_check_does_not_wait_for_fixed_batches(monkeypatch):
+    svc = ClusterStatusService(cache=LocalConnectionStatusCache())
+    in_flight = []
+    peak = []
+
+    async def fake_test(db, cluster_id, *_, **__):
+        in_flight.append(cluster_id)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.1 if cluster_id else 0.6)
+        in_flight.remove(cluster_id)
+        return {"overall_status": "success", "tests": {}}
+
+    monkeypatch.setattr(svc, "test_cluster_connections", fake_test)
+
+    started = time.monotonic()
+    results = await svc.batch_health_check(None, list(range(12)), parallel_limit=4)
+
+    # 一个慢集群只占用一个并发名额，其余集群持续补位（固定批次约需 0.8 秒）
+    assert time.monotonic() - started < 0.75
+    assert max(peak) == 4
+    assert set(results) == set(range(12))
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from app.services.job_executor import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    JobExecutor,
+    JobQueueFullError,
+)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.unit
+def test_pool_bounds_concurrency_and_orders_by_priority():
+    executor = JobExecutor(pool_sizes={"archive": 1}, max_queue_size=10)
+    gate = threading.Event()
+    order = []
+
+    executor.submit("archive", gate.wait, name="blocker")
+    assert _wait_until(lambda: executor.stats()["pools"]["archive"]["running"])
+    executor.submit("archive", order.append, "policy", priority=PRIORITY_LOW)
+    executor.submit("archive", order.append, "archive")
+    executor.submit("archive", order.append, "restore", priority=PRIORITY_HIGH)
+
+    stats = executor.stats()["pools"]["archive"]
+    assert stats["workers"] == 1
+    assert [job["name"] for job in stats["running"]] == ["blocker"]
+    assert len(stats["queued"]) == 3
+
+    gate.set()
+    assert executor.shutdown(timeout=2) is True
+    # 单线程池：高优先级的恢复先于普通归档，策略执行最后
+    assert order == ["restore", "archive", "policy"]
+    assert executor.stats()["pools"]["archive"]["completed"] == 4
+
+
+@pytest.mark.unit
+def test_queue_limit_and_shutdown_cancels_queued_jobs():
+    executor = JobExecutor(pool_sizes={"scan": 1}, max_queue_size=2)
+    gate = threading.Event()
+    ran = []
+
+    executor.submit("scan", gate.wait)
+    assert _wait_until(lambda: executor.stats()["pools"]["scan"]["running"])
+    executor.submit("scan", ran.append, 1)
+    executor.submit("scan", ran.append, 2)
+    with pytest.raises(JobQueueFullError):
+        executor.submit("scan", ran.append, 3)
+
+    # 超时后丢弃排队作业，并拒绝新的提交
+    assert executor.shutdown(timeout=0.1) is False
+    gate.set()
+    assert ran == []
+    recent = executor.stats()["recent"]
+    assert [job["state"] for job in recent] == ["cancelled", "cancelled"]
+    with pytest.raises(JobQueueFullError):
+        executor.submit("scan", ran.append, 4)
+
+
+@pytest.mark.unit
+def test_failed_job_is_recorded_and_worker_keeps_running():
+    executor = JobExecutor(pool_sizes={"merge": 2})
+
+    def boom():
+        raise ValueError("merge failed")
+
+    executor.submit("merge", boom, name="merge:1")
+    executor.submit("merge", lambda: None, name="merge:2")
+    assert executor.shutdown(timeout=2) is True
+
+    stats = executor.stats()
+    assert stats["pools"]["merge"]["failed"] == 1
+    assert stats["pools"]["merge"]["completed"] == 1
+    failed = [job for job in stats["recent"] if job["state"] == "failed"]
+    assert failed[0]["name"] == "merge:1" and failed[0]["error"] == "merge failed"
@@ -76,3 +76,49 @@ def test_scan_task_manager_core_flow(db_session):
         and row2.end_time is not None
         and row2.duration is not None
     )
+
+
+@pytest.mark.unit
+def test_task_logs_are_a_bounded_ring_buffer(db_session):
+    mgr = ScanTaskManager(log_buffer_size=5)
+    c = _mk_cluster(db_session)
+    task = mgr.create_scan_task(db_session, c.id, "cluster", "ring")
+
+    for i in range(20):
+        mgr.add_log(task.task_id, "WARN" if i % 2 else "INFO", f"log-{i}")
+
+    logs = mgr.get_task_logs(task.task_id)
+    assert [l.message for l in logs] == [f"log-{i}" for i in range(15, 20)]
+    # 读取共享同一批条目，不重建对象
+    assert mgr.get_task_logs(task.task_id)[0] is logs[0]
+    warn = mgr.get_task_logs(task.task_id, limit=1, level="warn")
+    assert [l.message for l in warn] == ["log-19"]
+
+
+@pytest.mark.unit
+def test_registry_evicts_finished_and_overflowing_tasks(db_session, monkeypatch):
+    import app.services.scan_service as scan_service_mod
+
+    now = [1000.0]
+    monkeypatch.setattr(scan_service_mod.time, "monotonic", lambda: now[0])
+    mgr = ScanTaskManager(max_tasks=3, finished_ttl_seconds=60, stale_ttl_seconds=600)
+    c = _mk_cluster(db_session)
+
+    finished = mgr.create_scan_task(db_session, c.id, "cluster", "done")
+    mgr.complete_task(db_session, finished.task_id, success=True)
+    running = mgr.create_scan_task(db_session, c.id, "cluster", "running")
+
+    # 已结束任务在 TTL 内仍可读取
+    now[0] += 30
+    mgr.create_scan_task(db_session, c.id, "cluster", "t3")
+    assert mgr.get_task(finished.task_id) is not None
+
+    # 超过上限时优先淘汰已结束任务
+    mgr.create_scan_task(db_session, c.id, "cluster", "t4")
+    assert mgr.get_task(finished.task_id) is None
+    assert mgr.get_task(running.task_id) is not None
+
+    # 长时间无活动的任务视为失联
+    now[0] += 601
+    mgr.create_scan_task(db_session, c.id, "cluster", "t5")
+    assert mgr.registry_stats()["tasks"] == 1
@@ -0,0 +1,73 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.config.settings import settings
+from app.services.test_table_service import TestTableService
+
+
+class _SlowHDFS:
+    """模拟一次 CREATE + DataNode 写入的耗时，记录并发峰值"""
+
+    def __init__(self, fail_paths=()):
+        self.fail_paths = set(fail_paths)
+        self.payloads = set()
+        self.written = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def write_file(self, path, content):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.payloads.add(id(content))
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+            self.written.append(path)
+        if path in self.fail_paths:
+            return False, "Create failed - HTTP 403"
+        return True, "ok"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_webhdfs_generation_writes_partitions_concurrently(monkeypatch):
+    monkeypatch.setattr(settings, "TEST_TABLE_WRITE_CONCURRENCY", 8)
+    monkeypatch.setattr(settings, "TEST_TABLE_PARTITION_CONCURRENCY", 2)
+    failed_path = "/t/partition_0001/data_000003.txt"
+    hdfs = _SlowHDFS(fail_paths=[failed_path])
+    task = SimpleNamespace(
+        id=1,
+        status="running",
+        progress_percentage=65.0,
+        current_phase="data_generation",
+        current_operation=None,
+        error_message=None,
+    )
+    config = {
+        "hdfs_base_path": "/t",
+        "partition_count": 4,
+        "files_per_partition": 10,
+        "file_size_kb": 1,
+    }
+
+    started = time.monotonic()
+    created, failed, samples = await TestTableService()._generate_data_files_webhdfs(
+        task, "task-1", MagicMock(), hdfs, config, total_files=40
+    )
+    elapsed = time.monotonic() - started
+
+    # 40 次写入串行约 2 秒；并发上限 8 时约 0.25 秒
+    assert elapsed < 1.0
+    assert hdfs.peak == 8
+    assert len(hdfs.written) == 40
+    # write_file 返回失败而非抛异常时也计入失败
+    assert (created, failed) == (39, 1)
+    assert samples == [{"file": failed_path, "error": "Create failed - HTTP 403"}]
+    # 所有写入共用同一份编码后的内容
+    assert len(hdfs.payloads) == 1
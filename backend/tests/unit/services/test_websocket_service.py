@@ -1,11 +1,13 @@
 import asyncio
 import json
 from typing import List, Tuple
+from unittest.mock import MagicMock
 
 import pytest
 
 from app.services.websocket_service import (
     RealTimeNotificationService,
+    RedisTopicBridge,
     WebSocketManager,
     WebSocketMessage,
 )
@@ -106,6 +108,7 @@ async def test_broadcast_to_topic_sends_only_to_subscribers_and_disconnects_on_e
 
     msg = WebSocketMessage(type="foo", data={"hello": 123})
     await mgr.broadcast_to_topic("alpha", msg)
+    await mgr.wait_for_pending_sends()
 
     # ok1 should receive the broadcast (plus the initial connect message)
     assert len(ok1.sent_texts) >= 2
@@ -200,3 +203,268 @@ async def test_realtime_notification_service_topics_and_types(monkeypatch):
         "task_update",
         "cluster_stats",
     ]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publish_coalesces_progress_and_batches_logs():
+    mgr = WebSocketManager(fanout_backend="local")
+    mgr.max_updates_per_second = 20
+    ws = FakeWebSocket("u1-ws")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["task_progress:1", "task_logs:1"])
+
+    for pct in (10, 20, 30):
+        mgr.publish("task_progress:1", "task_progress", {"progress": pct})
+    mgr.publish("task_logs:1", "task_logs", {"message": "a"}, append=True)
+    mgr.publish("task_logs:1", "task_logs", {"message": "b"}, append=True)
+    await asyncio.sleep(0.1)
+
+    payloads = [json.loads(t) for t in ws.sent_texts[1:]]
+    progress = [p for p in payloads if p["type"] == "task_progress"]
+    logs = [p for p in payloads if p["type"] == "task_logs"]
+    assert [p["data"]["progress"] for p in progress] == [30]
+    assert progress[0]["topic"] == "task_progress:1"
+    assert progress[0]["offset"] == 1
+    assert [e["message"] for e in logs[0]["data"]["entries"]] == ["a", "b"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_publish_rate_limits_per_topic():
+    mgr = WebSocketManager(fanout_backend="local")
+    mgr.max_updates_per_second = 5
+    ws = FakeWebSocket("u1-ws")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["scan_progress:x"])
+
+    mgr.publish("scan_progress:x", "scan_progress", {"n": 1})
+    await asyncio.sleep(0.02)
+    mgr.publish("scan_progress:x", "scan_progress", {"n": 2})
+    mgr.publish("scan_progress:x", "scan_progress", {"n": 3})
+    await asyncio.sleep(0.02)
+    # 第二次推送需等待 1/5 秒窗口
+    assert [json.loads(t)["data"]["n"] for t in ws.sent_texts[1:]] == [1]
+    await asyncio.sleep(0.25)
+    assert [json.loads(t)["data"]["n"] for t in ws.sent_texts[1:]] == [1, 3]
+
+
+@pytest.mark.unit
+def test_replay_returns_messages_after_offset_and_reports_gap():
+    mgr = WebSocketManager(fanout_backend="local")
+    mgr.replay_buffer_size = 3
+    # 没有事件循环时直接记入重放缓冲
+    for i in range(5):
+        mgr.publish("task_logs:9", "task_logs", {"i": i}, append=True)
+
+    messages, latest, gap = mgr.replay("task_logs:9", 3)
+    assert [m.offset for m in messages] == [4, 5]
+    assert latest == 5 and gap is False
+
+    messages, latest, gap = mgr.replay("task_logs:9", 0)
+    assert [m.offset for m in messages] == [3, 4, 5]
+    assert gap is True
+
+
+def _redis_client(offset=7):
+    client = MagicMock()
+    client.incr.return_value = offset
+    return client
+
+
+@pytest.mark.unit
+def test_worker_process_publishes_topic_messages_through_redis():
+    client = _redis_client()
+    mgr = WebSocketManager(fanout_backend="redis")
+    mgr.attach_bridge(RedisTopicBridge(client, history_size=50))
+
+    # Celery worker 中没有事件循环,首条消息立即转发
+    mgr.publish("task_progress:3", "task_progress", {"progress": 40})
+
+    pipe = client.pipeline.return_value
+    channel, payload = pipe.publish.call_args.args
+    assert channel == "hsfp:ws:topic:task_progress:3"
+    body = json.loads(payload)
+    assert body["offset"] == 7 and body["data"] == {"progress": 40}
+    pipe.rpush.assert_called_once()
+    pipe.ltrim.assert_called_once_with("hsfp:ws:history:task_progress:3", -50, -1)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_api_worker_relies_on_listener_for_local_delivery():
+    client = _redis_client()
+    mgr = WebSocketManager(fanout_backend="redis")
+    bridge = RedisTopicBridge(client)
+    mgr.attach_bridge(bridge)
+    # 模拟监听线程已订阅频道
+    bridge._listener = MagicMock()
+    bridge._listener.is_alive.return_value = True
+    bridge._subscribed.set()
+    ws = FakeWebSocket("u1-ws")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["task_logs:3"])
+
+    mgr.publish("task_logs:3", "task_logs", {"message": "x"}, append=True)
+    await asyncio.sleep(0.1)
+    # 已发布到 Redis,本地不直接推送,避免与监听回送重复
+    assert len(ws.sent_texts) == 1
+    payload = client.pipeline.return_value.publish.call_args.args[1]
+
+    # 监听线程收到(任意进程发布的)消息后回送本进程连接
+    mgr._on_remote_message(WebSocketMessage(**json.loads(payload)))
+    await asyncio.sleep(0.05)
+    delivered = ws.last_payload()
+    assert delivered["topic"] == "task_logs:3" and delivered["offset"] == 7
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_late_redis_connection_starts_listener_and_keeps_local_delivery(
+    monkeypatch,
+):
+    mgr = WebSocketManager(fanout_backend="redis")
+    monkeypatch.setattr(
+        RedisTopicBridge, "from_settings", classmethod(lambda cls: None)
+    )
+    # 启动时 Redis 不可用
+    assert await mgr.start_fanout_listener() is False
+
+    ws = FakeWebSocket("u1-ws")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["task_progress:9"])
+
+    client = _redis_client()
+    # 订阅一直失败: 监听线程在线但未完成订阅
+    client.pubsub.return_value.psubscribe.side_effect = ConnectionError("down")
+    bridge = RedisTopicBridge(client)
+    monkeypatch.setattr(
+        RedisTopicBridge, "from_settings", classmethod(lambda cls: bridge)
+    )
+    try:
+        # 之后懒连接成功: 监听线程随之启动
+        assert mgr._get_bridge() is bridge
+        assert bridge._listener is not None and bridge._listener.is_alive()
+
+        # 监听线程尚未订阅时仍在本进程广播,消息不丢失
+        assert bridge.listening is False
+        mgr.publish("task_progress:9", "task_progress", {"progress": 10})
+        await asyncio.sleep(0.1)
+        assert ws.last_payload()["data"] == {"progress": 10}
+        client.pipeline.return_value.publish.assert_called_once()
+    finally:
+        mgr.stop_fanout_listener()
+
+
+@pytest.mark.unit
+def test_replay_reads_redis_history():
+    client = _redis_client()
+    history = [
+        json.dumps(
+            WebSocketMessage(
+                type="task_logs", data={"i": i}, topic="task_logs:5", offset=i
+            ).to_dict()
+        )
+        for i in (4, 5, 6)
+    ]
+    client.lrange.return_value = history
+    client.get.return_value = "6"
+    mgr = WebSocketManager(fanout_backend="redis")
+    mgr.attach_bridge(RedisTopicBridge(client))
+
+    messages, latest, gap = mgr.replay("task_logs:5", 4)
+    assert [m.offset for m in messages] == [5, 6]
+    assert latest == 6 and gap is False
+    assert mgr.replay("task_logs:5", 1)[2] is True
+
+
+class StalledWebSocket(FakeWebSocket):
+    """accept 正常,send_text 一直阻塞直到 release 被设置"""
+
+    def __init__(self, name: str = "stalled"):
+        super().__init__(name)
+        self.release = asyncio.Event()
+        self.stall = False
+
+    async def send_text(self, text: str):
+        if self.stall:
+            await self.release.wait()
+        await super().send_text(text)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_slow_consumer_does_not_block_other_subscribers():
+    mgr = WebSocketManager(fanout_backend="local")
+    slow, fast = StalledWebSocket("slow"), FakeWebSocket("fast")
+    await mgr.connect(slow, user_id="u1")
+    await mgr.connect(fast, user_id="u2")
+    await mgr.subscribe("u1", ["alpha"])
+    await mgr.subscribe("u2", ["alpha"])
+    slow.stall = True
+
+    for i in range(3):
+        await asyncio.wait_for(
+            mgr.broadcast_to_topic("alpha", WebSocketMessage(type="m", data={"i": i})),
+            timeout=0.5,
+        )
+    await asyncio.sleep(0.05)
+
+    assert [json.loads(t)["data"]["i"] for t in fast.sent_texts[1:]] == [0, 1, 2]
+    assert len(slow.sent_texts) == 1
+
+    slow.release.set()
+    await mgr.wait_for_pending_sends()
+    assert [json.loads(t)["data"]["i"] for t in slow.sent_texts[1:]] == [0, 1, 2]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_send_queue_drops_oldest_and_coalesces_progress():
+    mgr = WebSocketManager(fanout_backend="local")
+    mgr.send_queue_size = 2
+    ws = StalledWebSocket("slow")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["alpha", "task_progress:1"])
+    ws.stall = True
+
+    # 第一条进入发送中,其余在队列中等待
+    for i in range(4):
+        await mgr.broadcast_to_topic("alpha", WebSocketMessage(type="m", data={"i": i}))
+        await asyncio.sleep(0)
+    for pct in (10, 20):
+        await mgr.broadcast_to_topic(
+            "task_progress:1",
+            WebSocketMessage(
+                type="task_progress",
+                data={"progress": pct},
+                topic="task_progress:1",
+                offset=pct,
+            ),
+        )
+
+    stats = mgr.get_connection_stats()
+    assert stats["dropped_messages"] == 2
+    assert stats["coalesced_messages"] == 1
+
+    ws.release.set()
+    await mgr.wait_for_pending_sends()
+    payloads = [json.loads(t) for t in ws.sent_texts[1:]]
+    assert [p["data"] for p in payloads] == [{"i": 0}, {"i": 3}, {"progress": 20}]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_send_timeout_disconnects_stalled_connection():
+    mgr = WebSocketManager(fanout_backend="local")
+    mgr.send_timeout = 0.05
+    ws = StalledWebSocket("stalled")
+    await mgr.connect(ws, user_id="u1")
+    await mgr.subscribe("u1", ["alpha"])
+    ws.stall = True
+
+    await mgr.broadcast_to_topic("alpha", WebSocketMessage(type="m", data={}))
+    await mgr.wait_for_pending_sends()
+
+    assert "u1" not in mgr.active_connections
+    assert "alpha" not in mgr.topic_subscribers
@@ -0,0 +1,86 @@
+"""
+数据库引擎配置档单元测试
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app.config import database
+from app.config.settings import settings
+
+
+@pytest.mark.unit
+def test_sqlite_file_engine_uses_wal_and_busy_timeout(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            # NORMAL == 1
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert (
+                conn.execute(text("PRAGMA busy_timeout")).scalar()
+                == settings.SQLITE_BUSY_TIMEOUT_MS
+            )
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.unit
+def test_sqlite_connection_usable_across_threads(tmp_path):
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'threads.db'}")
+    errors = []
+    try:
+        conn = engine.connect()
+
+        def use_connection():
+            try:
+                conn.execute(text("SELECT 1"))
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=use_connection)
+        worker.start()
+        worker.join()
+        conn.close()
+    finally:
+        engine.dispose()
+    assert errors == []
+
+
+@pytest.mark.unit
+def test_postgres_profile_pool_and_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 12)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 8)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 15000)
+
+    options = database.build_engine_options("postgresql://u:p@db:5432/hsfp")
+
+    assert options["pool_size"] == 12
+    assert options["max_overflow"] == 8
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=15000"}
+
+
+@pytest.mark.unit
+def test_pool_status_reports_saturation(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    try:
+        first, second = engine.connect(), engine.connect()
+        status = database.get_pool_status(engine)
+        assert status["checked_out"] == 2
+        assert status["utilization"] == 1.0
+        assert status["saturated_checkouts"] == 1
+        first.close()
+        second.close()
+
+        status = database.get_pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["peak_checked_out"] == 2
+        assert status["total_checkouts"] == 2
+    finally:
+        engine.dispose()
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from app.utils.archive_report import build_move_report
+from app.utils.webhdfs_client import HDFSFileInfo
+
+
+def _info(path, size=0, is_directory=False):
+    return HDFSFileInfo(
+        path=path,
+        size=size,
+        modification_time=0,
+        is_directory=is_directory,
+        block_size=0,
+        replication=0,
+        permission="755",
+        owner="hdfs",
+        group="hdfs",
+    )
+
+
+class _FakeClient:
+    def __init__(self, summary=None):
+        self.summary = summary
+        self.listed = 0
+
+    def get_content_summary(self, path):
+        if self.summary is None:
+            return {"success": False, "error": "HTTP 404"}
+        return {"success": True, "content_summary": self.summary}
+
+    def iter_directory(self, path, recursive=False):
+        self.listed += 1
+        yield _info(f"{path}/a.parquet", 10)
+        yield _info(f"{path}/sub", is_directory=True)
+        yield _info(f"{path}/sub/b.parquet", 5)
+
+
+@pytest.mark.unit
+def test_summary_mode_uses_content_summary_without_listing():
+    client = _FakeClient({"fileCount": 100000, "directoryCount": 3, "length": 1 << 30})
+
+    report = build_move_report(client, "/wh/t", "/archive/t", mode="summary")
+
+    assert client.listed == 0
+    assert report == {
+        "file_count": 100000,
+        "directory_count": 2,
+        "total_bytes": 1 << 30,
+        "files": [],
+        "manifest_path": None,
+    }
+
+
+@pytest.mark.unit
+def test_summary_falls_back_to_streamed_counts():
+    report = build_move_report(_FakeClient(), "/wh/t", "/archive/t", mode="summary")
+
+    assert (report["file_count"], report["total_bytes"]) == (2, 15)
+    assert report["files"] == []
+
+
+@pytest.mark.unit
+def test_manifest_streams_records_and_full_mode_keeps_list(tmp_path):
+    report = build_move_report(
+        _FakeClient(),
+        "/archive/t",
+        "/wh/t",
+        source_key="archive",
+        target_key="restored",
+        mode="full",
+        manifest_dir=str(tmp_path),
+    )
+
+    with open(report["manifest_path"], encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records == report["files"]
+    assert records[1] == {
+        "archive": "/archive/t/sub/b.parquet",
+        "restored": "/wh/t/sub/b.parquet",
+        "size": 5,
+    }
+    assert report["directory_count"] == 1
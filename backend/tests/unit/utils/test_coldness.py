@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.utils.coldness import (
+    UNKNOWN_DAYS,
+    ColdnessColumns,
+    bucket_counts,
+    days_since,
+    to_datetime64,
+)
+
+
+@pytest.mark.unit
+def test_days_since_uses_first_available_column_and_floors():
+    now = datetime(2024, 6, 1, 12, 0, 0)
+    access = to_datetime64([now - timedelta(days=3, hours=5), None, None])
+    created = to_datetime64([None, now - timedelta(hours=30), None])
+
+    days = days_since(now, access, created)
+    assert days[0] == 3
+    assert days[1] == 1  # 与 timedelta.days 一致
+    assert np.isnan(days[2])
+
+    days = days_since(now, access, created, default=UNKNOWN_DAYS)
+    assert days[2] == UNKNOWN_DAYS
+
+
+@pytest.mark.unit
+def test_to_datetime64_converts_aware_values_to_local_naive():
+    aware = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    expected = np.datetime64(aware.astimezone().replace(tzinfo=None), "us")
+    assert to_datetime64([aware])[0] == expected
+
+
+@pytest.mark.unit
+def test_bucket_counts_left_closed_intervals_and_weights():
+    days = np.array([0, 1, 6.0, 7, 400, np.nan, 5000])
+    sizes = np.array([1, 2, 3, 4, 5, 6, 7], dtype=np.float64)
+
+    counts, sums = bucket_counts(days, [0, 1, 7, 365, 1095], sizes)
+
+    assert counts.tolist() == [1, 2, 1, 1]
+    assert sums.tolist() == [1, 5, 4, 5]
+
+
+@pytest.mark.unit
+def test_coldness_columns_from_rows_fallbacks():
+    now = datetime(2024, 6, 1)
+    rows = [
+        (200, None, 10),
+        (None, now - timedelta(days=40), 20),
+        (None, None, None),
+    ]
+    columns = ColdnessColumns.from_rows(rows, now, fallback_days=7)
+
+    assert len(columns) == 3
+    assert columns.days.tolist() == [200, 40, 7]
+    assert columns.sizes.tolist() == [10, 20, 0]
+    counts, sizes = columns.histogram([0, 30, 90, 365])
+    assert counts.tolist() == [1, 1, 1]
+    assert sizes.tolist() == [0, 20, 10]
+    assert len(ColdnessColumns.from_rows([], now)) == 0
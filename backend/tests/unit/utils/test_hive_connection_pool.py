@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils import metrics
+from app.utils.hive_connection_pool import HiveConnectionPool
+
+
+class _FakeHive:
+    """记录建连次数与每个连接上执行过的语句"""
+
+    def __init__(self):
+        self.connections = []
+
+    def connect(self, **params):
+        conn = MagicMock(name=f"conn{len(self.connections)}")
+        conn.statements = []
+        conn.cursor.side_effect = lambda: self._cursor(conn)
+        self.connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _cursor(conn):
+        cursor = MagicMock()
+        cursor.execute.side_effect = lambda sql, *a, **k: conn.statements.append(sql)
+        return cursor
+
+
+@pytest.fixture
+def fake_hive():
+    return _FakeHive()
+
+
+@pytest.mark.unit
+def test_connections_are_reused_per_cluster_and_database(fake_hive):
+    metrics.reset_metrics()
+    pool = HiveConnectionPool(validate_after_idle_seconds=60)
+
+    for _ in range(3):
+        conn = pool.connect(fake_hive.connect, host="hs2-a", port=10000, database="db")
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM t")
+        cursor.close()
+        conn.close()
+    other = pool.connect(fake_hive.connect, host="hs2-b", port=10000, database="db")
+
+    assert len(fake_hive.connections) == 2
+    assert fake_hive.connections[0].close.call_count == 0
+    assert pool.stats()["@hs2-b:10000/db"] == {"idle": 0, "checked_out": 1}
+    events = metrics.snapshot_metrics()["hive_pool_events"]
+    assert (events["borrow"], events["created"], events["reused"]) == (4, 2, 2)
+    other.close()
+
+
+@pytest.mark.unit
+def test_session_state_is_reset_before_reuse(fake_hive):
+    pool = HiveConnectionPool()
+
+    conn = pool.connect(fake_hive.connect, host="hs2", port=10000, database="sales")
+    with conn:
+        conn.cursor().execute("SET hive.merge.mapfiles=true")
+        conn.cursor().execute("USE tmp")
+
+    raw = fake_hive.connections[0]
+    assert raw.statements[-2:] == ["RESET", "USE `sales`"]
+    assert pool.connect(fake_hive.connect, host="hs2", port=10000, database="sales")
+    assert len(fake_hive.connections) == 1
+
+
+@pytest.mark.unit
+def test_dead_expired_and_temporary_connections_are_discarded(fake_hive):
+    pool = HiveConnectionPool(validate_after_idle_seconds=0)
+    params = {"host": "hs2", "port": 10000, "database": "db"}
+
+    # 空闲连接借出前检查失败 -> 重新建连
+    pool.connect(fake_hive.connect, **params).close()
+    fake_hive.connections[0].cursor.side_effect = RuntimeError("TSocket closed")
+    pool.connect(fake_hive.connect, **params).close()
+    assert len(fake_hive.connections) == 2
+    fake_hive.connections[0].close.assert_called_once()
+
+    # 会话中创建了临时对象 -> 归还时关闭
+    conn = pool.connect(fake_hive.connect, **params)
+    conn.cursor().execute("CREATE TEMPORARY TABLE t AS SELECT 1")
+    conn.close()
+    fake_hive.connections[1].close.assert_called_once()
+
+    # 超过最大生命周期 -> 归还时关闭
+    short_lived = HiveConnectionPool(max_lifetime_seconds=0)
+    short_lived.connect(fake_hive.connect, **params).close()
+    fake_hive.connections[-1].close.assert_called_once()
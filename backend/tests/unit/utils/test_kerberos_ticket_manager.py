@@ -0,0 +1,129 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils import kerberos_ticket_manager as module
+from app.utils.kerberos_diagnostics import (
+    KerberosDiagnosticCode,
+    KerberosDiagnosticError,
+)
+
+KLIST_OUTPUT = """Ticket cache: FILE:/tmp/krb5cc_hive
+Default principal: hive/host@EXAMPLE.COM
+
+Valid starting       Expires              Service principal
+10/19/2026 08:00:00  10/19/2026 18:00:00  krbtgt/EXAMPLE.COM@EXAMPLE.COM
+\trenew until 10/26/2026 08:00:00
+"""
+
+
+class _FakeKerberos:
+    def __init__(self, klist_output=KLIST_OUTPUT):
+        self.klist_output = klist_output
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def run(self, cmd, env=None, **kwargs):
+        with self.lock:
+            self.calls.append((cmd, env))
+
+        class Result:
+            stdout = self.klist_output if cmd[0] == "klist" else ""
+            stderr = ""
+
+        return Result()
+
+    def kinit_calls(self):
+        return [cmd for cmd, _ in self.calls if cmd[0] == "kinit"]
+
+
+@pytest.fixture
+def keytab(tmp_path):
+    path = tmp_path / "hive.keytab"
+    path.write_bytes(b"dummy")
+    return str(path)
+
+
+@pytest.mark.unit
+def test_parse_klist_expiry_formats():
+    assert module.parse_klist_expiry(KLIST_OUTPUT) == datetime(2026, 10, 19, 18)
+    heimdal = "2026-10-19T08:00:00  2026-10-20T08:00:00  krbtgt/A@A"
+    assert module.parse_klist_expiry(heimdal) == datetime(2026, 10, 20, 8)
+    assert module.parse_klist_expiry("klist: No credentials cache found") is None
+
+
+@pytest.mark.unit
+def test_get_cache_runs_kinit_once_per_principal(monkeypatch, tmp_path, keytab):
+    fake = _FakeKerberos(
+        "01/01/2020 00:00:00  12/31/2099 00:00:00  krbtgt/EXAMPLE.COM@EXAMPLE.COM"
+    )
+    monkeypatch.setattr(module.subprocess, "run", fake.run)
+    manager = module.KerberosTicketManager(cache_dir=str(tmp_path / "cc"))
+    try:
+        threads = [
+            threading.Thread(
+                target=manager.get_cache, args=("hive/host@EXAMPLE.COM", keytab)
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cache_a = manager.get_cache("hive/host@EXAMPLE.COM", keytab)
+        cache_b = manager.get_cache("hdfs/host@EXAMPLE.COM", keytab)
+    finally:
+        manager.shutdown()
+
+    assert len(fake.kinit_calls()) == 2
+    assert cache_a != cache_b
+    assert cache_a.startswith(str(tmp_path / "cc"))
+    # 缓存路径同时通过 -c 与子进程环境传给 kinit，不修改进程级环境变量
+    assert fake.kinit_calls()[0][4:6] == ["-c", cache_a]
+    assert fake.calls[0][1]["KRB5CCNAME"] == cache_a
+    assert os.environ.get("KRB5CCNAME") != cache_a
+    assert manager.tickets()[0].expires_at == datetime(2099, 12, 31)
+
+
+@pytest.mark.unit
+def test_renew_due_renews_tickets_near_expiry(monkeypatch, tmp_path, keytab):
+    fake = _FakeKerberos()
+    monkeypatch.setattr(module.subprocess, "run", fake.run)
+    manager = module.KerberosTicketManager(
+        cache_dir=str(tmp_path), renew_margin_seconds=600
+    )
+    try:
+        manager.get_cache("hive/host@EXAMPLE.COM", keytab)
+        ticket = manager.tickets()[0]
+        ticket.expires_at = datetime.now() + timedelta(hours=5)
+        assert manager.renew_due() == 0
+
+        ticket.expires_at = datetime.now() + timedelta(minutes=5)
+        assert manager.renew_due() == 1
+    finally:
+        manager.shutdown()
+    assert len(fake.kinit_calls()) == 2
+
+
+@pytest.mark.unit
+def test_missing_keytab_and_external_cache(monkeypatch, tmp_path):
+    fake = _FakeKerberos()
+    monkeypatch.setattr(module.subprocess, "run", fake.run)
+    manager = module.KerberosTicketManager(cache_dir=str(tmp_path))
+
+    # 未提供 keytab 时直接使用外部准备好的缓存
+    assert manager.get_cache("hive@A", None, "~/cc") == os.path.expanduser("~/cc")
+    with pytest.raises(KerberosDiagnosticError) as exc:
+        manager.get_cache("hive@A", str(tmp_path / "missing.keytab"))
+    assert exc.value.diagnostic.code == KerberosDiagnosticCode.KEYTAB_MISSING
+    assert fake.calls == []
+
+
+@pytest.mark.unit
+def test_use_ticket_cache_restores_environment(monkeypatch):
+    monkeypatch.setenv("KRB5CCNAME", "/tmp/original")
+    with module.use_ticket_cache("/tmp/cluster-a"):
+        assert os.environ["KRB5CCNAME"] == "/tmp/cluster-a"
+    assert os.environ["KRB5CCNAME"] == "/tmp/original"
@@ -0,0 +1,172 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils import lease_service as module
+from app.utils.lease_service import (
+    LeaseBackendUnavailableError,
+    LeaseUnavailableError,
+    LocalLeaseService,
+    RedisLeaseService,
+    table_resource,
+)
+
+
+@pytest.mark.unit
+def test_local_lease_is_exclusive_and_tokens_increase():
+    svc = LocalLeaseService(default_ttl_seconds=30)
+    res = table_resource(1, "db", "tbl")
+
+    first = svc.acquire(res, "worker-a")
+    assert first is not None
+    assert svc.acquire(res, "worker-b") is None
+
+    info = svc.get_lease(res)
+    assert info["owner"] == "worker-a" and info["token"] == first.token
+    assert [l["resource"] for l in svc.list_leases("table:1:")] == [res]
+
+    assert svc.release(first) is True
+    second = svc.acquire(res, "worker-b")
+    assert second.token > first.token
+
+
+@pytest.mark.unit
+def test_local_lease_expiry_fences_out_stale_holder():
+    svc = LocalLeaseService()
+    res = table_resource(1, "db", "tbl")
+
+    stale = svc.acquire(res, "worker-a", ttl_seconds=0.05)
+    time.sleep(0.06)
+    fresh = svc.acquire(res, "worker-b", ttl_seconds=30)
+
+    assert fresh is not None and fresh.token > stale.token
+    assert svc.renew(stale) is False
+    assert svc.release(stale) is False
+    with pytest.raises(LeaseUnavailableError):
+        svc.ensure_valid(stale)
+    svc.ensure_valid(fresh)
+    assert svc.get_lease(res)["owner"] == "worker-b"
+
+
+@pytest.mark.unit
+def test_acquire_or_raise_reports_holder_and_auto_renews():
+    svc = LocalLeaseService()
+    res = table_resource(2, "db", "tbl")
+
+    lease = svc.acquire_or_raise(res, "merge", ttl_seconds=0.3)
+    time.sleep(0.5)  # 超过 TTL，依赖后台续约保持持有
+    assert svc.validate(lease) is True
+
+    with pytest.raises(LeaseUnavailableError) as exc:
+        svc.acquire_or_raise(res, "archive", wait_timeout=0.05)
+    assert exc.value.holder["owner"] == "merge"
+    assert "merge" in str(exc.value)
+
+    svc.release(lease)
+    assert svc.get_lease(res) is None
+
+
+@pytest.mark.unit
+def test_redis_lease_service_runs_scripts_with_fencing_keys():
+    client = MagicMock()
+    scripts = [MagicMock(name="acquire"), MagicMock(name="renew"), MagicMock()]
+    client.register_script.side_effect = scripts
+    acquire_script, renew_script, release_script = scripts
+    svc = RedisLeaseService(client, default_ttl_seconds=10)
+
+    acquire_script.return_value = 7
+    lease = svc.acquire("table:1:db:tbl", "worker-a")
+    assert lease.token == 7
+    kwargs = acquire_script.call_args.kwargs
+    assert kwargs["keys"] == [
+        "hsfp:lease:table:1:db:tbl",
+        "hsfp:lease:fence:table:1:db:tbl",
+    ]
+    assert kwargs["args"][:2] == ["worker-a", 10000]
+
+    acquire_script.return_value = None
+    assert svc.acquire("table:1:db:tbl", "worker-b") is None
+
+    renew_script.return_value = 1
+    assert svc.renew(lease) is True
+    assert renew_script.call_args.kwargs["args"][0] == "7"
+
+    release_script.return_value = 0
+    assert svc.release(lease) is False
+
+
+@pytest.mark.unit
+def test_redis_lease_introspection_parses_hash():
+    client = MagicMock()
+    client.register_script.return_value = MagicMock()
+    client.hgetall.return_value = {
+        "owner": "host:1:merge_task:5",
+        "token": "3",
+        "acquired_at": "1700000000000",
+        "renewed_at": "1700000001000",
+    }
+    client.pttl.return_value = 4500
+    client.scan_iter.return_value = [
+        "hsfp:lease:table:1:db:tbl",
+        "hsfp:lease:fence:table:1:db:tbl",
+    ]
+    svc = RedisLeaseService(client)
+
+    leases = svc.list_leases()
+
+    assert len(leases) == 1
+    assert leases[0]["resource"] == "table:1:db:tbl"
+    assert leases[0]["token"] == 3
+    assert leases[0]["ttl_remaining_seconds"] == 4.5
+
+
+@pytest.mark.unit
+def test_get_lease_service_fails_closed_and_reconnects(monkeypatch):
+    monkeypatch.setattr(module, "_lease_service", None)
+    monkeypatch.setattr(module.settings, "LEASE_BACKEND", "redis")
+    monkeypatch.setattr(module, "get_redis_client", lambda: None)
+
+    svc = module.get_lease_service()
+    assert svc.backend == "redis"
+    assert module.get_lease_service() is svc
+    # Redis 不可用时拒绝加锁，而不是退化为进程内租约
+    with pytest.raises(LeaseBackendUnavailableError):
+        svc.acquire(table_resource(1, "db", "tbl"), "worker-a")
+
+    client = MagicMock()
+    acquire_script = MagicMock(return_value=1)
+    client.register_script.side_effect = [acquire_script, MagicMock(), MagicMock()]
+    # 共享客户端重试间隔过后重新连上
+    monkeypatch.setattr(module, "get_redis_client", lambda: client)
+
+    lease = svc.acquire(table_resource(1, "db", "tbl"), "worker-a")
+    assert lease.token == 1
+    monkeypatch.setattr(module, "_lease_service", None)
+
+
+@pytest.mark.unit
+def test_base_lease_service_requires_backend_hooks():
+    with pytest.raises(TypeError):
+        module.BaseLeaseService()
+
+
+@pytest.mark.unit
+def test_merge_engine_guard_aborts_swap_after_lease_loss():
+    from app.engines.safe_hive_engine import SafeHiveMergeEngine
+
+    svc = LocalLeaseService()
+    res = table_resource(1, "db", "tbl")
+    lease = svc.acquire(res, "merge_task:1", ttl_seconds=30)
+    engine = SafeHiveMergeEngine.__new__(SafeHiveMergeEngine)
+    engine._create_hive_connection = MagicMock()
+    engine.set_lease_guard(lambda: svc.ensure_valid(lease))
+    engine._ensure_lease_valid("原子表切换")
+
+    # 租约被其他持有者接管后，不可逆的表切换不再执行
+    svc.release(lease)
+    svc.acquire(res, "archive:2")
+    with pytest.raises(RuntimeError, match="租约已失效"):
+        engine._atomic_table_swap(MagicMock(database_name="db"), "tmp", "bak")
+    engine._create_hive_connection.assert_not_called()
+    assert lease.lost is True
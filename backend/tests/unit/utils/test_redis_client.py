@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils import redis_client as module
+
+
+@pytest.fixture(autouse=True)
+def _reset_clients():
+    module.reset_redis_clients()
+    yield
+    module.reset_redis_clients()
+
+
+@pytest.mark.unit
+def test_client_is_shared_and_failures_back_off(monkeypatch):
+    import redis
+
+    client = MagicMock()
+    from_url = MagicMock(side_effect=[ConnectionError("down"), client])
+    monkeypatch.setattr(redis, "from_url", from_url)
+    monkeypatch.setattr(module.settings, "REDIS_RETRY_INTERVAL_SECONDS", 60.0)
+    url = "redis://cache:6379/0"
+
+    # 首次连接失败后，重试间隔内不再尝试连接
+    assert module.get_redis_client(url) is None
+    assert module.get_redis_client(url) is None
+    assert from_url.call_count == 1
+
+    # 重试间隔过后重新连接，成功后各组件共用同一客户端
+    module._retry_at[url] = 0.0
+    assert module.get_redis_client(url) is client
+    assert module.get_redis_client(url) is client
+    assert from_url.call_count == 2
+    client.ping.assert_called_once()
+
+
+@pytest.mark.unit
+def test_mark_unavailable_drops_shared_client(monkeypatch):
+    import redis
+
+    monkeypatch.setattr(redis, "from_url", MagicMock(return_value=MagicMock()))
+    url = "redis://cache:6379/0"
+    assert module.get_redis_client(url) is not None
+
+    module.mark_redis_unavailable(url)
+    assert module.get_redis_client(url) is None
@@ -9,6 +9,7 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.models.merge_task import MergeTask
+from app.models.table_lock import TableLock
 from app.utils.table_lock_manager import TableLockManager
 
 
@@ -25,10 +26,6 @@ class TestTableLockManager:
 
     def test_acquire_table_lock_success(self):
         """测试成功获取表锁"""
-        # 模拟没有现有锁
-        self.mock_db.query().filter().first.return_value = None
-
-        # 模拟当前任务
         current_task = MergeTask(
             id=self.task_id,
             cluster_id=self.cluster_id,
@@ -38,41 +35,46 @@ class TestTableLockManager:
         )
         self.mock_db.query().filter().first.return_value = current_task
 
-        result = TableLockManager.acquire_table_lock(
-            self.mock_db,
-            self.cluster_id,
-            self.database_name,
-            self.table_name,
-            self.task_id,
-        )
+        with (
+            patch.object(TableLockManager, "_get_lease", return_value=None),
+            patch.object(
+                TableLockManager, "_try_acquire_lease", return_value=True
+            ) as mock_try,
+        ):
+            result = TableLockManager.acquire_table_lock(
+                self.mock_db,
+                self.cluster_id,
+                self.database_name,
+                self.table_name,
+                self.task_id,
+            )
 
         assert result["success"] is True
         assert "Table lock acquired" in result["message"]
         assert result["lock_holder"] == f"task_{self.task_id}"
         assert current_task.table_lock_acquired is True
         assert current_task.lock_holder == f"task_{self.task_id}"
+        mock_try.assert_called_once_with(
+            self.mock_db,
+            self.cluster_id,
+            self.database_name,
+            self.table_name,
+            self.task_id,
+            f"task_{self.task_id}",
+            120,
+        )
         self.mock_db.commit.assert_called_once()
 
     def test_acquire_table_lock_already_locked(self):
         """测试表已被其他任务锁定"""
-        # 模拟存在锁定的任务
-        existing_task = MergeTask(
-            id=456,
-            cluster_id=self.cluster_id,
-            database_name=self.database_name,
-            table_name=self.table_name,
-            table_lock_acquired=True,
-            lock_holder="task_456",
-            status="running",
-            started_time=datetime.utcnow(),  # 锁未过期
-        )
-
-        # 第一次查询返回现有锁，第二次查询不会执行
-        query_mock = self.mock_db.query.return_value
-        filter_mock = query_mock.filter.return_value
-        filter_mock.first.return_value = existing_task
+        current_task = MergeTask(id=self.task_id, table_lock_acquired=False)
+        self.mock_db.query().filter().first.return_value = current_task
+        lease = TableLock(task_id=456, holder="task_456")
 
-        with patch.object(TableLockManager, "_is_lock_expired", return_value=False):
+        with (
+            patch.object(TableLockManager, "_get_lease", return_value=lease),
+            patch.object(TableLockManager, "_try_acquire_lease", return_value=False),
+        ):
             result = TableLockManager.acquire_table_lock(
                 self.mock_db,
                 self.cluster_id,
@@ -85,10 +87,11 @@ class TestTableLockManager:
         assert "is locked by task 456" in result["message"]
         assert result["locked_by_task"] == 456
         assert result["lock_holder"] == "task_456"
+        assert current_task.table_lock_acquired is False
+        self.mock_db.commit.assert_not_called()
 
     def test_acquire_table_lock_expired_lock_cleanup(self):
-        """测试清理过期锁并获取新锁"""
-        # 模拟过期的锁定任务
+        """测试接管过期租约后清理原持有任务"""
         expired_task = MergeTask(
             id=456,
             cluster_id=self.cluster_id,
@@ -97,10 +100,7 @@ class TestTableLockManager:
             table_lock_acquired=True,
             lock_holder="task_456",
             status="running",
-            started_time=datetime.utcnow() - timedelta(hours=3),  # 过期锁
         )
-
-        # 模拟当前任务
         current_task = MergeTask(
             id=self.task_id,
             cluster_id=self.cluster_id,
@@ -108,45 +108,46 @@ class TestTableLockManager:
             table_name=self.table_name,
             table_lock_acquired=False,
         )
+        self.mock_db.query().filter().first.side_effect = [current_task, expired_task]
+        lease = TableLock(
+            task_id=456,
+            holder="task_456",
+            expires_at=datetime.utcnow() - timedelta(minutes=1),
+        )
 
-        # 设置查询返回值
-        query_results = [expired_task, current_task]
-        self.mock_db.query().filter().first.side_effect = query_results
-
-        with patch.object(
-            TableLockManager, "_is_lock_expired", return_value=True
-        ) as mock_expired:
-            with patch.object(TableLockManager, "_force_release_lock") as mock_release:
-                result = TableLockManager.acquire_table_lock(
-                    self.mock_db,
-                    self.cluster_id,
-                    self.database_name,
-                    self.table_name,
-                    self.task_id,
-                )
+        with (
+            patch.object(TableLockManager, "_get_lease", return_value=lease),
+            patch.object(TableLockManager, "_try_acquire_lease", return_value=True),
+            patch.object(TableLockManager, "_force_release_lock") as mock_release,
+        ):
+            result = TableLockManager.acquire_table_lock(
+                self.mock_db,
+                self.cluster_id,
+                self.database_name,
+                self.table_name,
+                self.task_id,
+            )
 
         assert result["success"] is True
-        mock_expired.assert_called_once_with(expired_task, 120)
         mock_release.assert_called_once_with(self.mock_db, expired_task)
         assert current_task.table_lock_acquired is True
 
     def test_acquire_table_lock_task_not_found(self):
         """测试任务不存在的情况"""
-        # 模拟没有现有锁
-        query_mock = self.mock_db.query.return_value
-        filter_mock = query_mock.filter.return_value
-        filter_mock.first.side_effect = [None, None]  # 没有现有锁，也没有当前任务
+        self.mock_db.query().filter().first.return_value = None
 
-        result = TableLockManager.acquire_table_lock(
-            self.mock_db,
-            self.cluster_id,
-            self.database_name,
-            self.table_name,
-            self.task_id,
-        )
+        with patch.object(TableLockManager, "_try_acquire_lease") as mock_try:
+            result = TableLockManager.acquire_table_lock(
+                self.mock_db,
+                self.cluster_id,
+                self.database_name,
+                self.table_name,
+                self.task_id,
+            )
 
         assert result["success"] is False
         assert f"Task {self.task_id} not found" in result["message"]
+        mock_try.assert_not_called()
 
     def test_release_table_lock_success(self):
         """测试成功释放表锁"""
@@ -198,28 +199,26 @@ class TestTableLockManager:
 
     def test_check_table_lock_status_locked(self):
         """测试检查表锁状态 - 已锁定"""
-        locked_task = MergeTask(
-            id=456,
-            cluster_id=self.cluster_id,
-            database_name=self.database_name,
-            table_name=self.table_name,
-            table_lock_acquired=True,
-            lock_holder="task_456",
-            status="running",
-            started_time=datetime.utcnow(),
+        acquired_at = datetime.utcnow()
+        lease = TableLock(
+            task_id=456,
+            holder="task_456",
+            acquired_at=acquired_at,
+            expires_at=acquired_at + timedelta(minutes=10),
         )
-
+        locked_task = MergeTask(id=456, status="running")
         self.mock_db.query().filter().first.return_value = locked_task
 
-        result = TableLockManager.check_table_lock_status(
-            self.mock_db, self.cluster_id, self.database_name, self.table_name
-        )
+        with patch.object(TableLockManager, "_get_lease", return_value=lease):
+            result = TableLockManager.check_table_lock_status(
+                self.mock_db, self.cluster_id, self.database_name, self.table_name
+            )
 
         assert result["locked"] is True
         assert result["locked_by_task"] == 456
         assert result["lock_holder"] == "task_456"
         assert result["task_status"] == "running"
-        assert result["locked_since"] == locked_task.started_time
+        assert result["locked_since"] == acquired_at
 
     def test_check_table_lock_status_not_locked(self):
         """测试检查表锁状态 - 未锁定"""
@@ -234,33 +233,40 @@ class TestTableLockManager:
 
     def test_cleanup_expired_locks(self):
         """测试清理过期锁"""
-        # 创建一个过期任务和一个未过期任务
+        expired_lease = TableLock(task_id=456)
         expired_task = MergeTask(
             id=456,
             table_lock_acquired=True,
             status="running",
+            started_time=datetime.utcnow(),
+        )
+        stale_task = MergeTask(
+            id=789,
+            table_lock_acquired=True,
+            status="running",
             started_time=datetime.utcnow() - timedelta(hours=3),
         )
-
         active_task = MergeTask(
-            id=789,
+            id=999,
             table_lock_acquired=True,
             status="running",
             started_time=datetime.utcnow(),
         )
 
-        self.mock_db.query().filter().all.return_value = [expired_task, active_task]
+        self.mock_db.query().filter().all.side_effect = [
+            [expired_lease],
+            [expired_task, stale_task, active_task],
+        ]
 
-        with patch.object(TableLockManager, "_is_lock_expired") as mock_expired:
-            with patch.object(TableLockManager, "_force_release_lock") as mock_release:
-                # 第一个任务过期，第二个未过期
-                mock_expired.side_effect = [True, False]
-
-                result = TableLockManager.cleanup_expired_locks(self.mock_db, 120)
+        with patch.object(TableLockManager, "_force_release_lock") as mock_release:
+            result = TableLockManager.cleanup_expired_locks(self.mock_db, 120)
 
         assert result["success"] is True
-        assert result["cleaned_locks"] == 1
-        mock_release.assert_called_once_with(self.mock_db, expired_task)
+        # 一个过期租约 + 一个无租约的遗留超时镜像锁
+        assert result["cleaned_locks"] == 2
+        self.mock_db.delete.assert_called_once_with(expired_lease)
+        released = [c.args[1] for c in mock_release.call_args_list]
+        assert released == [expired_task, stale_task]
         self.mock_db.commit.assert_called_once()
 
     def test_is_lock_expired_true(self):
@@ -339,31 +345,33 @@ class TestTableLockManager:
 
     def test_get_all_table_locks(self):
         """测试获取所有表锁信息"""
-        task1 = MergeTask(
-            id=123,
+        now = datetime.utcnow()
+        lease1 = TableLock(
+            task_id=123,
             cluster_id=1,
             database_name="db1",
             table_name="table1",
-            table_lock_acquired=True,
-            lock_holder="task_123",
-            status="running",
-            started_time=datetime.utcnow(),
-            merge_strategy="safe_merge",
+            holder="task_123",
+            acquired_at=now,
+            heartbeat_at=now,
+            expires_at=now + timedelta(minutes=10),
         )
-
-        task2 = MergeTask(
-            id=456,
+        lease2 = TableLock(
+            task_id=456,
             cluster_id=2,
             database_name="db2",
             table_name="table2",
-            table_lock_acquired=True,
-            lock_holder="task_456",
-            status="pending",
-            created_time=datetime.utcnow(),
-            merge_strategy="concatenate",
+            holder="task_456",
+            acquired_at=now,
+            heartbeat_at=now,
+            expires_at=now - timedelta(minutes=1),
         )
+        task1 = MergeTask(id=123, status="running")
 
-        self.mock_db.query().filter().all.return_value = [task1, task2]
+        self.mock_db.query().outerjoin().all.return_value = [
+            (lease1, task1),
+            (lease2, None),
+        ]
 
         result = TableLockManager.get_all_table_locks(self.mock_db)
 
@@ -380,23 +388,24 @@ class TestTableLockManager:
         assert lock1["table_name"] == "table1"
         assert lock1["lock_holder"] == "task_123"
         assert lock1["task_status"] == "running"
-        assert lock1["strategy"] == "safe_merge"
+        assert lock1["expired"] is False
+        assert locks[1]["task_status"] is None
+        assert locks[1]["expired"] is True
 
     def test_get_all_table_locks_with_cluster_filter(self):
         """测试获取指定集群的表锁信息"""
-        task1 = MergeTask(id=123, cluster_id=1, table_lock_acquired=True)
-        task2 = MergeTask(id=456, cluster_id=2, table_lock_acquired=True)
+        now = datetime.utcnow()
+        lease = TableLock(task_id=123, cluster_id=1, holder="task_123", expires_at=now)
 
         # 模拟查询链式调用
-        query_mock = self.mock_db.query.return_value
-        filter_mock1 = query_mock.filter.return_value
-        filter_mock2 = filter_mock1.filter.return_value
-        filter_mock2.all.return_value = [task1]  # 只返回集群1的任务
+        outerjoin_mock = self.mock_db.query.return_value.outerjoin.return_value
+        outerjoin_mock.filter.return_value.all.return_value = [(lease, None)]
 
         result = TableLockManager.get_all_table_locks(self.mock_db, cluster_id=1)
 
         assert result["success"] is True
         assert result["total_locks"] == 1
+        outerjoin_mock.filter.assert_called_once()
 
     def test_error_handling_in_acquire_lock(self):
         """测试获取锁时的错误处理"""
@@ -4,6 +4,7 @@ import pytest
 
 from app.models.cluster import Cluster
 from app.models.merge_task import MergeTask
+from app.models.table_lock import TableLock
 from app.utils.table_lock_manager import TableLockManager
 
 
@@ -68,10 +69,10 @@ def test_acquire_and_release_lock_flow(db_session):
 def test_acquire_when_other_task_holds_lock(db_session):
     c = _make_cluster(db_session)
     holder = _make_task(db_session, c.id, name="holder")
-    holder.table_lock_acquired = True
-    holder.status = "running"
-    holder.started_time = datetime.utcnow()
-    db_session.commit()
+    r = TableLockManager.acquire_table_lock(
+        db_session, c.id, holder.database_name, holder.table_name, holder.id
+    )
+    assert r["success"] is True
 
     me = _make_task(db_session, c.id, name="me")
 
@@ -80,15 +81,22 @@ def test_acquire_when_other_task_holds_lock(db_session):
     )
     assert r["success"] is False
     assert r.get("locked_by_task") == holder.id
+    assert r.get("lock_holder") == f"task_{holder.id}"
+
+    db_session.refresh(me)
+    assert me.table_lock_acquired is not True
 
 
 @pytest.mark.unit
 def test_expired_lock_is_force_released_then_acquired_by_new_task(db_session):
     c = _make_cluster(db_session)
     expired = _make_task(db_session, c.id, name="expired")
-    expired.table_lock_acquired = True
+    TableLockManager.acquire_table_lock(
+        db_session, c.id, expired.database_name, expired.table_name, expired.id
+    )
     expired.status = "running"
-    expired.started_time = datetime.utcnow() - timedelta(minutes=180)
+    lease = db_session.query(TableLock).filter_by(task_id=expired.id).one()
+    lease.expires_at = datetime.utcnow() - timedelta(minutes=1)
     db_session.commit()
 
     me = _make_task(db_session, c.id, name="me")
@@ -106,8 +114,31 @@ def test_expired_lock_is_force_released_then_acquired_by_new_task(db_session):
     db_session.refresh(expired)
     db_session.refresh(me)
     assert expired.table_lock_acquired is False
-    assert expired.status in ("failed", "running")  # 若释放时处于 running 应标记 failed
+    assert expired.status == "failed"
     assert me.table_lock_acquired is True
+    assert db_session.query(TableLock).count() == 1
+
+
+@pytest.mark.unit
+def test_reacquire_and_renew_by_holder(db_session):
+    c = _make_cluster(db_session)
+    task = _make_task(db_session, c.id)
+
+    for _ in range(2):
+        r = TableLockManager.acquire_table_lock(
+            db_session, c.id, task.database_name, task.table_name, task.id
+        )
+        assert r["success"] is True
+
+    lease = db_session.query(TableLock).filter_by(task_id=task.id).one()
+    before = lease.expires_at
+    assert TableLockManager.renew_table_lock(db_session, task.id, 240) is True
+    db_session.refresh(lease)
+    assert lease.expires_at > before
+
+    TableLockManager.release_table_lock(db_session, task.id)
+    assert db_session.query(TableLock).count() == 0
+    assert TableLockManager.renew_table_lock(db_session, task.id) is False
 
 
 @pytest.mark.unit
@@ -3,6 +3,7 @@ from types import SimpleNamespace
 
 import pytest
 
+from app.utils import kerberos_ticket_manager as ticket_manager_module
 from app.utils import webhdfs_client as module
 from app.utils.kerberos_diagnostics import (
     KerberosDiagnosticCode,
@@ -21,7 +22,7 @@ def test_webhdfs_client_configures_kerberos(monkeypatch, tmp_path):
 
     run_calls = []
 
-    def fake_run(cmd, check, stdout, stderr, env, text):
+    def fake_run(cmd, env=None, **kwargs):
         run_calls.append((cmd, env))
 
         class Result:
@@ -30,8 +31,10 @@ def test_webhdfs_client_configures_kerberos(monkeypatch, tmp_path):
 
         return Result()
 
-    monkeypatch.setattr(module.subprocess, "run", fake_run)
+    monkeypatch.setattr(ticket_manager_module.subprocess, "run", fake_run)
     monkeypatch.delenv("KRB5CCNAME", raising=False)
+    manager = ticket_manager_module.KerberosTicketManager(cache_dir=str(tmp_path))
+    monkeypatch.setattr(module, "get_ticket_manager", lambda: manager)
 
     keytab = tmp_path / "test.keytab"
     keytab.write_bytes(b"dummy")
@@ -50,11 +53,19 @@ def test_webhdfs_client_configures_kerberos(monkeypatch, tmp_path):
     client = module.WebHDFSClient.from_cluster(cluster, timeout=15)
 
     assert client.session.auth is fake_auth
-    assert any(cmd[0] == "kinit" for cmd, _ in run_calls)
-    assert os.environ.get("KRB5CCNAME") == str(cache_path)
+    kinit_calls = [cmd for cmd, _ in run_calls if cmd[0] == "kinit"]
+    assert len(kinit_calls) == 1 and str(cache_path) in kinit_calls[0]
+    # 票据缓存只交给本客户端，不修改进程级环境变量
+    assert client._ticket_cache_env == str(cache_path)
+    assert "KRB5CCNAME" not in os.environ
     assert client.kerberos_principal.endswith("@EXAMPLE.COM")
 
+    # 票据未到期时再次建立连接不再执行 kinit
+    module.WebHDFSClient.from_cluster(cluster, timeout=15).close()
+    assert len([cmd for cmd, _ in run_calls if cmd[0] == "kinit"]) == 1
+
     client.close()
+    manager.shutdown()
 
 
 @pytest.mark.unit
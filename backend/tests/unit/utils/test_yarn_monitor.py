@@ -0,0 +1,325 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils import yarn_monitor as module
+from app.utils.yarn_monitor import YarnApplicationInfo, YarnApplicationPoller
+
+
+def _app(app_id, start_time, name="HIVE-session", tags="", progress=10.0):
+    return YarnApplicationInfo(
+        id=app_id,
+        name=name,
+        application_type="TEZ",
+        user="hive",
+        queue="default",
+        state="RUNNING",
+        final_status="UNDEFINED",
+        progress=progress,
+        tracking_url="",
+        original_tracking_url="",
+        start_time=start_time,
+        finish_time=0,
+        elapsed_time=0,
+        memory_seconds=0,
+        vcore_seconds=0,
+        preempted_resource_mb=0,
+        preempted_resource_vcores=0,
+        application_tags=tags,
+    )
+
+
+@pytest.fixture
+def poller():
+    monitor = MagicMock()
+    p = YarnApplicationPoller(monitor, interval=3600)
+    yield p
+    p.stop()
+
+
+@pytest.mark.unit
+def test_poll_once_uses_started_time_filter_and_matches_tags(poller):
+    sub_a = poller.subscribe(tag="HSFP-MERGE-1-aaaa", started_after_ms=1_000_000)
+    sub_b = poller.subscribe(tag="hsfp-merge-2-bbbb", started_after_ms=1_000_500)
+    poller.monitor.get_applications.return_value = [
+        _app("application_2", 1_000_600, tags="hsfp-merge-2-bbbb"),
+        _app("application_1", 1_000_700, tags="userid=hive,hsfp-merge-1-aaaa"),
+    ]
+
+    poller.poll_once()
+
+    kwargs = poller.monitor.get_applications.call_args.kwargs
+    assert kwargs["started_time_begin"] == 1_000_000 - poller.CLOCK_SKEW_MS
+    assert kwargs["application_types"] == ["TEZ", "MAPREDUCE"]
+    assert sub_a.latest.id == "application_1"
+    assert sub_b.latest.id == "application_2"
+
+
+@pytest.mark.unit
+def test_fallback_does_not_reuse_claimed_applications(poller):
+    tagged = poller.subscribe(tag="hsfp-merge-1-aaaa", started_after_ms=2_000_000)
+    untagged = poller.subscribe(started_after_ms=2_000_000)
+    poller.monitor.get_applications.return_value = [
+        _app("application_1", 2_000_100, tags="hsfp-merge-1-aaaa"),
+        _app("application_old", 1_000_000),
+        _app("application_2", 2_000_200),
+    ]
+
+    poller.poll_once()
+
+    assert tagged.application_id == "application_1"
+    assert untagged.application_id == "application_2"
+
+
+@pytest.mark.unit
+def test_tagged_subscription_never_falls_back_to_other_jobs(poller, monkeypatch):
+    monkeypatch.setattr(module, "get_shared_yarn_poller", lambda monitor: poller)
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("hive.execution.engine=mr",)]
+    _, sub = module.subscribe_yarn_application(poller.monitor, cursor, 5)
+    poller.monitor.get_applications.return_value = [
+        _app("application_other", sub.started_after_ms - 1_000),
+    ]
+
+    poller.poll_once()
+
+    assert sub.allow_fallback is False
+    assert sub.application_id is None and sub.latest is None
+
+
+@pytest.mark.unit
+def test_fallback_binding_is_provisional_until_tagged_app_appears(poller):
+    untagged = poller.subscribe(tag="hsfp-merge-4-dddd", started_after_ms=3_000_000)
+    other = _app("application_other", 3_000_050)
+    poller.monitor.get_applications.return_value = [other]
+    poller.poll_once()
+    assert untagged.application_id == "application_other"
+    assert untagged.provisional is True
+
+    poller.monitor.get_applications.return_value = [
+        other,
+        _app("application_4", 3_000_100, tags="hsfp-merge-4-dddd", progress=40.0),
+    ]
+    poller.poll_once()
+
+    assert untagged.application_id == "application_4"
+    assert untagged.provisional is False
+    assert untagged.latest.progress == 40.0
+
+
+@pytest.mark.unit
+def test_provisional_binding_yields_to_tagged_owner(poller):
+    fallback = poller.subscribe(started_after_ms=4_000_000)
+    app = _app("application_5", 4_000_100)
+    poller.monitor.get_applications.return_value = [app]
+    poller.poll_once()
+    assert fallback.application_id == "application_5" and fallback.provisional
+
+    owner = poller.subscribe(tag="hsfp-merge-5-eeee", started_after_ms=4_000_000)
+    app.application_tags = "hsfp-merge-5-eeee"
+    poller.poll_once()
+
+    assert owner.application_id == "application_5"
+    assert fallback.application_id is None and fallback.latest is None
+
+
+@pytest.mark.unit
+def test_bound_application_receives_updates_and_unsubscribe(poller):
+    sub = poller.subscribe(tag="hsfp-merge-3-cccc", started_after_ms=0)
+    poller.monitor.get_applications.return_value = [
+        _app("application_3", 10, tags="hsfp-merge-3-cccc", progress=20.0)
+    ]
+    poller.poll_once()
+    poller.monitor.get_applications.return_value = [
+        _app("application_3", 10, tags="", progress=80.0)
+    ]
+    poller.poll_once()
+
+    assert sub.latest.progress == 80.0
+
+    poller.unsubscribe(sub)
+    assert poller.subscription_count() == 0
+
+
+@pytest.mark.unit
+def test_subscribe_restarts_polling_after_idle_exit(poller, monkeypatch):
+    started = []
+
+    def fake_run_coroutine_threadsafe(coro, loop):
+        started.append(coro)
+        return MagicMock(done=MagicMock(return_value=False))
+
+    monkeypatch.setattr(
+        module.asyncio, "run_coroutine_threadsafe", fake_run_coroutine_threadsafe
+    )
+    monkeypatch.setattr(module, "get_yarn_monitor_loop", lambda: None)
+    poller.interval = 0
+
+    sub = poller.subscribe(tag="hsfp-merge-7-gggg")
+    poller.unsubscribe(sub)
+    # 轮询协程因无订阅退出；其 future 尚未被标记为 done
+    asyncio.run(started[0])
+    assert poller._future is None
+
+    poller.subscribe(tag="hsfp-merge-8-hhhh")
+    assert len(started) == 2
+    started[1].close()
+
+
+@pytest.mark.unit
+def test_apply_yarn_query_tag_tolerates_restricted_settings():
+    cursor = MagicMock()
+    cursor.execute.side_effect = [Exception("not in whitelist"), None]
+
+    # 只有 mapreduce.job.tags 生效时 Tez 应用没有标签，不能关闭兜底
+    assert module.apply_yarn_query_tag(cursor, "hsfp-merge-1-x") is False
+    assert [c.args[0] for c in cursor.execute.call_args_list] == [
+        "SET hive.query.tag=hsfp-merge-1-x",
+        "SET mapreduce.job.tags=hsfp-merge-1-x",
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "rows, expected",
+    [
+        ([("hive.execution.engine=mr",)], True),
+        ([("hive.execution.engine=tez",)], False),
+        ([], False),
+    ],
+)
+def test_apply_yarn_query_tag_keeps_fallback_for_tez_sessions(rows, expected):
+    cursor = MagicMock()
+    cursor.fetchall.return_value = rows
+
+    assert module.apply_yarn_query_tag(cursor, "hsfp-merge-1-x") is expected
+
+
+@pytest.mark.unit
+def test_tez_subscription_keeps_provisional_fallback(poller, monkeypatch):
+    monkeypatch.setattr(module, "get_shared_yarn_poller", lambda monitor: poller)
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("hive.execution.engine=tez",)]
+    _, sub = module.subscribe_yarn_application(poller.monitor, cursor, 6)
+    # Tez 应用不带本次标签，按启动时间临时绑定
+    poller.monitor.get_applications.return_value = [
+        _app("application_session", sub.started_after_ms + 100),
+    ]
+
+    poller.poll_once()
+
+    assert sub.allow_fallback is True
+    assert sub.application_id == "application_session" and sub.provisional
+
+
+@pytest.mark.unit
+def test_shared_poller_is_keyed_by_resource_managers(monkeypatch):
+    monkeypatch.setattr(module, "_shared_pollers", {})
+    first = MagicMock(resource_manager_urls=["http://rm1:8088"])
+    second = MagicMock(resource_manager_urls=["http://rm1:8088"])
+    other = MagicMock(resource_manager_urls=["http://rm2:8088"])
+
+    assert module.get_shared_yarn_poller(first) is module.get_shared_yarn_poller(second)
+    assert module.get_shared_yarn_poller(other) is not module.get_shared_yarn_poller(
+        first
+    )
+
+
+def _bare_monitor():
+    monitor = module.YarnResourceManagerMonitor.__new__(
+        module.YarnResourceManagerMonitor
+    )
+    monitor.active_rm_url = "http://rm:8088"
+    return monitor
+
+
+@pytest.mark.unit
+async def test_monitor_applications_async_watches_many_with_ring_buffer():
+    monitor = _bare_monitor()
+    polls = {"application_a": 0, "application_b": 0}
+
+    def fake_get(app_id):
+        polls[app_id] += 1
+        n = polls[app_id]
+        if app_id == "application_a" and n >= 5:
+            app = _app(app_id, 0, progress=100.0)
+            app.state = "FINISHED"
+            app.final_status = "SUCCEEDED"
+            return app
+        if app_id == "application_b" and n >= 2:
+            return None
+        return _app(app_id, 0, progress=float(n * 10))
+
+    monitor.get_application_by_id = fake_get
+
+    results = await monitor.monitor_applications_async(
+        ["application_a", "application_b"],
+        min_interval=0,
+        max_interval=0,
+        history_size=3,
+    )
+
+    a = results["application_a"]
+    assert a["success"] is True
+    assert a["final_state"] == "FINISHED"
+    assert len(a["progress_history"]) == 3
+    assert a["progress_history"][-1].progress == 100.0
+    assert results["application_b"]["final_state"] == "RUNNING"
+    assert len(results["application_b"]["progress_history"]) == 1
+
+
+@pytest.mark.unit
+def test_monitor_application_progress_returns_serialisable_history():
+    monitor = _bare_monitor()
+    finished = _app("application_c", 0, progress=100.0)
+    finished.state = "FINISHED"
+    finished.final_status = "SUCCEEDED"
+    monitor.get_application_by_id = lambda app_id: finished
+
+    result = monitor.monitor_application_progress("application_c", check_interval=0)
+
+    assert result["success"] is True
+    assert result["progress_history"][0]["state"] == "FINISHED"
+    assert isinstance(result["progress_history"][0]["timestamp"], str)
+
+
+@pytest.mark.unit
+async def test_sync_monitor_works_inside_running_loop_and_shares_monitor_loop():
+    monitor = _bare_monitor()
+    finished = _app("application_d", 0, progress=100.0)
+    finished.state = "FINISHED"
+    finished.final_status = "SUCCEEDED"
+    monitor.get_application_by_id = lambda app_id: finished
+
+    # 调用线程已有运行中的事件循环时不再因 asyncio.run 抛出 RuntimeError
+    result = monitor.monitor_application_progress("application_d", check_interval=0)
+    assert result["final_status"] == "SUCCEEDED"
+
+    future = monitor.watch_applications(["application_d"], min_interval=0)
+    assert future.result(timeout=5)["application_d"]["success"] is True
+    assert module.get_yarn_monitor_loop() is module.get_yarn_monitor_loop()
+
+
+@pytest.mark.unit
+def test_poller_runs_on_shared_monitor_loop():
+    monitor = MagicMock()
+    monitor.get_applications.return_value = [
+        _app("application_6", 10, tags="hsfp-merge-6-ffff", progress=30.0)
+    ]
+    poller = YarnApplicationPoller(monitor, interval=0.01)
+    try:
+        sub = poller.subscribe(tag="hsfp-merge-6-ffff", started_after_ms=0)
+        deadline = time.monotonic() + 2
+        while sub.latest is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sub.latest.progress == 30.0
+
+        # 最后一个订阅取消后协程自行退出
+        future = poller._future
+        poller.unsubscribe(sub)
+        future.result(timeout=2)
+        assert future.done() and poller._future is None
+    finally:
+        poller.stop()
@@ -54,6 +54,8 @@ export interface PartitionArchiveResult {
   original_location?: string
   archive_location: string
   files_moved?: number
+  bytes_moved?: number
+  manifest_path?: string | null
   moved_files?: Array<{
     source: string
     target: string
@@ -70,6 +72,8 @@ export interface PartitionRestoreResult {
   archive_location?: string
   restored_location: string
   files_restored?: number
+  bytes_restored?: number
+  manifest_path?: string | null
   restored_files?: Array<{
     archive: string
     restored: string
@@ -121,7 +121,7 @@ export async function loadMergeRun(taskId: number): Promise<NormalizedTaskRun> {
   const task = await tasksApi.get(taskId)
   let logs: any[] = []
   try {
-    logs = await tasksApi.getLogs(taskId, 1000)  // 获取更多日志,避免遗漏ERROR
+    logs = await tasksApi.getAllLogs(taskId)  // 分页拉取全部日志,避免遗漏ERROR
   } catch {}
 
   // Group logs by phase and infer per-phase status from start/end messages
@@ -263,7 +263,7 @@ export async function loadTestTableRun(taskId: string): Promise<NormalizedTaskRu
   let taskInfo: any = null
 
   try {
-    logs = await tasksApi.getLogs(taskId)
+    logs = await tasksApi.getAllLogs(taskId)
     console.log('Test table logs loaded:', logs)
   } catch (e) {
     console.warn('Failed to load test table logs:', e)
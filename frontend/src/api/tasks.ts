@@ -108,8 +108,32 @@ export const tasksApi = {
   },
 
   // 获取任务日志 (支持合并任务number ID 和测试表任务string UUID)
-  getLogs(id: number | string): Promise<any[]> {
-    return api.get(`/tasks/${id}/logs`)
+  // 传入 after_id 可增量拉取(仅返回更新的日志),limit/level/phase 用于分页与过滤
+  getLogs(
+    id: number | string,
+    params?: { after_id?: number; limit?: number; level?: string; phase?: string }
+  ): Promise<any[]> {
+    return api.get(`/tasks/${id}/logs`, { params })
+  },
+
+  // 按 after_id 游标分页拉取全部日志(每页 pageSize 条),避免单次请求返回整表
+  async getAllLogs(
+    id: number | string,
+    params?: { level?: string; phase?: string; pageSize?: number }
+  ): Promise<any[]> {
+    const { pageSize = 1000, ...filters } = params || {}
+    const logs: any[] = []
+    let afterId: number | undefined
+    while (true) {
+      const page: any[] = await api.get(`/tasks/${id}/logs`, {
+        params: { ...filters, after_id: afterId, limit: pageSize }
+      })
+      logs.push(...page)
+      const lastId = page[page.length - 1]?.id
+      if (page.length < pageSize || typeof lastId !== 'number') break
+      afterId = lastId
+    }
+    return logs
   },
 
   // 获取表信息（包括分区状态）